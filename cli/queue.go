@@ -1,6 +1,10 @@
 package main
 
 import (
+	"bytes"
+	"compress/zlib"
+	"context"
+	"encoding/base64"
 	"encoding/json"
 	"fmt"
 	"net/http"
@@ -17,8 +21,13 @@ import (
 var endpointPaths = map[string]string{
 	"monitoring": "/monitoring",
 	"heartbeat":  "/heartbeat",
+	// Written by seerpy's rollups into the shared queue.
+	"rollup": "/rollup",
 }
 
+// queueLockTimeout bounds the wait for .queue.lock when queueing an envelope.
+var queueLockTimeout = 5 * time.Second
+
 type Envelope struct {
 	Version        int            `json:"version"`
 	Endpoint       string         `json:"endpoint"`
@@ -122,7 +131,6 @@ func enforceQueueLimits(queueDir string) (int, error) {
 	if err != nil {
 		return 0, err
 	}
-	maxFiles, maxBytes := getQueueLimits()
 
 	lock := flock.New(filepath.Join(path, ".queue.lock"))
 	locked, err := lock.TryLock()
@@ -130,7 +138,13 @@ func enforceQueueLimits(queueDir string) (int, error) {
 		return 0, err
 	}
 	defer lock.Unlock()
+	return evictOldest(path)
+}
 
+// evictOldest drops the oldest envelopes until the queue is under its limits.
+// The caller holds .queue.lock.
+func evictOldest(path string) (int, error) {
+	maxFiles, maxBytes := getQueueLimits()
 	evicted := 0
 	for {
 		files, err := listQueueFiles(path)
@@ -188,10 +202,23 @@ func saveFailedPayload(
 		Attempts:       0,
 		IdempotencyKey: idempotencyKey,
 	}
+	// seerpy indexes the queue under .queue.lock and rescans when the
+	// directory changes; writing under the same lock keeps the two in step.
+	lock := flock.New(filepath.Join(path, ".queue.lock"))
+	ctx, cancel := context.WithTimeout(context.Background(), queueLockTimeout)
+	defer cancel()
+	locked, err := lock.TryLockContext(ctx, 10*time.Millisecond)
+	if err != nil || !locked {
+		if err == nil {
+			err = fmt.Errorf("queue lock busy: %s", path)
+		}
+		return "", err
+	}
+	defer lock.Unlock()
 	if err := atomicWriteJSON(filepathName, envelope); err != nil {
 		return "", err
 	}
-	_, _ = enforceQueueLimits(path)
+	_, _ = evictOldest(path)
 	fmt.Printf("Seer upload failed, queued at %s\n", filepathName)
 	fmt.Println("Call `seer replay` to retrigger events.")
 	return filepathName, nil
@@ -206,6 +233,14 @@ func loadEnvelope(filepathName string) (Envelope, error) {
 	if err := json.Unmarshal(b, &data); err != nil {
 		return Envelope{}, err
 	}
+	if packed, ok := data["payload_zlib"].(string); ok {
+		payload, err := inflatePayload(packed)
+		if err != nil {
+			return Envelope{}, err
+		}
+		delete(data, "payload_zlib")
+		data["payload"] = payload
+	}
 
 	_, hasPayload := data["payload"]
 	_, hasEndpoint := data["endpoint"]
@@ -251,6 +286,25 @@ func loadEnvelope(filepathName string) (Envelope, error) {
 	return env, nil
 }
 
+// inflatePayload decodes the payload of a v4 envelope written by seerpy:
+// base64 of the zlib-compressed payload JSON.
+func inflatePayload(packed string) (map[string]any, error) {
+	raw, err := base64.StdEncoding.DecodeString(packed)
+	if err != nil {
+		return nil, err
+	}
+	reader, err := zlib.NewReader(bytes.NewReader(raw))
+	if err != nil {
+		return nil, err
+	}
+	defer reader.Close()
+	var payload map[string]any
+	if err := json.NewDecoder(reader).Decode(&payload); err != nil {
+		return nil, err
+	}
+	return payload, nil
+}
+
 func endpointURL(baseURL, endpoint string) (string, error) {
 	path, ok := endpointPaths[endpoint]
 	if !ok {
@@ -1,6 +1,9 @@
 package main
 
 import (
+	"bytes"
+	"compress/zlib"
+	"encoding/base64"
 	"encoding/json"
 	"net/http"
 	"net/http/httptest"
@@ -8,6 +11,9 @@ import (
 	"path/filepath"
 	"sync/atomic"
 	"testing"
+	"time"
+
+	"github.com/gofrs/flock"
 )
 
 func TestParseJSONBodyDictAndString(t *testing.T) {
@@ -148,6 +154,27 @@ func TestFIFOEvictionByMaxFiles(t *testing.T) {
 	}
 }
 
+func TestSaveWaitsForQueueLock(t *testing.T) {
+	dir := t.TempDir()
+	held := flock.New(filepath.Join(dir, ".queue.lock"))
+	if ok, err := held.TryLock(); err != nil || !ok {
+		t.Fatalf("lock: %v %v", ok, err)
+	}
+	saved := queueLockTimeout
+	queueLockTimeout = 50 * time.Millisecond
+	defer func() { queueLockTimeout = saved }()
+
+	if _, err := saveFailedPayload(map[string]any{"n": 1}, "heartbeat", "a", "https://example.com", dir); err == nil {
+		t.Fatal("expected a lock timeout while another writer holds .queue.lock")
+	}
+	if err := held.Unlock(); err != nil {
+		t.Fatal(err)
+	}
+	if _, err := saveFailedPayload(map[string]any{"n": 1}, "heartbeat", "a", "https://example.com", dir); err != nil {
+		t.Fatal(err)
+	}
+}
+
 func TestDeadLetterAfterMaxAttempts(t *testing.T) {
 	dir := t.TempDir()
 	t.Setenv("SEER_QUEUE_DIR", dir)
@@ -220,6 +247,73 @@ func TestLegacyRawPayloadStillReplays(t *testing.T) {
 	}
 }
 
+func TestReplaysRollupEnvelope(t *testing.T) {
+	dir := t.TempDir()
+	t.Setenv("SEER_QUEUE_DIR", dir)
+
+	var path, key string
+	srv := httptest.NewServer(http.HandlerFunc(func(w http.ResponseWriter, r *http.Request) {
+		path, key = r.URL.Path, r.Header.Get("Idempotency-Key")
+		_, _ = w.Write([]byte(`{"ok":true}`))
+	}))
+	defer srv.Close()
+
+	body, _ := json.Marshal(map[string]any{
+		"version":         3,
+		"endpoint":        "rollup",
+		"base_url":        srv.URL,
+		"payload":         map[string]any{"job_name": "hot", "count": 10},
+		"created_at":      "2026-01-01T00:00:00+00:00",
+		"attempts":        0,
+		"idempotency_key": "rollup-key",
+	})
+	file := filepath.Join(dir, "20260101000000000000_rollup_abc.json")
+	if err := os.WriteFile(file, body, 0o644); err != nil {
+		t.Fatal(err)
+	}
+
+	result := replayFailedPayloads("key", srv.URL, dir, 5)
+	if result.Sent != 1 || result.Failed != 0 {
+		t.Fatalf("expected sent=1, got %+v", result)
+	}
+	if path != "/rollup" || key != "rollup-key" {
+		t.Fatalf("unexpected request: path=%q key=%q", path, key)
+	}
+	if _, err := os.Stat(file); !os.IsNotExist(err) {
+		t.Fatalf("rollup envelope still queued: %v", err)
+	}
+}
+
+func TestLoadCompressedV4Envelope(t *testing.T) {
+	dir := t.TempDir()
+	var deflated bytes.Buffer
+	w := zlib.NewWriter(&deflated)
+	_, _ = w.Write([]byte(`{"job_name":"etl","status":"failed","logs":"line\n"}`))
+	_ = w.Close()
+
+	path := filepath.Join(dir, "20260101000000000000_monitoring_v4.json")
+	body, _ := json.Marshal(map[string]any{
+		"version":         4,
+		"endpoint":        "monitoring",
+		"base_url":        "https://example.com",
+		"payload_zlib":    base64.StdEncoding.EncodeToString(deflated.Bytes()),
+		"created_at":      "2026-01-01T00:00:00+00:00",
+		"attempts":        1,
+		"idempotency_key": "v4-key",
+	})
+	if err := os.WriteFile(path, body, 0o644); err != nil {
+		t.Fatal(err)
+	}
+
+	env, err := loadEnvelope(path)
+	if err != nil {
+		t.Fatal(err)
+	}
+	if env.Version != 4 || env.Attempts != 1 || env.Payload["job_name"] != "etl" || env.Payload["logs"] != "line\n" {
+		t.Fatalf("unexpected envelope: %#v", env)
+	}
+}
+
 func TestResolveBaseURLPrecedence(t *testing.T) {
 	t.Setenv("SEER_BASE_URL", "https://seer.env.example/")
 	if got := resolveBaseURL(""); got != "https://seer.env.example" {
@@ -0,0 +1,120 @@
+"""
+Offline queue enqueue throughput per backend and durability mode.
+
+Simulates an outage: many writers fall back to the queue at the same moment.
+Writers are threads of one process by default; ``--processes`` makes each one
+a separate process, like many jobs on one host (group commit does not span
+processes, so expect no gain from ``group`` there).
+
+Usage:
+  python examples/queue_benchmark.py
+  python examples/queue_benchmark.py --writers 64 --envelopes 2000 --dir /mnt/nfs/seer-bench
+  python examples/queue_benchmark.py --backends files --modes strict group
+  python examples/queue_benchmark.py --processes
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Allow running from a source checkout without installing first.
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from seerpy.durability import DURABILITY_MODES, get_durability
+from seerpy.payloads import save_failed_payload
+from seerpy.storage import QUEUE_BACKENDS
+
+
+def _write(queue_dir: str, backend: str, n: int, count: int, start) -> None:
+    start.wait()
+    for i in range(count):
+        save_failed_payload(
+            {"job_name": f"job-{n}", "status": "failed", "i": i},
+            "monitoring",
+            queue_dir=queue_dir,
+            backend=backend,
+        )
+
+
+def _write_quietly(queue_dir: str, backend: str, n: int, count: int, start) -> None:
+    with contextlib.redirect_stdout(io.StringIO()):
+        _write(queue_dir, backend, n, count, start)
+
+
+def run(
+    backend: str,
+    mode: str,
+    writers: int,
+    envelopes: int,
+    base_dir: str,
+    processes: bool = False,
+) -> float:
+    """Enqueue ``envelopes`` from ``writers`` threads (or processes); return envelopes/s."""
+    queue_dir = tempfile.mkdtemp(prefix=f"seer-bench-{backend}-{mode}-", dir=base_dir)
+    os.environ["SEER_QUEUE_DURABILITY"] = mode
+    per_writer = max(1, envelopes // writers)
+    if processes:
+        context = multiprocessing.get_context("spawn")
+        start = context.Barrier(writers + 1)
+        workers = [
+            context.Process(target=_write_quietly, args=(queue_dir, backend, n, per_writer, start))
+            for n in range(writers)
+        ]
+    else:
+        start = threading.Barrier(writers + 1)
+        workers = [
+            threading.Thread(target=_write, args=(queue_dir, backend, n, per_writer, start))
+            for n in range(writers)
+        ]
+    for worker in workers:
+        worker.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        start.wait()
+        began = time.perf_counter()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - began
+    shutil.rmtree(queue_dir, ignore_errors=True)
+    return per_writer * writers / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--writers", type=int, default=16)
+    parser.add_argument("--envelopes", type=int, default=800)
+    parser.add_argument("--dir", default=None, help="volume to benchmark (default: temp dir)")
+    parser.add_argument("--backends", nargs="+", default=list(QUEUE_BACKENDS))
+    parser.add_argument("--modes", nargs="+", default=list(DURABILITY_MODES))
+    parser.add_argument(
+        "--processes", action="store_true", help="run each writer as its own process"
+    )
+    args = parser.parse_args()
+
+    os.environ["SEER_QUEUE_MAX_FILES"] = str(args.envelopes * 2)
+    kind = "processes" if args.processes else "threads"
+    print(f"{args.envelopes} envelopes from {args.writers} writer {kind}")
+    print(f"{'backend':<8} {'mode':<8} {'envelopes/s':>12} {'fsync batches':>14}")
+    for backend in args.backends:
+        for mode in args.modes:
+            batches = get_durability(mode).committer.batches
+            rate = run(backend, mode, args.writers, args.envelopes, args.dir, args.processes)
+            batches = get_durability(mode).committer.batches - batches
+            counted = mode == "group" and backend != "sqlite" and not args.processes
+            shown = str(batches) if counted else "-"
+            print(f"{backend:<8} {mode:<8} {rate:>12.0f} {shown:>14}")
+
+
+if __name__ == "__main__":
+    main()
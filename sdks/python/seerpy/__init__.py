@@ -1,3 +1,6 @@
+from .aio import AsyncSeer
+from .pool import connection_stats
+from .sampling import SamplingPolicy
 from .seer import Seer
 from .payloads import (
     queue_status,
@@ -7,7 +10,10 @@ from .payloads import (
 )
 
 __all__ = [
+    "AsyncSeer",
+    "SamplingPolicy",
     "Seer",
+    "connection_stats",
     "queue_status",
     "replay_failed_payloads",
     "retry_dead",
@@ -0,0 +1,369 @@
+"""Asyncio-native Seer client."""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import time
+import traceback
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+
+import requests
+
+from .backoff import ReplaySchedule
+from .http import (
+    DEFAULT_DEADLINE,
+    apost_with_backoff,
+    replay_startup_jitter_seconds,
+)
+from .payloads import (
+    ReplayResult,
+    add_enqueue_listener,
+    get_queue_dir,
+    remove_enqueue_listener,
+    replay_failed_payloads,
+)
+from .rollup import DEFAULT_ROLLUP_INTERVAL
+from .sampling import SamplingPolicy
+from .seer import (
+    DEFAULT_REPLAY_INTERVAL,
+    DEFAULT_REPLAY_MAX_INTERVAL,
+    Seer,
+    _MonitoredRun,
+    _finish_overrun,
+    _report_final_failure,
+    _start_overrun,
+)
+
+
+class AsyncSeer(Seer):
+    """Seer client for asyncio services.
+
+    ``amonitor`` and ``aheartbeat`` never block the event loop: each HTTP
+    attempt runs in the loop's default executor, backoff uses ``asyncio.sleep``,
+    and offline queue writes are offloaded too. Background replay is an asyncio
+    task instead of a thread, so create the client inside a running loop when
+    ``auto_replay`` or ``background_replay`` is set. The synchronous ``monitor``
+    and ``heartbeat`` inherited from ``Seer`` keep working.
+    """
+
+    def __init__(
+        self,
+        apiKey: Optional[str] = None,
+        *,
+        api_key: Optional[str] = None,
+        auto_replay: bool = False,
+        background_replay: bool = False,
+        replay_interval: float = DEFAULT_REPLAY_INTERVAL,
+        replay_max_interval: float = DEFAULT_REPLAY_MAX_INTERVAL,
+        base_url: Optional[str] = None,
+        timeout: float = 30,
+        queue_backend: Optional[str] = None,
+        rollup_interval: float = DEFAULT_ROLLUP_INTERVAL,
+        connect_timeout: Optional[float] = None,
+        send_deadline: Optional[float] = DEFAULT_DEADLINE,
+    ):
+        super().__init__(
+            apiKey,
+            api_key=api_key,
+            replay_interval=replay_interval,
+            replay_max_interval=replay_max_interval,
+            base_url=base_url,
+            timeout=timeout,
+            queue_backend=queue_backend,
+            rollup_interval=rollup_interval,
+            connect_timeout=connect_timeout,
+            send_deadline=send_deadline,
+        )
+        self._bg_task: Optional["asyncio.Task[None]"] = None
+        self._bg_async_stop: Optional[asyncio.Event] = None
+        self._bg_async_wake: Optional[asyncio.Event] = None
+        self._bg_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._auto_replay_task: Optional["asyncio.Task[None]"] = None
+
+        if auto_replay:
+            self._auto_replay_task = asyncio.get_running_loop().create_task(
+                self._auto_replay()
+            )
+
+        if background_replay:
+            self.start_background_replay()
+
+    async def _apost(
+        self,
+        path: str,
+        payload: Dict[str, Any],
+        *,
+        idempotency_key: Optional[str] = None,
+        deadline: Optional[float] = None,
+    ) -> requests.Response:
+        key = idempotency_key or str(uuid.uuid4())
+        return await apost_with_backoff(
+            self._url(path),
+            payload,
+            self._headers(idempotency_key=key),
+            timeout=self.timeout,
+            connect_timeout=self.connect_timeout,
+            deadline=self.send_deadline if deadline is None else deadline,
+            session=self._session,
+        )
+
+    async def _aqueue(
+        self,
+        payload: Dict[str, Any],
+        endpoint: str,
+        *,
+        idempotency_key: str,
+    ) -> str:
+        """Write an offline envelope from the executor so disk I/O stays off the loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None,
+            functools.partial(
+                self._queue,
+                payload,
+                endpoint,
+                idempotency_key=idempotency_key,
+            ),
+        )
+
+    async def areplay(
+        self,
+        *,
+        max_attempts: int = 5,
+        concurrency: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        shards: Optional[int] = None,
+    ) -> ReplayResult:
+        """Flush the local offline queue to SEER without blocking the loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None,
+            functools.partial(
+                replay_failed_payloads,
+                self.api_key,
+                base_url=self.base_url,
+                max_attempts=max_attempts,
+                concurrency=concurrency,
+                batch_size=batch_size,
+                backend=self.queue_backend,
+                shards=shards,
+            ),
+        )
+
+    async def _auto_replay(self) -> None:
+        try:
+            jitter = replay_startup_jitter_seconds()
+            if jitter > 0:
+                await asyncio.sleep(jitter)
+            await self.areplay()
+        except Exception as exc:
+            print(f"Seer auto_replay skipped: {exc}")
+
+    def _wake_replay(self, queue_dir: str) -> None:
+        loop, wake = self._bg_loop, self._bg_async_wake
+        if loop is None or wake is None or queue_dir != get_queue_dir():
+            return
+        try:
+            loop.call_soon_threadsafe(wake.set)
+        except RuntimeError:  # loop already closed
+            pass
+
+    def start_background_replay(self) -> None:
+        """Start an asyncio task that flushes the offline queue.
+
+        Paced like :meth:`Seer.start_background_replay`, including the wake-up
+        on enqueue. Must be called from within a running event loop.
+        """
+        if self._bg_task is not None and not self._bg_task.done():
+            return
+        loop = asyncio.get_running_loop()
+        self._bg_loop = loop
+        self._bg_async_stop = asyncio.Event()
+        self._bg_async_wake = asyncio.Event()
+        add_enqueue_listener(self._wake_replay)
+        self._bg_task = loop.create_task(
+            self._replay_loop(self._bg_async_stop, self._bg_async_wake)
+        )
+
+    async def _replay_loop(self, stop: asyncio.Event, wake: asyncio.Event) -> None:
+        # Stampede guard before the first flush when many workers start together.
+        jitter = replay_startup_jitter_seconds()
+        if jitter > 0 and await _wait_event(stop, jitter):
+            return
+        schedule = ReplaySchedule(self.replay_interval, self.replay_max_interval)
+        loop = asyncio.get_running_loop()
+        while not stop.is_set():
+            wake.clear()
+            result: Optional[ReplayResult] = None
+            try:
+                result = await self.areplay()
+            except Exception as exc:
+                print(f"Seer background_replay error: {exc}")
+            until = loop.time() + schedule.next_delay(result)
+            while not stop.is_set():
+                remaining = until - loop.time()
+                if remaining <= 0:
+                    break
+                if await _wait_event(wake, remaining):
+                    if not schedule.failing:
+                        break
+                    wake.clear()
+
+    def stop_background_replay(self, timeout: float = 2.0) -> None:
+        """Signal the background replay task to stop (see ``aclose`` to await it)."""
+        remove_enqueue_listener(self._wake_replay)
+        if self._bg_async_stop is not None:
+            self._bg_async_stop.set()
+        task = self._bg_task
+        if task is not None and not task.done():
+            task.cancel()
+        self._bg_task = None
+
+    async def aclose(self) -> None:
+        """Stop background replay and wait for in-flight work to settle."""
+        tasks = [t for t in (self._bg_task, self._auto_replay_task) if t is not None]
+        self.stop_background_replay()
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._auto_replay_task = None
+
+    @asynccontextmanager
+    async def amonitor(
+        self,
+        job_name: str,
+        capture_logs: bool = False,
+        metadata: Optional[dict] = None,
+        tags: Optional[List[str]] = None,
+        stream_logs: bool = False,
+        capture_mode: str = "python",
+        capture_level: Union[int, str, None] = None,
+        sampling: Optional[SamplingPolicy] = None,
+        rollup: bool = False,
+        start_budget: Optional[float] = None,
+        finish_budget: Optional[float] = None,
+    ) -> AsyncIterator[None]:
+        """Async counterpart of ``Seer.monitor``.
+
+        A cancelled task is reported as ``cancelled``. ``capture_logs`` and
+        ``stream_logs`` tee process-wide stdout and logging, so concurrent
+        runs see each other's output. Streamed chunks are shipped from a
+        thread, never from the event loop. ``start_budget`` and
+        ``finish_budget`` work as in ``monitor``.
+        """
+        run = self._open_run(
+            job_name,
+            metadata,
+            tags,
+            capture_logs=capture_logs,
+            stream_logs=stream_logs,
+            capture_mode=capture_mode,
+            sampling=sampling,
+            rollup=rollup,
+        )
+        start_task: Optional["asyncio.Future[Any]"] = None
+        if not self._batch_start(run):
+            start_task = asyncio.ensure_future(
+                self._apost(
+                    "/monitoring",
+                    run.start_payload(),
+                    idempotency_key=f"{run.run_key}:register",
+                    deadline=start_budget,
+                )
+            )
+        self._start_capture(run, capture_logs, stream_logs, capture_mode, capture_level)
+
+        try:
+            print("→ Monitoring active.")
+            print("Starting Code...")
+            yield
+        except asyncio.CancelledError:
+            run.fail("cancelled")
+            raise
+        except Exception:
+            run.fail("failed", traceback.format_exc())
+            raise
+        finally:
+            finish_by = None if finish_budget is None else time.monotonic() + finish_budget
+            log_contents = None
+            if run.capture is not None:
+                # Draining fd readers or an in-flight chunk must not block the loop.
+                log_contents = await asyncio.get_running_loop().run_in_executor(
+                    None, run.capture.stop
+                )
+            final_payload = run.final_payload(log_contents)
+
+            # Keep start-before-final ordering when the register is still in flight.
+            start_error = None
+            if start_task is not None:
+                wait = self.timeout
+                if finish_by is not None:
+                    wait = max(0.0, finish_by - time.monotonic())
+                done, _ = await asyncio.wait({start_task}, timeout=wait)
+                if start_task in done and not start_task.cancelled():
+                    start_error = start_task.exception()
+                elif finish_by is not None:
+                    start_error = _start_overrun()
+
+            await self._afinish_run(run, final_payload, start_error, finish_by)
+
+    async def _afinish_run(
+        self,
+        run: _MonitoredRun,
+        final_payload: Dict[str, Any],
+        start_error: Optional[BaseException],
+        finish_by: Optional[float],
+    ) -> None:
+        """Async :meth:`Seer._finish_run`."""
+        if not self._settle_run(run, final_payload):
+            return  # Rolled up, not sampled, or buffered with the start event.
+        if start_error is not None:
+            print(start_error)
+        try:
+            if finish_by is not None and time.monotonic() >= finish_by:
+                raise _finish_overrun()  # and the start may still be in flight
+            await self._apost(
+                "/monitoring",
+                final_payload,
+                idempotency_key=f"{run.run_key}:complete",
+                deadline=None if finish_by is None else finish_by - time.monotonic(),
+            )
+            print("✓ Monitoring complete.")
+        except Exception as exc:
+            await self._aqueue(final_payload, "monitoring", idempotency_key=run.run_key)
+            _report_final_failure(run, exc, start_error)
+
+    async def aheartbeat(
+        self,
+        job_name: str,
+        metadata: Optional[dict] = None,
+        tags: Optional[List[str]] = None,
+    ) -> None:
+        current_time = datetime.now(timezone.utc).isoformat(sep=" ")
+        payload = {
+            "job_name": job_name,
+            "current_time": current_time,
+            "metadata": metadata,
+            "tags": tags,
+        }
+        idem_key = str(uuid.uuid4())
+        try:
+            await self._apost("/heartbeat", payload, idempotency_key=idem_key)
+            print("Heartbeat received")
+        except Exception:
+            await self._aqueue(payload, "heartbeat", idempotency_key=idem_key)
+
+
+async def _wait_event(event: asyncio.Event, timeout: float) -> bool:
+    """Wait up to ``timeout`` seconds; True when the event was set."""
+    try:
+        await asyncio.wait_for(event.wait(), timeout=timeout)
+    except asyncio.TimeoutError:
+        return False
+    return True
@@ -0,0 +1,179 @@
+"""Per-host replay backoff that survives between replay passes and processes.
+
+``post_with_backoff`` honours ``Retry-After`` only within one call. Without
+memory, the next pass from ``auto_replay``, background replay, ``areplay`` or
+``retry_dead`` starts again at attempt 0 and hits a rate-limited host once
+more. ``ReplayBackoff`` records, per ``base_url``, the consecutive failed
+passes and the earliest wall-clock time a replay may send again. The state is
+kept in ``.backoff`` in the queue directory, so every process draining that
+queue leaves the host alone.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+import requests
+
+from .hoststate import HostStateFile
+from .http import retry_after_seconds
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .payloads import ReplayResult
+
+DEFAULT_REPLAY_BACKOFF_BASE = 5.0  # seconds after the first failed pass
+DEFAULT_REPLAY_BACKOFF_MAX = 600.0
+BACKOFF_FILE = ".backoff"
+
+
+def get_replay_backoff_settings() -> Tuple[float, float]:
+    """Return (base, max) seconds from ``SEER_REPLAY_BACKOFF_BASE`` / ``SEER_REPLAY_BACKOFF_MAX``.
+
+    A base of ``0`` disables persisted backoff.
+    """
+    from .payloads import _env_float  # payloads imports us
+
+    return (
+        _env_float("SEER_REPLAY_BACKOFF_BASE", DEFAULT_REPLAY_BACKOFF_BASE, 0.0),
+        _env_float("SEER_REPLAY_BACKOFF_MAX", DEFAULT_REPLAY_BACKOFF_MAX, 0.0),
+    )
+
+
+def is_host_failure(exc: BaseException) -> bool:
+    """Whether ``exc`` says the host, not the event, is the problem.
+
+    Connection errors, timeouts, 429 and 5xx count; other 4xx do not.
+    """
+    if isinstance(exc, requests.exceptions.HTTPError):
+        status = getattr(exc.response, "status_code", None)
+        return status is None or status == 429 or status >= 500
+    return isinstance(exc, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+
+class ReplayBackoff:
+    """Persisted exponential backoff per host for queue replay.
+
+    After a pass fails against a host, replay skips it for
+    ``min(base * 2**(failures - 1), max)`` seconds, or longer when the server
+    sent a ``Retry-After``. Failures while a host is already backing off
+    extend the wait only if the server asks for more; they do not count as
+    another failed pass, so parallel lanes hitting the same outage grow the
+    delay once. A successful send clears the host.
+    """
+
+    def __init__(
+        self,
+        queue_dir: str,
+        *,
+        base: Optional[float] = None,
+        max_delay: Optional[float] = None,
+    ):
+        default_base, default_max = get_replay_backoff_settings()
+        self.base = default_base if base is None else base
+        self.max_delay = default_max if max_delay is None else max_delay
+        self.path = os.path.join(queue_dir, BACKOFF_FILE)
+        self._state = HostStateFile(self.path, {"failures": 0, "next_send_at": None})
+
+    @property
+    def enabled(self) -> bool:
+        return self.base > 0
+
+    def wait(self, base_url: str) -> float:
+        """Seconds until a replay may send to ``base_url`` again (0 when it may now)."""
+        if not self.enabled:
+            return 0.0
+        next_send_at = self._state.entry(base_url.rstrip("/")).get("next_send_at")
+        if next_send_at is None:
+            return 0.0
+        return max(0.0, next_send_at - time.time())
+
+    def record_success(self, base_url: str) -> None:
+        if not self.enabled:
+            return
+        base = base_url.rstrip("/")
+        entry = self._state.entry(base)
+        if not entry.get("failures") and entry.get("next_send_at") is None:
+            return
+
+        def reset(entry: Dict[str, Any]) -> bool:
+            entry["failures"], entry["next_send_at"] = 0, None
+            return True
+
+        self._state.update(base, reset)
+
+    def record_failure(self, base_url: str, exc: Optional[BaseException] = None) -> float:
+        """Count a failed pass against ``base_url``; returns the seconds to wait."""
+        if not self.enabled:
+            return 0.0
+        base = base_url.rstrip("/")
+        response = getattr(exc, "response", None)
+        retry_after = retry_after_seconds(response) if response is not None else None
+
+        def fail(entry: Dict[str, Any]) -> bool:
+            now = time.time()
+            current = entry.get("next_send_at")
+            backing_off = current is not None and current > now
+            if not backing_off:
+                entry["failures"] = int(entry.get("failures") or 0) + 1
+            delay = min(self.base * 2 ** (int(entry["failures"]) - 1), self.max_delay)
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+            target = now + delay
+            if backing_off and target <= current:
+                return False
+            entry["next_send_at"] = target
+            return True
+
+        entry = self._state.update(base, fail)
+        next_send_at = entry.get("next_send_at")
+        return 0.0 if next_send_at is None else max(0.0, next_send_at - time.time())
+
+
+_BACKOFFS: Dict[Tuple[int, str], ReplayBackoff] = {}
+_BACKOFFS_LOCK = threading.Lock()
+
+
+def get_replay_backoff(queue_dir: str) -> ReplayBackoff:
+    """The replay backoff state for ``queue_dir``."""
+    key = (os.getpid(), queue_dir)
+    with _BACKOFFS_LOCK:
+        backoff = _BACKOFFS.get(key)
+        if backoff is None:
+            backoff = _BACKOFFS[key] = ReplayBackoff(queue_dir)
+        return backoff
+
+
+class ReplaySchedule:
+    """Adaptive delay between background replay passes.
+
+    A pass that sent nothing and left envelopes behind (or raised) counts as
+    failing: the delay doubles from ``interval`` up to ``max_interval``. A
+    pass that made progress but left work, or found another process
+    replaying, comes back after ``interval``. A pass that drained the queue
+    idles for ``max_interval``; new envelopes queued by this process wake the
+    flusher sooner unless the host is failing.
+    """
+
+    def __init__(self, interval: float, max_interval: float):
+        self.interval = interval
+        self.max_interval = max(interval, max_interval)
+        self.failures = 0
+
+    @property
+    def failing(self) -> bool:
+        return self.failures > 0
+
+    def next_delay(self, result: Optional["ReplayResult"]) -> float:
+        """Seconds to wait after a pass that returned ``result`` (None: it raised)."""
+        if result is None or (
+            not result.sent and (result.failed or result.dead_lettered or result.deferred)
+        ):
+            self.failures += 1
+            return min(self.interval * 2**self.failures, self.max_interval)
+        self.failures = 0
+        if result.skipped or result.failed or result.deferred:
+            return self.interval
+        return self.max_interval
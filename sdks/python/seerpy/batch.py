@@ -0,0 +1,202 @@
+"""Client-side batching of live events through the ``/batch`` endpoint."""
+
+from __future__ import annotations
+
+import atexit
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from .http import (
+    DEFAULT_BATCH_MAX_BYTES,
+    DEFAULT_BATCH_MAX_ITEMS,
+    BatchItemResult,
+    BatchUnsupported,
+    DeadlineExceeded,
+    batch_supported,
+    pack_batch_events,
+    post_batch,
+    time_left,
+)
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .seer import Seer
+
+DEFAULT_BATCH_INTERVAL = 1.0
+
+# (event, queue_key) — queue_key None means "do not queue on failure".
+_Pending = Tuple[Dict[str, Any], Optional[str]]
+
+
+class EventBatcher:
+    """Collect live monitoring/heartbeat events and ship them through ``/batch``.
+
+    ``add`` only appends to an in-memory buffer. A daemon thread flushes every
+    ``flush_interval`` seconds, or as soon as ``max_items`` events are waiting,
+    in requests capped at ``max_items`` / ``max_bytes``; ``close`` flushes what
+    is left. Items the server rejects or that cannot be delivered go to the
+    offline queue under their ``queue_key``; hosts without ``/batch`` get one
+    request per event. ``close`` also runs at exit, where it sends for at
+    most ``timeout`` seconds and queues the rest.
+    """
+
+    def __init__(
+        self,
+        client: "Seer",
+        *,
+        max_items: int = DEFAULT_BATCH_MAX_ITEMS,
+        max_bytes: int = DEFAULT_BATCH_MAX_BYTES,
+        flush_interval: float = DEFAULT_BATCH_INTERVAL,
+    ):
+        if flush_interval <= 0:
+            raise ValueError("flush_interval must be > 0")
+        self.client = client
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.flush_interval = float(flush_interval)
+        self._pending: List[_Pending] = []
+        self._lock = threading.Lock()
+        # Serializes flushes so events leave in the order they were added.
+        self._send_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._loop,
+            name="seer-event-batcher",
+            daemon=True,
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    def add(
+        self,
+        endpoint: str,
+        payload: Dict[str, Any],
+        *,
+        idempotency_key: str,
+        queue_key: Optional[str] = None,
+    ) -> None:
+        """Buffer one event; ``idempotency_key`` is sent as-is with the item."""
+        event = {
+            "endpoint": endpoint,
+            "idempotency_key": idempotency_key,
+            "payload": payload,
+        }
+        with self._lock:
+            self._pending.append((event, queue_key))
+            full = len(self._pending) >= self.max_items
+        if full:
+            self._wake.set()
+
+    def flush(self, deadline: Optional[float] = None) -> List[BatchItemResult]:
+        """Send everything buffered so far and return one result per event.
+
+        ``deadline`` bounds the whole flush, including the wait for one
+        already running; events left when it runs out are queued.
+        """
+        ends = None if deadline is None else time.monotonic() + deadline
+        locked = self._send_lock.acquire(timeout=-1 if ends is None else max(0.0, deadline))
+        try:
+            with self._lock:
+                pending, self._pending = self._pending, []
+            if not locked:
+                ends = time.monotonic()
+            results: List[BatchItemResult] = []
+            for chunk in self._chunks(pending):
+                results.extend(self._send_chunk(chunk, ends))
+            return results
+        finally:
+            if locked:
+                self._send_lock.release()
+
+    def close(self, timeout: float = 2.0) -> None:
+        """Stop the flusher thread and flush remaining events within ``timeout`` seconds."""
+        ends = time.monotonic() + timeout
+        self._stop.set()
+        self._wake.set()
+        thread = self._thread
+        if thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout=timeout)
+        try:
+            self.flush(deadline=max(0.0, ends - time.monotonic()))
+        except Exception as exc:
+            print(f"Seer batch flush on close failed: {exc}")
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(timeout=self.flush_interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                self.flush()
+            except Exception as exc:
+                print(f"Seer batch flush error: {exc}")
+
+    def _chunks(self, pending: List[_Pending]) -> List[List[_Pending]]:
+        by_id = {id(event): (event, key) for event, key in pending}
+        packed = pack_batch_events(
+            [event for event, _key in pending],
+            max_items=self.max_items,
+            max_bytes=self.max_bytes,
+        )
+        return [[by_id[id(event)] for event in chunk] for chunk in packed]
+
+    def _send_chunk(
+        self, chunk: List[_Pending], ends: Optional[float] = None
+    ) -> List[BatchItemResult]:
+        client = self.client
+        remaining = time_left(ends)
+        if remaining is not None and remaining <= 0:
+            for event, key in chunk:
+                self._queue(event, key)
+            return [BatchItemResult(status=0, body={"error": "flush deadline"}) for _ in chunk]
+        if batch_supported(client.base_url):
+            try:
+                results = post_batch(
+                    client.base_url,
+                    [event for event, _key in chunk],
+                    client._headers(),
+                    timeout=client.timeout,
+                    connect_timeout=client.connect_timeout,
+                    deadline=client.send_deadline if remaining is None else remaining,
+                    session=client._session,
+                )
+            except BatchUnsupported:
+                pass
+            except Exception as exc:
+                for event, key in chunk:
+                    self._queue(event, key)
+                print(f"Seer batch upload failed; queued for replay: {exc}")
+                return [BatchItemResult(status=0, body={"error": str(exc)}) for _ in chunk]
+            else:
+                for (event, key), result in zip(chunk, results):
+                    if not result.ok:
+                        self._queue(event, key)
+                return results
+
+        results = []
+        for event, key in chunk:
+            path = "/" + event["endpoint"]
+            remaining = time_left(ends)
+            try:
+                if remaining is not None and remaining <= 0:
+                    raise DeadlineExceeded("Seer batch flush deadline ran out")
+                response = client._post(
+                    path,
+                    event["payload"],
+                    idempotency_key=event["idempotency_key"],
+                    deadline=remaining,
+                )
+                results.append(
+                    BatchItemResult(status=getattr(response, "status_code", 200))
+                )
+            except Exception as exc:
+                self._queue(event, key)
+                results.append(BatchItemResult(status=0, body={"error": str(exc)}))
+        return results
+
+    def _queue(self, event: Dict[str, Any], queue_key: Optional[str]) -> None:
+        if queue_key is None:
+            return
+        self.client._queue(event["payload"], event["endpoint"], idempotency_key=queue_key)
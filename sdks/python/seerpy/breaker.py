@@ -0,0 +1,183 @@
+"""Circuit breaker for Seer hosts, shared across processes.
+
+When a host keeps failing, every send paying the full backoff loop stalls
+jobs for minutes before they fall back to the offline queue. After
+``threshold`` consecutive failed sends to a ``base_url`` the breaker
+opens: sends fail at once with ``CircuitOpen`` (callers queue the event) and
+replay leaves that host's envelopes alone. Once ``cooldown`` seconds have
+passed, one process probes ``GET /health``; a healthy answer closes the
+breaker, anything else keeps it open for another cooldown.
+
+State lives in ``.breaker`` in the queue directory, so every process
+sharing the queue opens and closes together.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import requests
+
+from .hoststate import HostStateFile
+from .pool import session_for
+
+DEFAULT_BREAKER_THRESHOLD = 3  # consecutive failed sends that open the breaker
+DEFAULT_BREAKER_COOLDOWN = 30.0  # seconds before an open breaker is probed
+BREAKER_FILE = ".breaker"
+BREAKER_PROBE_TIMEOUT = 5
+
+
+class CircuitOpen(requests.exceptions.ConnectionError):
+    """Raised instead of sending while the breaker for a host is open."""
+
+
+def get_breaker_settings() -> Tuple[int, float]:
+    """Return (threshold, cooldown) from ``SEER_BREAKER_THRESHOLD`` / ``SEER_BREAKER_COOLDOWN``.
+
+    A threshold of ``0`` disables the breaker.
+    """
+    from .payloads import _env_float  # payloads imports http, which imports us
+
+    threshold = DEFAULT_BREAKER_THRESHOLD
+    raw = os.environ.get("SEER_BREAKER_THRESHOLD", "").strip()
+    if raw:
+        try:
+            threshold = max(0, int(raw))
+        except ValueError:
+            pass
+    return threshold, _env_float("SEER_BREAKER_COOLDOWN", DEFAULT_BREAKER_COOLDOWN, 0.0)
+
+
+def probe_health(base_url: str) -> bool:
+    """True when ``GET {base_url}/health`` answers 2xx."""
+    try:
+        response = session_for(base_url).get(
+            f"{base_url}/health",
+            allow_redirects=False,
+            timeout=BREAKER_PROBE_TIMEOUT,
+        )
+    except requests.exceptions.RequestException:
+        return False
+    return 200 <= getattr(response, "status_code", 0) < 300
+
+
+class CircuitBreaker:
+    """Per-host breaker whose state is a small JSON file shared by processes.
+
+    The happy path costs one ``stat`` of the state file per send; the file
+    is only rewritten when a host fails, recovers or is probed.
+    """
+
+    def __init__(
+        self,
+        queue_dir: str,
+        *,
+        threshold: Optional[int] = None,
+        cooldown: Optional[float] = None,
+        probe: Callable[[str], bool] = probe_health,
+    ):
+        default_threshold, default_cooldown = get_breaker_settings()
+        self.threshold = default_threshold if threshold is None else threshold
+        self.cooldown = default_cooldown if cooldown is None else cooldown
+        self.probe = probe
+        self.path = os.path.join(queue_dir, BREAKER_FILE)
+        self._state = HostStateFile(self.path, {"failures": 0, "opened_at": None})
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0
+
+    def is_open(self, base_url: str) -> bool:
+        if not self.enabled:
+            return False
+        return self._state.entry(base_url.rstrip("/")).get("opened_at") is not None
+
+    def allow(self, base_url: str) -> bool:
+        """Whether a send to ``base_url`` may go out now.
+
+        An open breaker past its cooldown lets exactly one process probe
+        ``/health`` (the others keep failing fast) and closes on success.
+        """
+        if not self.enabled:
+            return True
+        base = base_url.rstrip("/")
+        opened_at = self._state.entry(base).get("opened_at")
+        if opened_at is None:
+            return True
+        if time.time() - opened_at < self.cooldown:
+            return False
+
+        claimed = []
+
+        def claim(entry: Dict[str, Any]) -> bool:
+            opened = entry.get("opened_at")
+            if opened is None or time.time() - opened < self.cooldown:
+                return False
+            # Restart the cooldown so no other process probes meanwhile.
+            entry["opened_at"] = time.time()
+            claimed.append(True)
+            return True
+
+        entry = self._state.update(base, claim)
+        if not claimed:
+            return entry.get("opened_at") is None
+        if not self.probe(base):
+            return False
+        self.record_success(base)
+        return True
+
+    def record_success(self, base_url: str) -> None:
+        if not self.enabled:
+            return
+        base = base_url.rstrip("/")
+        entry = self._state.entry(base)
+        if not entry.get("failures") and entry.get("opened_at") is None:
+            return
+
+        def close(entry: Dict[str, Any]) -> bool:
+            entry["failures"], entry["opened_at"] = 0, None
+            return True
+
+        self._state.update(base, close)
+        if entry.get("opened_at") is not None:
+            print(f"Seer circuit for {base} closed")
+
+    def record_failure(self, base_url: str) -> bool:
+        """Count a failed send; returns True when the breaker is (now) open."""
+        if not self.enabled:
+            return False
+        base = base_url.rstrip("/")
+        opened = []
+
+        def fail(entry: Dict[str, Any]) -> bool:
+            entry["failures"] = int(entry.get("failures") or 0) + 1
+            if entry.get("opened_at") is None and entry["failures"] >= self.threshold:
+                entry["opened_at"] = time.time()
+                opened.append(True)
+            return True
+
+        entry = self._state.update(base, fail)
+        if opened:
+            print(f"Seer circuit for {base} opened; events are queued until it recovers")
+        return entry.get("opened_at") is not None
+
+
+_BREAKERS: Dict[Tuple[int, str], CircuitBreaker] = {}
+_BREAKERS_LOCK = threading.Lock()
+
+
+def get_circuit_breaker(queue_dir: Optional[str] = None) -> CircuitBreaker:
+    """The breaker for ``queue_dir`` (default: the configured queue directory)."""
+    if queue_dir is None:
+        from .payloads import get_queue_dir  # payloads imports http, which imports us
+
+        queue_dir = get_queue_dir()
+    key = (os.getpid(), queue_dir)
+    with _BREAKERS_LOCK:
+        breaker = _BREAKERS.get(key)
+        if breaker is None:
+            breaker = _BREAKERS[key] = CircuitBreaker(queue_dir)
+        return breaker
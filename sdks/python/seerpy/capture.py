@@ -0,0 +1,623 @@
+"""Stdout and logging capture for monitored runs."""
+
+from __future__ import annotations
+
+import codecs
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from .payloads import _env_float, _env_int
+
+DEFAULT_CAPTURE_HEAD_BYTES = 64 * 1024
+DEFAULT_CAPTURE_TAIL_BYTES = 448 * 1024
+DEFAULT_LOG_FLUSH_BYTES = 64 * 1024
+DEFAULT_LOG_FLUSH_INTERVAL = 30.0  # seconds
+CAPTURE_MODES = ("python", "fd")
+DEFAULT_CAPTURE_LEVEL = logging.INFO
+FD_READ_CHUNK = 64 * 1024
+FD_DRAIN_TIMEOUT = 1.0  # seconds to wait for a pipe to empty on stop
+
+
+def get_capture_limits() -> Tuple[int, int]:
+    """Return (head_bytes, tail_bytes) kept from a run's captured output."""
+    return (
+        _env_int("SEER_LOG_HEAD_BYTES", DEFAULT_CAPTURE_HEAD_BYTES),
+        _env_int("SEER_LOG_TAIL_BYTES", DEFAULT_CAPTURE_TAIL_BYTES),
+    )
+
+
+def get_capture_level(level: Union[int, str, None] = None) -> int:
+    """Resolve a capture level from ``level`` or ``SEER_CAPTURE_LEVEL`` (name or number)."""
+    if level is None:
+        level = os.environ.get("SEER_CAPTURE_LEVEL", "").strip() or DEFAULT_CAPTURE_LEVEL
+    if isinstance(level, str):
+        if level.isdigit():
+            return int(level)
+        resolved = logging.getLevelName(level.upper())
+        return resolved if isinstance(resolved, int) else DEFAULT_CAPTURE_LEVEL
+    return int(level)
+
+
+class CaptureBuffer:
+    """A text sink that keeps the first ``head_bytes`` and last ``tail_bytes``.
+
+    Everything in between is counted in ``dropped`` and replaced by a marker
+    line in ``getvalue()``. Memory stays under ``head_bytes + 2 * tail_bytes``
+    however much is written: the tail is trimmed once it reaches twice its
+    limit, so trimming costs amortized O(1) per byte.
+    """
+
+    def __init__(
+        self,
+        head_bytes: int = DEFAULT_CAPTURE_HEAD_BYTES,
+        tail_bytes: int = DEFAULT_CAPTURE_TAIL_BYTES,
+    ) -> None:
+        self.head_bytes = max(0, head_bytes)
+        self.tail_bytes = max(0, tail_bytes)
+        self.written = 0
+        self._head = bytearray()
+        self._tail = bytearray()
+        self._lock = threading.Lock()
+
+    @property
+    def dropped(self) -> int:
+        """Bytes written but not retained."""
+        with self._lock:
+            return self.written - len(self._head) - min(len(self._tail), self.tail_bytes)
+
+    def write(self, message: str) -> int:
+        data = message.encode("utf-8", errors="replace")
+        with self._lock:
+            self.written += len(data)
+            room = self.head_bytes - len(self._head)
+            if room > 0:
+                self._head += data[:room]
+                data = data[room:]
+            if data and self.tail_bytes:
+                self._tail += data
+                if len(self._tail) >= 2 * self.tail_bytes:
+                    del self._tail[: len(self._tail) - self.tail_bytes]
+        return len(message)
+
+    def flush(self) -> None:
+        pass
+
+    def getvalue(self) -> str:
+        with self._lock:
+            tail = bytes(self._tail[-self.tail_bytes :]) if self.tail_bytes else b""
+            head = bytes(self._head)
+            dropped = self.written - len(head) - len(tail)
+        # Cuts can land inside a multi-byte character; drop the fragments.
+        text = head.decode("utf-8", errors="ignore")
+        if dropped:
+            text += f"\n[seer: {dropped} bytes of output dropped]\n"
+        return text + tail.decode("utf-8", errors="ignore")
+
+
+def get_log_flush_policy() -> Tuple[int, float]:
+    """Return (bytes, seconds): ship streamed logs at whichever comes first."""
+    interval = _env_float("SEER_LOG_FLUSH_INTERVAL", DEFAULT_LOG_FLUSH_INTERVAL, 0.0)
+    if interval <= 0:
+        interval = DEFAULT_LOG_FLUSH_INTERVAL
+    return _env_int("SEER_LOG_FLUSH_BYTES", DEFAULT_LOG_FLUSH_BYTES), interval
+
+
+class LogStreamer:
+    """A capture sink that ships output to the server while the run is going.
+
+    Output collects in a pending buffer. A daemon thread hands it to ``ship``
+    as ``(chunk, offset)`` once ``flush_bytes`` have built up or
+    ``flush_interval`` seconds have passed. ``offset`` is the chunk's byte
+    position in the run's whole output, which lets the server place retried
+    or out-of-order chunks.
+
+    ``supported`` runs on the thread before anything is shipped. When it
+    returns False (a server that cannot append logs) the streamer falls
+    back to a ``CaptureBuffer`` and the final payload carries the logs as
+    before. A chunk ``ship`` raises on goes back in front of the pending
+    output, so during an outage unsent output is retried with the next
+    chunk and otherwise ends up in the final payload, not in envelopes of
+    its own. If more than ``max_pending`` bytes pile up because shipping is
+    slow, the oldest are dropped and counted in ``dropped``.
+
+    ``max_offset``, also asked on the thread, is the most bytes the server
+    keeps for a run. Shipping stops once a chunk would end past it; later
+    output goes to a tail-only ``CaptureBuffer`` and the final payload
+    writes that tail so it ends at ``max_offset`` (see ``final_offset``).
+    """
+
+    def __init__(
+        self,
+        ship: Callable[[str, int], None],
+        *,
+        supported: Callable[[], bool] = lambda: True,
+        max_offset: Callable[[], Optional[int]] = lambda: None,
+        flush_bytes: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        head_bytes: Optional[int] = None,
+        tail_bytes: Optional[int] = None,
+        stop_timeout: Optional[float] = None,
+    ) -> None:
+        default_bytes, default_interval = get_log_flush_policy()
+        default_head, default_tail = get_capture_limits()
+        self.flush_bytes = default_bytes if flush_bytes is None else flush_bytes
+        self.flush_interval = default_interval if flush_interval is None else flush_interval
+        self.head_bytes = default_head if head_bytes is None else head_bytes
+        self.tail_bytes = default_tail if tail_bytes is None else tail_bytes
+        self.max_pending = max(self.flush_bytes, self.head_bytes + self.tail_bytes)
+        self.stop_timeout = stop_timeout
+        self.offset = 0  # position of the first pending byte
+        self.dropped = 0
+        self.shipped = 0
+        self.limit: Optional[int] = None
+        self.capped = False
+        self._sending = False
+        self._ship = ship
+        self._supported = supported
+        self._max_offset = max_offset
+        self._pending = bytearray()
+        self._fallback: Optional[CaptureBuffer] = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._decided = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def streaming(self) -> bool:
+        """True once a chunk was shipped (or is being); the final then needs an offset."""
+        return self.shipped > 0 or self._sending
+
+    def write(self, message: str) -> int:
+        data = message.encode("utf-8", errors="replace")
+        with self._lock:
+            if self._fallback is not None:
+                self._fallback.write(message)
+                return len(message)
+            self._pending += data
+            self._trim()
+            if len(self._pending) >= self.flush_bytes:
+                self._wake.set()
+        return len(message)
+
+    def _trim(self) -> None:
+        excess = len(self._pending) - self.max_pending
+        if excess > 0:
+            # Never start the kept bytes inside a multi-byte character.
+            while excess < len(self._pending) and self._pending[excess] & 0xC0 == 0x80:
+                excess += 1
+            del self._pending[:excess]
+            self.offset += excess
+            self.dropped += excess
+
+    def flush(self) -> None:
+        pass
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="seer-log-stream", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop shipping; whatever is still pending goes in the final payload.
+
+        Waits up to ``stop_timeout`` for a chunk being shipped, but not for
+        the ``supported`` check: a run that ends before it answers ships
+        nothing.
+        """
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None and self._decided.is_set():
+            self._thread.join(timeout=self.stop_timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        try:
+            supported = self._supported()
+            self.limit = self._max_offset() if supported else None
+        except Exception:
+            supported = False
+        finally:
+            self._decided.set()
+        if not supported:
+            with self._lock:
+                self._fallback = CaptureBuffer(self.head_bytes, self.tail_bytes)
+                self._fallback.write(self._pending.decode("utf-8", errors="ignore"))
+                self._fallback.written += self.dropped
+                self._pending = bytearray()
+            return
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            self._ship_pending()
+            if self.capped:
+                break
+
+    def _ship_pending(self) -> None:
+        with self._lock:
+            chunk = bytes(self._pending)
+            offset = self.offset
+            self._pending = bytearray()
+            self.offset += len(chunk)
+            self._sending = bool(chunk)
+        if not chunk:
+            return
+        cut = len(chunk)
+        if self.limit is not None and offset + cut > self.limit:
+            cut = max(0, min(cut, self.limit - offset))
+            while 0 < cut < len(chunk) and chunk[cut] & 0xC0 == 0x80:
+                cut -= 1
+        sent = False
+        if cut:
+            try:
+                self._ship(chunk[:cut].decode("utf-8", errors="replace"), offset)
+                sent = True
+            except Exception:
+                pass
+        with self._lock:
+            self._sending = False
+            if sent:
+                self.shipped += 1
+            if cut < len(chunk) and (sent or not cut):
+                self.capped = True
+                self._fallback = CaptureBuffer(0, self.tail_bytes)
+                rest = chunk[cut:] + bytes(self._pending)
+                self._fallback.write(rest.decode("utf-8", errors="ignore"))
+                self._pending = bytearray()
+                self.offset = offset + cut
+            elif not sent and self.offset == offset + len(chunk):
+                self._pending[:0] = chunk
+                self.offset = offset
+                self._trim()
+            elif not sent:
+                # Newer output was dropped meanwhile; this chunk is older still.
+                self.dropped += len(chunk)
+
+    def final_offset(self, logs: str) -> int:
+        """Where the final payload writes ``logs``, the ``getvalue()`` text.
+
+        That is right after the shipped output, or earlier so ``logs`` ends
+        at the server's limit; past the limit it overwrites the last bytes
+        shipped rather than being refused.
+        """
+        if self.limit is None:
+            return self.offset
+        return max(0, min(self.offset, self.limit - len(logs.encode("utf-8"))))
+
+    def getvalue(self) -> str:
+        """The output not shipped yet (all of it when streaming fell back)."""
+        with self._lock:
+            if self._fallback is not None:
+                return self._fallback.getvalue()
+            text = self._pending.decode("utf-8", errors="replace")
+            dropped = self.dropped
+        if dropped:
+            text += f"[seer: {dropped} bytes of output dropped]\n"
+        return text
+
+
+def _sdk_thread() -> bool:
+    """True on the SDK's own threads (all named ``seer-*``), whose prints are not run output."""
+    return threading.current_thread().name.startswith("seer-")
+
+
+class _BytesTee:
+    """``StreamTee.buffer``: bytes go to the original buffer and, decoded, the copy."""
+
+    def __init__(self, original, copy_to):
+        self.original = original
+        self.copy_to = copy_to
+
+    def write(self, data):
+        written = self.original.write(data)
+        if not _sdk_thread():
+            self.copy_to.write(bytes(data).decode("utf-8", errors="replace"))
+        return written
+
+    def flush(self):
+        self.original.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.original, name)
+
+
+class StreamTee:
+    """Writes to both the original stream and a buffer (like StringIO).
+
+    What the SDK's own threads print is left out of the buffer.
+    """
+
+    def __init__(self, original, copy_to):
+        self.original = original
+        self.copy_to = copy_to
+
+    def write(self, message):
+        self.original.write(message)
+        if not _sdk_thread():
+            self.copy_to.write(message)
+
+    def flush(self):
+        self.original.flush()
+        self.copy_to.flush()
+
+    def isatty(self):
+        return getattr(self.original, "isatty", lambda: False)()
+
+    def fileno(self):
+        return self.original.fileno()
+
+    @property
+    def encoding(self):
+        return getattr(self.original, "encoding", None)
+
+    @property
+    def buffer(self):
+        return _BytesTee(self.original.buffer, self.copy_to)
+
+
+class _FdRedirect:
+    """Point ``fd`` at a pipe whose reader copies to the original fd and a sink.
+
+    Catches whatever writes to the fd directly: C extensions, the JVM behind
+    Spark, and subprocesses that inherit it. The reader thread pays per
+    ``os.read`` of up to ``FD_READ_CHUNK`` bytes, not per ``write()``.
+    """
+
+    def __init__(self, fd: int, sink) -> None:
+        self.fd = fd
+        self.sink = sink
+        self._saved: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        saved = os.dup(self.fd)
+        try:
+            read_end, write_end = os.pipe()
+        except OSError:
+            os.close(saved)
+            raise
+        try:
+            os.dup2(write_end, self.fd)
+        except OSError:
+            for fd in (saved, read_end):
+                os.close(fd)
+            raise
+        finally:
+            os.close(write_end)
+        self._saved = saved
+        self._thread = threading.Thread(
+            target=self._drain,
+            args=(read_end, saved),
+            name=f"seer-fd{self.fd}-capture",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def write_original(self, data: bytes) -> bool:
+        """Write ``data`` to the original fd past the pipe; False once stopped."""
+        saved = self._saved
+        if saved is None:
+            return False
+        view = memoryview(data)
+        try:
+            while view:
+                view = view[os.write(saved, view) :]
+        except OSError:
+            return False
+        return True
+
+    def stop(self) -> None:
+        """Point the fd back at the original and let the reader finish the pipe.
+
+        A child process that still holds the pipe keeps the reader going after
+        ``stop`` returns; the reader closes its fds when the last one exits.
+        """
+        if self._saved is None:
+            return
+        os.dup2(self._saved, self.fd)
+        self._saved = None
+        if self._thread is not None:
+            self._thread.join(timeout=FD_DRAIN_TIMEOUT)
+            self._thread = None
+
+    def _drain(self, read_end: int, saved: int) -> None:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        try:
+            while True:
+                try:
+                    chunk = os.read(read_end, FD_READ_CHUNK)
+                except InterruptedError:
+                    continue
+                if not chunk:
+                    break
+                view = memoryview(chunk)
+                while view:
+                    try:
+                        view = view[os.write(saved, view) :]
+                    except OSError:
+                        break
+                self.sink.write(decoder.decode(chunk))
+            tail = decoder.decode(b"", final=True)
+            if tail:
+                self.sink.write(tail)
+        finally:
+            os.close(read_end)
+            os.close(saved)
+
+
+class _PastCapture:
+    """A Python stream on a captured fd whose SDK-thread writes skip the pipe.
+
+    The SDK's own prints go straight to the original fd, so they reach the
+    terminal without landing in the run's logs.
+    """
+
+    def __init__(self, original, redirect: _FdRedirect) -> None:
+        self.original = original
+        self.redirect = redirect
+
+    def write(self, message):
+        if _sdk_thread():
+            encoding = getattr(self.original, "encoding", None) or "utf-8"
+            if self.redirect.write_original(message.encode(encoding, errors="replace")):
+                return len(message)
+        return self.original.write(message)
+
+    def __getattr__(self, name):
+        return getattr(self.original, name)
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Enqueue records untouched, so the listener thread does the formatting.
+
+    ``QueueHandler.prepare`` formats in the logging thread, which is the cost
+    being moved off the job. The catch: a mutable argument changed right after
+    the call is formatted with its new value.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def _writes_to_fd(stream, fd: int) -> bool:
+    try:
+        return stream.fileno() == fd
+    except (AttributeError, OSError, ValueError):
+        return False
+
+
+class _LogCapture:
+    """Tee stdout and root-logger records into a bounded buffer for one run.
+
+    ``mode="fd"`` captures fds 1 and 2 instead (see ``_FdRedirect``), so
+    stderr, native code and subprocesses are included. Python streams that
+    do not write to those fds (pytest, Jupyter) are still teed.
+
+    Records at ``level`` and above are captured; the root logger is lowered
+    to ``level`` only if it is set higher. The job thread just enqueues
+    each record; a ``QueueListener`` thread formats and buffers it.
+
+    ``stop`` restores the previous streams, handlers and level and returns
+    the captured text: the start and end of the output, with a marker giving
+    the number of bytes dropped in between. With a ``LogStreamer`` sink it
+    returns only what the streamer has not shipped.
+    """
+
+    def __init__(
+        self,
+        head_bytes: Optional[int] = None,
+        tail_bytes: Optional[int] = None,
+        *,
+        sink: Optional[LogStreamer] = None,
+        mode: str = "python",
+        level: Union[int, str, None] = None,
+    ) -> None:
+        if mode not in CAPTURE_MODES:
+            raise ValueError(f"capture mode must be one of {', '.join(CAPTURE_MODES)}")
+        default_head, default_tail = get_capture_limits()
+        self.stream = sink or CaptureBuffer(
+            default_head if head_bytes is None else head_bytes,
+            default_tail if tail_bytes is None else tail_bytes,
+        )
+        self.mode = mode
+        self.level = get_capture_level(level)
+        self._tees: List[Tuple[str, object]] = []
+        self._redirects: List[_FdRedirect] = []
+        self._handler: Optional[logging.Handler] = None
+        self._listener: Optional[logging.handlers.QueueListener] = None
+        self._logger: Optional[logging.Logger] = None
+        self._previous_level: Optional[int] = None
+
+    @property
+    def dropped(self) -> int:
+        return self.stream.dropped
+
+    def _flush_std(self) -> None:
+        for stream in (sys.stdout, sys.stderr):
+            try:
+                stream.flush()
+            except (AttributeError, OSError, ValueError):
+                pass
+
+    def start(self) -> None:
+        if isinstance(self.stream, LogStreamer):
+            self.stream.start()
+        captured_fds: Dict[int, _FdRedirect] = {}
+        if self.mode == "fd":
+            self._flush_std()
+            for fd in (1, 2):
+                redirect = _FdRedirect(fd, self.stream)
+                try:
+                    redirect.start()
+                except OSError:
+                    continue  # closed fd (daemonized process): tee Python streams only
+                self._redirects.append(redirect)
+                captured_fds[fd] = redirect
+
+        names = ("stdout", "stderr") if self.mode == "fd" else ("stdout",)
+        for fd, name in enumerate(names, start=1):
+            original = getattr(sys, name)
+            self._tees.append((name, original))
+            if fd in captured_fds and _writes_to_fd(original, fd):
+                setattr(sys, name, _PastCapture(original, captured_fds[fd]))
+            else:
+                setattr(sys, name, StreamTee(original, self.stream))
+
+        self._logger = logging.getLogger()
+        self._previous_level = self._logger.level
+        if self._logger.getEffectiveLevel() > self.level:
+            self._logger.setLevel(self.level)
+        # Records a root handler already prints to a captured fd arrive that
+        # way; the rest, such as INFO under a WARNING console handler, are ours.
+        printing = [
+            h
+            for h in self._logger.handlers
+            if isinstance(h, logging.StreamHandler)
+            and any(_writes_to_fd(h.stream, fd) for fd in captured_fds)
+        ]
+        records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        self._handler = _DeferredQueueHandler(records)
+        self._handler.setLevel(self.level)
+        if printing:
+            self._handler.addFilter(
+                lambda record: not any(
+                    record.levelno >= h.level and h.filter(record) for h in printing
+                )
+            )
+        self._listener = logging.handlers.QueueListener(
+            records, logging.StreamHandler(self.stream)
+        )
+        self._listener.start()
+        self._logger.addHandler(self._handler)
+
+    def stop(self) -> str:
+        for name, original in reversed(self._tees):
+            setattr(sys, name, original)
+        self._tees = []
+        if self._redirects:
+            self._flush_std()
+            for redirect in self._redirects:
+                redirect.stop()
+            self._redirects = []
+        if self._logger is not None:
+            if self._handler is not None:
+                self._logger.removeHandler(self._handler)
+                self._handler.close()
+                self._handler = None
+            if self._listener is not None:
+                self._listener.stop()  # drains queued records first
+                for handler in self._listener.handlers:
+                    handler.close()
+                self._listener = None
+            if self._previous_level is not None:
+                self._logger.setLevel(self._previous_level)
+            self._logger = None
+        if isinstance(self.stream, LogStreamer):
+            self.stream.stop()
+        return self.stream.getvalue()
@@ -0,0 +1,243 @@
+"""How hard queue writes try to survive a crash or power loss.
+
+``strict``
+    fsync the envelope before it is renamed into place, then fsync the
+    directory so the rename itself is durable. Every write is on disk when
+    the call returns.
+``group``
+    Threads writing at the same moment share their fsyncs through one
+    committer: one thread fsyncs the whole batch, so concurrent writers pay
+    for one round of fsyncs instead of one each. A file that is renamed into
+    place is still made durable before the rename (its temp file is written
+    and batched before the queue lock is taken); writers inside
+    ``Durability.deferred()`` only put off the directory fsync, and the
+    fsync of log appends, whose checksums let a reader drop a torn record,
+    until the queue locks are released. A writer returns only once its
+    envelope is durable. Batches are per process: separate processes writing
+    the same queue each fsync on their own, so group mode helps a process
+    with many threads writing at once and does nothing for many
+    single-threaded jobs. On Windows group mode behaves like strict.
+``relaxed``
+    No fsync at all; for tmpfs or ephemeral containers whose queue would
+    not survive a reboot anyway.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+DURABILITY_MODES = ("strict", "group", "relaxed")
+DEFAULT_GROUP_COMMIT_WINDOW = 0.002  # seconds
+
+# (duplicated fd of a written file or None, directory whose entry changed or None)
+_Pending = Tuple[Optional[int], Optional[str]]
+
+
+def fsync_dir(path: str) -> None:
+    """Flush a directory's entries. A no-op where directories cannot be opened."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class _Batch:
+    def __init__(self) -> None:
+        self.fds: List[int] = []
+        self.dirs: List[str] = []
+        self.done = threading.Event()
+        self.error: Optional[BaseException] = None
+
+
+class GroupCommitter:
+    """Share fsyncs between threads that finish writes at about the same time.
+
+    The first thread to arrive leads a batch. It waits for the previous
+    batch's fsyncs to finish, and waits ``window`` seconds more when other
+    writers are still mid-write. Then it closes the batch and fsyncs
+    everything in it. Threads that arrive meanwhile join the batch and wait
+    for the leader to finish.
+
+    Only threads of the current process share a batch. Each process has its
+    own committer (see ``get_durability``), so many single-threaded jobs
+    falling back at once gain nothing over ``strict``.
+    """
+
+    def __init__(self, window: float = DEFAULT_GROUP_COMMIT_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._batch: Optional[_Batch] = None
+        self._writing = 0
+        self.batches = 0
+
+    def begin(self) -> None:
+        """Note a write in progress, so a batch leader knows to wait for it."""
+        with self._lock:
+            self._writing += 1
+
+    def abort(self, pending: List[_Pending]) -> None:
+        """Give up on a write started with ``begin``."""
+        with self._lock:
+            self._writing -= 1
+        for fd, _directory in pending:
+            if fd is None:
+                continue
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def commit(self, pending: List[_Pending], *, ending: bool = True) -> None:
+        """End a write started with ``begin``: fsync ``pending`` as part of a batch.
+
+        Takes ownership of the fds. Returns once they are durable. With
+        ``ending=False`` the write goes on afterwards (it syncs a file before
+        renaming it) and stays counted as in progress.
+        """
+        with self._lock:
+            if ending:
+                self._writing -= 1
+            if not pending:
+                return
+            batch = self._batch
+            leader = batch is None
+            if batch is None:
+                batch = self._batch = _Batch()
+            for fd, directory in pending:
+                if fd is not None:
+                    batch.fds.append(fd)
+                if directory is not None and directory not in batch.dirs:
+                    batch.dirs.append(directory)
+        if leader:
+            self._lead(batch, 0 if ending else 1)
+        else:
+            batch.done.wait()
+        if batch.error is not None:
+            raise batch.error
+
+    def _lead(self, batch: _Batch, own: int) -> None:
+        with self._sync_lock:
+            with self._lock:
+                # Writers that began but have not reached commit() yet.
+                others = self._writing - own
+            if others > 0 and self.window > 0:
+                time.sleep(self.window)
+            with self._lock:
+                self._batch = None
+                self.batches += 1
+            try:
+                for fd in batch.fds:
+                    os.fsync(fd)
+                for directory in batch.dirs:
+                    fsync_dir(directory)
+            except BaseException as exc:
+                batch.error = exc
+            finally:
+                for fd in batch.fds:
+                    try:
+                        os.close(fd)
+                    except OSError:
+                        pass
+                batch.done.set()
+
+
+class Durability:
+    """The fsync policy for one durability mode.
+
+    Writers call ``sync_file`` on a temp file before renaming it into place,
+    or ``sync_data`` on a file they appended to, then ``sync_entry`` with the
+    returned token (None after ``sync_file``) and the directory the file
+    appeared in.
+    """
+
+    def __init__(self, mode: str = "strict", window: float = DEFAULT_GROUP_COMMIT_WINDOW):
+        if mode not in DURABILITY_MODES:
+            raise ValueError(f"Unknown queue durability mode: {mode}")
+        self.mode = mode
+        self.committer = GroupCommitter(window)
+        self._local = threading.local()
+
+    def _deferring(self) -> bool:
+        return self.mode == "group" and getattr(self._local, "pending", None) is not None
+
+    def sync_file(self, fd: int) -> None:
+        """Flush a file about to be renamed into place; returns once it is durable.
+
+        In a deferred block this joins the batch of concurrent writers.
+        """
+        if self.mode == "relaxed":
+            return
+        if self._deferring():
+            self.committer.commit([(os.dup(fd), None)], ending=False)
+            return
+        os.fsync(fd)
+
+    def sync_data(self, fd: int) -> Optional[int]:
+        """Flush appended data now, or return a token to flush it with the batch."""
+        if self.mode == "relaxed":
+            return None
+        if self._deferring():
+            return os.dup(fd)
+        os.fsync(fd)
+        return None
+
+    def sync_entry(self, token: Optional[int], directory: Optional[str]) -> None:
+        """Make the file's directory entry durable (``directory=None``: unchanged)."""
+        if self.mode == "relaxed":
+            return
+        if token is not None or (directory is not None and self._deferring()):
+            self._local.pending.append((token, directory))
+        elif directory is not None:
+            fsync_dir(directory)
+
+    @contextmanager
+    def deferred(self) -> Iterator[None]:
+        """Batch the fsyncs of writes made inside, committing the deferred ones on exit.
+
+        Callers enter this before taking the queue locks so that the waits
+        for batches happen outside those locks. Nested blocks join the
+        outermost one.
+        """
+        if self.mode != "group" or os.name == "nt" or self._deferring():
+            yield
+            return
+        self._local.pending = []
+        self.committer.begin()
+        try:
+            yield
+        except BaseException:
+            pending, self._local.pending = self._local.pending, None
+            self.committer.abort(pending)
+            raise
+        pending, self._local.pending = self._local.pending, None
+        self.committer.commit(pending)
+
+
+_DURABILITY: Dict[str, Durability] = {}
+_DURABILITY_LOCK = threading.Lock()
+
+
+def get_durability(mode: str = "strict") -> Durability:
+    """Return the process-wide policy for ``mode``, so group commits span stores."""
+    with _DURABILITY_LOCK:
+        durability = _DURABILITY.get(mode)
+        if durability is None:
+            from .payloads import _env_float  # payloads imports us
+
+            window = (
+                _env_float("SEER_QUEUE_GROUP_COMMIT_MS", DEFAULT_GROUP_COMMIT_WINDOW * 1000, 0.0)
+                / 1000.0
+            )
+            durability = _DURABILITY[mode] = Durability(mode, window)
+        return durability
@@ -0,0 +1,105 @@
+"""Coalescing heartbeat sender for hot loops."""
+
+from __future__ import annotations
+
+import atexit
+import threading
+import time
+import uuid
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from .http import time_left
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .seer import Seer
+
+DEFAULT_HEARTBEAT_INTERVAL = 10.0
+
+
+class HeartbeatCoalescer:
+    """Keep only the newest heartbeat per job and send it at most once per interval.
+
+    ``offer`` is a dict assignment under a lock, so callers inside tight loops
+    never touch the network or the disk. A daemon thread flushes every
+    ``interval`` seconds. A heartbeat that fails to send is kept in memory
+    (unless a newer one for the job has arrived) and retried next interval;
+    only ``close`` writes unsent heartbeats to the offline queue. ``close``
+    also runs at exit, where it sends for at most ``timeout`` seconds.
+    """
+
+    def __init__(self, client: "Seer", *, interval: float = DEFAULT_HEARTBEAT_INTERVAL):
+        if interval <= 0:
+            raise ValueError("heartbeat_interval must be > 0")
+        self.client = client
+        self.interval = float(interval)
+        self._latest: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._loop,
+            name="seer-heartbeat-coalescer",
+            daemon=True,
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    def offer(self, job_name: str, payload: Dict[str, Any]) -> None:
+        """Record ``payload`` as the latest heartbeat for ``job_name``."""
+        with self._lock:
+            self._latest[job_name] = payload
+
+    def flush(self, deadline: Optional[float] = None) -> int:
+        """Send the latest heartbeat of every job now. Returns how many were sent.
+
+        ``deadline`` bounds the whole flush, including the wait for one
+        already running; heartbeats it does not get to stay pending.
+        """
+        ends = None if deadline is None else time.monotonic() + deadline
+        if not self._send_lock.acquire(timeout=-1 if ends is None else max(0.0, deadline)):
+            return 0
+        try:
+            with self._lock:
+                latest, self._latest = self._latest, {}
+            sent = 0
+            for job_name, payload in latest.items():
+                remaining = time_left(ends)
+                if remaining is not None and remaining <= 0:
+                    with self._lock:
+                        self._latest.setdefault(job_name, payload)
+                    continue
+                try:
+                    self.client._post(
+                        "/heartbeat",
+                        payload,
+                        idempotency_key=str(uuid.uuid4()),
+                        deadline=remaining,
+                    )
+                    sent += 1
+                except Exception as exc:
+                    with self._lock:
+                        self._latest.setdefault(job_name, payload)
+                    print(f"Seer heartbeat for {job_name} failed; will retry: {exc}")
+            return sent
+        finally:
+            self._send_lock.release()
+
+    def close(self, timeout: float = 2.0) -> None:
+        """Stop the flusher, flush for up to ``timeout`` seconds and queue the rest."""
+        ends = time.monotonic() + timeout
+        self._stop.set()
+        thread = self._thread
+        if thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout=timeout)
+        self.flush(deadline=max(0.0, ends - time.monotonic()))
+        with self._lock:
+            leftover, self._latest = self._latest, {}
+        for payload in leftover.values():
+            self.client._queue(payload, "heartbeat", idempotency_key=str(uuid.uuid4()))
+
+    def _loop(self) -> None:
+        while not self._stop.wait(timeout=self.interval):
+            try:
+                self.flush()
+            except Exception as exc:
+                print(f"Seer heartbeat flush error: {exc}")
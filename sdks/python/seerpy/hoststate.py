@@ -0,0 +1,78 @@
+"""Per-host state shared by every process using a queue directory.
+
+A small JSON file maps each ``base_url`` to a dict. Reads are cached until
+the file changes, so checking it costs one ``stat``; updates are
+read-modify-write under a ``FileLock`` and replace the file atomically.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from filelock import FileLock, Timeout
+
+_LOCK_TIMEOUT = 1.0
+
+Entry = Dict[str, Any]
+
+
+class HostStateFile:
+    def __init__(self, path: str, defaults: Entry):
+        self.path = path
+        self.defaults = defaults
+        self._file_lock = FileLock(path + ".lock", timeout=_LOCK_TIMEOUT)
+        self._mutex = threading.Lock()
+        self._hosts: Dict[str, Entry] = {}
+        self._stamp: Optional[Tuple[int, int]] = None
+
+    def _load(self) -> Dict[str, Entry]:
+        """Current state, re-read only when the file changed."""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            self._hosts, self._stamp = {}, None
+            return self._hosts
+        stamp = (st.st_mtime_ns, st.st_size)
+        if stamp != self._stamp:
+            try:
+                with open(self.path, "r", encoding="utf-8") as handle:
+                    data = json.load(handle)
+            except (OSError, ValueError):
+                data = {}
+            self._hosts = data if isinstance(data, dict) else {}
+            self._stamp = stamp
+        return self._hosts
+
+    def entry(self, base: str) -> Entry:
+        """A copy of ``base``'s entry (the defaults when it has none)."""
+        with self._mutex:
+            return dict(self._load().get(base) or self.defaults)
+
+    def update(self, base: str, change: Callable[[Entry], bool]) -> Entry:
+        """Apply ``change`` to ``base``'s entry under the file lock; returns the entry.
+
+        ``change`` edits the entry in place and returns False when there is
+        nothing to write. If the lock cannot be had quickly the update is
+        skipped: this state only steers retries, it is never worth a stall.
+        """
+        try:
+            with self._file_lock:
+                with self._mutex:
+                    self._stamp = None
+                    hosts = dict(self._load())
+                    entry = dict(hosts.get(base) or self.defaults)
+                    if not change(entry):
+                        return entry
+                    hosts[base] = entry
+                    os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                    tmp = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                    with open(tmp, "w", encoding="utf-8") as handle:
+                        json.dump(hosts, handle)
+                    os.replace(tmp, self.path)
+                    self._hosts, self._stamp = hosts, None
+                    return entry
+        except Timeout:
+            return self.entry(base)
@@ -2,19 +2,64 @@
 
 from __future__ import annotations
 
+import asyncio
+import functools
+import gzip
 import json
+import math
 import os
 import random
+import threading
 import time
-from typing import Any, Dict, Optional
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
 
 import requests
 
-DEFAULT_TIMEOUT = 30
+from .breaker import CircuitOpen, get_circuit_breaker
+
+DEFAULT_TIMEOUT = 30  # read timeout per attempt
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_DEADLINE = 120.0  # seconds one call may spend on all attempts and backoff
 DEFAULT_MAX_RETRIES = 5
 DEFAULT_BASE_DELAY = 1
 DEFAULT_MAX_DELAY = 30
 DEFAULT_REPLAY_JITTER_MS = 2000
+BATCH_PATH = "/batch"
+DEFAULT_BATCH_MAX_ITEMS = 100
+DEFAULT_BATCH_MAX_BYTES = 512 * 1024
+HEALTH_PATH = "/health"
+DEFAULT_GZIP_MIN_BYTES = 8 * 1024
+HEALTH_PROBE_TIMEOUT = 5
+HEALTH_PROBE_MIN_TIMEOUT = 0.5  # less time than this left: skip the probe, send plain JSON
+CAPABILITY_RETRY_SECONDS = 60.0
+DEFAULT_MAX_LOG_BYTES = 64 * 1024 * 1024  # servers that list logs_offset but no max_log_bytes
+
+_BATCH_UNSUPPORTED: Set[str] = set()
+_BATCH_LOCK = threading.Lock()
+# base URL -> (capabilities, monotonic expiry or None for "this process")
+_CAPABILITIES: Dict[str, Tuple[frozenset, Optional[float]]] = {}
+_CAPABILITIES_LOCK = threading.Lock()
+# base URL -> the most log bytes a run may hold, from the same /health probe
+_LOG_LIMITS: Dict[str, int] = {}
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """A call ran out of its overall deadline before an attempt succeeded."""
+
+
+class BatchUnsupported(Exception):
+    """The target server has no ``/batch`` endpoint (older SEER build)."""
+
+
+@dataclass
+class BatchItemResult:
+    status: int
+    body: Any = None
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
 
 
 def _should_retry_status(status_code: Optional[int]) -> bool:
@@ -28,6 +73,19 @@ def _should_retry_status(status_code: Optional[int]) -> bool:
     return False
 
 
+def retry_after_seconds(response: requests.Response) -> Optional[float]:
+    """The numeric ``Retry-After`` of a 429 response, or None."""
+    if getattr(response, "status_code", None) != 429:
+        return None
+    ra = response.headers.get("Retry-After") if response.headers else None
+    if ra is None:
+        return None
+    try:
+        return max(0.0, float(ra))
+    except (TypeError, ValueError):
+        return None
+
+
 def compute_backoff_delay(
     attempt: int,
     *,
@@ -41,13 +99,9 @@ def compute_backoff_delay(
     Uses ``random.uniform(0, min(base * 2**attempt, max))``. On HTTP 429, prefers
     a numeric ``Retry-After`` header when present (capped at ``max_delay``).
     """
-    if response is not None and getattr(response, "status_code", None) == 429:
-        ra = response.headers.get("Retry-After") if response.headers else None
-        if ra is not None:
-            try:
-                return min(float(ra), max_delay)
-            except (TypeError, ValueError):
-                pass
+    retry_after = retry_after_seconds(response) if response is not None else None
+    if retry_after is not None:
+        return min(retry_after, max_delay)
     ceiling = min(base_delay * (2**attempt), max_delay)
     picker = rng.uniform if rng is not None else random.uniform
     return picker(0.0, ceiling)
@@ -69,6 +123,217 @@ def replay_startup_jitter_seconds(
     return picker(0.0, ms / 1000.0)
 
 
+def gzip_min_bytes() -> int:
+    """Smallest JSON body worth compressing (``SEER_GZIP_MIN_BYTES``; ``0`` disables)."""
+    raw = os.getenv("SEER_GZIP_MIN_BYTES", "").strip()
+    if not raw:
+        return DEFAULT_GZIP_MIN_BYTES
+    try:
+        return max(0, int(raw))
+    except ValueError:
+        return DEFAULT_GZIP_MIN_BYTES
+
+
+def _base_of(url: str) -> str:
+    return url.rsplit("/", 1)[0].rstrip("/")
+
+
+def server_capabilities(
+    base_url: str,
+    *,
+    session: Optional[requests.Session] = None,
+    timeout: float = HEALTH_PROBE_TIMEOUT,
+) -> frozenset:
+    """Features ``base_url`` advertises in ``GET /health`` (e.g. ``"gzip"``).
+
+    Cached for the life of the process. Servers that predate the
+    ``capabilities`` field report none; a failed probe is retried after
+    ``CAPABILITY_RETRY_SECONDS``. ``timeout`` bounds the probe.
+    """
+    base = base_url.rstrip("/")
+    now = time.monotonic()
+    cached = _known_capabilities(base)
+    if cached is not None:
+        return cached
+    getter = session.get if session is not None else requests.get
+    expires: Optional[float] = None
+    try:
+        response = getter(
+            f"{base}{HEALTH_PATH}",
+            allow_redirects=False,
+            timeout=timeout,
+        )
+        response.raise_for_status()
+        data = parse_json_response(response)
+        listed = data.get("capabilities") if isinstance(data, dict) else None
+        found = frozenset(str(c) for c in listed) if isinstance(listed, list) else frozenset()
+        limit = data.get("max_log_bytes") if isinstance(data, dict) else None
+        if isinstance(limit, int) and limit > 0:
+            with _CAPABILITIES_LOCK:
+                _LOG_LIMITS[base] = limit
+    except (requests.exceptions.RequestException, ValueError):
+        found = frozenset()
+        expires = now + CAPABILITY_RETRY_SECONDS
+    with _CAPABILITIES_LOCK:
+        _CAPABILITIES[base] = (found, expires)
+    return found
+
+
+def lacks_capability(
+    base_url: str, capability: str, *, session: Optional[requests.Session] = None
+) -> bool:
+    """True when ``base_url`` answered ``/health`` without listing ``capability``.
+
+    A server that could not be reached is not known to lack anything.
+    """
+    found = server_capabilities(base_url, session=session)
+    with _CAPABILITIES_LOCK:
+        cached = _CAPABILITIES.get(base_url.rstrip("/"))
+    return capability not in found and cached is not None and cached[1] is None
+
+
+def server_log_limit(base_url: str) -> int:
+    """Most bytes of logs the server keeps per run (``max_log_bytes`` in ``/health``).
+
+    Only reads what ``server_capabilities`` learned; never probes.
+    """
+    with _CAPABILITIES_LOCK:
+        return _LOG_LIMITS.get(base_url.rstrip("/"), DEFAULT_MAX_LOG_BYTES)
+
+
+def _known_capabilities(base: str) -> Optional[frozenset]:
+    """Cached capabilities of ``base``, or None when it has to be probed."""
+    with _CAPABILITIES_LOCK:
+        cached = _CAPABILITIES.get(base)
+    if cached is not None and (cached[1] is None or cached[1] > time.monotonic()):
+        return cached[0]
+    return None
+
+
+def _forget_capability(base_url: str, capability: str) -> None:
+    with _CAPABILITIES_LOCK:
+        cached = _CAPABILITIES.get(base_url)
+        if cached is not None:
+            _CAPABILITIES[base_url] = (cached[0] - {capability}, cached[1])
+
+
+def _json_body(
+    url: str,
+    payload: Dict[str, Any],
+    session: Optional[requests.Session],
+    deadline_at: float,
+) -> bytes:
+    """Serialize ``payload`` once per call, learning first whether gzip is worth it.
+
+    A body large enough to compress may need a ``/health`` probe. It gets at
+    most half the time left before ``deadline_at`` and is skipped when that
+    is under ``HEALTH_PROBE_MIN_TIMEOUT``; the body then goes out as plain JSON.
+    """
+    body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    threshold = gzip_min_bytes()
+    if threshold > 0 and len(body) >= threshold:
+        budget = min(HEALTH_PROBE_TIMEOUT, (deadline_at - time.monotonic()) / 2)
+        if budget >= HEALTH_PROBE_MIN_TIMEOUT:
+            server_capabilities(_base_of(url), session=session, timeout=budget)
+    return body
+
+
+def _encode_body(url: str, body: bytes) -> Tuple[bytes, bool]:
+    """Gzip ``body`` when it is large and the server is known to accept gzip."""
+    threshold = gzip_min_bytes()
+    if threshold <= 0 or len(body) < threshold:
+        return body, False
+    if "gzip" not in (_known_capabilities(_base_of(url)) or frozenset()):
+        return body, False
+    return gzip.compress(body, compresslevel=6), True
+
+
+def _post_once(
+    session: Optional[requests.Session],
+    url: str,
+    body: bytes,
+    headers: Dict[str, str],
+    timeout: Union[float, Tuple[float, float]],
+) -> Tuple[Optional[requests.Response], Optional[BaseException]]:
+    """One POST attempt of a JSON ``body``. Returns ``(response, error)``.
+
+    ``error`` is None on success. Large bodies are gzipped when the server
+    is known to support it; a ``415`` for a gzipped body drops that
+    capability and resends plain JSON. Non-retryable HTTP errors (4xx other
+    than 429) are raised immediately.
+    """
+    poster = session.post if session is not None else requests.post
+    body, compressed = _encode_body(url, body)
+    while True:
+        sent = dict(headers)
+        sent["Content-Type"] = "application/json"
+        if compressed:
+            sent["Content-Encoding"] = "gzip"
+        try:
+            response = poster(
+                url,
+                headers=sent,
+                data=body,
+                allow_redirects=False,
+                timeout=timeout,
+            )
+        except requests.exceptions.RequestException as exc:
+            return None, exc
+        if compressed and getattr(response, "status_code", None) == 415:
+            _forget_capability(_base_of(url), "gzip")
+            body, compressed = gzip.decompress(body), False
+            continue
+        break
+    try:
+        response.raise_for_status()
+        return response, None
+    except requests.exceptions.HTTPError as exc:
+        status = getattr(response, "status_code", None)
+        wrapped = requests.exceptions.HTTPError(
+            f"{exc}\nResponse body:\n{getattr(response, 'text', '')}",
+            response=response,
+        )
+        if not _should_retry_status(status):
+            raise wrapped from exc
+        return response, wrapped
+
+
+def _attempt_timeout(
+    connect_timeout: Optional[float],
+    read_timeout: float,
+    deadline_at: float,
+) -> Optional[Tuple[float, float]]:
+    """``(connect, read)`` timeouts for the next attempt, cut to the time left.
+
+    None when the deadline has already passed.
+    """
+    remaining = deadline_at - time.monotonic()
+    if remaining <= 0:
+        return None
+    connect = connect_timeout
+    if connect is None:
+        connect = min(read_timeout, DEFAULT_CONNECT_TIMEOUT)
+    return min(connect, remaining), min(read_timeout, remaining)
+
+
+def time_left(ends: Optional[float]) -> Optional[float]:
+    """Seconds until ``ends``, a ``time.monotonic()`` reading; None when unbounded."""
+    return None if ends is None else ends - time.monotonic()
+
+
+def _counts_against_host(response: Optional[requests.Response]) -> bool:
+    """Whether a failed attempt says the host is down; a 429 only says "slow down"."""
+    return getattr(response, "status_code", None) != 429
+
+
+def _deadline_at(deadline: Optional[float]) -> float:
+    return math.inf if deadline is None else time.monotonic() + max(0.0, deadline)
+
+
+def _deadline_exceeded(url: str, deadline: Optional[float]) -> DeadlineExceeded:
+    return DeadlineExceeded(f"Seer deadline of {deadline}s for {url} ran out")
+
+
 def post_with_backoff(
     url: str,
     payload: Dict[str, Any],
@@ -78,62 +343,214 @@ def post_with_backoff(
     base_delay: float = DEFAULT_BASE_DELAY,
     max_delay: float = DEFAULT_MAX_DELAY,
     timeout: float = DEFAULT_TIMEOUT,
+    connect_timeout: Optional[float] = None,
+    deadline: Optional[float] = DEFAULT_DEADLINE,
     session: Optional[requests.Session] = None,
     rng: Optional[random.Random] = None,
 ) -> requests.Response:
     """POST JSON with full-jitter exponential backoff.
 
     Retries connection/timeouts, HTTP 5xx, and 429. Other 4xx fail immediately.
+    A call that fails counts once towards the host's circuit breaker, however
+    many attempts it made, unless its last attempt was answered with 429.
+    While the breaker is open this raises ``CircuitOpen`` without sending,
+    and retries stop as soon as it opens.
+
+    ``timeout`` is the read timeout of one attempt and ``connect_timeout``
+    (default ``min(timeout, DEFAULT_CONNECT_TIMEOUT)``) its connect timeout.
+    ``deadline`` bounds the whole call: attempts are cut short to fit in it,
+    and a retry whose backoff would overrun it is not made. Running out
+    raises ``DeadlineExceeded``; ``None`` means no overall bound.
     """
-    poster = session.post if session is not None else requests.post
+    breaker = get_circuit_breaker()
+    base = _base_of(url)
+    if not breaker.allow(base):
+        raise CircuitOpen(f"Seer circuit for {base} is open")
+    deadline_at = _deadline_at(deadline)
+    body = _json_body(url, payload, session, deadline_at)
     last_error: Optional[BaseException] = None
-    last_response: Optional[requests.Response] = None
+    failed = False  # the call ends in a failure that counts against the host
 
-    for attempt in range(max_retries):
-        last_response = None
-        try:
-            response = poster(
-                url,
-                headers=headers,
-                json=payload,
-                allow_redirects=False,
-                timeout=timeout,
+    try:
+        for attempt in range(max_retries):
+            attempt_timeout = _attempt_timeout(connect_timeout, timeout, deadline_at)
+            if attempt_timeout is None:
+                raise _deadline_exceeded(url, deadline) from last_error
+            failed = False
+            response, last_error = _post_once(session, url, body, headers, attempt_timeout)
+            if last_error is None:
+                assert response is not None
+                breaker.record_success(base)
+                return response
+
+            failed = _counts_against_host(response)
+            if attempt == max_retries - 1 or breaker.is_open(base):
+                break
+            delay = compute_backoff_delay(
+                attempt,
+                base_delay=base_delay,
+                max_delay=max_delay,
+                response=response,
+                rng=rng,
             )
-        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as exc:
-            last_error = exc
-        except requests.exceptions.RequestException as exc:
-            last_error = exc
-        else:
-            last_response = response
-            try:
-                response.raise_for_status()
+            if time.monotonic() + delay >= deadline_at:
+                raise _deadline_exceeded(url, deadline) from last_error
+            time.sleep(delay)
+    finally:
+        if failed:
+            breaker.record_failure(base)
+
+    if last_error is not None:
+        raise last_error
+    raise RuntimeError(f"Failed to POST {url} after {max_retries} attempts")
+
+
+async def apost_with_backoff(
+    url: str,
+    payload: Dict[str, Any],
+    headers: Dict[str, str],
+    *,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    base_delay: float = DEFAULT_BASE_DELAY,
+    max_delay: float = DEFAULT_MAX_DELAY,
+    timeout: float = DEFAULT_TIMEOUT,
+    connect_timeout: Optional[float] = None,
+    deadline: Optional[float] = DEFAULT_DEADLINE,
+    session: Optional[requests.Session] = None,
+    rng: Optional[random.Random] = None,
+) -> requests.Response:
+    """Asyncio variant of :func:`post_with_backoff`.
+
+    Each attempt runs in the loop's default executor and backoff uses
+    ``asyncio.sleep``, so a slow endpoint never blocks the event loop. The
+    circuit breaker's file and ``/health`` probe are handled there too.
+    """
+    loop = asyncio.get_running_loop()
+    breaker = get_circuit_breaker()
+    base = _base_of(url)
+    if not await loop.run_in_executor(None, breaker.allow, base):
+        raise CircuitOpen(f"Seer circuit for {base} is open")
+    deadline_at = _deadline_at(deadline)
+    body = await loop.run_in_executor(
+        None, functools.partial(_json_body, url, payload, session, deadline_at)
+    )
+    last_error: Optional[BaseException] = None
+    failed = False  # the call ends in a failure that counts against the host
+
+    try:
+        for attempt in range(max_retries):
+            attempt_timeout = _attempt_timeout(connect_timeout, timeout, deadline_at)
+            if attempt_timeout is None:
+                raise _deadline_exceeded(url, deadline) from last_error
+            failed = False
+            response, last_error = await loop.run_in_executor(
+                None,
+                functools.partial(_post_once, session, url, body, headers, attempt_timeout),
+            )
+            if last_error is None:
+                assert response is not None
+                await loop.run_in_executor(None, breaker.record_success, base)
                 return response
-            except requests.exceptions.HTTPError as exc:
-                status = getattr(response, "status_code", None)
-                wrapped = requests.exceptions.HTTPError(
-                    f"{exc}\nResponse body:\n{getattr(response, 'text', '')}",
-                    response=response,
-                )
-                if not _should_retry_status(status):
-                    raise wrapped from exc
-                last_error = wrapped
-
-        if attempt == max_retries - 1:
-            break
-        delay = compute_backoff_delay(
-            attempt,
-            base_delay=base_delay,
-            max_delay=max_delay,
-            response=last_response,
-            rng=rng,
-        )
-        time.sleep(delay)
+
+            failed = _counts_against_host(response)
+            if attempt == max_retries - 1:
+                break
+            if await loop.run_in_executor(None, breaker.is_open, base):
+                break
+            delay = compute_backoff_delay(
+                attempt,
+                base_delay=base_delay,
+                max_delay=max_delay,
+                response=response,
+                rng=rng,
+            )
+            if time.monotonic() + delay >= deadline_at:
+                raise _deadline_exceeded(url, deadline) from last_error
+            await asyncio.sleep(delay)
+    finally:
+        if failed:
+            await loop.run_in_executor(None, breaker.record_failure, base)
 
     if last_error is not None:
         raise last_error
     raise RuntimeError(f"Failed to POST {url} after {max_retries} attempts")
 
 
+def batch_supported(base_url: str) -> bool:
+    """False once ``base_url`` has answered ``/batch`` with 404/405 in this process."""
+    with _BATCH_LOCK:
+        return base_url.rstrip("/") not in _BATCH_UNSUPPORTED
+
+
+def pack_batch_events(
+    events: List[Dict[str, Any]],
+    *,
+    max_items: int = DEFAULT_BATCH_MAX_ITEMS,
+    max_bytes: int = DEFAULT_BATCH_MAX_BYTES,
+) -> List[List[Dict[str, Any]]]:
+    """Split events into request-sized chunks, preserving order.
+
+    An event larger than ``max_bytes`` on its own still ships, alone.
+    """
+    chunks: List[List[Dict[str, Any]]] = []
+    current: List[Dict[str, Any]] = []
+    size = 0
+    for event in events:
+        event_size = len(json.dumps(event)) + 1
+        if current and (len(current) >= max_items or size + event_size > max_bytes):
+            chunks.append(current)
+            current, size = [], 0
+        current.append(event)
+        size += event_size
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def post_batch(
+    base_url: str,
+    events: List[Dict[str, Any]],
+    headers: Dict[str, str],
+    *,
+    timeout: float = DEFAULT_TIMEOUT,
+    connect_timeout: Optional[float] = None,
+    deadline: Optional[float] = DEFAULT_DEADLINE,
+    session: Optional[requests.Session] = None,
+) -> List[BatchItemResult]:
+    """POST ``{"events": [...]}`` to ``/batch`` and return one result per event.
+
+    Each event is ``{"endpoint", "idempotency_key", "payload"}``. Raises
+    ``BatchUnsupported`` (and remembers it for ``base_url``) when the server
+    has no batch endpoint.
+    """
+    base = base_url.rstrip("/")
+    try:
+        response = post_with_backoff(
+            f"{base}{BATCH_PATH}",
+            {"events": events},
+            headers,
+            timeout=timeout,
+            connect_timeout=connect_timeout,
+            deadline=deadline,
+            session=session,
+        )
+    except requests.exceptions.HTTPError as exc:
+        status = getattr(exc.response, "status_code", None)
+        if status in (404, 405):
+            with _BATCH_LOCK:
+                _BATCH_UNSUPPORTED.add(base)
+            raise BatchUnsupported(base) from exc
+        raise
+    data = parse_json_response(response)
+    results = data.get("results") if isinstance(data, dict) else None
+    if not isinstance(results, list) or len(results) != len(events):
+        raise RuntimeError("Seer batch response did not include one result per event")
+    return [
+        BatchItemResult(status=int(item.get("status", 0)), body=item.get("body"))
+        for item in results
+    ]
+
+
 def parse_json_response(response: requests.Response) -> Any:
     """Parse a response body that may already be a dict or a JSON string."""
     data = response.json()
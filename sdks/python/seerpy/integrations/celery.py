@@ -9,8 +9,18 @@ Use ``SeerTask`` as a base class, or ``connect_seer_signals`` for app-wide hooks
 
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
-
+import atexit
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from seerpy.payloads import new_run_id
+from seerpy.sampling import SamplingPolicy
 from seerpy.seer import Seer
 
 try:
@@ -22,10 +32,113 @@ except ImportError as exc:  # pragma: no cover - exercised when celery extra mis
     ) from exc
 
 
+RUN_ID_TTL = 24 * 3600.0  # seconds a started task's run id is remembered
+RUN_ID_MAX_ENTRIES = 10_000
+DISPATCH_QUEUE_SIZE = 10_000
+DISPATCH_DRAIN_TIMEOUT = 5.0  # seconds to flush pending sends at exit
+
+
+class RunIdMap:
+    """Thread-safe ``task_id -> (run_id, run_key)`` map with a TTL and a size cap.
+
+    Entries for tasks whose postrun never fires (killed worker, revoked task)
+    expire after ``ttl`` seconds, and the oldest go first past ``max_entries``,
+    so the map cannot grow without bound in a long-lived worker.
+    """
+
+    def __init__(self, ttl: float = RUN_ID_TTL, max_entries: int = RUN_ID_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Tuple[str, str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def put(self, task_id: str, value: Tuple[str, str]) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._entries.pop(task_id, None)
+            self._entries[task_id] = (now + self.ttl, value)
+            while self._entries:
+                _key, (expires, _value) = next(iter(self._entries.items()))
+                if expires > now and len(self._entries) <= self.max_entries:
+                    break
+                self._entries.popitem(last=False)
+
+    def pop(self, task_id: str) -> Optional[Tuple[str, str]]:
+        with self._lock:
+            entry = self._entries.pop(task_id, None)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return entry[1]
+
+
+_Event = Tuple[Dict[str, Any], str, bool]  # payload, run key, is final
+
+
+class _SignalDispatcher:
+    """Per-worker-process sender, so signal handlers only enqueue.
+
+    One daemon thread posts events in the order they were added, so a run's
+    start always goes before its final. A final that cannot be posted, or
+    that does not fit in the full queue, goes to the offline queue; starts
+    are best-effort, as the final carries the run id anyway.
+    """
+
+    def __init__(self, client: Seer, maxsize: int = DISPATCH_QUEUE_SIZE):
+        self.client = client
+        self._queue: "queue.Queue[Optional[_Event]]" = queue.Queue(maxsize)
+        self._thread = threading.Thread(target=self._loop, name="seer-celery-dispatch", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, payload: Dict[str, Any], run_key: str, *, final: bool) -> None:
+        try:
+            self._queue.put_nowait((payload, run_key, final))
+        except queue.Full:
+            if final:
+                self.client._queue(payload, "monitoring", idempotency_key=run_key)
+
+    def _send(self, payload: Dict[str, Any], run_key: str, final: bool) -> None:
+        suffix = "complete" if final else "register"
+        try:
+            self.client._post("/monitoring", payload, idempotency_key=f"{run_key}:{suffix}")
+        except Exception:
+            if final:
+                self.client._queue(payload, "monitoring", idempotency_key=run_key)
+
+    def _loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            self._send(*item)
+
+    def close(self, timeout: float = DISPATCH_DRAIN_TIMEOUT) -> None:
+        """Send what is pending within ``timeout``; queue finals still left."""
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout=timeout)
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not None and item[2]:
+                self.client._queue(item[0], "monitoring", idempotency_key=item[1])
+
+
 _DEFAULT_SEER: Optional[Seer] = None
-_RUN_IDS: Dict[str, str] = {}
+_RUN_IDS = RunIdMap()
 _SIGNAL_SEER: Optional[Seer] = None
 _SIGNALS_CONNECTED = False
+_DISPATCHER: Optional[_SignalDispatcher] = None
+_DISPATCHER_PID: Optional[int] = None
+_DISPATCHER_LOCK = threading.Lock()
 
 
 def set_default_seer(seer: Seer) -> None:
@@ -38,6 +151,34 @@ def get_default_seer() -> Optional[Seer]:
     return _DEFAULT_SEER
 
 
+def _dispatcher(client: Seer) -> _SignalDispatcher:
+    """The dispatcher for this worker process (prefork children get their own)."""
+    global _DISPATCHER, _DISPATCHER_PID
+    with _DISPATCHER_LOCK:
+        if (
+            _DISPATCHER is None
+            or _DISPATCHER_PID != os.getpid()
+            or _DISPATCHER.client is not client
+        ):
+            _DISPATCHER = _SignalDispatcher(client)
+            _DISPATCHER_PID = os.getpid()
+        return _DISPATCHER
+
+
+def _submit(client: Seer, payload: Dict[str, Any], run_key: str, *, final: bool) -> None:
+    batcher = client._batcher
+    if batcher is not None:
+        suffix = "complete" if final else "register"
+        batcher.add(
+            "monitoring",
+            payload,
+            idempotency_key=f"{run_key}:{suffix}",
+            queue_key=run_key if final else None,
+        )
+        return
+    _dispatcher(client).submit(payload, run_key, final=final)
+
+
 class SeerTask(Task):
     """Celery Task base that wraps execution in ``seer.monitor``.
 
@@ -47,6 +188,9 @@ class SeerTask(Task):
     - ``seer_job_name``: override job name (default: Celery task name)
     - ``seer_capture_logs``: capture stdout/logging into the run
     - ``seer_metadata`` / ``seer_tags``: optional static metadata/tags
+    - ``seer_sampling``: ``SamplingPolicy`` for high-frequency tasks, e.g.
+      ``SamplingPolicy(keep_every=100)``
+    - ``seer_rollup``: report the task only through per-window rollups
     """
 
     abstract = True
@@ -55,6 +199,8 @@ class SeerTask(Task):
     seer_capture_logs: bool = False
     seer_metadata: Optional[dict] = None
     seer_tags: Optional[list] = None
+    seer_sampling: Optional[SamplingPolicy] = None
+    seer_rollup: bool = False
 
     def __call__(self, *args: Any, **kwargs: Any) -> Any:
         client = self.seer or get_default_seer()
@@ -67,6 +213,8 @@ class SeerTask(Task):
             capture_logs=self.seer_capture_logs,
             metadata=self.seer_metadata,
             tags=self.seer_tags,
+            sampling=self.seer_sampling,
+            rollup=self.seer_rollup,
         ):
             return super().__call__(*args, **kwargs)
 
@@ -77,6 +225,10 @@ def connect_seer_signals(seer: Seer, *, app=None) -> None:
     Prefer ``SeerTask`` when you want per-task control. Signals are a convenient
     app-wide alternative. Pass ``app`` only for documentation/clarity; Celery
     signals are process-global.
+
+    The handlers never touch the network: they hand events to a background
+    dispatcher per worker process (or to ``seer``'s batcher when it has
+    ``batch_events=True``), so a slow SEER adds nothing to task latency.
     """
     global _SIGNAL_SEER, _SIGNALS_CONNECTED
     _SIGNAL_SEER = seer
@@ -89,31 +241,25 @@ def connect_seer_signals(seer: Seer, *, app=None) -> None:
         if client is None or task is None:
             return
         job_name = getattr(task, "seer_job_name", None) or getattr(task, "name", "celery_task")
+
+        # Client-assigned id: postrun/failure can complete the run even if this
+        # register never reaches SEER.
+        run_id = new_run_id()
+        run_key = str(uuid.uuid4())
+        if task_id:
+            _RUN_IDS.put(task_id, (run_id, run_key))
         start_payload = {
             "job_name": job_name,
             "status": "running",
-            "run_id": "",
-            "start_time": None,
+            "run_id": run_id,
+            "start_time": datetime.now(timezone.utc).isoformat(sep=" "),
             "end_time": None,
             "metadata": {"celery_task_id": task_id},
             "error_details": None,
             "tags": ["celery"],
             "logs": None,
         }
-        from datetime import datetime, timezone
-
-        start_payload["start_time"] = datetime.now(timezone.utc).isoformat(sep=" ")
-        try:
-            from seerpy.http import parse_json_response
-
-            resp = client._post("/monitoring", start_payload)
-            data = parse_json_response(resp)
-            run_id = data.get("run_id")
-            if run_id and task_id:
-                _RUN_IDS[task_id] = run_id
-        except Exception:
-            # Offline: leave no run_id; postrun/failure will queue final outcome.
-            pass
+        _submit(client, start_payload, run_key, final=False)
 
     @task_postrun.connect(weak=False)
     def _on_postrun(task_id=None, task=None, state=None, **_kwargs):
@@ -135,17 +281,16 @@ def connect_seer_signals(seer: Seer, *, app=None) -> None:
 
 
 def _complete_signal_run(client: Seer, task_id, task, *, status: str, error: Optional[str]) -> None:
-    from datetime import datetime, timezone
-
     job_name = "celery_task"
     if task is not None:
         job_name = getattr(task, "seer_job_name", None) or getattr(task, "name", job_name)
-    run_id = _RUN_IDS.pop(task_id, "") if task_id else ""
+    entry = _RUN_IDS.pop(task_id) if task_id else None
+    run_id, run_key = entry if entry is not None else ("", str(uuid.uuid4()))
     end_time = datetime.now(timezone.utc).isoformat(sep=" ")
     payload = {
         "job_name": job_name,
         "status": status,
-        "run_id": run_id or "",
+        "run_id": run_id,
         "start_time": None,
         "end_time": end_time,
         "metadata": {"celery_task_id": task_id},
@@ -153,9 +298,4 @@ def _complete_signal_run(client: Seer, task_id, task, *, status: str, error: Opt
         "tags": ["celery"],
         "logs": None,
     }
-    try:
-        client._post("/monitoring", payload)
-    except Exception:
-        from seerpy.payloads import save_failed_payload
-
-        save_failed_payload(payload, "monitoring", base_url=client.base_url)
+    _submit(client, payload, run_key, final=True)
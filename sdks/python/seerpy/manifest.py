@@ -0,0 +1,250 @@
+"""Metadata index for queue areas that keep envelopes as plain files.
+
+The manifest (``<queue_dir>/index/manifest.sqlite3``) mirrors one row per
+envelope file, carrying only what inspection needs: job, endpoint, status,
+attempts, created_at and size. Triggers keep per-state counts and bytes, so
+status is a single-row lookup instead of a stat of every file.
+
+It is a cache, never the source of truth. For each area (``queue`` for the
+file backend's pending/sending files, ``dead`` for dead letters) it records
+the directory mtime it last matched, which lets writers skip the listing.
+Readers (status, paging, replay) compare the directory's file names with
+the rows instead, since the mtime misses changes made in the same tick or
+by a writer that skips ``.queue.lock``. When the directory has changed
+behind its back (the CLI or an older client, a crash between a file write
+and the index update, someone editing by hand) the area is rescanned and
+only files it has never seen are opened.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+MANIFEST_PATH = os.path.join("index", "manifest.sqlite3")
+STATES = ("pending", "sending", "dead")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    area TEXT NOT NULL,
+    key TEXT NOT NULL,
+    state TEXT NOT NULL,
+    endpoint TEXT NOT NULL DEFAULT '',
+    job_name TEXT,
+    status TEXT,
+    base_url TEXT NOT NULL DEFAULT '',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL DEFAULT '',
+    size INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    PRIMARY KEY (area, key)
+);
+CREATE INDEX IF NOT EXISTS ix_entries_state ON entries (state, key);
+CREATE INDEX IF NOT EXISTS ix_entries_job_name ON entries (job_name, state);
+CREATE TABLE IF NOT EXISTS totals (
+    state TEXT PRIMARY KEY,
+    count INTEGER NOT NULL DEFAULT 0,
+    bytes INTEGER NOT NULL DEFAULT 0
+);
+INSERT OR IGNORE INTO totals (state) VALUES ('pending'), ('sending'), ('dead');
+CREATE TABLE IF NOT EXISTS marks (
+    area TEXT PRIMARY KEY,
+    mtime INTEGER
+);
+CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN
+    UPDATE totals SET count = count + 1, bytes = bytes + NEW.size WHERE state = NEW.state;
+END;
+CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN
+    UPDATE totals SET count = count - 1, bytes = bytes - OLD.size WHERE state = OLD.state;
+END;
+CREATE TRIGGER IF NOT EXISTS entries_update AFTER UPDATE OF state, size ON entries BEGIN
+    UPDATE totals SET count = count - 1, bytes = bytes - OLD.size WHERE state = OLD.state;
+    UPDATE totals SET count = count + 1, bytes = bytes + NEW.size WHERE state = NEW.state;
+END;
+"""
+
+# Columns of a manifest row, in the order ``put`` takes them.
+ROW_FIELDS = (
+    "state",
+    "endpoint",
+    "job_name",
+    "status",
+    "base_url",
+    "attempts",
+    "created_at",
+    "size",
+    "error",
+)
+
+
+def filter_clause(
+    *,
+    job_name: Optional[str] = None,
+    endpoint: Optional[str] = None,
+    created_before: Optional[str] = None,
+    created_after: Optional[str] = None,
+) -> Tuple[str, List[Any]]:
+    """SQL ``AND ...`` fragment shared by the manifest and the SQLite backend."""
+    sql = ""
+    args: List[Any] = []
+    if job_name is not None:
+        sql += " AND job_name = ?"
+        args.append(job_name)
+    if endpoint is not None:
+        sql += " AND endpoint = ?"
+        args.append(endpoint)
+    if created_before is not None:
+        sql += " AND created_at <= ?"
+        args.append(created_before)
+    if created_after is not None:
+        sql += " AND created_at >= ?"
+        args.append(created_after)
+    return sql, args
+
+
+class QueueManifest:
+    """One process's connection to the manifest database of a queue dir."""
+
+    def __init__(self, queue_dir: str):
+        self.db_path = os.path.join(queue_dir, MANIFEST_PATH)
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._mutex = threading.RLock()
+        self._depth = 0
+        try:
+            self._conn = self._open()
+        except sqlite3.DatabaseError:
+            # Only a cache: start over rather than fail the queue.
+            for suffix in ("", "-wal", "-shm"):
+                try:
+                    os.remove(self.db_path + suffix)
+                except OSError:
+                    pass
+            self._conn = self._open()
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=30,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        # Rebuildable from the files, so skip the per-commit fsync.
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        return conn
+
+    @contextmanager
+    def tx(self) -> Iterator[sqlite3.Connection]:
+        """One write transaction; nested calls join the outermost one."""
+        with self._mutex:
+            if self._depth:
+                self._depth += 1
+                try:
+                    yield self._conn
+                finally:
+                    self._depth -= 1
+                return
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._depth = 1
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            else:
+                self._conn.execute("COMMIT")
+            finally:
+                self._depth = 0
+
+    def _query(self, sql: str, args: Iterable[Any] = ()) -> List[Tuple[Any, ...]]:
+        with self._mutex:
+            return self._conn.execute(sql, tuple(args)).fetchall()
+
+    # -- sync marks ---------------------------------------------------------
+
+    def mark(self, area: str) -> Optional[int]:
+        rows = self._query("SELECT mtime FROM marks WHERE area = ?", (area,))
+        return rows[0][0] if rows else None
+
+    def set_mark(self, area: str, mtime: Optional[int]) -> None:
+        with self.tx() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO marks (area, mtime) VALUES (?, ?)", (area, mtime)
+            )
+
+    # -- rows ---------------------------------------------------------------
+
+    def put(self, area: str, key: str, row: Dict[str, Any]) -> None:
+        self.put_many(area, [(key, row)])
+
+    def put_many(self, area: str, rows: List[Tuple[str, Dict[str, Any]]]) -> None:
+        if not rows:
+            return
+        columns = ", ".join(ROW_FIELDS)
+        updates = ", ".join(f"{f} = excluded.{f}" for f in ROW_FIELDS)
+        with self.tx() as conn:
+            conn.executemany(
+                f"INSERT INTO entries (area, key, {columns})"
+                f" VALUES (?, ?, {', '.join('?' for _ in ROW_FIELDS)})"
+                f" ON CONFLICT (area, key) DO UPDATE SET {updates}",
+                [(area, key) + tuple(row.get(f) for f in ROW_FIELDS) for key, row in rows],
+            )
+
+    def set_state(self, area: str, key: str, state: str) -> None:
+        with self.tx() as conn:
+            conn.execute(
+                "UPDATE entries SET state = ? WHERE area = ? AND key = ?", (state, area, key)
+            )
+
+    def delete(self, area: str, keys: Iterable[str]) -> None:
+        with self.tx() as conn:
+            conn.executemany(
+                "DELETE FROM entries WHERE area = ? AND key = ?", [(area, k) for k in keys]
+            )
+
+    def states(self, area: str) -> Dict[str, str]:
+        return dict(self._query("SELECT key, state FROM entries WHERE area = ?", (area,)))
+
+    def totals(self, state: str) -> Tuple[int, int]:
+        rows = self._query("SELECT count, bytes FROM totals WHERE state = ?", (state,))
+        return (rows[0][0], rows[0][1]) if rows else (0, 0)
+
+    def oldest(self, state: str) -> Optional[str]:
+        rows = self._query(
+            "SELECT key FROM entries WHERE state = ? ORDER BY key LIMIT 1", (state,)
+        )
+        return rows[0][0] if rows else None
+
+    def page(
+        self,
+        state: str,
+        *,
+        after: Optional[str] = None,
+        limit: int = -1,
+        **filters: Optional[str],
+    ) -> List[Dict[str, Any]]:
+        """Rows in ``state`` ordered by key, starting after ``after``; -1 means no limit."""
+        sql = (
+            "SELECT key, endpoint, job_name, status, base_url, attempts, created_at, size, error"
+            " FROM entries WHERE state = ?"
+        )
+        args: List[Any] = [state]
+        if after is not None:
+            sql += " AND key > ?"
+            args.append(after)
+        clause, clause_args = filter_clause(**filters)
+        rows = self._query(sql + clause + " ORDER BY key LIMIT ?", args + clause_args + [limit])
+        names = ("key", "endpoint", "job_name", "status", "base_url", "attempts",
+                 "created_at", "size", "error")
+        return [dict(zip(names, row)) for row in rows]
+
+    def backlog(self) -> List[Tuple[Optional[str], str, int, int, Optional[str]]]:
+        """``(job_name, state, count, bytes, oldest_created_at)`` per job and state."""
+        return self._query(
+            "SELECT job_name, state, COUNT(*), COALESCE(SUM(size), 0), MIN(created_at)"
+            " FROM entries GROUP BY job_name, state"
+        )
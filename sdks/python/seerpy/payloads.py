@@ -2,36 +2,80 @@
 
 from __future__ import annotations
 
+import glob
 import json
 import os
+import threading
+import time
 import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass
-from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
 
 from filelock import FileLock, Timeout
 
-from .http import parse_json_response, post_with_backoff
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows has no shared locks
+    fcntl = None  # type: ignore[assignment]
+
+from .backoff import ReplayBackoff, get_replay_backoff, is_host_failure
+from .breaker import CircuitOpen, get_circuit_breaker
+from .durability import DURABILITY_MODES
+from .http import (
+    DEFAULT_BATCH_MAX_BYTES,
+    BatchUnsupported,
+    batch_supported,
+    post_batch,
+    post_with_backoff,
+)
+from .pool import session_for
+from .storage import (
+    DEFAULT_BASE_URL,
+    ENVELOPE_VERSION,
+    QUEUE_BACKENDS,
+    QueueItem,
+    QueueStorage,
+    _utc_now_iso,
+    open_queue_storage,
+    resolve_base_url,
+)
 
-ENVELOPE_VERSION = 3
-DEFAULT_BASE_URL = "https://api.ansrstudio.com/"
 DEFAULT_MAX_ATTEMPTS = 5
 DEFAULT_MAX_QUEUE_FILES = 500
 DEFAULT_MAX_QUEUE_BYTES = 50 * 1024 * 1024  # 50 MiB
+DEFAULT_REPLAY_CONCURRENCY = 4
+DEFAULT_REPLAY_BATCH_SIZE = 1
+DEFAULT_REPLAY_SHARDS = 1
+DEFAULT_PAGE_SIZE = 100
 ENDPOINT_PATHS = {
     "monitoring": "/monitoring",
     "heartbeat": "/heartbeat",
+    "rollup": "/rollup",
 }
 
+# Called with the queue directory after this process queues an envelope.
+_ENQUEUE_LISTENERS: List[Callable[[str], None]] = []
+_ENQUEUE_LOCK = threading.Lock()
 
-def resolve_base_url(explicit: Optional[str] = None) -> str:
-    """Resolve API base URL: explicit arg > SEER_BASE_URL env > default."""
-    if explicit:
-        return explicit.rstrip("/")
-    env = os.environ.get("SEER_BASE_URL", "").strip()
-    if env:
-        return env.rstrip("/")
-    return DEFAULT_BASE_URL.rstrip("/")
+
+def new_run_id() -> str:
+    """Mint a time-ordered, UUIDv7-style run id on the client.
+
+    48-bit Unix milliseconds, then version/variant bits and 74 random bits, so
+    ids sort by creation time and never need a server round trip.
+    """
+    millis = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), "big")
+    value = (millis & ((1 << 48) - 1)) << 80
+    value |= 0x7 << 76
+    value |= ((rand >> 62) & 0xFFF) << 64
+    value |= 0b10 << 62
+    value |= rand & ((1 << 62) - 1)
+    return str(uuid.UUID(int=value))
 
 
 def get_queue_dir() -> str:
@@ -41,6 +85,30 @@ def get_queue_dir() -> str:
     return os.path.join(os.path.expanduser("~"), ".seer", "queue")
 
 
+def get_queue_backend() -> str:
+    """Return the offline queue storage backend (``SEER_QUEUE_BACKEND``).
+
+    ``files`` (default) keeps one JSON file per envelope; ``log`` appends to
+    segment files (see ``seerpy.segment_log``); ``sqlite`` uses a WAL-mode
+    database with indexed metadata (see ``seerpy.sqlite_queue``). A ``Seer``
+    built with ``queue_backend=`` overrides this for its own queue writes.
+    """
+    backend = os.environ.get("SEER_QUEUE_BACKEND", "").strip().lower()
+    return backend if backend in QUEUE_BACKENDS else "files"
+
+
+def get_queue_durability() -> str:
+    """Return how queue writes are synced to disk (``SEER_QUEUE_DURABILITY``).
+
+    ``strict`` (default) fsyncs each envelope and its directory entry;
+    ``group`` shares those fsyncs between writes made at the same moment
+    (window ``SEER_QUEUE_GROUP_COMMIT_MS``, default 2); ``relaxed`` never
+    fsyncs. See ``seerpy.durability``.
+    """
+    mode = os.environ.get("SEER_QUEUE_DURABILITY", "").strip().lower()
+    return mode if mode in DURABILITY_MODES else "strict"
+
+
 def _env_int(name: str, default: int) -> int:
     raw = os.environ.get(name)
     if raw is None or raw == "":
@@ -52,6 +120,17 @@ def _env_int(name: str, default: int) -> int:
     return value if value > 0 else default
 
 
+def _env_float(name: str, default: float, minimum: float) -> float:
+    raw = os.environ.get(name, "").strip()
+    if not raw:
+        return default
+    try:
+        value = float(raw)
+    except ValueError:
+        return default
+    return max(minimum, value)
+
+
 def get_queue_limits() -> Tuple[int, int]:
     """Return (max_files, max_bytes) for the offline queue."""
     return (
@@ -71,62 +150,148 @@ class QueueStatus:
     max_files: int = 0
     max_bytes: int = 0
     queue_dir: str = ""
+    backend: str = ""
 
 
-def queue_status(queue_dir: Optional[str] = None) -> QueueStatus:
-    """Inspect pending, in-flight (.sending), and dead-letter envelopes."""
+def queue_status(
+    queue_dir: Optional[str] = None,
+    *,
+    backend: Optional[str] = None,
+) -> QueueStatus:
+    """Inspect pending, in-flight (claimed), and dead-letter envelopes."""
     path = _ensure_queue_dir(queue_dir)
     max_files, max_bytes = get_queue_limits()
-    status = QueueStatus(max_files=max_files, max_bytes=max_bytes, queue_dir=path)
-
-    pending = _list_queue_files(path)
-    status.pending = len(pending)
-    if pending:
-        status.oldest_pending = pending[0]
-    for name in pending:
-        status.pending_bytes += os.path.getsize(os.path.join(path, name))
-
-    for name in os.listdir(path):
-        if name.endswith(".json.sending"):
-            status.sending += 1
-
-    dead_dir = os.path.join(path, "dead")
-    if os.path.isdir(dead_dir):
-        for name in os.listdir(dead_dir):
-            if name.endswith(".json"):
-                status.dead += 1
-                status.dead_bytes += os.path.getsize(os.path.join(dead_dir, name))
+    store = _queue_storage(path, backend)
+    status = QueueStatus(
+        max_files=max_files,
+        max_bytes=max_bytes,
+        queue_dir=path,
+        backend=store.backend,
+    )
+    status.pending, status.sending, status.pending_bytes, status.oldest_pending = store.stats()
+    status.dead, status.dead_bytes = store.dead_stats()
     return status
 
 
-def list_dead_letters(queue_dir: Optional[str] = None) -> List[Dict[str, Any]]:
-    """Return summaries of dead-letter envelopes."""
+def _created_cutoff(age_seconds: Optional[float]) -> Optional[str]:
+    if age_seconds is None:
+        return None
+    return (datetime.now(timezone.utc) - timedelta(seconds=age_seconds)).isoformat()
+
+
+def iter_pending(
+    queue_dir: Optional[str] = None,
+    *,
+    backend: Optional[str] = None,
+    job_name: Optional[str] = None,
+    endpoint: Optional[str] = None,
+    older_than: Optional[float] = None,
+    newer_than: Optional[float] = None,
+    after: Optional[str] = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+) -> Iterator[QueueItem]:
+    """Yield metadata of pending envelopes, oldest first, a page at a time.
+
+    ``older_than``/``newer_than`` are ages in seconds. Only one page is held
+    at once; pass a yielded item's ``order`` as ``after`` to resume later.
+    """
+    store = _queue_storage(_ensure_queue_dir(queue_dir), backend)
+    filters = {
+        "job_name": job_name,
+        "endpoint": endpoint,
+        "created_before": _created_cutoff(older_than),
+        "created_after": _created_cutoff(newer_than),
+    }
+    while True:
+        items = store.pending_page(after=after, limit=page_size, **filters)
+        yield from items
+        if len(items) < page_size:
+            return
+        after = items[-1].order
+
+
+def iter_dead(
+    queue_dir: Optional[str] = None,
+    *,
+    backend: Optional[str] = None,
+    job_name: Optional[str] = None,
+    endpoint: Optional[str] = None,
+    older_than: Optional[float] = None,
+    newer_than: Optional[float] = None,
+    after: Optional[str] = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+) -> Iterator[Dict[str, Any]]:
+    """Yield dead-letter summaries (as ``list_dead_letters``) a page at a time.
+
+    Filters match ``iter_pending``; pass a summary's ``file`` as ``after`` to
+    resume later.
+    """
+    store = _queue_storage(_ensure_queue_dir(queue_dir), backend)
+    filters = {
+        "job_name": job_name,
+        "endpoint": endpoint,
+        "created_before": _created_cutoff(older_than),
+        "created_after": _created_cutoff(newer_than),
+    }
+    while True:
+        entries = store.list_dead(after=after, limit=page_size, **filters)
+        yield from entries
+        if len(entries) < page_size:
+            return
+        after = entries[-1]["file"]
+
+
+def list_dead_letters(
+    queue_dir: Optional[str] = None,
+    *,
+    backend: Optional[str] = None,
+    job_name: Optional[str] = None,
+    endpoint: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Return summaries of dead-letter envelopes, optionally for one job/endpoint.
+
+    Served from the queue's metadata index; prefer ``iter_dead`` for large queues.
+    """
     path = _ensure_queue_dir(queue_dir)
-    dead_dir = os.path.join(path, "dead")
-    if not os.path.isdir(dead_dir):
-        return []
-    out: List[Dict[str, Any]] = []
-    for name in sorted(os.listdir(dead_dir)):
-        if not name.endswith(".json"):
-            continue
-        filepath = os.path.join(dead_dir, name)
-        try:
-            envelope = _load_envelope(filepath)
-            payload = envelope.get("payload") or {}
-            out.append(
-                {
-                    "file": name,
-                    "path": filepath,
-                    "endpoint": envelope.get("endpoint"),
-                    "job_name": payload.get("job_name"),
-                    "status": payload.get("status"),
-                    "attempts": envelope.get("attempts", 0),
-                    "created_at": envelope.get("created_at"),
-                }
-            )
-        except Exception as exc:
-            out.append({"file": name, "path": filepath, "error": str(exc)})
-    return out
+    return _queue_storage(path, backend).list_dead(job_name=job_name, endpoint=endpoint)
+
+
+@dataclass
+class JobBacklog:
+    job_name: Optional[str] = None
+    pending: int = 0
+    pending_bytes: int = 0
+    sending: int = 0
+    dead: int = 0
+    dead_bytes: int = 0
+    oldest_created_at: Optional[str] = None
+
+
+def backlog_summary(
+    queue_dir: Optional[str] = None,
+    *,
+    backend: Optional[str] = None,
+) -> List[JobBacklog]:
+    """Group queued and dead-letter counts and bytes by job, largest backlog first.
+
+    ``oldest_created_at`` is that of the oldest envelope still queued (not
+    dead). Envelopes that could not be read are grouped under ``job_name=None``.
+    """
+    store = _queue_storage(_ensure_queue_dir(queue_dir), backend)
+    jobs: Dict[Optional[str], JobBacklog] = {}
+    for job_name, state, count, size, oldest in store.backlog():
+        job = jobs.setdefault(job_name, JobBacklog(job_name=job_name))
+        if state == "dead":
+            job.dead, job.dead_bytes = job.dead + count, job.dead_bytes + size
+        elif state == "sending":
+            job.sending += count
+        else:
+            job.pending, job.pending_bytes = job.pending + count, job.pending_bytes + size
+        if state != "dead" and oldest and (
+            job.oldest_created_at is None or oldest < job.oldest_created_at
+        ):
+            job.oldest_created_at = oldest
+    return sorted(jobs.values(), key=lambda job: (-job.pending, -job.dead, job.job_name or ""))
 
 
 def retry_dead(
@@ -138,45 +303,18 @@ def retry_dead(
     all_dead: bool = False,
     flush: bool = True,
     max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    backend: Optional[str] = None,
 ) -> Dict[str, Any]:
     """Move dead-letter envelopes back to pending (attempts=0), optionally flush.
 
-    Pass ``filename`` for one file, or ``all_dead=True`` for every dead letter.
+    Pass ``filename`` for one dead letter (the ``file`` field from
+    ``list_dead_letters``), or ``all_dead=True`` for every dead letter.
     """
     if not filename and not all_dead:
         raise ValueError("pass filename=... or all_dead=True")
     path = _ensure_queue_dir(queue_dir)
-    dead_dir = os.path.join(path, "dead")
-    restored = 0
-    errors: List[str] = []
-
-    targets: List[str] = []
-    if all_dead:
-        if os.path.isdir(dead_dir):
-            targets = [
-                os.path.join(dead_dir, n)
-                for n in sorted(os.listdir(dead_dir))
-                if n.endswith(".json")
-            ]
-    else:
-        assert filename is not None
-        candidate = filename
-        if not os.path.isabs(candidate):
-            candidate = os.path.join(dead_dir, os.path.basename(candidate))
-        targets = [candidate]
-
-    for dead_path in targets:
-        try:
-            envelope = _load_envelope(dead_path)
-            envelope["attempts"] = 0
-            if not envelope.get("idempotency_key"):
-                envelope["idempotency_key"] = str(uuid.uuid4())
-            dest = os.path.join(path, os.path.basename(dead_path))
-            _atomic_write_json(dest, envelope)
-            os.remove(dead_path)
-            restored += 1
-        except Exception as exc:
-            errors.append(f"{dead_path}: {exc}")
+    store = _queue_storage(path, backend)
+    restored, errors = store.revive_dead(None if all_dead else filename)
 
     result: Dict[str, Any] = {"restored": restored, "errors": errors, "replay": None}
     if flush and restored and api_key:
@@ -185,6 +323,7 @@ def retry_dead(
             base_url=base_url,
             queue_dir=path,
             max_attempts=max_attempts,
+            backend=store.backend,
         )
     return result
 
@@ -196,43 +335,8 @@ def _ensure_queue_dir(queue_dir: Optional[str] = None) -> str:
     return path
 
 
-def _utc_now_iso() -> str:
-    return datetime.now(timezone.utc).isoformat()
-
-
-def _atomic_write_json(filepath: str, data: Dict[str, Any]) -> None:
-    """Write JSON via temp file + os.replace so readers never see partial files."""
-    directory = os.path.dirname(filepath)
-    os.makedirs(directory, exist_ok=True)
-    tmp_path = f"{filepath}.{uuid.uuid4().hex}.tmp"
-    try:
-        with open(tmp_path, "w", encoding="utf-8") as handle:
-            json.dump(data, handle, indent=2)
-            handle.flush()
-            os.fsync(handle.fileno())
-        os.replace(tmp_path, filepath)
-    finally:
-        if os.path.exists(tmp_path):
-            try:
-                os.remove(tmp_path)
-            except OSError:
-                pass
-
-
-def _list_queue_files(path: str) -> List[str]:
-    """FIFO order: filenames include UTC timestamps so lexicographic sort is oldest-first."""
-    return sorted(
-        name
-        for name in os.listdir(path)
-        if name.endswith(".json") and not name.endswith(".sending")
-    )
-
-
-def _file_size(path: str) -> int:
-    try:
-        return os.path.getsize(path)
-    except OSError:
-        return 0
+def _queue_storage(path: str, backend: Optional[str] = None) -> QueueStorage:
+    return open_queue_storage(path, backend or get_queue_backend(), get_queue_durability())
 
 
 def enforce_queue_limits(
@@ -240,6 +344,7 @@ def enforce_queue_limits(
     *,
     max_files: Optional[int] = None,
     max_bytes: Optional[int] = None,
+    backend: Optional[str] = None,
 ) -> int:
     """Evict oldest envelopes until under file/byte caps. Returns number evicted."""
     path = _ensure_queue_dir(queue_dir)
@@ -247,29 +352,13 @@ def enforce_queue_limits(
     max_files = default_files if max_files is None else max_files
     max_bytes = default_bytes if max_bytes is None else max_bytes
 
-    lock = FileLock(os.path.join(path, ".queue.lock"), timeout=5)
-    evicted = 0
-    with lock:
-        while True:
-            files = _list_queue_files(path)
-            sizes = {name: _file_size(os.path.join(path, name)) for name in files}
-            total_bytes = sum(sizes.values())
-            if len(files) <= max_files and total_bytes <= max_bytes:
-                break
-            # Keep at least the newest envelope even if a single file exceeds max_bytes.
-            if len(files) <= 1:
-                break
-            oldest = files[0]
-            oldest_path = os.path.join(path, oldest)
-            try:
-                os.remove(oldest_path)
-                evicted += 1
-                print(
-                    f"Seer queue limit reached; evicted oldest envelope: {oldest}"
-                )
-            except OSError:
-                break
-    return evicted
+    store = _queue_storage(path, backend)
+    evicted = store.evict(max_files, max_bytes)
+    for key in evicted:
+        print(f"Seer queue limit reached; evicted oldest envelope: {key}")
+    if evicted:
+        store.compact()
+    return len(evicted)
 
 
 def save_failed_payload(
@@ -279,16 +368,13 @@ def save_failed_payload(
     queue_dir: Optional[str] = None,
     idempotency_key: Optional[str] = None,
     base_url: Optional[str] = None,
+    backend: Optional[str] = None,
 ) -> str:
-    """Persist a failed upload as a versioned envelope. Returns the file path."""
+    """Persist a failed upload as a versioned envelope. Returns where it was stored."""
     if endpoint not in ENDPOINT_PATHS:
         raise ValueError(f"Unknown endpoint: {endpoint}")
 
     path = _ensure_queue_dir(queue_dir)
-    stamp = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S%f")
-    # Timestamp first so lexicographic sort is true FIFO across endpoints.
-    filename = f"{stamp}_{endpoint}_{uuid.uuid4().hex[:8]}.json"
-    filepath = os.path.join(path, filename)
     envelope = {
         "version": ENVELOPE_VERSION,
         "endpoint": endpoint,
@@ -298,41 +384,36 @@ def save_failed_payload(
         "attempts": 0,
         "idempotency_key": idempotency_key or str(uuid.uuid4()),
     }
-    _atomic_write_json(filepath, envelope)
-    enforce_queue_limits(path)
-    print(f"Seer upload failed, queued at {filepath}")
+    store = _queue_storage(path, backend)
+    location = store.append(envelope)
+    enforce_queue_limits(path, backend=store.backend)
+    print(f"Seer upload failed, queued at {location}")
     print("Call seer.replay() or initialize with auto_replay=True to retrigger events.")
-    return filepath
+    _notify_enqueued(path)
+    return location
 
 
-def _load_envelope(filepath: str) -> Dict[str, Any]:
-    with open(filepath, "r", encoding="utf-8") as handle:
-        data = json.load(handle)
+def add_enqueue_listener(listener: Callable[[str], None]) -> None:
+    """Call ``listener(queue_dir)`` whenever this process queues an envelope."""
+    with _ENQUEUE_LOCK:
+        _ENQUEUE_LISTENERS.append(listener)
 
-    # Legacy: raw payload files without an envelope wrapper
-    if "payload" not in data or "endpoint" not in data:
-        basename = os.path.basename(filepath)
-        if "monitoring" in basename:
-            endpoint = "monitoring"
-        elif "heartbeat" in basename:
-            endpoint = "heartbeat"
-        else:
-            raise ValueError(f"Cannot infer endpoint for legacy file: {basename}")
-        return {
-            "version": 0,
-            "endpoint": endpoint,
-            "base_url": resolve_base_url(),
-            "payload": data,
-            "created_at": _utc_now_iso(),
-            "attempts": 0,
-            "idempotency_key": str(uuid.uuid4()),
-        }
-
-    if not data.get("idempotency_key"):
-        data["idempotency_key"] = str(uuid.uuid4())
-    if not data.get("base_url"):
-        data["base_url"] = resolve_base_url()
-    return data
+
+def remove_enqueue_listener(listener: Callable[[str], None]) -> None:
+    with _ENQUEUE_LOCK:
+        if listener in _ENQUEUE_LISTENERS:
+            _ENQUEUE_LISTENERS.remove(listener)
+
+
+def _notify_enqueued(path: str) -> None:
+    with _ENQUEUE_LOCK:
+        listeners = list(_ENQUEUE_LISTENERS)
+    path = os.path.abspath(path)
+    for listener in listeners:
+        try:
+            listener(path)
+        except Exception as exc:
+            print(f"Seer enqueue listener error: {exc}")
 
 
 def _endpoint_url(base_url: str, endpoint: str) -> str:
@@ -342,84 +423,54 @@ def _endpoint_url(base_url: str, endpoint: str) -> str:
     return f"{base_url.rstrip('/')}{path}"
 
 
-def _post_envelope(url: str, payload: Dict[str, Any], headers: Dict[str, str]) -> Any:
-    return post_with_backoff(url, payload, headers)
-
-
-def _deliver_monitoring_payload(
+def _post_envelope(
     url: str,
     payload: Dict[str, Any],
+    headers: Dict[str, str],
     *,
-    api_key: str,
+    base_url: str,
+) -> Any:
+    return post_with_backoff(url, payload, headers, session=session_for(base_url))
+
+
+def _delivery_event(
+    endpoint: str,
+    payload: Dict[str, Any],
     idempotency_key: str,
 ) -> Dict[str, Any]:
-    """Deliver a monitoring payload, registering first when run_id is missing.
+    """Build the single request that delivers a queued envelope.
 
-    An empty run_id means Seer was unreachable at job start, so the offline
-    final was queued without a server-assigned id. Replay must register a run,
-    then post the terminal status/logs with that run_id.
+    Current clients mint the run_id before the job starts, so a queued final
+    already carries it. Envelopes from older clients have an empty run_id;
+    mint one here and let the server create the terminal run under it rather
+    than registering first. Monitoring finals use ``{key}:complete``.
     """
     body = dict(payload)
-    run_id = body.get("run_id") or ""
-
-    if not run_id:
-        register_payload = {
-            "job_name": body.get("job_name"),
-            "status": "running",
-            "run_id": "",
-            "start_time": body.get("start_time"),
-            "end_time": None,
-            "metadata": body.get("metadata"),
-            "error_details": None,
-            "tags": body.get("tags"),
-            "logs": None,
-        }
-        register_headers = {
-            "Authorization": api_key,
-            "Content-Type": "application/json",
-            "Idempotency-Key": f"{idempotency_key}:register",
-        }
-        response = _post_envelope(url, register_payload, register_headers)
-        registered = parse_json_response(response)
-        run_id = registered.get("run_id") or ""
-        if not run_id:
-            raise RuntimeError(
-                "Seer register succeeded but returned no run_id during offline replay"
-            )
-        body["run_id"] = run_id
-
-    complete_headers = {
-        "Authorization": api_key,
-        "Content-Type": "application/json",
-        "Idempotency-Key": f"{idempotency_key}:complete",
-    }
-    _post_envelope(url, body, complete_headers)
-    return body
+    key = idempotency_key
+    if endpoint == "monitoring":
+        if not body.get("run_id"):
+            body["run_id"] = new_run_id()
+        key = f"{idempotency_key}:complete"
+    return {"endpoint": endpoint, "idempotency_key": key, "payload": body}
 
 
 def _deliver_envelope(
     endpoint: str,
-    url: str,
+    base_url: str,
     payload: Dict[str, Any],
     *,
     api_key: str,
     idempotency_key: str,
-) -> Optional[Dict[str, Any]]:
-    if endpoint == "monitoring":
-        return _deliver_monitoring_payload(
-            url,
-            payload,
-            api_key=api_key,
-            idempotency_key=idempotency_key,
-        )
-
+) -> Dict[str, Any]:
+    event = _delivery_event(endpoint, payload, idempotency_key)
+    url = _endpoint_url(base_url, endpoint)
     headers = {
         "Authorization": api_key,
         "Content-Type": "application/json",
-        "Idempotency-Key": idempotency_key,
+        "Idempotency-Key": event["idempotency_key"],
     }
-    _post_envelope(url, payload, headers)
-    return None
+    _post_envelope(url, event["payload"], headers, base_url=base_url)
+    return event["payload"]
 
 
 @dataclass
@@ -427,14 +478,432 @@ class ReplayResult:
     sent: int = 0
     failed: int = 0
     dead_lettered: int = 0
+    # Left queued, attempts unchanged: the host's circuit is open or it is backing off.
+    deferred: int = 0
     skipped: bool = False
     errors: Optional[List[str]] = None
+    wall_time: float = 0.0
+    throughput: float = 0.0
 
     def __post_init__(self) -> None:
         if self.errors is None:
             self.errors = []
 
 
+def get_replay_batch_size() -> int:
+    """Envelopes per ``/batch`` request during replay (``SEER_REPLAY_BATCH_SIZE``).
+
+    1 (the default) sends one request per envelope.
+    """
+    return _env_int("SEER_REPLAY_BATCH_SIZE", DEFAULT_REPLAY_BATCH_SIZE)
+
+
+def get_replay_concurrency() -> int:
+    """Return the per-host replay worker limit (``SEER_REPLAY_CONCURRENCY``)."""
+    return _env_int("SEER_REPLAY_CONCURRENCY", DEFAULT_REPLAY_CONCURRENCY)
+
+
+def _replay_lanes(
+    items: List[QueueItem],
+    fallback_base: str,
+) -> Dict[str, List[List[QueueItem]]]:
+    """Group pending items into per-job FIFO lanes, keyed by target base_url.
+
+    Unreadable envelopes get a lane of their own so the claim/dead-letter path
+    still handles them.
+    """
+    lanes: Dict[Tuple[str, str], List[QueueItem]] = {}
+    for item in items:
+        if item.job_name is None:
+            key = (fallback_base, f"\0{item.key}")
+        else:
+            key = (item.base_url or fallback_base, item.job_name)
+        lanes.setdefault(key, []).append(item)
+
+    hosts: Dict[str, List[List[QueueItem]]] = {}
+    for (base, _job), lane in lanes.items():
+        hosts.setdefault(base, []).append(lane)
+    return hosts
+
+
+def _settle_failure(
+    store: QueueStorage,
+    item: QueueItem,
+    exc: BaseException,
+    *,
+    fallback_base: str,
+    max_attempts: int,
+) -> Tuple[str, str]:
+    """Bump attempts on a failed claim and requeue or dead-letter it."""
+    envelope = store.recover(item)
+    envelope["attempts"] = int(envelope.get("attempts", 0)) + 1
+    if not envelope.get("idempotency_key"):
+        envelope["idempotency_key"] = str(uuid.uuid4())
+    if not envelope.get("base_url"):
+        envelope["base_url"] = fallback_base
+    if envelope["attempts"] >= max_attempts:
+        store.bury(item, envelope)
+        msg = f"Moved to dead letter after {max_attempts} attempts: {item.key}"
+        print(msg)
+        return "dead", msg
+    store.requeue(item, envelope)
+    msg = f"Unable to send payload ({item.key}): {exc}"
+    print(msg)
+    return "failed", msg
+
+
+def _replay_file(
+    store: QueueStorage,
+    item: QueueItem,
+    *,
+    api_key: str,
+    fallback_base: str,
+    max_attempts: int,
+    backoff: Optional[ReplayBackoff] = None,
+) -> Tuple[str, Optional[str]]:
+    """Claim, send and settle one envelope. Returns ``(outcome, message)``.
+
+    Outcome is ``sent``, ``failed``, ``dead``, ``skipped`` (already claimed) or
+    ``deferred`` (the host's circuit opened or it is backing off; the envelope
+    is left as-is).
+    """
+    host = item.base_url or fallback_base
+    if backoff is not None and backoff.wait(host) > 0:
+        return "deferred", None
+    try:
+        envelope = store.claim(item)
+        if envelope is None:
+            # Another writer/replayer moved it; skip.
+            return "skipped", None
+        endpoint = envelope["endpoint"]
+        target_base = envelope.get("base_url") or fallback_base
+        idem_key = envelope.get("idempotency_key") or str(uuid.uuid4())
+        _deliver_envelope(
+            endpoint,
+            target_base,
+            envelope["payload"],
+            api_key=api_key,
+            idempotency_key=idem_key,
+        )
+        store.ack(item)
+        if backoff is not None:
+            backoff.record_success(target_base)
+        print(f"Successfully replayed {endpoint} event to SEER")
+        return "sent", None
+    except CircuitOpen:
+        store.release(item)
+        return "deferred", None
+    except Exception as exc:
+        if backoff is not None and is_host_failure(exc):
+            backoff.record_failure(host, exc)
+        return _settle_failure(
+            store,
+            item,
+            exc,
+            fallback_base=fallback_base,
+            max_attempts=max_attempts,
+        )
+
+
+def _replay_lane(
+    store: QueueStorage, lane: List[QueueItem], **kwargs: Any
+) -> List[Tuple[str, Optional[str]]]:
+    """Send one job's envelopes in order, stopping at the first failure.
+
+    Later envelopes of the same job stay pending (unclaimed, attempts unchanged)
+    so a retry never lands after a newer run of that job.
+    """
+    outcomes: List[Tuple[str, Optional[str]]] = []
+    for item in lane:
+        outcome = _replay_file(store, item, **kwargs)
+        outcomes.append(outcome)
+        if outcome[0] in ("failed", "dead", "deferred"):
+            break
+    return outcomes
+
+
+def _replay_batched(
+    store: QueueStorage,
+    lanes: List[List[QueueItem]],
+    *,
+    base_url: str,
+    batch_size: int,
+    api_key: str,
+    fallback_base: str,
+    max_attempts: int,
+    backoff: Optional[ReplayBackoff] = None,
+) -> List[Tuple[str, Optional[str]]]:
+    """Drain several lanes for one host through ``/batch``, one request per chunk.
+
+    Chunks follow FIFO order across the lanes. The server skips later events
+    of a job after one fails (424); those claims, and the rest of a failed
+    job's lane, are released untouched so the job keeps its order. Falls back
+    to one request per envelope when the host has no batch endpoint. Once the
+    host starts backing off, the remaining envelopes are left for a later pass.
+    """
+    settle_kwargs = {"fallback_base": fallback_base, "max_attempts": max_attempts}
+    lane_kwargs = dict(settle_kwargs, api_key=api_key, backoff=backoff)
+    headers = {"Authorization": api_key, "Content-Type": "application/json"}
+    order = sorted(
+        ((item, idx) for idx, lane in enumerate(lanes) for item in lane),
+        key=lambda pair: pair[0].order,
+    )
+    outcomes: List[Tuple[str, Optional[str]]] = []
+    blocked: Set[int] = set()
+    finished: Set[str] = set()
+    cursor = 0
+
+    while cursor < len(order):
+        if backoff is not None and backoff.wait(base_url) > 0:
+            outcomes.extend(
+                ("deferred", None)
+                for item, lane in order[cursor:]
+                if lane not in blocked and item.key not in finished
+            )
+            return outcomes
+        batch: List[Tuple[QueueItem, int, Dict[str, Any]]] = []
+        size = 0
+        while cursor < len(order) and len(batch) < batch_size:
+            item, lane = order[cursor]
+            if lane in blocked:
+                cursor += 1
+                continue
+            try:
+                envelope = store.claim(item)
+                if envelope is None:
+                    cursor += 1
+                    finished.add(item.key)
+                    outcomes.append(("skipped", None))
+                    continue
+                event = _delivery_event(
+                    envelope["endpoint"],
+                    envelope["payload"],
+                    envelope.get("idempotency_key") or str(uuid.uuid4()),
+                )
+            except Exception as exc:
+                cursor += 1
+                finished.add(item.key)
+                blocked.add(lane)
+                outcomes.append(_settle_failure(store, item, exc, **settle_kwargs))
+                continue
+            event_size = len(json.dumps(event)) + 1
+            if batch and size + event_size > DEFAULT_BATCH_MAX_BYTES:
+                store.release(item)
+                break
+            batch.append((item, lane, event))
+            size += event_size
+            cursor += 1
+
+        if not batch:
+            continue
+
+        try:
+            results = post_batch(
+                base_url,
+                [entry[2] for entry in batch],
+                headers,
+                session=session_for(base_url),
+            )
+        except BatchUnsupported:
+            for item, _lane, _event in batch:
+                store.release(item)
+            for idx, lane_items in enumerate(lanes):
+                if idx in blocked:
+                    continue
+                rest = [i for i in lane_items if i.key not in finished]
+                outcomes.extend(_replay_lane(store, rest, **lane_kwargs))
+            return outcomes
+        except CircuitOpen:
+            for item, _lane, _event in batch:
+                store.release(item)
+                outcomes.append(("deferred", None))
+            return outcomes
+        except Exception as exc:
+            if backoff is not None and is_host_failure(exc):
+                backoff.record_failure(base_url, exc)
+            # Whole request failed: charge one attempt per job, keep the rest pending.
+            for item, lane, _event in batch:
+                if lane in blocked:
+                    store.release(item)
+                    continue
+                blocked.add(lane)
+                finished.add(item.key)
+                outcomes.append(_settle_failure(store, item, exc, **settle_kwargs))
+            continue
+
+        if backoff is not None:
+            backoff.record_success(base_url)
+        for (item, lane, event), res in zip(batch, results):
+            if lane in blocked:
+                store.release(item)
+                continue
+            finished.add(item.key)
+            if res.ok:
+                store.ack(item)
+                outcomes.append(("sent", None))
+                print(f"Successfully replayed {event['endpoint']} event to SEER")
+                continue
+            blocked.add(lane)
+            error = RuntimeError(f"HTTP {res.status}: {res.body}")
+            outcomes.append(_settle_failure(store, item, error, **settle_kwargs))
+
+    return outcomes
+
+
+def get_replay_shards() -> int:
+    """Return the number of replay partitions (``SEER_REPLAY_SHARDS``).
+
+    1 (the default) replays the whole queue under one lock.
+    """
+    return _env_int("SEER_REPLAY_SHARDS", DEFAULT_REPLAY_SHARDS)
+
+
+def replay_shard(item: QueueItem, shards: int) -> int:
+    """The partition ``item`` replays in: a stable hash of its job name.
+
+    All envelopes of a job share a partition, so one lock keeps them in
+    order. Unreadable envelopes hash by their key.
+    """
+    if shards <= 1:
+        return 0
+    name = item.job_name if item.job_name is not None else item.key
+    return zlib.crc32(name.encode("utf-8")) % shards
+
+
+def _replay_lock_path(path: str, shard: int, shards: int) -> str:
+    if shards <= 1:
+        return os.path.join(path, ".replay.lock")
+    return os.path.join(path, f".replay.{shard}-of-{shards}.lock")
+
+
+def _flock(name: str, operation: int, deadline: float) -> Optional[int]:
+    """Open ``name`` and take ``operation`` on it, polling until ``deadline``."""
+    fd = os.open(name, os.O_RDWR | os.O_CREAT, 0o644)
+    while True:
+        try:
+            fcntl.flock(fd, operation | fcntl.LOCK_NB)
+            return fd
+        except OSError:
+            if time.monotonic() >= deadline:
+                os.close(fd)
+                return None
+            time.sleep(0.05)
+
+
+@contextmanager
+def _sharded_replay(path: str, shards: int, lock_timeout: float) -> Iterator[bool]:
+    """Admit a ``shards``-way replay of ``path``; yield False when it must skip.
+
+    A sharded replay holds ``.replay.lock`` shared, so an unsharded one (the
+    CLI, or ``shards=1``) that takes it exclusively never overlaps it, and
+    ``.replay.of-{shards}.lock`` shared. A newcomer checks under
+    ``.replay.shards.lock`` that no replay with another shard count holds its
+    file, since the two would split the queue differently. Without ``fcntl``
+    (Windows) sharded replays take ``.replay.lock`` exclusively instead.
+    An unsharded replay is always admitted; its partition lock is the gate.
+    """
+    if shards <= 1:
+        yield True
+        return
+    if fcntl is None:
+        lock = FileLock(_replay_lock_path(path, 0, 1))
+        try:
+            lock.acquire(timeout=lock_timeout)
+        except Timeout:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            lock.release()
+        return
+
+    deadline = time.monotonic() + lock_timeout
+    ours = os.path.join(path, f".replay.of-{shards}.lock")
+    held: List[int] = []
+    try:
+        try:
+            with FileLock(os.path.join(path, ".replay.shards.lock"), timeout=lock_timeout):
+                for name in [_replay_lock_path(path, 0, 1), ours]:
+                    fd = _flock(name, fcntl.LOCK_SH, deadline)
+                    if fd is None:
+                        break
+                    held.append(fd)
+                others = glob.glob(os.path.join(path, ".replay.of-*.lock"))
+                for name in others if len(held) == 2 else []:
+                    if name == ours:
+                        continue
+                    fd = _flock(name, fcntl.LOCK_EX, deadline)
+                    if fd is None:
+                        os.close(held.pop())
+                        break
+                    os.close(fd)
+        except Timeout:
+            pass
+        yield len(held) == 2
+    finally:
+        for fd in held:
+            os.close(fd)
+
+
+def _replay_items(
+    store: QueueStorage,
+    items: List[QueueItem],
+    result: ReplayResult,
+    *,
+    held: Set[str],
+    workers: int,
+    batch_limit: int,
+    lane_kwargs: Dict[str, Any],
+) -> None:
+    """Replay ``items`` into ``result``, leaving hosts in ``held`` for later."""
+    hosts = _replay_lanes(items, lane_kwargs["fallback_base"])
+    for host in held.intersection(hosts):
+        result.deferred += sum(len(lane) for lane in hosts.pop(host))
+    futures = []
+    pools = [
+        ThreadPoolExecutor(
+            max_workers=min(workers, len(lanes)),
+            thread_name_prefix="seer-replay",
+        )
+        for lanes in hosts.values()
+    ]
+    try:
+        for pool, (host, lanes) in zip(pools, hosts.items()):
+            if batch_limit > 1 and batch_supported(host):
+                # Each worker owns whole lanes so per-job order survives batching.
+                groups = [lanes[i::workers] for i in range(min(workers, len(lanes)))]
+                for group in groups:
+                    futures.append(
+                        pool.submit(
+                            _replay_batched,
+                            store,
+                            group,
+                            base_url=host,
+                            batch_size=batch_limit,
+                            **lane_kwargs,
+                        )
+                    )
+                continue
+            for lane in lanes:
+                futures.append(pool.submit(_replay_lane, store, lane, **lane_kwargs))
+        for future in futures:
+            for outcome, msg in future.result():
+                if outcome == "sent":
+                    result.sent += 1
+                elif outcome == "failed":
+                    result.failed += 1
+                elif outcome == "dead":
+                    result.dead_lettered += 1
+                elif outcome == "deferred":
+                    result.deferred += 1
+                if msg:
+                    result.errors.append(msg)
+    finally:
+        for pool in pools:
+            pool.shutdown(wait=True)
+
+
 def replay_failed_payloads(
     api_key: str,
     *,
@@ -442,107 +911,101 @@ def replay_failed_payloads(
     queue_dir: Optional[str] = None,
     max_attempts: int = DEFAULT_MAX_ATTEMPTS,
     lock_timeout: float = 0,
+    concurrency: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    backend: Optional[str] = None,
+    shards: Optional[int] = None,
 ) -> ReplayResult:
     """Replay queued envelopes under a directory lock.
 
-    Uses FileLock so only one process replays at a time. Individual files are
-    claimed via rename to ``*.sending`` before POST to avoid double-sends.
-    Each envelope's ``idempotency_key`` is sent as the ``Idempotency-Key`` header.
-    Replay targets ``envelope["base_url"]`` when present so queued events stay
-    pinned to the host they were originally intended for.
+    Uses FileLock so only one process replays a partition at a time. Each envelope is
+    claimed before POST (the file backend renames it to ``*.sending``) to avoid
+    double-sends. Each envelope's ``idempotency_key`` is sent as the
+    ``Idempotency-Key`` header. Replay targets ``envelope["base_url"]`` when
+    present so queued events stay pinned to the host they were originally
+    intended for.
+
+    With ``shards`` > 1 (default ``SEER_REPLAY_SHARDS``) the queue is split
+    into that many partitions by :func:`replay_shard`, each with its own
+    lock. A call drains every partition it can lock, starting at one picked
+    by its pid, so several processes replay at once; ``skipped`` is set only
+    when every partition was busy. A sharded replay never overlaps an unsharded
+    one (including the CLI's) or one with a different shard count; it skips
+    instead. Each partition's envelopes are read once its lock is held.
+
+    Envelopes are grouped into per-job lanes that drain in FIFO order; up to
+    ``concurrency`` lanes (default ``SEER_REPLAY_CONCURRENCY``) run at once
+    against each base_url. With ``batch_size`` > 1 (default
+    ``SEER_REPLAY_BATCH_SIZE``) each worker packs its lanes into ``/batch``
+    requests of up to that many envelopes. ``backend`` selects the queue
+    storage (default ``SEER_QUEUE_BACKEND``). Hosts whose circuit breaker is
+    open (and not healed by a ``/health`` probe) are left for a later replay
+    without charging their envelopes an attempt, as are hosts still backing
+    off after an earlier pass failed (see :class:`~seerpy.backoff.ReplayBackoff`).
     """
     result = ReplayResult()
     path = _ensure_queue_dir(queue_dir)
     fallback_base = resolve_base_url(base_url)
-    lock = FileLock(os.path.join(path, ".replay.lock"), timeout=lock_timeout)
-
-    try:
-        lock.acquire(timeout=lock_timeout)
-    except Timeout:
-        result.skipped = True
-        print("Seer queue replay already in progress; skipping.")
-        return result
-
-    try:
-        files = _list_queue_files(path)
+    workers = get_replay_concurrency() if concurrency is None else max(1, concurrency)
+    batch_limit = get_replay_batch_size() if batch_size is None else max(1, batch_size)
+    count = get_replay_shards() if shards is None else max(1, shards)
+    backoff = get_replay_backoff(path)
+    lane_kwargs = {
+        "api_key": api_key,
+        "fallback_base": fallback_base,
+        "max_attempts": max_attempts,
+        "backoff": backoff,
+    }
 
-        for filename in files:
-            filepath = os.path.join(path, filename)
-            claimed = f"{filepath}.sending"
+    started = time.perf_counter()
+    replayed = False
+    checked: Set[str] = set()
+    held: Set[str] = set()
+    first = os.getpid() % count
+    order = [(first + i) % count for i in range(count)]
+    with _sharded_replay(path, count, lock_timeout) as admitted:
+        for shard in order if admitted else []:
+            lock = FileLock(_replay_lock_path(path, shard, count), timeout=lock_timeout)
             try:
-                os.rename(filepath, claimed)
-            except OSError:
-                # Another writer/replayer moved it; skip.
+                lock.acquire(timeout=lock_timeout)
+            except Timeout:
                 continue
-
             try:
-                envelope = _load_envelope(claimed)
-                endpoint = envelope["endpoint"]
-                target_base = envelope.get("base_url") or fallback_base
-                envelope["base_url"] = target_base
-                url = _endpoint_url(target_base, endpoint)
-                idem_key = envelope.get("idempotency_key") or str(uuid.uuid4())
-                envelope["idempotency_key"] = idem_key
-                delivered = _deliver_envelope(
-                    endpoint,
-                    url,
-                    envelope["payload"],
-                    api_key=api_key,
-                    idempotency_key=idem_key,
+                replayed = True
+                store = _queue_storage(path, backend)
+                # Read under this partition's lock: a replay that held it earlier
+                # may have sent or dead-lettered what an earlier read saw.
+                items = [item for item in store.pending() if replay_shard(item, count) == shard]
+                breaker = get_circuit_breaker()
+                for host in set(_replay_lanes(items, fallback_base)) - checked:
+                    checked.add(host)
+                    if not breaker.allow(host):
+                        held.add(host)
+                        result.errors.append(f"Seer circuit for {host} is open; replay deferred")
+                        continue
+                    wait = backoff.wait(host)
+                    if wait > 0:
+                        held.add(host)
+                        result.errors.append(f"Seer host {host} is backing off for {wait:.0f}s")
+                _replay_items(
+                    store,
+                    items,
+                    result,
+                    held=held,
+                    workers=workers,
+                    batch_limit=batch_limit,
+                    lane_kwargs=lane_kwargs,
                 )
-                # Persist assigned run_id back onto the in-memory envelope for debugging;
-                # file is deleted on success anyway.
-                if isinstance(delivered, dict) and delivered.get("run_id"):
-                    envelope["payload"] = delivered
-                os.remove(claimed)
-                result.sent += 1
-                print(f"Successfully replayed {endpoint} event to SEER")
-            except Exception as exc:
-                envelope = _safe_load_for_retry(claimed)
-                envelope["attempts"] = int(envelope.get("attempts", 0)) + 1
-                if not envelope.get("idempotency_key"):
-                    envelope["idempotency_key"] = str(uuid.uuid4())
-                if not envelope.get("base_url"):
-                    envelope["base_url"] = fallback_base
-                if envelope["attempts"] >= max_attempts:
-                    dead_path = os.path.join(
-                        path, "dead", os.path.basename(filepath)
-                    )
-                    _atomic_write_json(dead_path, envelope)
-                    try:
-                        os.remove(claimed)
-                    except OSError:
-                        pass
-                    result.dead_lettered += 1
-                    msg = f"Moved to dead letter after {max_attempts} attempts: {filename}"
-                    result.errors.append(msg)
-                    print(msg)
-                else:
-                    _atomic_write_json(filepath, envelope)
-                    try:
-                        os.remove(claimed)
-                    except OSError:
-                        pass
-                    result.failed += 1
-                    msg = f"Unable to send payload ({filename}): {exc}"
-                    result.errors.append(msg)
-                    print(msg)
-    finally:
-        lock.release()
-
-    return result
+                store.compact()
+            finally:
+                lock.release()
 
+    if not replayed:
+        result.skipped = True
+        print("Seer queue replay already in progress; skipping.")
+        return result
 
-def _safe_load_for_retry(claimed_path: str) -> Dict[str, Any]:
-    try:
-        return _load_envelope(claimed_path)
-    except Exception:
-        return {
-            "version": ENVELOPE_VERSION,
-            "endpoint": "monitoring",
-            "base_url": resolve_base_url(),
-            "payload": {},
-            "created_at": _utc_now_iso(),
-            "attempts": 0,
-            "idempotency_key": str(uuid.uuid4()),
-        }
+    result.wall_time = time.perf_counter() - started
+    if result.wall_time > 0:
+        result.throughput = result.sent / result.wall_time
+    return result
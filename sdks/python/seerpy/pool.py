@@ -0,0 +1,148 @@
+"""Process-wide HTTP connection pools, one per Seer host.
+
+Live sends, heartbeats, batch flushes, health probes and queue replay all
+take their ``requests.Session`` from here, so they share kept-alive
+connections to a host instead of paying a TCP and TLS handshake each.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterator, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_KEEPALIVE = 60.0  # seconds a pooled connection may sit idle
+
+
+def get_pool_settings() -> Tuple[int, float]:
+    """Return (pool_size, keepalive) from ``SEER_HTTP_POOL_SIZE`` / ``SEER_HTTP_KEEPALIVE``.
+
+    ``pool_size`` is the connections kept per host. ``keepalive`` is how long
+    an idle connection is kept; ``0`` closes each connection after use.
+    """
+    from .payloads import _env_float  # payloads imports us
+
+    size = DEFAULT_POOL_SIZE
+    raw = os.environ.get("SEER_HTTP_POOL_SIZE", "").strip()
+    if raw:
+        try:
+            size = max(1, int(raw))
+        except ValueError:
+            pass
+    return size, _env_float("SEER_HTTP_KEEPALIVE", DEFAULT_KEEPALIVE, 0.0)
+
+
+@dataclass
+class PoolStats:
+    """Request and connection counts for one host since the process started."""
+
+    requests: int = 0
+    connections: int = 0
+
+    @property
+    def reused(self) -> int:
+        """Requests that went over an already-open connection."""
+        return max(0, self.requests - self.connections)
+
+
+class _Host:
+    def __init__(self, pool_size: int, keepalive: float) -> None:
+        self.session = requests.Session()
+        self.adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", self.adapter)
+        self.session.mount("https://", self.adapter)
+        if keepalive <= 0:
+            self.session.headers["Connection"] = "close"
+        self.retired = PoolStats()
+        self.last_used = time.monotonic()
+
+    def _pools(self) -> Iterator[object]:
+        pools = self.adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                yield pool
+
+    def stats(self) -> PoolStats:
+        live = PoolStats(self.retired.requests, self.retired.connections)
+        for pool in self._pools():
+            live.requests += getattr(pool, "num_requests", 0)
+            live.connections += getattr(pool, "num_connections", 0)
+        return live
+
+    def drop_idle(self) -> None:
+        """Close pooled connections, keeping their counts."""
+        self.retired = self.stats()
+        self.adapter.poolmanager.clear()
+
+
+class SessionPool:
+    """Hand out one shared ``requests.Session`` per base URL.
+
+    A host whose connections sat idle longer than ``keepalive`` has them
+    closed before the next use, rather than finding out mid-request that the
+    server or a load balancer already dropped them.
+    """
+
+    def __init__(self, pool_size: Optional[int] = None, keepalive: Optional[float] = None):
+        default_size, default_keepalive = get_pool_settings()
+        self.pool_size = default_size if pool_size is None else pool_size
+        self.keepalive = default_keepalive if keepalive is None else keepalive
+        self._hosts: Dict[str, _Host] = {}
+        self._lock = threading.Lock()
+
+    def session(self, base_url: str) -> requests.Session:
+        key = base_url.rstrip("/")
+        now = time.monotonic()
+        with self._lock:
+            host = self._hosts.get(key)
+            if host is None:
+                host = self._hosts[key] = _Host(self.pool_size, self.keepalive)
+            elif self.keepalive > 0 and now - host.last_used > self.keepalive:
+                host.drop_idle()
+            host.last_used = now
+            return host.session
+
+    def stats(self) -> Dict[str, PoolStats]:
+        with self._lock:
+            return {key: host.stats() for key, host in self._hosts.items()}
+
+    def close(self) -> None:
+        with self._lock:
+            hosts, self._hosts = self._hosts, {}
+        for host in hosts.values():
+            host.session.close()
+
+
+_POOL: Optional[SessionPool] = None
+_POOL_PID: Optional[int] = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_session_pool() -> SessionPool:
+    """Return the process-wide pool, creating it from the environment on first use.
+
+    A forked child gets a fresh pool rather than sockets shared with its parent.
+    """
+    global _POOL, _POOL_PID
+    with _POOL_LOCK:
+        if _POOL is None or _POOL_PID != os.getpid():
+            _POOL = SessionPool()
+            _POOL_PID = os.getpid()
+        return _POOL
+
+
+def session_for(base_url: str) -> requests.Session:
+    """The shared session for ``base_url``."""
+    return get_session_pool().session(base_url)
+
+
+def connection_stats() -> Dict[str, PoolStats]:
+    """Requests, new connections and reuses per base URL in this process."""
+    return get_session_pool().stats()
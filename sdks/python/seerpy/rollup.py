@@ -0,0 +1,203 @@
+"""Client-side rollups of high-rate jobs.
+
+``monitor(..., rollup=True)`` records each finished run here instead of
+sending a running/final pair. Every ``interval`` seconds one ``/rollup``
+event per job carries the window's run count, outcome totals and duration
+percentiles, so event volume follows the number of jobs rather than the
+number of executions.
+"""
+
+from __future__ import annotations
+
+import atexit
+import math
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from .http import lacks_capability, time_left
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .seer import Seer
+
+DEFAULT_ROLLUP_INTERVAL = 60.0
+DEFAULT_ROLLUP_SAMPLES = 2048  # durations kept per job and window for percentiles
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    """Nearest-rank ``q``-th percentile (0-100) of an ascending list; 0.0 when empty."""
+    if not ordered:
+        return 0.0
+    rank = max(1, math.ceil(len(ordered) * q / 100))
+    return ordered[min(len(ordered), rank) - 1]
+
+
+class _Window:
+    def __init__(self, tags: Optional[List[str]]) -> None:
+        self.start = datetime.now(timezone.utc).isoformat(sep=" ")
+        self.tags = tags
+        self.count = 0
+        self.outcomes = {"success": 0, "failed": 0, "cancelled": 0}
+        self.max_ms = 0.0
+        self.samples: List[float] = []
+
+    def add(self, status: str, duration_ms: float, max_samples: int, rng: random.Random) -> None:
+        self.count += 1
+        if status in self.outcomes:
+            self.outcomes[status] += 1
+        self.max_ms = max(self.max_ms, duration_ms)
+        # Reservoir sampling: a uniform sample of the window's durations in
+        # bounded memory, however many runs it sees.
+        if len(self.samples) < max_samples:
+            self.samples.append(duration_ms)
+        else:
+            slot = rng.randrange(self.count)
+            if slot < max_samples:
+                self.samples[slot] = duration_ms
+
+    def payload(self, job_name: str) -> Dict[str, Any]:
+        ordered = sorted(self.samples)
+        return {
+            "job_name": job_name,
+            "window_start": self.start,
+            "window_end": datetime.now(timezone.utc).isoformat(sep=" "),
+            "count": self.count,
+            "successes": self.outcomes["success"],
+            "failures": self.outcomes["failed"],
+            "cancelled": self.outcomes["cancelled"],
+            "duration_ms": {
+                "p50": percentile(ordered, 50),
+                "p95": percentile(ordered, 95),
+                "p99": percentile(ordered, 99),
+                "max": self.max_ms,
+            },
+            "tags": self.tags,
+        }
+
+
+class RunAggregator:
+    """Accumulate finished runs per job and ship one rollup per window.
+
+    ``record`` is an in-memory update under a lock. A daemon thread flushes
+    every ``interval`` seconds, and ``close`` flushes the last window. Counts
+    are exact; percentiles come from a uniform sample of at most
+    ``max_samples`` durations per job. A rollup that cannot be sent is queued
+    offline under the same idempotency key, so a replay is stored only once.
+    ``close`` also runs at exit, where it sends for at most ``timeout``
+    seconds and queues the rest.
+
+    The flusher first asks ``/health`` whether the server lists the
+    ``rollup`` capability. Once it is known not to, ``unsupported`` is set:
+    later runs are reported one by one and windows already collected are
+    dropped, since the server would refuse them.
+    """
+
+    def __init__(
+        self,
+        client: "Seer",
+        *,
+        interval: float = DEFAULT_ROLLUP_INTERVAL,
+        max_samples: int = DEFAULT_ROLLUP_SAMPLES,
+    ):
+        if interval <= 0:
+            raise ValueError("rollup_interval must be > 0")
+        self.client = client
+        self.interval = float(interval)
+        self.max_samples = max_samples
+        self.unsupported = False
+        self._windows: Dict[str, _Window] = {}
+        self._rng = random.Random()
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._loop,
+            name="seer-rollup",
+            daemon=True,
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    def record(
+        self,
+        job_name: str,
+        status: str,
+        duration: float,
+        tags: Optional[List[str]] = None,
+    ) -> None:
+        """Count one finished run of ``job_name`` that took ``duration`` seconds."""
+        with self._lock:
+            window = self._windows.get(job_name)
+            if window is None:
+                window = self._windows[job_name] = _Window(tags)
+            window.add(status, duration * 1000.0, self.max_samples, self._rng)
+
+    def flush(self, deadline: Optional[float] = None) -> int:
+        """Ship the current window of every job now. Returns how many were sent.
+
+        ``deadline`` bounds the whole flush, including the wait for one
+        already running; windows left when it runs out are queued.
+        """
+        ends = None if deadline is None else time.monotonic() + deadline
+        locked = self._send_lock.acquire(timeout=-1 if ends is None else max(0.0, deadline))
+        try:
+            with self._lock:
+                windows, self._windows = self._windows, {}
+            if windows and self._probe():
+                runs = sum(window.count for window in windows.values())
+                print(f"Seer server does not support rollups; dropped a window of {runs} runs")
+                return 0
+            sent = 0
+            for job_name, window in windows.items():
+                payload = window.payload(job_name)
+                key = str(uuid.uuid4())
+                batcher = self.client._batcher
+                if batcher is not None:
+                    batcher.add("rollup", payload, idempotency_key=key, queue_key=key)
+                    sent += 1
+                    continue
+                remaining = time_left(ends)
+                if not locked or (remaining is not None and remaining <= 0):
+                    self.client._queue(payload, "rollup", idempotency_key=key)
+                    continue
+                try:
+                    self.client._post("/rollup", payload, idempotency_key=key, deadline=remaining)
+                    sent += 1
+                except Exception as exc:
+                    self.client._queue(payload, "rollup", idempotency_key=key)
+                    print(f"Seer rollup for {job_name} failed; queued for replay: {exc}")
+            return sent
+        finally:
+            if locked:
+                self._send_lock.release()
+
+    def close(self, timeout: float = 2.0) -> None:
+        """Stop the flusher and ship the last window within ``timeout`` seconds."""
+        ends = time.monotonic() + timeout
+        self._stop.set()
+        thread = self._thread
+        if thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout=timeout)
+        self.flush(deadline=max(0.0, ends - time.monotonic()))
+
+    def _probe(self) -> bool:
+        """Check the server's capabilities; True once it is known to lack rollups."""
+        if not self.unsupported:
+            try:
+                self.unsupported = lacks_capability(
+                    self.client.base_url, "rollup", session=self.client._session
+                )
+            except Exception:
+                pass
+        return self.unsupported
+
+    def _loop(self) -> None:
+        self._probe()
+        while not self._stop.wait(timeout=self.interval):
+            try:
+                self.flush()
+            except Exception as exc:
+                print(f"Seer rollup flush error: {exc}")
@@ -0,0 +1,57 @@
+"""Sampling for high-frequency monitored jobs.
+
+A job that runs thousands of times a minute does not need a monitoring row
+for every success. A ``SamplingPolicy`` passed to ``Seer.monitor`` (or set as
+``SeerTask.seer_sampling``) decides, once a run has finished, whether it is
+reported at all. Runs it drops never touch the network or the offline queue.
+"""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from typing import Dict
+
+
+@dataclass
+class _JobState:
+    successes: int = 0
+    after_failure: bool = False
+
+
+class SamplingPolicy:
+    """Keep 1 in ``keep_every`` successful runs of each job.
+
+    Failed and cancelled runs are always kept unless ``keep_failures`` is
+    False, and the first success after one of them is always kept unless
+    ``keep_recovery`` is False, so the dashboard sees a job recover. Counting
+    is per job name, and the first success a policy sees is kept.
+    """
+
+    def __init__(
+        self,
+        keep_every: int = 1,
+        *,
+        keep_failures: bool = True,
+        keep_recovery: bool = True,
+    ) -> None:
+        if keep_every < 1:
+            raise ValueError("keep_every must be >= 1")
+        self.keep_every = keep_every
+        self.keep_failures = keep_failures
+        self.keep_recovery = keep_recovery
+        self._jobs: Dict[str, _JobState] = {}
+        self._lock = threading.Lock()
+
+    def keep(self, job_name: str, status: str) -> bool:
+        """Record a finished run and return whether to report it."""
+        with self._lock:
+            state = self._jobs.setdefault(job_name, _JobState())
+            if status != "success":
+                state.after_failure = True
+                return self.keep_failures
+            recovered = state.after_failure and self.keep_recovery
+            state.after_failure = False
+            # A kept recovery restarts the 1-in-N count.
+            state.successes = 1 if recovered else state.successes + 1
+            return recovered or (state.successes - 1) % self.keep_every == 0
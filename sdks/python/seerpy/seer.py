@@ -3,54 +3,50 @@
 from __future__ import annotations
 
 import atexit
-import logging
-import sys
 import threading
 import time
 import traceback
 import uuid
 from contextlib import contextmanager
 from datetime import datetime, timezone
-from io import StringIO
-from typing import Any, Dict, Iterator, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Union
 
 import requests
 
-from .http import parse_json_response, post_with_backoff, replay_startup_jitter_seconds
+from .backoff import ReplaySchedule
+from .batch import DEFAULT_BATCH_INTERVAL, EventBatcher
+from .capture import (  # noqa: F401 (StreamTee re-exported)
+    CAPTURE_MODES,
+    LogStreamer,
+    StreamTee,
+    _LogCapture,
+)
+from .heartbeat import DEFAULT_HEARTBEAT_INTERVAL, HeartbeatCoalescer
+from .http import (
+    DEFAULT_DEADLINE,
+    DeadlineExceeded,
+    post_with_backoff,
+    replay_startup_jitter_seconds,
+    server_capabilities,
+    server_log_limit,
+)
 from .payloads import (
+    QUEUE_BACKENDS,
     ReplayResult,
+    add_enqueue_listener,
+    get_queue_dir,
+    new_run_id,
+    remove_enqueue_listener,
     replay_failed_payloads,
     resolve_base_url,
     save_failed_payload,
 )
+from .pool import session_for
+from .rollup import DEFAULT_ROLLUP_INTERVAL, RunAggregator
+from .sampling import SamplingPolicy
 
 DEFAULT_REPLAY_INTERVAL = 60.0
-
-
-class StreamTee:
-    """Writes to both the original stream and a buffer (like StringIO)."""
-
-    def __init__(self, original, copy_to):
-        self.original = original
-        self.copy_to = copy_to
-
-    def write(self, message):
-        self.original.write(message)
-        self.copy_to.write(message)
-
-    def flush(self):
-        self.original.flush()
-        self.copy_to.flush()
-
-    def isatty(self):
-        return getattr(self.original, "isatty", lambda: False)()
-
-    def fileno(self):
-        return self.original.fileno()
-
-    @property
-    def encoding(self):
-        return getattr(self.original, "encoding", None)
+DEFAULT_REPLAY_MAX_INTERVAL = 600.0  # idle / failing ceiling for background replay
 
 
 class Seer:
@@ -62,23 +58,57 @@ class Seer:
         auto_replay: bool = False,
         background_replay: bool = False,
         replay_interval: float = DEFAULT_REPLAY_INTERVAL,
+        replay_max_interval: float = DEFAULT_REPLAY_MAX_INTERVAL,
         base_url: Optional[str] = None,
         timeout: float = 30,
+        batch_events: bool = False,
+        batch_interval: float = DEFAULT_BATCH_INTERVAL,
+        coalesce_heartbeats: bool = False,
+        heartbeat_interval: float = DEFAULT_HEARTBEAT_INTERVAL,
+        queue_backend: Optional[str] = None,
+        rollup_interval: float = DEFAULT_ROLLUP_INTERVAL,
+        connect_timeout: Optional[float] = None,
+        send_deadline: Optional[float] = DEFAULT_DEADLINE,
     ):
         key = api_key or apiKey
         if not key:
             raise ValueError("API key is required (api_key or apiKey)")
         if replay_interval <= 0:
             raise ValueError("replay_interval must be > 0")
+        if replay_max_interval < replay_interval:
+            raise ValueError("replay_max_interval must be >= replay_interval")
+        if rollup_interval <= 0:
+            raise ValueError("rollup_interval must be > 0")
+        if send_deadline is not None and send_deadline <= 0:
+            raise ValueError("send_deadline must be > 0")
+        if queue_backend is not None and queue_backend not in QUEUE_BACKENDS:
+            raise ValueError(f"queue_backend must be one of {', '.join(QUEUE_BACKENDS)}")
 
         self.api_key = key
         self.base_url = resolve_base_url(base_url)
+        # timeout is the read timeout of one attempt; send_deadline bounds a
+        # whole send, retries and backoff included (None: no bound).
         self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.send_deadline = send_deadline
         self.replay_interval = float(replay_interval)
-        self._session = requests.Session()
+        self.replay_max_interval = float(replay_max_interval)
+        # None defers to SEER_QUEUE_BACKEND at each queue operation.
+        self.queue_backend = queue_backend
         self._bg_stop = threading.Event()
         self._bg_thread: Optional[threading.Thread] = None
+        self._bg_wake = threading.Event()
         self._atexit_registered = False
+        self._batcher: Optional[EventBatcher] = None
+        if batch_events:
+            self._batcher = EventBatcher(self, flush_interval=batch_interval)
+        self._coalescer: Optional[HeartbeatCoalescer] = None
+        if coalesce_heartbeats:
+            self._coalescer = HeartbeatCoalescer(self, interval=heartbeat_interval)
+        # Started on the first monitor(..., rollup=True).
+        self.rollup_interval = float(rollup_interval)
+        self._rollups: Optional[RunAggregator] = None
+        self._rollups_lock = threading.Lock()
 
         if auto_replay:
             try:
@@ -92,6 +122,11 @@ class Seer:
         if background_replay:
             self.start_background_replay()
 
+    @property
+    def _session(self) -> requests.Session:
+        """The process-wide pooled session for this client's host."""
+        return session_for(self.base_url)
+
     def _headers(self, *, idempotency_key: Optional[str] = None) -> Dict[str, str]:
         headers = {
             "Authorization": self.api_key,
@@ -110,30 +145,122 @@ class Seer:
         payload: Dict[str, Any],
         *,
         idempotency_key: Optional[str] = None,
+        deadline: Optional[float] = None,
     ):
+        """POST to ``path`` within ``deadline`` seconds (default ``send_deadline``)."""
         key = idempotency_key or str(uuid.uuid4())
         return post_with_backoff(
             self._url(path),
             payload,
             self._headers(idempotency_key=key),
             timeout=self.timeout,
+            connect_timeout=self.connect_timeout,
+            deadline=self.send_deadline if deadline is None else deadline,
             session=self._session,
         )
 
-    def replay(self, *, max_attempts: int = 5) -> ReplayResult:
+    def _queue(
+        self,
+        payload: Dict[str, Any],
+        endpoint: str,
+        *,
+        idempotency_key: Optional[str] = None,
+    ) -> str:
+        """Write an offline envelope pinned to this client's host and queue backend."""
+        return save_failed_payload(
+            payload,
+            endpoint,
+            idempotency_key=idempotency_key,
+            base_url=self.base_url,
+            backend=self.queue_backend,
+        )
+
+    def _log_streamer(
+        self,
+        job_name: str,
+        run_id: str,
+        run_key: str,
+        start_time: str,
+    ) -> LogStreamer:
+        """Ship a run's output as running-progress chunks.
+
+        A chunk that fails is not queued: the streamer keeps it for the next
+        chunk or the final payload, so an outage queues one envelope per run.
+        """
+
+        def ship(chunk: str, offset: int) -> None:
+            payload = {
+                "job_name": job_name,
+                "status": "running",
+                "run_id": run_id,
+                "start_time": start_time,
+                "logs": chunk,
+                "logs_offset": offset,
+            }
+            self._post("/monitoring", payload, idempotency_key=f"{run_key}:logs:{offset}")
+
+        def supported() -> bool:
+            return "logs_offset" in server_capabilities(self.base_url, session=self._session)
+
+        return LogStreamer(
+            ship,
+            supported=supported,
+            max_offset=lambda: server_log_limit(self.base_url),
+            stop_timeout=self.timeout,
+        )
+
+    def _rollup_aggregator(self) -> RunAggregator:
+        with self._rollups_lock:
+            if self._rollups is None:
+                self._rollups = RunAggregator(self, interval=self.rollup_interval)
+            return self._rollups
+
+    def flush_events(self) -> None:
+        """Send pending rollups and events buffered by ``batch_events=True`` right away."""
+        if self._rollups is not None:
+            self._rollups.flush()
+        if self._batcher is not None:
+            self._batcher.flush()
+
+    def replay(
+        self,
+        *,
+        max_attempts: int = 5,
+        concurrency: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        shards: Optional[int] = None,
+    ) -> ReplayResult:
         """Flush the local offline queue to SEER."""
         return replay_failed_payloads(
             self.api_key,
             base_url=self.base_url,
             max_attempts=max_attempts,
+            concurrency=concurrency,
+            batch_size=batch_size,
+            backend=self.queue_backend,
+            shards=shards,
         )
 
+    def _wake_replay(self, queue_dir: str) -> None:
+        if queue_dir == get_queue_dir():
+            self._bg_wake.set()
+
     def start_background_replay(self) -> None:
-        """Start a daemon thread that periodically flushes the offline queue."""
+        """Start a daemon thread that flushes the offline queue.
+
+        Passes are paced by :class:`~seerpy.backoff.ReplaySchedule`: every
+        ``replay_interval`` while envelopes remain, backing off towards
+        ``replay_max_interval`` while the host fails, and idling at
+        ``replay_max_interval`` once the queue is drained. An envelope queued
+        by this process wakes the thread at once, unless the host is failing.
+        """
         if self._bg_thread is not None and self._bg_thread.is_alive():
             return
 
         self._bg_stop.clear()
+        self._bg_wake.clear()
+        add_enqueue_listener(self._wake_replay)
+        schedule = ReplaySchedule(self.replay_interval, self.replay_max_interval)
 
         def _loop() -> None:
             # Stampede guard before the first flush when many workers start together.
@@ -141,12 +268,21 @@ class Seer:
             if jitter > 0 and self._bg_stop.wait(timeout=jitter):
                 return
             while not self._bg_stop.is_set():
+                self._bg_wake.clear()
+                result: Optional[ReplayResult] = None
                 try:
-                    self.replay()
+                    result = self.replay()
                 except Exception as exc:
                     print(f"Seer background_replay error: {exc}")
-                if self._bg_stop.wait(timeout=self.replay_interval):
-                    break
+                until = time.monotonic() + schedule.next_delay(result)
+                while not self._bg_stop.is_set():
+                    remaining = until - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    if self._bg_wake.wait(timeout=remaining):
+                        if not schedule.failing:
+                            break
+                        self._bg_wake.clear()
 
         self._bg_thread = threading.Thread(
             target=_loop,
@@ -160,7 +296,9 @@ class Seer:
 
     def stop_background_replay(self, timeout: float = 2.0) -> None:
         """Stop the background flusher if it is running."""
+        remove_enqueue_listener(self._wake_replay)
         self._bg_stop.set()
+        self._bg_wake.set()
         thread = self._bg_thread
         if thread is not None and thread.is_alive() and thread is not threading.current_thread():
             thread.join(timeout=timeout)
@@ -173,114 +311,197 @@ class Seer:
         capture_logs: bool = False,
         metadata: Optional[dict] = None,
         tags: Optional[List[str]] = None,
+        stream_logs: bool = False,
+        capture_mode: str = "python",
+        capture_level: Union[int, str, None] = None,
+        sampling: Optional[SamplingPolicy] = None,
+        rollup: bool = False,
+        start_budget: Optional[float] = None,
+        finish_budget: Optional[float] = None,
     ) -> Iterator[None]:
-        start_time = datetime.now(timezone.utc).isoformat(sep=" ")
-        status = "success"
-        error = None
-        log_stream = None
-        log_contents = None
-        handler = None
-        run_id = None
-        original_stdout = None
-        logger = None
-        previous_level = None
-        user_failed = False
-
-        start_payload = {
-            "job_name": job_name,
-            "status": "running",
-            "run_id": "",
-            "start_time": start_time,
-            "end_time": None,
-            "metadata": metadata,
-            "error_details": None,
-            "tags": tags,
-            "logs": None,
-        }
+        """Report one run of ``job_name`` around the ``with`` block.
+
+        ``capture_logs`` tees stdout and logging into the final payload.
+        ``stream_logs`` also captures, but ships the output in chunks while
+        the job runs, so the final payload carries only the tail.
+        ``capture_mode="fd"`` captures fds 1 and 2 rather than ``sys.stdout``,
+        which adds stderr, native libraries and subprocesses.
+        ``capture_level`` (default ``SEER_CAPTURE_LEVEL`` or ``INFO``) is the
+        lowest logging level captured.
+        ``sampling`` decides after the run whether it is reported; a sampled
+        run sends no running stub, only its final result.
+        ``rollup`` sends nothing per run: the outcome and duration are added
+        to this job's next rollup (see ``rollup_interval``). Against a server
+        without the ``rollup`` capability each run's final is sent instead.
+        ``start_budget`` caps, in seconds, how long the running stub may take
+        to send (it goes out in the background either way), and
+        ``finish_budget`` how long leaving the block may take. An event that
+        misses its budget is queued for replay rather than retried inline.
+        """
+        run = self._open_run(
+            job_name,
+            metadata,
+            tags,
+            capture_logs=capture_logs,
+            stream_logs=stream_logs,
+            capture_mode=capture_mode,
+            sampling=sampling,
+            rollup=rollup,
+        )
 
-        try:
-            id_response = self._post("/monitoring", start_payload)
-            id_response_dict = parse_json_response(id_response)
-            run_id = id_response_dict.get("run_id")
-            print("✓ Connected to SEER monitoring")
-            print(f'✓ Pipeline "{job_name}" registered')
-        except Exception as exc:
-            # Do not queue the running stub; we persist the final outcome below.
-            print(exc)
-            print("Seer unavailable at start; will queue final result if needed.")
-
-        if capture_logs:
-            log_stream = StringIO()
-            original_stdout = sys.stdout
-            sys.stdout = StreamTee(sys.stdout, log_stream)
-
-            handler = logging.StreamHandler(log_stream)
-            logger = logging.getLogger()
-            previous_level = logger.level
-            logger.setLevel(logging.DEBUG)
-            logger.addHandler(handler)
-            if run_id:
-                print("✓ Capturing Logs")
+        # Job start never waits on the network: the run_id is already known,
+        # so the running stub is batched or registered from a daemon thread.
+        start_errors: List[Exception] = []
+        start_thread: Optional[threading.Thread] = None
+
+        def _register() -> None:
+            try:
+                self._post(
+                    "/monitoring",
+                    run.start_payload(),
+                    idempotency_key=f"{run.run_key}:register",
+                    deadline=start_budget,
+                )
+            except Exception as exc:
+                start_errors.append(exc)
+
+        if not self._batch_start(run):
+            start_thread = threading.Thread(
+                target=_register,
+                name="seer-monitor-start",
+                daemon=True,
+            )
+            start_thread.start()
+        self._start_capture(run, capture_logs, stream_logs, capture_mode, capture_level)
 
         try:
-            if run_id:
-                print("→ Monitoring active.")
+            print("→ Monitoring active.")
             print("Starting Code...")
             yield
         except Exception:
-            status = "failed"
-            error = traceback.format_exc()
-            user_failed = True
+            run.fail("failed", traceback.format_exc())
             raise
         finally:
-            if capture_logs and original_stdout is not None:
-                sys.stdout = original_stdout
-            if capture_logs and handler is not None and logger is not None:
-                handler.flush()
-                logger.removeHandler(handler)
-                handler.close()
-                if previous_level is not None:
-                    logger.setLevel(previous_level)
-                if log_stream is not None:
-                    log_contents = log_stream.getvalue()
-
-            end_time = datetime.now(timezone.utc).isoformat(sep=" ")
-            final_payload = {
-                "job_name": job_name,
-                "status": status,
-                "run_id": run_id or "",
-                "start_time": start_time,
-                "end_time": end_time,
-                "metadata": metadata,
-                "error_details": error,
-                "tags": tags,
-                "logs": log_contents,
-            }
+            finish_by = None if finish_budget is None else time.monotonic() + finish_budget
+            log_contents = run.capture.stop() if run.capture is not None else None
+            final_payload = run.final_payload(log_contents)
+
+            # Keep start-before-final ordering when the register is still in flight.
+            if start_thread is not None:
+                if finish_by is None:
+                    start_thread.join(timeout=self.timeout)
+                else:
+                    start_thread.join(timeout=max(0.0, finish_by - time.monotonic()))
+                    if start_thread.is_alive():
+                        start_errors.append(_start_overrun())
+
+            self._finish_run(
+                run, final_payload, start_errors[0] if start_errors else None, finish_by
+            )
 
-            if run_id:
-                idem_key = str(uuid.uuid4())
-                try:
-                    self._post("/monitoring", final_payload, idempotency_key=idem_key)
-                    print("✓ Monitoring complete.")
-                except Exception as exc:
-                    save_failed_payload(
-                        final_payload,
-                        "monitoring",
-                        idempotency_key=idem_key,
-                        base_url=self.base_url,
-                    )
-                    # Never raise from finally — that would mask a user exception
-                    # and should not fail the job because monitoring is down.
-                    if not user_failed:
-                        print(f"Seer completion upload failed; queued for replay: {exc}")
-            else:
-                save_failed_payload(
-                    final_payload,
-                    "monitoring",
-                    idempotency_key=str(uuid.uuid4()),
-                    base_url=self.base_url,
-                )
-                print("Seer unable to start; final result queued for replay.")
+    def _finish_run(
+        self,
+        run: "_MonitoredRun",
+        final_payload: Dict[str, Any],
+        start_error: Optional[BaseException],
+        finish_by: Optional[float],
+    ) -> None:
+        """Post a finished run's final event, or queue it when that fails.
+
+        A failed start does not stop the live post: the run_id was minted
+        here, so the final alone records the run.
+        """
+        if not self._settle_run(run, final_payload):
+            return  # Rolled up, not sampled, or buffered with the start event.
+        if start_error is not None:
+            print(start_error)
+        try:
+            if finish_by is not None and time.monotonic() >= finish_by:
+                raise _finish_overrun()  # and the start may still be in flight
+            self._post(
+                "/monitoring",
+                final_payload,
+                idempotency_key=f"{run.run_key}:complete",
+                deadline=None if finish_by is None else finish_by - time.monotonic(),
+            )
+            print("✓ Monitoring complete.")
+        except Exception as exc:
+            self._queue(final_payload, "monitoring", idempotency_key=run.run_key)
+            _report_final_failure(run, exc, start_error)
+
+    # -- helpers shared by monitor() and AsyncSeer.amonitor() -----------------
+
+    def _open_run(
+        self,
+        job_name: str,
+        metadata: Optional[dict],
+        tags: Optional[List[str]],
+        *,
+        capture_logs: bool,
+        stream_logs: bool,
+        capture_mode: str,
+        sampling: Optional[SamplingPolicy],
+        rollup: bool,
+    ) -> "_MonitoredRun":
+        """Validate ``monitor`` options and start tracking one run."""
+        if capture_mode not in CAPTURE_MODES:
+            raise ValueError(f"capture_mode must be one of {', '.join(CAPTURE_MODES)}")
+        if sampling is not None and stream_logs:
+            raise ValueError("stream_logs cannot be combined with sampling")
+        if rollup and (capture_logs or stream_logs or sampling is not None):
+            raise ValueError("rollup cannot be combined with capture_logs, stream_logs or sampling")
+        return _MonitoredRun(job_name, metadata, tags, sampling=sampling, rollup=rollup)
+
+    def _batch_start(self, run: "_MonitoredRun") -> bool:
+        """Buffer the running stub when batching; False when it must be posted."""
+        if run.sampling is not None or run.rollup:
+            return True  # Whether and how to report is only known at the end.
+        if self._batcher is None:
+            return False
+        self._batcher.add(
+            "monitoring",
+            run.start_payload(),
+            idempotency_key=f"{run.run_key}:register",
+        )
+        return True
+
+    def _start_capture(
+        self,
+        run: "_MonitoredRun",
+        capture_logs: bool,
+        stream_logs: bool,
+        capture_mode: str,
+        capture_level: Union[int, str, None],
+    ) -> None:
+        print(f'✓ Pipeline "{run.job_name}" run {run.run_id} starting')
+        if not (capture_logs or stream_logs):
+            return
+        if stream_logs:
+            run.streamer = self._log_streamer(
+                run.job_name, run.run_id, run.run_key, run.start_time
+            )
+        run.capture = _LogCapture(sink=run.streamer, mode=capture_mode, level=capture_level)
+        run.capture.start()
+        print("✓ Capturing Logs")
+
+    def _settle_run(self, run: "_MonitoredRun", final_payload: Dict[str, Any]) -> bool:
+        """Roll up, drop or buffer a finished run; True when its final must be posted."""
+        rollups = self._rollup_aggregator() if run.rollup else None
+        if rollups is not None and not rollups.unsupported:
+            rollups.record(run.job_name, run.status, time.monotonic() - run.started, run.tags)
+            return False
+        if run.sampling is not None and not run.sampling.keep(run.job_name, run.status):
+            return False  # Not sampled: nothing is sent or queued.
+        if self._batcher is not None:
+            # Same buffer as the start event, so ordering is preserved.
+            self._batcher.add(
+                "monitoring",
+                final_payload,
+                idempotency_key=f"{run.run_key}:complete",
+                queue_key=run.run_key,
+            )
+            return False
+        return True
 
     def heartbeat(
         self,
@@ -295,14 +516,99 @@ class Seer:
             "metadata": metadata,
             "tags": tags,
         }
+        if self._coalescer is not None:
+            self._coalescer.offer(job_name, payload)
+            return
         idem_key = str(uuid.uuid4())
+        if self._batcher is not None:
+            self._batcher.add(
+                "heartbeat",
+                payload,
+                idempotency_key=idem_key,
+                queue_key=idem_key,
+            )
+            return
         try:
             self._post("/heartbeat", payload, idempotency_key=idem_key)
             print("Heartbeat received")
         except Exception:
-            save_failed_payload(
-                payload,
-                "heartbeat",
-                idempotency_key=idem_key,
-                base_url=self.base_url,
-            )
+            self._queue(payload, "heartbeat", idempotency_key=idem_key)
+
+
+class _MonitoredRun:
+    """State of one run reported by ``monitor`` or ``amonitor``."""
+
+    def __init__(
+        self,
+        job_name: str,
+        metadata: Optional[dict],
+        tags: Optional[List[str]],
+        *,
+        sampling: Optional[SamplingPolicy],
+        rollup: bool,
+    ) -> None:
+        self.job_name = job_name
+        self.metadata = metadata
+        self.tags = tags
+        self.sampling = sampling
+        self.rollup = rollup
+        self.started = time.monotonic()
+        self.start_time = datetime.now(timezone.utc).isoformat(sep=" ")
+        self.run_id = new_run_id()
+        self.run_key = str(uuid.uuid4())
+        self.status = "success"
+        self.error: Optional[str] = None
+        self.user_failed = False
+        self.capture: Optional[_LogCapture] = None
+        self.streamer: Optional[LogStreamer] = None
+
+    def fail(self, status: str, error: Optional[str] = None) -> None:
+        self.status, self.error, self.user_failed = status, error, True
+
+    def start_payload(self) -> Dict[str, Any]:
+        return {
+            "job_name": self.job_name,
+            "status": "running",
+            "run_id": self.run_id,
+            "start_time": self.start_time,
+            "end_time": None,
+            "metadata": self.metadata,
+            "error_details": None,
+            "tags": self.tags,
+            "logs": None,
+        }
+
+    def final_payload(self, log_contents: Optional[str]) -> Dict[str, Any]:
+        payload = {
+            "job_name": self.job_name,
+            "status": self.status,
+            "run_id": self.run_id,
+            "start_time": self.start_time,
+            "end_time": datetime.now(timezone.utc).isoformat(sep=" "),
+            "metadata": self.metadata,
+            "error_details": self.error,
+            "tags": self.tags,
+            "logs": log_contents,
+        }
+        if self.streamer is not None and self.streamer.streaming:
+            payload["logs_offset"] = self.streamer.final_offset(log_contents or "")
+        return payload
+
+
+def _start_overrun() -> DeadlineExceeded:
+    return DeadlineExceeded("Seer start not sent within finish_budget")
+
+
+def _finish_overrun() -> DeadlineExceeded:
+    return DeadlineExceeded("Seer final not sent within finish_budget")
+
+
+def _report_final_failure(
+    run: _MonitoredRun, exc: BaseException, start_error: Optional[BaseException] = None
+) -> None:
+    # Never raise from finally — that would mask a user exception
+    # and should not fail the job because monitoring is down.
+    if start_error is not None:
+        print("Seer unable to start; final result queued for replay.")
+    elif not run.user_failed:
+        print(f"Seer completion upload failed; queued for replay: {exc}")
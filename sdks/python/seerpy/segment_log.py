@@ -0,0 +1,474 @@
+"""Segmented append-only log backend for the offline queue.
+
+Envelopes are appended as records to rolling segment files under
+``<queue_dir>/log/``. Each record is a 4-byte big-endian body length, a
+4-byte CRC32 of the body, then the body: one line of compact JSON metadata
+and, for ``put`` records, the envelope JSON after a newline. Settling an
+envelope never rewrites it; an ``ack`` record (or a ``put`` that ``replaces``
+it, for retries) is appended instead.
+
+Claims are records too. ``claim`` marks an envelope in flight until a lease
+expires, so every process sharing the log skips it in ``evict``, ``stats``
+and its own replays; ``release``, ``ack`` or a replacing ``put`` ends the
+claim. A replayer that dies mid-send leaves a claim that lapses after
+``claim_lease`` seconds, returning the envelope to pending. Claim and release
+records are not fsynced: losing one in a crash only ends the claim early.
+
+Every append is fsynced before it is acknowledged (batched with concurrent
+appends in ``group`` durability, skipped in ``relaxed``), and a torn or corrupt
+tail left by a crash is truncated on the next read, so an envelope is either
+fully on disk or absent, the same promise ``_atomic_write_json`` gives the
+file backend. ``log/offset.json`` records the consumer offset: the position
+of the oldest envelope still pending. Segments wholly before it only hold
+settled records and are deleted by ``compact``.
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import os
+import struct
+import time
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from .durability import Durability
+from .storage import (
+    QueueItem,
+    QueueStorage,
+    _atomic_write_json,
+    _encode_envelope,
+    _file_size,
+    _normalize_envelope,
+    _placeholder_envelope,
+)
+
+DEFAULT_SEGMENT_BYTES = 4 * 1024 * 1024
+DEFAULT_CLAIM_LEASE = 600.0  # seconds before an unsettled claim lapses
+SEGMENT_SUFFIX = ".seg"
+_HEADER = struct.Struct(">II")  # body length, crc32(body)
+
+# (segment number, byte offset of the record header)
+_Position = Tuple[int, int]
+
+
+@dataclass
+class _Record:
+    item: QueueItem
+    segment: int
+    offset: int
+
+
+def _key(position: _Position) -> str:
+    return f"{position[0]:010d}:{position[1]:012d}"
+
+
+def _encode(meta: Dict[str, Any], envelope: Optional[Dict[str, Any]] = None) -> bytes:
+    body = json.dumps(meta, separators=(",", ":")).encode("utf-8")
+    if envelope is not None:
+        body += b"\n" + _encode_envelope(envelope)
+    return _HEADER.pack(len(body), zlib.crc32(body)) + body
+
+
+class SegmentLogStorage(QueueStorage):
+    """Queue storage that appends to rolling, checksummed segment files.
+
+    The pending set is an in-memory index rebuilt from the consumer offset on
+    first use and then advanced incrementally, reading only bytes appended
+    since the last look (including other processes' appends). All log I/O
+    happens under ``.queue.lock``.
+    """
+
+    backend = "log"
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        segment_bytes: int = DEFAULT_SEGMENT_BYTES,
+        claim_lease: float = DEFAULT_CLAIM_LEASE,
+        durability: Optional[Durability] = None,
+    ):
+        super().__init__(path, durability=durability)
+        self.log_dir = os.path.join(path, "log")
+        os.makedirs(self.log_dir, exist_ok=True)
+        self.segment_bytes = segment_bytes
+        self.claim_lease = claim_lease
+        self._offset_path = os.path.join(self.log_dir, "offset.json")
+        self._live: Dict[str, _Record] = {}
+        # (order, key) of every put since the last rebuild; settled keys are
+        # dropped lazily when they reach the top.
+        self._heap: List[Tuple[str, str]] = []
+        # key -> wall-clock expiry of its claim, from claim records
+        self._claims: Dict[str, float] = {}
+        self._bytes = 0
+        self._cursor: Optional[_Position] = None
+
+    # -- QueueStorage -------------------------------------------------------
+
+    def append(self, envelope: Dict[str, Any], *, name: Optional[str] = None) -> str:
+        with self.durability.deferred(), self._locked():
+            segment, offset = self._write([(self._put_meta(envelope), envelope)])[0]
+        return f"{self._segment_path(segment)}#{offset}"
+
+    def pending(self) -> List[QueueItem]:
+        with self._locked():
+            return self._unclaimed()
+
+    def pending_page(
+        self,
+        *,
+        after: Optional[str] = None,
+        limit: int = -1,
+        job_name: Optional[str] = None,
+        endpoint: Optional[str] = None,
+        created_before: Optional[str] = None,
+        created_after: Optional[str] = None,
+    ) -> List[QueueItem]:
+        with self._locked():
+            items = self._unclaimed()
+        out: List[QueueItem] = []
+        for item in items:
+            if len(out) == limit:
+                break
+            if after is not None and item.order <= after:
+                continue
+            if job_name is not None and item.job_name != job_name:
+                continue
+            if endpoint is not None and item.endpoint != endpoint:
+                continue
+            if created_before is not None and item.created_at > created_before:
+                continue
+            if created_after is not None and item.created_at < created_after:
+                continue
+            out.append(item)
+        return out
+
+    def claim(self, item: QueueItem) -> Optional[Dict[str, Any]]:
+        with self._locked():
+            if item.key not in self._live or item.key in self._claimed():
+                return None
+            until = time.time() + self.claim_lease
+            self._write([({"op": "claim", "refs": [item.key], "until": until}, None)], sync=False)
+            record = self._live[item.key]
+        return _normalize_envelope(self._read_envelope(record), item.endpoint)
+
+    def recover(self, item: QueueItem) -> Dict[str, Any]:
+        with self._mutex:
+            record = self._live.get(item.key)
+        if record is not None:
+            try:
+                return _normalize_envelope(self._read_envelope(record), item.endpoint)
+            except Exception:
+                pass
+        return _placeholder_envelope()
+
+    def ack(self, item: QueueItem) -> None:
+        with self._locked():
+            if item.key in self._live:
+                self._write([({"op": "ack", "refs": [item.key]}, None)])
+
+    def release(self, item: QueueItem) -> None:
+        with self._locked():
+            if item.key in self._claims:
+                self._write([({"op": "release", "refs": [item.key]}, None)], sync=False)
+
+    def requeue(self, item: QueueItem, envelope: Dict[str, Any]) -> None:
+        meta = self._put_meta(envelope)
+        # Keep the original FIFO slot; the new record supersedes the old one.
+        meta["order"] = item.order
+        meta["replaces"] = [item.key]
+        with self._locked():
+            self._write([(meta, envelope)])
+
+    def bury(self, item: QueueItem, envelope: Dict[str, Any]) -> str:
+        endpoint = envelope.get("endpoint") or item.endpoint or "unknown"
+        dead_path = self._write_dead(f"{item.order.replace(':', '_')}_{endpoint}.json", envelope)
+        self.ack(item)
+        return dead_path
+
+    def evict(self, max_files: int, max_bytes: int) -> List[str]:
+        with self._locked():
+            # Running totals and the order heap keep an enqueue under the caps O(claims).
+            claimed = self._claimed()
+            count = len(self._live) - len(claimed)
+            total = self._bytes - sum(self._live[key].item.size for key in claimed)
+            evicted: List[Tuple[str, str]] = []
+            held: List[Tuple[str, str]] = []
+            while self._heap and count > 1 and (count > max_files or total > max_bytes):
+                entry = heapq.heappop(self._heap)
+                record = self._live.get(entry[1])
+                if record is None:
+                    continue
+                if entry[1] in claimed:
+                    held.append(entry)
+                    continue
+                evicted.append(entry)
+                count -= 1
+                total -= record.item.size
+            try:
+                if evicted:
+                    self._write([({"op": "ack", "refs": [key for _, key in evicted]}, None)])
+            except BaseException:
+                held += evicted
+                raise
+            finally:
+                for entry in held:
+                    heapq.heappush(self._heap, entry)
+        return [key for _, key in evicted]
+
+    def stats(self) -> Tuple[int, int, int, Optional[str]]:
+        with self._locked():
+            claimed = self._claimed()
+            sending = [self._live[k] for k in claimed]
+            return (
+                len(self._live) - len(sending),
+                len(sending),
+                self._bytes - sum(r.item.size for r in sending),
+                self._oldest_unclaimed(claimed),
+            )
+
+    def backlog(self) -> List[Tuple[Optional[str], str, int, int, Optional[str]]]:
+        groups: Dict[Tuple[str, str], List[Any]] = {}
+        with self._locked():
+            claimed = self._claimed()
+            for key, record in self._live.items():
+                item = record.item
+                state = "sending" if key in claimed else "pending"
+                group = groups.setdefault((item.job_name or "", state), [0, 0, None])
+                group[0] += 1
+                group[1] += item.size
+                if group[2] is None or item.created_at < group[2]:
+                    group[2] = item.created_at
+        rows = [(job, state, *group) for (job, state), group in groups.items()]
+        return rows + super().backlog()
+
+    def compact(self) -> None:
+        """Advance the consumer offset and delete segments that are wholly settled."""
+        with self._locked():
+            assert self._cursor is not None
+            low = min(((r.segment, r.offset) for r in self._live.values()), default=self._cursor)
+            offset = {"segment": low[0], "offset": low[1]}
+            _atomic_write_json(self._offset_path, offset, self.durability)
+            segments = self._segments()
+            for segment in segments[:-1]:
+                if segment >= low[0]:
+                    break
+                try:
+                    os.remove(self._segment_path(segment))
+                except OSError:
+                    pass
+
+    # -- log internals ------------------------------------------------------
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        with self._mutex, self.lock:
+            self._refresh()
+            yield
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.log_dir, f"{segment:010d}{SEGMENT_SUFFIX}")
+
+    def _segments(self) -> List[int]:
+        out = []
+        for name in os.listdir(self.log_dir):
+            if name.endswith(SEGMENT_SUFFIX):
+                try:
+                    out.append(int(name[: -len(SEGMENT_SUFFIX)]))
+                except ValueError:
+                    continue
+        return sorted(out)
+
+    def _consumer_offset(self) -> _Position:
+        try:
+            with open(self._offset_path, "r", encoding="utf-8") as handle:
+                data = json.load(handle)
+            return int(data["segment"]), int(data["offset"])
+        except Exception:
+            return 1, 0
+
+    def _claimed(self) -> Set[str]:
+        """Live keys whose claim has not lapsed. Caller holds the locks."""
+        now = time.time()
+        return {key for key, until in self._claims.items() if until > now}
+
+    def _oldest_unclaimed(self, claimed: Set[str]) -> Optional[str]:
+        """Key of the oldest unclaimed envelope. Caller holds the locks."""
+        if len(self._heap) > 2 * len(self._live) + 64:
+            self._heap = [(r.item.order, k) for k, r in self._live.items()]
+            heapq.heapify(self._heap)
+        held: List[Tuple[str, str]] = []
+        oldest = None
+        while self._heap:
+            key = self._heap[0][1]
+            if key not in self._live:
+                heapq.heappop(self._heap)
+            elif key in claimed:
+                # In flight, so there are only a few of these.
+                held.append(heapq.heappop(self._heap))
+            else:
+                oldest = key
+                break
+        for entry in held:
+            heapq.heappush(self._heap, entry)
+        return oldest
+
+    def _unclaimed(self) -> List[QueueItem]:
+        claimed = self._claimed()
+        return sorted(
+            (r.item for k, r in self._live.items() if k not in claimed),
+            key=lambda item: item.order,
+        )
+
+    @staticmethod
+    def _put_meta(envelope: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "op": "put",
+            "endpoint": envelope.get("endpoint"),
+            "job_name": (envelope.get("payload") or {}).get("job_name"),
+            "base_url": envelope.get("base_url"),
+            "attempts": envelope.get("attempts", 0),
+            "created_at": envelope.get("created_at"),
+        }
+
+    def _refresh(self) -> None:
+        """Apply records appended since the last refresh. Caller holds the locks."""
+        segments = self._segments()
+        if self._cursor is not None and segments and self._cursor[0] < segments[0]:
+            # Another process compacted past us: rebuild from its consumer offset.
+            self._live.clear()
+            self._claims.clear()
+            self._heap.clear()
+            self._bytes = 0
+            self._cursor = None
+        start = self._cursor or self._consumer_offset()
+        if not segments:
+            self._cursor = start
+            return
+        for segment in segments:
+            if segment < start[0]:
+                continue
+            begin = start[1] if segment == start[0] else 0
+            end = self._scan(segment, begin, last=segment == segments[-1])
+            self._cursor = (segment, end)
+
+    def _scan(self, segment: int, begin: int, *, last: bool) -> int:
+        path = self._segment_path(segment)
+        with open(path, "rb") as handle:
+            handle.seek(begin)
+            data = handle.read()
+        pos = 0
+        while pos + _HEADER.size <= len(data):
+            length, crc = _HEADER.unpack_from(data, pos)
+            body = data[pos + _HEADER.size : pos + _HEADER.size + length]
+            if len(body) < length or zlib.crc32(body) != crc:
+                break
+            self._apply((segment, begin + pos), body)
+            pos += _HEADER.size + length
+        end = begin + pos
+        if pos < len(data):
+            if last:
+                # Torn write from a crash: drop it so new records follow good ones.
+                with open(path, "r+b") as handle:
+                    handle.truncate(end)
+                    handle.flush()
+                    os.fsync(handle.fileno())
+                print(f"Seer queue log: truncated {len(data) - pos} torn bytes in {path}")
+            else:
+                print(f"Seer queue log: skipped {len(data) - pos} corrupt bytes in {path}")
+        return end
+
+    def _apply(self, position: _Position, body: bytes) -> None:
+        meta_raw, sep, envelope_raw = body.partition(b"\n")
+        try:
+            meta = json.loads(meta_raw)
+        except ValueError:
+            return
+        if meta.get("op") == "put":
+            for ref in meta.get("replaces") or ():
+                self._forget(ref)
+            key = _key(position)
+            item = QueueItem(
+                key=key,
+                order=meta.get("order") or key,
+                endpoint=str(meta.get("endpoint") or ""),
+                job_name=str(meta.get("job_name") or ""),
+                base_url=str(meta.get("base_url") or ""),
+                attempts=int(meta.get("attempts") or 0),
+                created_at=str(meta.get("created_at") or ""),
+                size=len(envelope_raw),
+            )
+            self._live[key] = _Record(item=item, segment=position[0], offset=position[1])
+            heapq.heappush(self._heap, (item.order, key))
+            self._bytes += item.size
+        elif meta.get("op") == "ack":
+            for ref in meta.get("refs") or ():
+                self._forget(ref)
+        elif meta.get("op") == "claim":
+            for ref in meta.get("refs") or ():
+                if ref in self._live:
+                    self._claims[ref] = float(meta.get("until") or 0)
+        elif meta.get("op") == "release":
+            for ref in meta.get("refs") or ():
+                self._claims.pop(ref, None)
+
+    def _forget(self, key: str) -> None:
+        self._claims.pop(key, None)
+        record = self._live.pop(key, None)
+        if record is not None:
+            self._bytes -= record.item.size
+
+    def _write(
+        self,
+        records: List[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]],
+        *,
+        sync: bool = True,
+    ) -> List[_Position]:
+        """Append records in one write, synced per ``self.durability`` unless ``sync=False``.
+
+        Caller holds the locks and has refreshed.
+        """
+        assert self._cursor is not None
+        segment = self._cursor[0]
+        path = self._segment_path(segment)
+        size = _file_size(path)
+        if size >= self.segment_bytes:
+            segment, size = segment + 1, 0
+            path = self._segment_path(segment)
+        new_segment = not os.path.exists(path)
+
+        encoded = [_encode(meta, envelope) for meta, envelope in records]
+        with open(path, "ab") as handle:
+            try:
+                handle.write(b"".join(encoded))
+                handle.flush()
+                token = self.durability.sync_data(handle.fileno()) if sync else None
+            except BaseException:
+                handle.truncate(size)
+                raise
+        if sync:
+            self.durability.sync_entry(token, self.log_dir if new_segment else None)
+
+        positions: List[_Position] = []
+        offset = size
+        for chunk in encoded:
+            positions.append((segment, offset))
+            self._apply((segment, offset), chunk[_HEADER.size :])
+            offset += len(chunk)
+        self._cursor = (segment, offset)
+        return positions
+
+    def _read_envelope(self, record: _Record) -> Dict[str, Any]:
+        with open(self._segment_path(record.segment), "rb") as handle:
+            handle.seek(record.offset)
+            header = handle.read(_HEADER.size)
+            length, crc = _HEADER.unpack(header)
+            body = handle.read(length)
+        if len(body) < length or zlib.crc32(body) != crc:
+            raise ValueError(f"corrupt queue record {record.item.key}")
+        _meta, _sep, envelope_raw = body.partition(b"\n")
+        return json.loads(envelope_raw)
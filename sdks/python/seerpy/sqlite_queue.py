@@ -0,0 +1,367 @@
+"""SQLite (WAL mode) backend for the offline queue.
+
+All envelopes, dead letters included, live in one ``envelopes`` table in
+``<queue_dir>/queue.sqlite3``. ``state`` is ``pending``, ``sending`` or
+``dead``; claims are a conditional ``UPDATE`` so two replayers can never
+take the same row. Status reads trigger-maintained totals;
+eviction, paging and dead-letter filtering are indexed queries over the
+metadata columns and never decode the stored envelopes.
+FIFO order is the rowid, which retries keep.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .durability import Durability
+from .manifest import filter_clause
+from .storage import (
+    QueueItem,
+    QueueStorage,
+    _encode_envelope,
+    _normalize_envelope,
+    _placeholder_envelope,
+)
+
+DB_FILENAME = "queue.sqlite3"
+# SQLite's own knob for what a durability mode asks of the file backends.
+SYNCHRONOUS = {"strict": "FULL", "group": "NORMAL", "relaxed": "OFF"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS envelopes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    state TEXT NOT NULL DEFAULT 'pending',
+    endpoint TEXT NOT NULL,
+    job_name TEXT NOT NULL DEFAULT '',
+    status TEXT,
+    base_url TEXT NOT NULL DEFAULT '',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL DEFAULT '',
+    size INTEGER NOT NULL DEFAULT 0,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_envelopes_state ON envelopes (state, id);
+CREATE INDEX IF NOT EXISTS ix_envelopes_job_name ON envelopes (job_name, state);
+CREATE INDEX IF NOT EXISTS ix_envelopes_endpoint ON envelopes (endpoint, state);
+CREATE INDEX IF NOT EXISTS ix_envelopes_attempts ON envelopes (attempts);
+CREATE INDEX IF NOT EXISTS ix_envelopes_created_at ON envelopes (created_at);
+"""
+
+# Per-state counts and bytes kept by triggers, so status is a point lookup.
+# Recounted once per open, which also seeds databases that predate it.
+_TOTALS_SCHEMA = """
+BEGIN IMMEDIATE;
+CREATE TABLE IF NOT EXISTS totals (
+    state TEXT PRIMARY KEY,
+    count INTEGER NOT NULL DEFAULT 0,
+    bytes INTEGER NOT NULL DEFAULT 0
+);
+INSERT OR IGNORE INTO totals (state) VALUES ('pending'), ('sending'), ('dead');
+UPDATE totals SET
+    count = (SELECT COUNT(*) FROM envelopes WHERE envelopes.state = totals.state),
+    bytes = (SELECT COALESCE(SUM(size), 0) FROM envelopes WHERE envelopes.state = totals.state);
+CREATE TRIGGER IF NOT EXISTS envelopes_insert AFTER INSERT ON envelopes BEGIN
+    UPDATE totals SET count = count + 1, bytes = bytes + NEW.size WHERE state = NEW.state;
+END;
+CREATE TRIGGER IF NOT EXISTS envelopes_delete AFTER DELETE ON envelopes BEGIN
+    UPDATE totals SET count = count - 1, bytes = bytes - OLD.size WHERE state = OLD.state;
+END;
+CREATE TRIGGER IF NOT EXISTS envelopes_update AFTER UPDATE OF state, size ON envelopes BEGIN
+    UPDATE totals SET count = count - 1, bytes = bytes - OLD.size WHERE state = OLD.state;
+    UPDATE totals SET count = count + 1, bytes = bytes + NEW.size WHERE state = NEW.state;
+END;
+COMMIT;
+"""
+
+
+def _encode(envelope: Dict[str, Any]) -> Tuple[str, int]:
+    body = _encode_envelope(envelope)
+    return body.decode("utf-8"), len(body)
+
+
+def _row_id(name: str) -> int:
+    """Accept ``42``, a ``list_dead`` path (``.../queue.sqlite3#42``) or its file field."""
+    return int(name.rsplit("#", 1)[-1])
+
+
+class SQLiteQueueStorage(QueueStorage):
+    """Queue storage in a WAL-mode SQLite database with indexed metadata.
+
+    In ``strict`` durability ``synchronous=FULL`` makes every committed write
+    durable, matching the fsyncs the file backend does per envelope.
+    ``group`` uses ``synchronous=NORMAL``: commits only append to the WAL
+    and are synced together at the next checkpoint, so a power loss can
+    drop the last few (never corrupt the database). ``relaxed`` turns
+    syncing off. One connection per instance (instances are per process)
+    is shared by threads under a lock.
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, path: str, *, durability: Optional[Durability] = None):
+        super().__init__(path, durability=durability)
+        self.db_path = os.path.join(path, DB_FILENAME)
+        self._mutex = threading.Lock()
+        self._conn = sqlite3.connect(
+            self.db_path,
+            timeout=30,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"PRAGMA synchronous={SYNCHRONOUS[self.durability.mode]}")
+        self._conn.executescript(_SCHEMA)
+        self._conn.executescript(_TOTALS_SCHEMA)
+
+    @contextmanager
+    def _tx(self) -> Iterator[sqlite3.Connection]:
+        with self._mutex:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _query(self, sql: str, args: Tuple[Any, ...] = ()) -> List[Tuple[Any, ...]]:
+        with self._mutex:
+            return self._conn.execute(sql, args).fetchall()
+
+    def _location(self, row_id: int) -> str:
+        return f"{self.db_path}#{row_id}"
+
+    # -- QueueStorage -------------------------------------------------------
+
+    def append(self, envelope: Dict[str, Any], *, name: Optional[str] = None) -> str:
+        body, size = _encode(envelope)
+        payload = envelope.get("payload") or {}
+        with self._tx() as conn:
+            cursor = conn.execute(
+                "INSERT INTO envelopes"
+                " (endpoint, job_name, status, base_url, attempts, created_at, size, body)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    str(envelope.get("endpoint") or ""),
+                    str(payload.get("job_name") or ""),
+                    payload.get("status"),
+                    str(envelope.get("base_url") or ""),
+                    int(envelope.get("attempts") or 0),
+                    str(envelope.get("created_at") or ""),
+                    size,
+                    body,
+                ),
+            )
+        return self._location(int(cursor.lastrowid))
+
+    def pending(self) -> List[QueueItem]:
+        return self.pending_page()
+
+    def pending_page(
+        self,
+        *,
+        after: Optional[str] = None,
+        limit: int = -1,
+        job_name: Optional[str] = None,
+        endpoint: Optional[str] = None,
+        created_before: Optional[str] = None,
+        created_after: Optional[str] = None,
+    ) -> List[QueueItem]:
+        clause, args = filter_clause(
+            job_name=job_name,
+            endpoint=endpoint,
+            created_before=created_before,
+            created_after=created_after,
+        )
+        if after is not None:
+            clause += " AND id > ?"
+            args.append(int(after))
+        rows = self._query(
+            "SELECT id, endpoint, job_name, base_url, attempts, created_at, size"
+            " FROM envelopes WHERE state = 'pending'" + clause + " ORDER BY id LIMIT ?",
+            tuple(args + [limit]),
+        )
+        return [
+            QueueItem(
+                key=str(row_id),
+                order=f"{row_id:020d}",
+                endpoint=endpoint,
+                job_name=job_name,
+                base_url=base_url,
+                attempts=attempts,
+                created_at=created_at,
+                size=size,
+            )
+            for row_id, endpoint, job_name, base_url, attempts, created_at, size in rows
+        ]
+
+    def claim(self, item: QueueItem) -> Optional[Dict[str, Any]]:
+        with self._tx() as conn:
+            claimed = conn.execute(
+                "UPDATE envelopes SET state = 'sending' WHERE id = ? AND state = 'pending'",
+                (int(item.key),),
+            ).rowcount
+            if not claimed:
+                return None
+            body, attempts = conn.execute(
+                "SELECT body, attempts FROM envelopes WHERE id = ?", (int(item.key),)
+            ).fetchone()
+        envelope = _normalize_envelope(json.loads(body), item.endpoint)
+        envelope["attempts"] = attempts
+        return envelope
+
+    def recover(self, item: QueueItem) -> Dict[str, Any]:
+        rows = self._query(
+            "SELECT body, attempts FROM envelopes WHERE id = ?", (int(item.key),)
+        )
+        if rows:
+            try:
+                envelope = _normalize_envelope(json.loads(rows[0][0]), item.endpoint)
+                envelope["attempts"] = rows[0][1]
+                return envelope
+            except Exception:
+                pass
+        return _placeholder_envelope()
+
+    def ack(self, item: QueueItem) -> None:
+        with self._tx() as conn:
+            conn.execute("DELETE FROM envelopes WHERE id = ?", (int(item.key),))
+
+    def release(self, item: QueueItem) -> None:
+        with self._tx() as conn:
+            conn.execute(
+                "UPDATE envelopes SET state = 'pending' WHERE id = ? AND state = 'sending'",
+                (int(item.key),),
+            )
+
+    def _settle(self, item: QueueItem, envelope: Dict[str, Any], state: str) -> None:
+        body, size = _encode(envelope)
+        with self._tx() as conn:
+            conn.execute(
+                "UPDATE envelopes SET state = ?, attempts = ?, base_url = ?, size = ?, body = ?"
+                " WHERE id = ?",
+                (
+                    state,
+                    int(envelope.get("attempts") or 0),
+                    str(envelope.get("base_url") or ""),
+                    size,
+                    body,
+                    int(item.key),
+                ),
+            )
+
+    def requeue(self, item: QueueItem, envelope: Dict[str, Any]) -> None:
+        self._settle(item, envelope, "pending")
+
+    def bury(self, item: QueueItem, envelope: Dict[str, Any]) -> str:
+        self._settle(item, envelope, "dead")
+        return self._location(int(item.key))
+
+    def evict(self, max_files: int, max_bytes: int) -> List[str]:
+        with self._tx() as conn:
+            count, total = conn.execute(
+                "SELECT count, bytes FROM totals WHERE state = 'pending'"
+            ).fetchone()
+            if count <= max_files and total <= max_bytes:
+                return []
+            evicted: List[int] = []
+            rows = conn.execute(
+                "SELECT id, size FROM envelopes WHERE state = 'pending' ORDER BY id"
+            )
+            for row_id, size in rows:
+                if count <= 1 or (count <= max_files and total <= max_bytes):
+                    break
+                evicted.append(row_id)
+                count -= 1
+                total -= size
+            conn.executemany(
+                "DELETE FROM envelopes WHERE id = ?", [(row_id,) for row_id in evicted]
+            )
+        return [str(row_id) for row_id in evicted]
+
+    def stats(self) -> Tuple[int, int, int, Optional[str]]:
+        totals = {
+            state: (count, size)
+            for state, count, size in self._query("SELECT state, count, bytes FROM totals")
+        }
+        oldest = self._query("SELECT MIN(id) FROM envelopes WHERE state = 'pending'")[0][0]
+        pending, pending_bytes = totals.get("pending", (0, 0))
+        return (
+            pending,
+            totals.get("sending", (0, 0))[0],
+            pending_bytes,
+            str(oldest) if oldest is not None else None,
+        )
+
+    def backlog(self) -> List[Tuple[Optional[str], str, int, int, Optional[str]]]:
+        return self._query(
+            "SELECT job_name, state, COUNT(*), COALESCE(SUM(size), 0), MIN(created_at)"
+            " FROM envelopes GROUP BY job_name, state"
+        )
+
+    def compact(self) -> None:
+        with self._mutex:
+            self._conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    # -- dead letters -------------------------------------------------------
+
+    def dead_stats(self) -> Tuple[int, int]:
+        count, size = self._query("SELECT count, bytes FROM totals WHERE state = 'dead'")[0]
+        return count, size
+
+    def list_dead(
+        self,
+        *,
+        job_name: Optional[str] = None,
+        endpoint: Optional[str] = None,
+        created_before: Optional[str] = None,
+        created_after: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: int = -1,
+    ) -> List[Dict[str, Any]]:
+        clause, args = filter_clause(
+            job_name=job_name,
+            endpoint=endpoint,
+            created_before=created_before,
+            created_after=created_after,
+        )
+        if after is not None:
+            clause += " AND id > ?"
+            args.append(_row_id(after))
+        rows = self._query(
+            "SELECT id, endpoint, job_name, status, attempts, created_at"
+            " FROM envelopes WHERE state = 'dead'" + clause + " ORDER BY id LIMIT ?",
+            tuple(args + [limit]),
+        )
+        return [
+            {
+                "file": str(row_id),
+                "path": self._location(row_id),
+                "endpoint": row_endpoint,
+                "job_name": row_job or None,
+                "status": status,
+                "attempts": attempts,
+                "created_at": created_at,
+            }
+            for row_id, row_endpoint, row_job, status, attempts, created_at in rows
+        ]
+
+    def revive_dead(self, name: Optional[str] = None) -> Tuple[int, List[str]]:
+        sql = "UPDATE envelopes SET state = 'pending', attempts = 0 WHERE state = 'dead'"
+        args: Tuple[Any, ...] = ()
+        if name is not None:
+            try:
+                args = (_row_id(name),)
+            except ValueError:
+                return 0, [f"{name}: not a dead-letter id"]
+            sql += " AND id = ?"
+        with self._tx() as conn:
+            restored = conn.execute(sql, args).rowcount
+        if name is not None and not restored:
+            return 0, [f"{name}: no such dead letter"]
+        return restored, []
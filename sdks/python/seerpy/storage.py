@@ -0,0 +1,738 @@
+"""Storage backends for the offline queue.
+
+``payloads`` owns the queue semantics (FIFO lanes, attempts, dead letters);
+a ``QueueStorage`` only knows how to keep envelopes durably and hand them
+back. ``FileQueueStorage`` is the original one-JSON-file-per-envelope layout,
+indexed by a ``QueueManifest`` (``seerpy.manifest``);
+``SegmentLogStorage`` (``seerpy.segment_log``) appends to rolling segment
+files and ``SQLiteQueueStorage`` (``seerpy.sqlite_queue``) keeps envelopes
+in an indexed SQLite table.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import os
+import threading
+import uuid
+import zlib
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from filelock import FileLock
+
+from .durability import Durability, get_durability
+from .manifest import QueueManifest
+
+ENVELOPE_VERSION = 4
+# v4 payloads whose compact JSON reaches this size are stored zlib-compressed.
+COMPRESS_MIN_BYTES = 512
+DEFAULT_BASE_URL = "https://api.ansrstudio.com/"
+QUEUE_BACKENDS = ("files", "log", "sqlite")
+
+
+def resolve_base_url(explicit: Optional[str] = None) -> str:
+    """Resolve API base URL: explicit arg > SEER_BASE_URL env > default."""
+    if explicit:
+        return explicit.rstrip("/")
+    env = os.environ.get("SEER_BASE_URL", "").strip()
+    if env:
+        return env.rstrip("/")
+    return DEFAULT_BASE_URL.rstrip("/")
+
+
+def _utc_now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _atomic_write_json(
+    filepath: str,
+    data: Dict[str, Any],
+    durability: Optional[Durability] = None,
+) -> None:
+    """Write JSON via temp file + os.replace so readers never see partial files.
+
+    ``durability`` decides the fsyncs (default strict: the file, then the
+    directory entry).
+    """
+    durability = durability or get_durability()
+    _publish(_write_temp(filepath, data, durability), filepath, durability)
+
+
+def _write_temp(
+    filepath: str,
+    data: Dict[str, Any],
+    durability: Durability,
+    tmp_dir: Optional[str] = None,
+) -> str:
+    """Write ``data`` to a synced temp file for ``filepath``; returns its path.
+
+    The temp file is private, so this can run before the queue locks are
+    taken. It goes in ``tmp_dir`` (same filesystem) or beside ``filepath``.
+    """
+    directory = tmp_dir or os.path.dirname(filepath)
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = os.path.join(directory, f"{os.path.basename(filepath)}.{uuid.uuid4().hex}.tmp")
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(data, handle, separators=(",", ":"))
+            handle.flush()
+            durability.sync_file(handle.fileno())
+    except BaseException:
+        _discard(tmp_path)
+        raise
+    return tmp_path
+
+
+def _publish(tmp_path: str, filepath: str, durability: Durability) -> None:
+    """Rename a synced temp file into place and make the rename durable."""
+    try:
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        _discard(tmp_path)
+        raise
+    durability.sync_entry(None, os.path.dirname(filepath))
+
+
+def _discard(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _pack_envelope(envelope: Dict[str, Any]) -> Dict[str, Any]:
+    """On-disk form of an envelope (v4): large payloads are zlib-compressed.
+
+    The payload's compact JSON is deflated and base64-encoded into
+    ``payload_zlib`` when that is smaller; the routing fields stay plain.
+    """
+    packed = dict(envelope)
+    packed["version"] = ENVELOPE_VERSION
+    raw = json.dumps(envelope.get("payload"), separators=(",", ":")).encode("utf-8")
+    if len(raw) >= COMPRESS_MIN_BYTES:
+        deflated = base64.b64encode(zlib.compress(raw, 6))
+        if len(deflated) < len(raw):
+            del packed["payload"]
+            packed["payload_zlib"] = deflated.decode("ascii")
+    return packed
+
+
+def _unpack_envelope(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Inverse of ``_pack_envelope``; v0-v3 envelopes come back unchanged."""
+    if "payload_zlib" not in data:
+        return data
+    unpacked = dict(data)
+    deflated = unpacked.pop("payload_zlib")
+    unpacked["payload"] = json.loads(zlib.decompress(base64.b64decode(deflated)))
+    return unpacked
+
+
+def _encode_envelope(envelope: Dict[str, Any]) -> bytes:
+    """Compact v4 bytes for backends that store envelopes as blobs."""
+    return json.dumps(_pack_envelope(envelope), separators=(",", ":")).encode("utf-8")
+
+
+def _normalize_envelope(data: Dict[str, Any], name: str) -> Dict[str, Any]:
+    """Fill in missing envelope fields; ``name`` hints the endpoint of legacy files."""
+    data = _unpack_envelope(data)
+    # Legacy: raw payload files without an envelope wrapper
+    if "payload" not in data or "endpoint" not in data:
+        basename = os.path.basename(name)
+        if "monitoring" in basename:
+            endpoint = "monitoring"
+        elif "heartbeat" in basename:
+            endpoint = "heartbeat"
+        else:
+            raise ValueError(f"Cannot infer endpoint for legacy file: {basename}")
+        return {
+            "version": 0,
+            "endpoint": endpoint,
+            "base_url": resolve_base_url(),
+            "payload": data,
+            "created_at": _utc_now_iso(),
+            "attempts": 0,
+            "idempotency_key": str(uuid.uuid4()),
+        }
+
+    if not data.get("idempotency_key"):
+        data["idempotency_key"] = str(uuid.uuid4())
+    if not data.get("base_url"):
+        data["base_url"] = resolve_base_url()
+    return data
+
+
+def _load_envelope(filepath: str) -> Dict[str, Any]:
+    with open(filepath, "r", encoding="utf-8") as handle:
+        data = json.load(handle)
+    return _normalize_envelope(data, filepath)
+
+
+def _placeholder_envelope() -> Dict[str, Any]:
+    """Stand-in for an envelope that can no longer be read, so it can still age out."""
+    return {
+        "version": ENVELOPE_VERSION,
+        "endpoint": "monitoring",
+        "base_url": resolve_base_url(),
+        "payload": {},
+        "created_at": _utc_now_iso(),
+        "attempts": 0,
+        "idempotency_key": str(uuid.uuid4()),
+    }
+
+
+def _safe_load_for_retry(claimed_path: str) -> Dict[str, Any]:
+    try:
+        return _load_envelope(claimed_path)
+    except Exception:
+        return _placeholder_envelope()
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def _queue_filename(endpoint: str) -> str:
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S%f")
+    # Timestamp first so lexicographic sort is true FIFO across endpoints.
+    return f"{stamp}_{endpoint}_{uuid.uuid4().hex[:8]}.json"
+
+
+@dataclass
+class QueueItem:
+    """Metadata for one pending envelope.
+
+    ``key`` is backend-specific (a filename, a log position) and ``order`` sorts
+    items oldest-first across the whole queue. ``job_name`` is None when the
+    envelope could not be read; replay gives it a lane of its own.
+    """
+
+    key: str
+    order: str
+    endpoint: str = ""
+    job_name: Optional[str] = ""
+    base_url: str = ""
+    attempts: int = 0
+    created_at: str = ""
+    size: int = 0
+
+
+def _item_from_envelope(key: str, order: str, envelope: Dict[str, Any], size: int) -> QueueItem:
+    return QueueItem(
+        key=key,
+        order=order,
+        endpoint=str(envelope.get("endpoint") or ""),
+        job_name=str((envelope.get("payload") or {}).get("job_name") or ""),
+        base_url=str(envelope.get("base_url") or ""),
+        attempts=int(envelope.get("attempts") or 0),
+        created_at=str(envelope.get("created_at") or ""),
+        size=size,
+    )
+
+
+def _dir_mtime(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _manifest_row(envelope: Dict[str, Any], state: str, size: int) -> Dict[str, Any]:
+    payload = envelope.get("payload") or {}
+    return {
+        "state": state,
+        "endpoint": str(envelope.get("endpoint") or ""),
+        "job_name": str(payload.get("job_name") or ""),
+        "status": payload.get("status"),
+        "base_url": str(envelope.get("base_url") or ""),
+        "attempts": int(envelope.get("attempts") or 0),
+        "created_at": str(envelope.get("created_at") or ""),
+        "size": size,
+    }
+
+
+def _describe_file(filepath: str, state: str) -> Dict[str, Any]:
+    size = _file_size(filepath)
+    try:
+        envelope = _load_envelope(filepath)
+    except Exception as exc:
+        row = _manifest_row({}, state, size)
+        row.update(job_name=None, error=str(exc))
+        return row
+    return _manifest_row(envelope, state, size)
+
+
+def _item_from_row(row: Dict[str, Any]) -> QueueItem:
+    return QueueItem(
+        key=row["key"],
+        order=row["key"],
+        endpoint=row["endpoint"],
+        job_name=None if row["error"] else row["job_name"],
+        base_url=row["base_url"],
+        attempts=row["attempts"],
+        created_at=row["created_at"],
+        size=row["size"],
+    )
+
+
+class QueueStorage(ABC):
+    """Where offline envelopes live between a failed send and a replay.
+
+    Pending envelopes are handed out as ``QueueItem``s. Replay ``claim``s an
+    item, sends it, then settles it with exactly one of ``ack`` (delivered),
+    ``requeue`` (failed, keep its FIFO slot), ``bury`` (dead letter) or
+    ``release`` (not attempted). Backends implement the abstract methods.
+    Unless a backend overrides the dead-letter methods, dead letters are
+    plain JSON files under ``dead/`` so they stay easy to inspect by hand,
+    indexed by the ``QueueManifest`` so listing and counting them never
+    opens the files.
+    """
+
+    backend = ""
+
+    def __init__(self, path: str, *, durability: Optional[Durability] = None):
+        self.path = path
+        self.durability = durability or get_durability()
+        self.dead_dir = os.path.join(path, "dead")
+        os.makedirs(self.dead_dir, exist_ok=True)
+        self.lock = FileLock(os.path.join(path, ".queue.lock"), timeout=5)
+        self._mutex = threading.RLock()
+        self._manifest: Optional[QueueManifest] = None
+
+    @abstractmethod
+    def append(self, envelope: Dict[str, Any], *, name: Optional[str] = None) -> str:
+        """Durably store a new envelope and return where it went.
+
+        ``name`` is a filename hint (used when reviving a dead letter).
+        """
+
+    @abstractmethod
+    def pending(self) -> List[QueueItem]:
+        """Unclaimed envelopes, oldest first."""
+
+    @abstractmethod
+    def pending_page(
+        self,
+        *,
+        after: Optional[str] = None,
+        limit: int = -1,
+        job_name: Optional[str] = None,
+        endpoint: Optional[str] = None,
+        created_before: Optional[str] = None,
+        created_after: Optional[str] = None,
+    ) -> List[QueueItem]:
+        """Up to ``limit`` unclaimed envelopes whose ``order`` sorts after ``after``.
+
+        ``created_before``/``created_after`` are ISO timestamps compared with
+        the envelope's ``created_at``. Unreadable envelopes only appear
+        unfiltered.
+        """
+
+    @abstractmethod
+    def claim(self, item: QueueItem) -> Optional[Dict[str, Any]]:
+        """Take ``item`` for sending and return its envelope.
+
+        Returns None when it is already gone or claimed. Raises when the
+        envelope cannot be decoded; the item stays claimed so the caller can
+        settle it.
+        """
+
+    @abstractmethod
+    def recover(self, item: QueueItem) -> Dict[str, Any]:
+        """Best-effort envelope of a claimed item, for settling a failure."""
+
+    @abstractmethod
+    def ack(self, item: QueueItem) -> None:
+        """Drop a claimed item that was delivered."""
+
+    @abstractmethod
+    def release(self, item: QueueItem) -> None:
+        """Hand a claimed item back untouched; it was not attempted."""
+
+    @abstractmethod
+    def requeue(self, item: QueueItem, envelope: Dict[str, Any]) -> None:
+        """Store a failed item's updated ``envelope`` in its old FIFO slot."""
+
+    @abstractmethod
+    def bury(self, item: QueueItem, envelope: Dict[str, Any]) -> str:
+        """Move a claimed item to the dead letters. Returns the dead-letter path."""
+
+    @abstractmethod
+    def evict(self, max_files: int, max_bytes: int) -> List[str]:
+        """Drop the oldest pending envelopes until under both caps.
+
+        The newest envelope is always kept, even if it alone exceeds
+        ``max_bytes``. Returns the evicted keys.
+        """
+
+    @abstractmethod
+    def stats(self) -> Tuple[int, int, int, Optional[str]]:
+        """Return ``(pending, sending, pending_bytes, oldest_pending_key)``."""
+
+    def backlog(self) -> List[Tuple[Optional[str], str, int, int, Optional[str]]]:
+        """``(job_name, state, count, bytes, oldest_created_at)`` per job and state.
+
+        ``state`` is ``pending``, ``sending`` or ``dead``; this base version
+        only knows the dead letters.
+        """
+        return [row for row in self._synced("dead").backlog() if row[1] == "dead"]
+
+    def compact(self) -> None:
+        """Reclaim space held by settled envelopes, where the backend needs to."""
+
+    def dead_stats(self) -> Tuple[int, int]:
+        """Return ``(dead_count, dead_bytes)``."""
+        return self._synced("dead").totals("dead")
+
+    def list_dead(
+        self,
+        *,
+        job_name: Optional[str] = None,
+        endpoint: Optional[str] = None,
+        created_before: Optional[str] = None,
+        created_after: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: int = -1,
+    ) -> List[Dict[str, Any]]:
+        """Summaries of dead letters in ``file`` order, optionally filtered.
+
+        ``after`` is the ``file`` of the last summary of the previous page.
+        Unreadable dead letters are reported with an ``error`` and only when no
+        filter is given.
+        """
+        filters = {
+            "job_name": job_name,
+            "endpoint": endpoint,
+            "created_before": created_before,
+            "created_after": created_after,
+        }
+        unfiltered = all(value is None for value in filters.values())
+        rows = self._synced("dead").page("dead", after=after, limit=limit, **filters)
+        out: List[Dict[str, Any]] = []
+        for row in rows:
+            filepath = os.path.join(self.dead_dir, row["key"])
+            if row["error"]:
+                if unfiltered:
+                    out.append({"file": row["key"], "path": filepath, "error": row["error"]})
+                continue
+            out.append(
+                {
+                    "file": row["key"],
+                    "path": filepath,
+                    "endpoint": row["endpoint"],
+                    "job_name": row["job_name"] or None,
+                    "status": row["status"],
+                    "attempts": row["attempts"],
+                    "created_at": row["created_at"],
+                }
+            )
+        return out
+
+    def revive_dead(self, name: Optional[str] = None) -> Tuple[int, List[str]]:
+        """Return one dead letter (``name``) or all of them to pending with attempts=0.
+
+        Returns ``(restored, errors)``.
+        """
+        if name is None:
+            targets = [
+                os.path.join(self.dead_dir, n)
+                for n in sorted(os.listdir(self.dead_dir))
+                if n.endswith(".json")
+            ]
+        elif os.path.isabs(name):
+            targets = [name]
+        else:
+            targets = [os.path.join(self.dead_dir, os.path.basename(name))]
+
+        restored = 0
+        errors: List[str] = []
+        for dead_path in targets:
+            try:
+                with self.durability.deferred(), self._tracking("dead") as manifest:
+                    envelope = _load_envelope(dead_path)
+                    envelope["attempts"] = 0
+                    if not envelope.get("idempotency_key"):
+                        envelope["idempotency_key"] = str(uuid.uuid4())
+                    self.append(envelope, name=os.path.basename(dead_path))
+                    os.remove(dead_path)
+                    manifest.delete("dead", [os.path.basename(dead_path)])
+                restored += 1
+            except Exception as exc:
+                errors.append(f"{dead_path}: {exc}")
+        return restored, errors
+
+    def _write_dead(self, name: str, envelope: Dict[str, Any]) -> str:
+        dead_path = os.path.join(self.dead_dir, name)
+        with self._tracking("dead") as manifest:
+            _atomic_write_json(dead_path, _pack_envelope(envelope), self.durability)
+            manifest.put("dead", name, _manifest_row(envelope, "dead", _file_size(dead_path)))
+        return dead_path
+
+    # -- manifest -----------------------------------------------------------
+
+    @property
+    def manifest(self) -> QueueManifest:
+        with self._mutex:
+            if self._manifest is None:
+                self._manifest = QueueManifest(self.path)
+            return self._manifest
+
+    def _area_dir(self, area: str) -> str:
+        return self.dead_dir if area == "dead" else self.path
+
+    def _synced(self, *areas: str) -> QueueManifest:
+        """The manifest, after catching up with any change it did not record.
+
+        The directory mtime alone cannot be trusted here: a writer that skips
+        ``.queue.lock`` (the CLI, older clients) can add a file while this
+        process marks its own change, and coarse mtimes hide changes made in
+        the same tick. So each area's file names are compared with the
+        manifest; in the steady state that is one listing, no lock and no
+        file opened.
+        """
+        manifest = self.manifest
+        for area in areas:
+            if self._listing(area) != manifest.states(area):
+                with self._mutex, self.lock:
+                    self._sync(area, force=True)
+        return manifest
+
+    @contextmanager
+    def _tracking(self, *areas: str) -> Iterator[QueueManifest]:
+        """Run a change to ``areas`` and its manifest update as one step.
+
+        The manifest is synced first, then the caller changes the directory
+        and records what it did; the new directory mtimes are only marked as
+        seen if both succeed, so an interrupted change is rescanned later.
+        """
+        with self._mutex, self.lock:
+            manifest = self.manifest
+            for area in areas:
+                self._sync(area)
+            with manifest.tx():
+                yield manifest
+                for area in areas:
+                    manifest.set_mark(area, _dir_mtime(self._area_dir(area)))
+
+    def _listing(self, area: str) -> Dict[str, str]:
+        """Envelope files in ``area``'s directory, mapped to their state."""
+        on_disk: Dict[str, str] = {}
+        for name in os.listdir(self._area_dir(area)):
+            if name.endswith(".json"):
+                on_disk[name] = "dead" if area == "dead" else "pending"
+            elif area != "dead" and name.endswith(".json.sending"):
+                on_disk[name[: -len(".sending")]] = "sending"
+        return on_disk
+
+    def _sync(self, area: str, *, force: bool = False) -> None:
+        """Reconcile one area with its directory. Caller holds the locks.
+
+        Without ``force`` an unchanged directory mtime skips the listing.
+        """
+        directory = self._area_dir(area)
+        manifest = self.manifest
+        # Taken before listing, so a change made during the listing forces a rescan.
+        mtime = _dir_mtime(directory)
+        if not force and mtime is not None and mtime == manifest.mark(area):
+            return
+        on_disk = self._listing(area)
+        known = manifest.states(area)
+        with manifest.tx():
+            manifest.delete(area, [key for key in known if key not in on_disk])
+            fresh: List[Tuple[str, Dict[str, Any]]] = []
+            for key, state in on_disk.items():
+                if key not in known:
+                    name = f"{key}.sending" if state == "sending" else key
+                    fresh.append((key, _describe_file(os.path.join(directory, name), state)))
+                elif known[key] != state:
+                    manifest.set_state(area, key, state)
+            manifest.put_many(area, fresh)
+            manifest.set_mark(area, mtime)
+
+
+class FileQueueStorage(QueueStorage):
+    """One JSON file per envelope; claims are renames to ``*.sending``.
+
+    Every change goes through the ``QueueManifest`` under ``.queue.lock``, so
+    status and eviction read its running totals, and ``pending`` and
+    paging read its rows, instead of listing and parsing the directory.
+    """
+
+    backend = "files"
+
+    def append(self, envelope: Dict[str, Any], *, name: Optional[str] = None) -> str:
+        filename = name or _queue_filename(str(envelope.get("endpoint") or ""))
+        filepath = os.path.join(self.path, filename)
+        with self.durability.deferred():
+            # Written outside the queue dir so its mtime only moves on the rename.
+            tmp_path = _write_temp(
+                filepath, _pack_envelope(envelope), self.durability, os.path.join(self.path, "tmp")
+            )
+            try:
+                with self._tracking("queue") as manifest:
+                    _publish(tmp_path, filepath, self.durability)
+                    row = _manifest_row(envelope, "pending", _file_size(filepath))
+                    manifest.put("queue", filename, row)
+            finally:
+                if os.path.exists(tmp_path):
+                    _discard(tmp_path)
+        return filepath
+
+    def pending(self) -> List[QueueItem]:
+        return self.pending_page()
+
+    def pending_page(
+        self,
+        *,
+        after: Optional[str] = None,
+        limit: int = -1,
+        job_name: Optional[str] = None,
+        endpoint: Optional[str] = None,
+        created_before: Optional[str] = None,
+        created_after: Optional[str] = None,
+    ) -> List[QueueItem]:
+        rows = self._synced("queue").page(
+            "pending",
+            after=after,
+            limit=limit,
+            job_name=job_name,
+            endpoint=endpoint,
+            created_before=created_before,
+            created_after=created_after,
+        )
+        filtered = any(
+            value is not None for value in (job_name, endpoint, created_before, created_after)
+        )
+        return [_item_from_row(row) for row in rows if not (filtered and row["error"])]
+
+    def _claimed(self, item: QueueItem) -> str:
+        return os.path.join(self.path, f"{item.key}.sending")
+
+    def claim(self, item: QueueItem) -> Optional[Dict[str, Any]]:
+        claimed = self._claimed(item)
+        with self._tracking("queue") as manifest:
+            try:
+                os.rename(os.path.join(self.path, item.key), claimed)
+            except OSError:
+                # Another writer/replayer moved it.
+                return None
+            manifest.set_state("queue", item.key, "sending")
+        with open(claimed, "r", encoding="utf-8") as handle:
+            data = json.load(handle)
+        return _normalize_envelope(data, item.key)
+
+    def recover(self, item: QueueItem) -> Dict[str, Any]:
+        return _safe_load_for_retry(self._claimed(item))
+
+    def _drop_claim(self, item: QueueItem) -> None:
+        try:
+            os.remove(self._claimed(item))
+        except OSError:
+            pass
+
+    def ack(self, item: QueueItem) -> None:
+        with self._tracking("queue") as manifest:
+            self._drop_claim(item)
+            manifest.delete("queue", [item.key])
+
+    def release(self, item: QueueItem) -> None:
+        with self._tracking("queue") as manifest:
+            try:
+                os.rename(self._claimed(item), os.path.join(self.path, item.key))
+            except OSError:
+                return
+            manifest.set_state("queue", item.key, "pending")
+
+    def requeue(self, item: QueueItem, envelope: Dict[str, Any]) -> None:
+        filepath = os.path.join(self.path, item.key)
+        with self._tracking("queue") as manifest:
+            _atomic_write_json(filepath, _pack_envelope(envelope), self.durability)
+            self._drop_claim(item)
+            row = _manifest_row(envelope, "pending", _file_size(filepath))
+            manifest.put("queue", item.key, row)
+
+    def bury(self, item: QueueItem, envelope: Dict[str, Any]) -> str:
+        with self._tracking("queue") as manifest:
+            dead_path = self._write_dead(item.key, envelope)
+            self._drop_claim(item)
+            manifest.delete("queue", [item.key])
+        return dead_path
+
+    def evict(self, max_files: int, max_bytes: int) -> List[str]:
+        with self._tracking("queue") as manifest:
+            count, total = manifest.totals("pending")
+            if count <= max_files and total <= max_bytes:
+                return []
+            doomed: List[str] = []
+            for row in manifest.page("pending"):
+                if count <= 1 or (count <= max_files and total <= max_bytes):
+                    break
+                doomed.append(row["key"])
+                count -= 1
+                total -= row["size"]
+
+            evicted: List[str] = []
+            for name in doomed:
+                try:
+                    os.remove(os.path.join(self.path, name))
+                except FileNotFoundError:
+                    # Moved by a writer that bypasses the manifest; the next sync catches up.
+                    continue
+                except OSError:
+                    break
+                evicted.append(name)
+            manifest.delete("queue", evicted)
+            return evicted
+
+    def stats(self) -> Tuple[int, int, int, Optional[str]]:
+        manifest = self._synced("queue")
+        pending, pending_bytes = manifest.totals("pending")
+        sending, _sending_bytes = manifest.totals("sending")
+        return pending, sending, pending_bytes, manifest.oldest("pending")
+
+    def backlog(self) -> List[Tuple[Optional[str], str, int, int, Optional[str]]]:
+        return self._synced("queue", "dead").backlog()
+
+
+_STORES: Dict[Tuple[int, str, str, str], QueueStorage] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def open_queue_storage(
+    path: str,
+    backend: str = "files",
+    durability: str = "strict",
+) -> QueueStorage:
+    """Return this process's storage object for ``path``.
+
+    Instances are cached so backends that keep an in-memory index (the
+    segment log) only ever read what other processes appended since. The
+    cache is keyed by pid so a forked child never reuses its parent's SQLite
+    connection.
+    """
+    if backend not in QUEUE_BACKENDS:
+        raise ValueError(f"Unknown queue backend: {backend}")
+    policy = get_durability(durability)
+    key = (os.getpid(), backend, durability, os.path.abspath(path))
+    with _STORES_LOCK:
+        store = _STORES.get(key)
+        if store is None:
+            if backend == "log":
+                from .segment_log import SegmentLogStorage
+
+                store = SegmentLogStorage(path, durability=policy)
+            elif backend == "sqlite":
+                from .sqlite_queue import SQLiteQueueStorage
+
+                store = SQLiteQueueStorage(path, durability=policy)
+            else:
+                store = FileQueueStorage(path, durability=policy)
+            _STORES[key] = store
+        return store
@@ -0,0 +1,49 @@
+"""Shared test setup."""
+
+from __future__ import annotations
+
+import json
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+
+@pytest.fixture(autouse=True)
+def isolated_queue_dir(tmp_path, monkeypatch):
+    """Keep queue files and circuit-breaker state out of ``~/.seer``.
+
+    Tests that inspect the queue use ``queue_dir`` instead.
+    """
+    monkeypatch.setenv("SEER_QUEUE_DIR", str(tmp_path / "default-queue"))
+
+
+@pytest.fixture
+def queue_dir(tmp_path, monkeypatch):
+    """An empty queue directory set as ``SEER_QUEUE_DIR``.
+
+    Tests needing more configuration set further env vars with ``monkeypatch``.
+    """
+    path = tmp_path / "queue"
+    path.mkdir()
+    monkeypatch.setenv("SEER_QUEUE_DIR", str(path))
+    return path
+
+
+@pytest.fixture
+def mock_response():
+    """Factory for ``requests.Response`` stand-ins; 4xx/5xx raise from ``raise_for_status``."""
+    return _mock_response
+
+
+def _mock_response(status_code=200, payload=None, text="", headers=None):
+    response = MagicMock(spec=requests.Response)
+    response.status_code = status_code
+    response.text = text or json.dumps(payload or {})
+    response.json.return_value = payload if payload is not None else {}
+    response.headers = headers or {}
+    if status_code >= 400:
+        response.raise_for_status.side_effect = requests.exceptions.HTTPError(response=response)
+    else:
+        response.raise_for_status.return_value = None
+    return response
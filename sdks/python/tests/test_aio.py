@@ -0,0 +1,222 @@
+"""Tests for the asyncio client and async HTTP helper."""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import json
+import threading
+from unittest.mock import AsyncMock, patch
+
+import pytest
+import requests
+
+from seerpy import AsyncSeer
+from seerpy.http import apost_with_backoff
+from seerpy.payloads import ReplayResult, save_failed_payload
+
+
+class TestAsyncPostWithBackoff:
+    @patch("seerpy.http.asyncio.sleep", new_callable=AsyncMock)
+    @patch("seerpy.http.time.sleep")
+    @patch("seerpy.http.requests.post")
+    def test_retries_without_blocking_sleep(
+        self, mock_post, mock_time_sleep, mock_sleep, mock_response
+    ):
+        mock_post.side_effect = [mock_response(503), mock_response(payload={"ok": True})]
+
+        asyncio.run(apost_with_backoff("https://example.com/x", {}, {}, max_retries=3))
+
+        assert mock_post.call_count == 2
+        mock_sleep.assert_awaited_once()
+        mock_time_sleep.assert_not_called()
+
+    @patch("seerpy.http.requests.post")
+    def test_does_not_retry_4xx(self, mock_post, mock_response):
+        mock_post.return_value = mock_response(401)
+        with pytest.raises(requests.exceptions.HTTPError):
+            asyncio.run(apost_with_backoff("https://example.com/x", {}, {}))
+        assert mock_post.call_count == 1
+
+
+class TestAsyncMonitor:
+    def test_success_path(self):
+        async def scenario():
+            seer = AsyncSeer(api_key="test-key")
+            with patch.object(AsyncSeer, "_apost", new_callable=AsyncMock) as mock_post:
+                async with seer.amonitor("job", tags=["etl"]):
+                    await asyncio.sleep(0)
+            return mock_post
+
+        mock_post = asyncio.run(scenario())
+        assert mock_post.await_count == 2
+        start_payload = mock_post.await_args_list[0].args[1]
+        finish_payload = mock_post.await_args_list[1].args[1]
+        assert start_payload["status"] == "running"
+        assert finish_payload["status"] == "success"
+        assert finish_payload["run_id"] == start_payload["run_id"]
+
+    def test_cancelled_task_reports_cancelled(self):
+        async def scenario():
+            seer = AsyncSeer(api_key="test-key")
+            with patch.object(AsyncSeer, "_apost", new_callable=AsyncMock) as mock_post:
+
+                async def job():
+                    async with seer.amonitor("job"):
+                        await asyncio.sleep(10)
+
+                task = asyncio.ensure_future(job())
+                await asyncio.sleep(0.01)
+                task.cancel()
+                with pytest.raises(asyncio.CancelledError):
+                    await task
+            return mock_post
+
+        mock_post = asyncio.run(scenario())
+        assert mock_post.await_args_list[-1].args[1]["status"] == "cancelled"
+
+    def test_offline_queues_final(self, queue_dir):
+        async def scenario():
+            seer = AsyncSeer(api_key="test-key")
+            with patch.object(
+                AsyncSeer,
+                "_apost",
+                new_callable=AsyncMock,
+                side_effect=requests.exceptions.ConnectionError("down"),
+            ):
+                with pytest.raises(ValueError):
+                    async with seer.amonitor("offline-job"):
+                        raise ValueError("user-fail")
+
+        asyncio.run(scenario())
+        files = list(queue_dir.glob("*.json"))
+        assert len(files) == 1
+        envelope = json.loads(files[0].read_text(encoding="utf-8"))
+        assert envelope["payload"]["status"] == "failed"
+        assert envelope["payload"]["run_id"]
+
+    def test_failed_start_still_sends_the_final_live(self, queue_dir):
+        async def scenario():
+            seer = AsyncSeer(api_key="test-key")
+            with patch.object(
+                AsyncSeer,
+                "_apost",
+                new_callable=AsyncMock,
+                side_effect=[requests.exceptions.ConnectionError("blip"), None],
+            ) as mock_post:
+                async with seer.amonitor("flaky-start"):
+                    await asyncio.sleep(0)
+            return mock_post
+
+        mock_post = asyncio.run(scenario())
+        assert mock_post.await_args_list[-1].args[1]["status"] == "success"
+        assert list(queue_dir.glob("*.json")) == []
+
+    def test_heartbeat_offline_queues(self, queue_dir):
+        async def scenario():
+            seer = AsyncSeer(api_key="test-key")
+            with patch.object(
+                AsyncSeer,
+                "_apost",
+                new_callable=AsyncMock,
+                side_effect=requests.exceptions.ConnectionError("down"),
+            ):
+                await seer.aheartbeat("worker")
+
+        asyncio.run(scenario())
+        envelope = json.loads(next(queue_dir.glob("*.json")).read_text(encoding="utf-8"))
+        assert envelope["endpoint"] == "heartbeat"
+
+
+class TestAsyncCapture:
+    def test_capture_stops_off_the_event_loop(self):
+        from seerpy.capture import _LogCapture
+
+        stopped_on = []
+        real_stop = _LogCapture.stop
+
+        def stop(self):
+            stopped_on.append(threading.current_thread())
+            return real_stop(self)
+
+        async def scenario():
+            seer = AsyncSeer(api_key="test-key")
+            with patch.object(AsyncSeer, "_apost", new_callable=AsyncMock) as mock_post, \
+                    patch.object(_LogCapture, "stop", stop):
+                async with seer.amonitor("job", capture_logs=True):
+                    print("hello")
+            return mock_post
+
+        mock_post = asyncio.run(scenario())
+        assert stopped_on and stopped_on[0] is not threading.main_thread()
+        assert "hello" in mock_post.await_args_list[1].args[1]["logs"]
+
+
+class TestAsyncReplay:
+    def test_areplay_forwards_batch_size_and_shards(self):
+        async def scenario():
+            seer = AsyncSeer(api_key="test-key")
+            with patch("seerpy.aio.replay_failed_payloads", return_value=ReplayResult()) as mock:
+                await seer.areplay(batch_size=50, shards=4)
+            return mock
+
+        mock = asyncio.run(scenario())
+        assert mock.call_args.kwargs["batch_size"] == 50
+        assert mock.call_args.kwargs["shards"] == 4
+
+
+class TestAsyncBackgroundReplay:
+    def test_background_task_flushes_periodically(self, monkeypatch):
+        monkeypatch.setenv("SEER_REPLAY_JITTER_MS", "0")
+
+        async def scenario():
+            with patch.object(AsyncSeer, "areplay", new_callable=AsyncMock) as mock_replay:
+                seer = AsyncSeer(
+                    api_key="test-key",
+                    background_replay=True,
+                    replay_interval=0.02,
+                )
+                assert seer._bg_thread is None
+                for _ in range(50):
+                    if mock_replay.await_count >= 2:
+                        break
+                    await asyncio.sleep(0.01)
+                await seer.aclose()
+                return mock_replay.await_count, seer._bg_task
+
+        count, task = asyncio.run(scenario())
+        assert count >= 2
+        assert task is None
+
+    def test_idle_task_wakes_on_enqueue(self, monkeypatch, queue_dir):
+        monkeypatch.setenv("SEER_REPLAY_JITTER_MS", "0")
+
+        async def scenario():
+            with patch.object(
+                AsyncSeer, "areplay", new_callable=AsyncMock, return_value=ReplayResult()
+            ) as mock_replay:
+                seer = AsyncSeer(
+                    api_key="test-key",
+                    background_replay=True,
+                    replay_interval=0.01,
+                    replay_max_interval=60,
+                )
+                await asyncio.sleep(0.1)
+                idle_count = mock_replay.await_count
+                # Queued from a worker thread, as a failed sync send would be.
+                await asyncio.get_running_loop().run_in_executor(
+                    None, functools.partial(save_failed_payload, {"job_name": "j"}, "heartbeat")
+                )
+                for _ in range(100):
+                    if mock_replay.await_count > idle_count:
+                        break
+                    await asyncio.sleep(0.01)
+                await seer.aclose()
+                return idle_count, mock_replay.await_count
+
+        idle_count, count = asyncio.run(scenario())
+        assert (idle_count, count) == (1, 2)
+
+    def test_background_replay_requires_running_loop(self):
+        with pytest.raises(RuntimeError):
+            AsyncSeer(api_key="test-key", background_replay=True)
@@ -0,0 +1,94 @@
+"""Tests for persisted per-host replay backoff."""
+
+from __future__ import annotations
+
+import json
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from seerpy import replay_failed_payloads, retry_dead, save_failed_payload
+from seerpy.backoff import ReplayBackoff, is_host_failure
+
+BASE = "https://seer.example"
+
+
+@pytest.fixture
+def queue_dir(queue_dir, monkeypatch):
+    monkeypatch.setenv("SEER_REPLAY_BACKOFF_BASE", "5")
+    monkeypatch.setenv("SEER_BREAKER_THRESHOLD", "0")
+    return queue_dir
+
+
+def _rate_limited(retry_after="120"):
+    response = MagicMock(status_code=429, headers={"Retry-After": retry_after})
+    return requests.exceptions.HTTPError("429 Too Many Requests", response=response)
+
+
+def _queue_one(job="j"):
+    save_failed_payload({"job_name": job, "status": "success", "run_id": f"r-{job}"},
+                        "monitoring", base_url=BASE)
+
+
+def test_retry_after_persists_across_passes_and_processes(queue_dir):
+    _queue_one("a")
+    _queue_one("b")
+    with patch("seerpy.payloads.post_with_backoff", side_effect=_rate_limited()) as mock_post:
+        first = replay_failed_payloads("key", base_url=BASE, max_attempts=1, concurrency=1)
+        revived = retry_dead("key", base_url=BASE, all_dead=True)
+        second = replay_failed_payloads("key", base_url=BASE)
+
+    # The first 429 stops the pass: job b is not sent to a rate-limited host.
+    assert mock_post.call_count == 1
+    assert (first.dead_lettered, first.deferred) == (1, 1)
+    assert revived["restored"] == 1 and revived["replay"].deferred == 2
+    assert (second.sent, second.failed, second.deferred) == (0, 0, 2)
+    state = json.loads((queue_dir / ".backoff").read_text())[BASE]
+    assert state["failures"] == 1
+    assert state["next_send_at"] >= time.time() + 100
+
+    other_process = ReplayBackoff(str(queue_dir))
+    assert other_process.wait(BASE) > 100
+    attempts = [json.loads(p.read_text())["attempts"] for p in queue_dir.glob("*.json")]
+    assert sorted(attempts) == [0, 0]
+
+
+def test_backoff_grows_once_per_pass_and_resets_on_success(queue_dir):
+    backoff = ReplayBackoff(str(queue_dir), base=1, max_delay=4)
+    down = requests.exceptions.ConnectionError("down")
+    assert backoff.record_failure(BASE, down) == pytest.approx(1, abs=0.1)
+    # Another lane failing during the same outage does not count again.
+    assert backoff.record_failure(BASE, down) == pytest.approx(1, abs=0.1)
+
+    for expected in (2, 4, 4):
+        state = json.loads((queue_dir / ".backoff").read_text())
+        state[BASE]["next_send_at"] = time.time() - 1
+        (queue_dir / ".backoff").write_text(json.dumps(state))
+        assert backoff.record_failure(BASE, down) == pytest.approx(expected, abs=0.1)
+
+    backoff.record_success(BASE)
+    assert backoff.wait(BASE) == 0
+    assert json.loads((queue_dir / ".backoff").read_text())[BASE]["failures"] == 0
+
+
+def test_event_errors_do_not_back_off_the_host(queue_dir):
+    _queue_one()
+    bad_request = requests.exceptions.HTTPError(
+        "400", response=MagicMock(status_code=400, headers={})
+    )
+    assert not is_host_failure(bad_request)
+    with patch("seerpy.payloads.post_with_backoff", side_effect=bad_request):
+        replay_failed_payloads("key", base_url=BASE)
+
+    assert ReplayBackoff(str(queue_dir)).wait(BASE) == 0
+    assert not (queue_dir / ".backoff").exists()
+
+
+def test_base_zero_disables(queue_dir, monkeypatch):
+    monkeypatch.setenv("SEER_REPLAY_BACKOFF_BASE", "0")
+    backoff = ReplayBackoff(str(queue_dir))
+    assert backoff.record_failure(BASE, _rate_limited()) == 0
+    assert backoff.wait(BASE) == 0
+    assert not (queue_dir / ".backoff").exists()
@@ -0,0 +1,148 @@
+"""Tests for /batch packing, batched replay and the live event batcher."""
+
+from __future__ import annotations
+
+import json
+from unittest.mock import patch
+
+import pytest
+import requests
+
+from seerpy import Seer
+from seerpy import http as seer_http
+from seerpy.http import pack_batch_events
+from seerpy.payloads import replay_failed_payloads, save_failed_payload
+
+
+@pytest.fixture(autouse=True)
+def reset_batch_support():
+    seer_http._BATCH_UNSUPPORTED.clear()
+    yield
+    seer_http._BATCH_UNSUPPORTED.clear()
+
+
+@pytest.fixture
+def batch_reply(mock_response):
+    def reply(statuses):
+        return mock_response(payload={"results": [{"status": s, "body": {}} for s in statuses]})
+
+    return reply
+
+
+def _pending(queue_dir):
+    return sorted(queue_dir.glob("*.json"))
+
+
+class TestPackBatchEvents:
+    def test_splits_on_count(self):
+        events = [{"n": i} for i in range(5)]
+        chunks = pack_batch_events(events, max_items=2, max_bytes=10_000)
+        assert [len(c) for c in chunks] == [2, 2, 1]
+
+    def test_splits_on_bytes_and_keeps_oversized_alone(self):
+        events = [{"pad": "x" * 50}, {"pad": "y" * 500}, {"pad": "z" * 50}]
+        chunks = pack_batch_events(events, max_items=10, max_bytes=200)
+        assert [len(c) for c in chunks] == [1, 1, 1]
+        assert chunks[1][0]["pad"].startswith("y")
+
+
+class TestBatchedReplay:
+    @patch("seerpy.http.post_with_backoff")
+    def test_one_request_per_batch(self, mock_post, queue_dir, batch_reply):
+        save_failed_payload({"job_name": "a", "run_id": "r1"}, "monitoring", idempotency_key="k1")
+        save_failed_payload({"job_name": "b"}, "heartbeat", idempotency_key="k2")
+        save_failed_payload({"job_name": "a", "run_id": "r3"}, "monitoring", idempotency_key="k3")
+        mock_post.return_value = batch_reply([200, 200, 200])
+
+        result = replay_failed_payloads("key", concurrency=1, batch_size=10)
+
+        assert result.sent == 3
+        assert mock_post.call_count == 1
+        url, body = mock_post.call_args.args[0], mock_post.call_args.args[1]
+        assert url.endswith("/batch")
+        keys = [e["idempotency_key"] for e in body["events"]]
+        assert keys == ["k1:complete", "k2", "k3:complete"]
+        assert not _pending(queue_dir)
+
+    @patch("seerpy.http.post_with_backoff")
+    def test_failed_item_holds_back_its_job(self, mock_post, queue_dir, batch_reply):
+        save_failed_payload({"job_name": "a", "run_id": "r1"}, "monitoring")
+        save_failed_payload({"job_name": "a", "run_id": "r2"}, "monitoring")
+        save_failed_payload({"job_name": "b", "run_id": "r3"}, "monitoring")
+        mock_post.return_value = batch_reply([500, 424, 200])
+
+        result = replay_failed_payloads("key", concurrency=1, batch_size=10)
+
+        assert result.sent == 1
+        assert result.failed == 1
+        envelopes = [json.loads(p.read_text(encoding="utf-8")) for p in _pending(queue_dir)]
+        attempts = {e["payload"]["run_id"]: e["attempts"] for e in envelopes}
+        assert attempts == {"r1": 1, "r2": 0}
+
+    @patch("seerpy.payloads.post_with_backoff")
+    @patch("seerpy.http.post_with_backoff")
+    def test_falls_back_when_server_has_no_batch(
+        self, mock_batch, mock_single, queue_dir, mock_response
+    ):
+        save_failed_payload({"job_name": "a", "run_id": "r1"}, "monitoring")
+        save_failed_payload({"job_name": "b", "run_id": "r2"}, "monitoring")
+        not_found = mock_response(404)
+        mock_batch.side_effect = requests.exceptions.HTTPError(response=not_found)
+        mock_single.return_value = mock_response(payload={"ok": True})
+
+        result = replay_failed_payloads("key", concurrency=1, batch_size=10)
+
+        assert result.sent == 2
+        assert mock_single.call_count == 2
+        assert not seer_http.batch_supported(Seer(api_key="k").base_url)
+
+        replay_failed_payloads("key", concurrency=1, batch_size=10)
+        assert mock_batch.call_count == 1
+
+
+class TestEventBatcher:
+    @patch("seerpy.http.post_with_backoff")
+    def test_heartbeats_share_one_request(self, mock_post, queue_dir, batch_reply):
+        mock_post.return_value = batch_reply([200, 200, 200])
+        seer = Seer(api_key="test-key", batch_events=True, batch_interval=60)
+        try:
+            for _ in range(3):
+                seer.heartbeat("worker")
+            assert mock_post.call_count == 0
+            seer.flush_events()
+        finally:
+            seer._batcher.close()
+        assert mock_post.call_count == 1
+        assert len(mock_post.call_args.args[1]["events"]) == 3
+
+    @patch("seerpy.http.post_with_backoff")
+    def test_monitor_start_and_final_batched_and_rejects_queued(
+        self, mock_post, queue_dir, batch_reply
+    ):
+        mock_post.return_value = batch_reply([200, 500])
+        seer = Seer(api_key="test-key", batch_events=True, batch_interval=60)
+        try:
+            with seer.monitor("job"):
+                pass
+            seer.flush_events()
+        finally:
+            seer._batcher.close()
+
+        events = mock_post.call_args.args[1]["events"]
+        assert [e["payload"]["status"] for e in events] == ["running", "success"]
+        assert events[0]["payload"]["run_id"] == events[1]["payload"]["run_id"]
+        files = _pending(queue_dir)
+        assert len(files) == 1
+        envelope = json.loads(files[0].read_text(encoding="utf-8"))
+        assert envelope["payload"]["status"] == "success"
+        assert events[1]["idempotency_key"] == f"{envelope['idempotency_key']}:complete"
+
+    @patch("seerpy.http.post_with_backoff")
+    def test_close_sends_within_its_timeout_and_queues_the_rest(self, mock_post, queue_dir):
+        seer = Seer(api_key="test-key", batch_events=True, batch_interval=60)
+        with seer.monitor("job"):
+            pass
+        seer._batcher.close(timeout=0)
+
+        mock_post.assert_not_called()
+        assert len(_pending(queue_dir)) == 1
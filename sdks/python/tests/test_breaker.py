@@ -0,0 +1,135 @@
+"""Tests for the cross-process circuit breaker."""
+
+from __future__ import annotations
+
+import json
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from seerpy import Seer, replay_failed_payloads, save_failed_payload
+from seerpy.breaker import CircuitBreaker, CircuitOpen, get_circuit_breaker
+from seerpy.http import post_with_backoff
+
+BASE = "https://seer.example"
+
+
+@pytest.fixture
+def queue_dir(queue_dir, monkeypatch):
+    monkeypatch.setenv("SEER_BREAKER_THRESHOLD", "2")
+    monkeypatch.setenv("SEER_BREAKER_COOLDOWN", "60")
+    return queue_dir
+
+
+def _down_session():
+    session = MagicMock()
+    session.post.side_effect = requests.exceptions.ConnectionError("down")
+    return session
+
+
+def test_opens_after_threshold_failed_calls_and_then_fails_fast(queue_dir):
+    session = _down_session()
+    for _ in range(2):
+        with pytest.raises(requests.exceptions.ConnectionError):
+            post_with_backoff(f"{BASE}/heartbeat", {}, {}, session=session, base_delay=0)
+    assert session.post.call_count == 10  # each call's retries count as one failure
+
+    with pytest.raises(CircuitOpen):
+        post_with_backoff(f"{BASE}/heartbeat", {}, {}, session=session, base_delay=0)
+    assert session.post.call_count == 10
+    assert json.loads((queue_dir / ".breaker").read_text())[BASE]["opened_at"]
+
+
+def test_retries_stop_once_another_call_opens_the_breaker(queue_dir):
+    session = _down_session()
+    breaker = get_circuit_breaker()
+
+    def down(*args, **kwargs):
+        breaker.record_failure(BASE)  # other senders failing meanwhile
+        raise requests.exceptions.ConnectionError("down")
+
+    session.post.side_effect = down
+    with pytest.raises(requests.exceptions.ConnectionError):
+        post_with_backoff(f"{BASE}/heartbeat", {}, {}, session=session, base_delay=0)
+    assert session.post.call_count == 2
+
+
+def test_rate_limited_calls_do_not_count(queue_dir):
+    session = MagicMock()
+    session.post.return_value = MagicMock(status_code=429, headers={}, text="slow down")
+    session.post.return_value.raise_for_status.side_effect = requests.exceptions.HTTPError("429")
+    for _ in range(3):
+        with pytest.raises(requests.exceptions.HTTPError):
+            post_with_backoff(f"{BASE}/heartbeat", {}, {}, session=session, base_delay=0)
+    assert not get_circuit_breaker().is_open(BASE)
+
+
+def test_state_is_shared_through_the_queue_dir(queue_dir):
+    first = CircuitBreaker(str(queue_dir), threshold=2)
+    second = CircuitBreaker(str(queue_dir), threshold=2)
+    first.record_failure(BASE)
+    assert second.record_failure(BASE)  # the second process's failure trips it
+    assert first.is_open(BASE) and not first.allow(BASE)
+
+    second.record_success(BASE)
+    assert first.allow(BASE) and not first.is_open(BASE)
+
+
+def test_one_process_probes_health_after_the_cooldown(queue_dir):
+    probes = []
+
+    def probe(base):
+        probes.append(base)
+        return False
+
+    first = CircuitBreaker(str(queue_dir), threshold=1, cooldown=0.05, probe=probe)
+    second = CircuitBreaker(str(queue_dir), threshold=1, cooldown=0.05, probe=probe)
+    first.record_failure(BASE)
+    time.sleep(0.06)
+
+    assert not first.allow(BASE)  # probed, still down: cooldown restarts
+    assert not second.allow(BASE)
+    assert probes == [BASE]
+
+    time.sleep(0.06)
+    second.probe = lambda base: True
+    assert second.allow(BASE) and first.allow(BASE)
+
+
+def test_threshold_zero_disables(queue_dir):
+    breaker = CircuitBreaker(str(queue_dir), threshold=0)
+    for _ in range(5):
+        assert not breaker.record_failure(BASE)
+    assert breaker.allow(BASE)
+    assert not (queue_dir / ".breaker").exists()
+
+
+def test_open_breaker_sends_monitor_events_straight_to_the_queue(queue_dir):
+    get_circuit_breaker().record_failure(BASE)
+    get_circuit_breaker().record_failure(BASE)
+    seer = Seer(api_key="key", base_url=BASE)
+
+    with patch("seerpy.http._post_once") as post_once:
+        with seer.monitor("job"):
+            pass
+        seer.heartbeat("job")
+
+    post_once.assert_not_called()
+    assert len(list(queue_dir.glob("*.json"))) == 2
+
+
+def test_replay_defers_hosts_with_an_open_breaker(queue_dir):
+    save_failed_payload({"job_name": "j", "status": "success", "run_id": "r1"}, "monitoring",
+                        base_url=BASE)
+    get_circuit_breaker().record_failure(BASE)
+    get_circuit_breaker().record_failure(BASE)
+
+    with patch("seerpy.payloads.post_with_backoff") as mock_post:
+        result = replay_failed_payloads("key", base_url=BASE)
+
+    mock_post.assert_not_called()
+    assert (result.sent, result.failed, result.deferred) == (0, 0, 1)
+    (envelope,) = queue_dir.glob("*.json")
+    assert json.loads(envelope.read_text())["attempts"] == 0
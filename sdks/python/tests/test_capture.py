@@ -0,0 +1,488 @@
+"""Tests for bounded stdout/logging capture."""
+
+from __future__ import annotations
+
+import io
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+import requests
+
+from seerpy import Seer
+from seerpy.capture import CaptureBuffer, LogStreamer, StreamTee, _LogCapture
+from seerpy.payloads import queue_status
+
+
+def _assemble(chunks):
+    """Apply (logs, offset) writes the way the server does."""
+    text = b""
+    for logs, offset in chunks:
+        data = logs.encode("utf-8")
+        text = text.ljust(offset)
+        text = text[:offset] + data + text[offset + len(data) :]
+    return text.decode("utf-8")
+
+
+class TestCaptureBuffer:
+    def test_small_output_is_kept_verbatim(self):
+        buf = CaptureBuffer(head_bytes=16, tail_bytes=16)
+        buf.write("hello\n")
+        assert buf.getvalue() == "hello\n"
+        assert buf.dropped == 0
+
+    def test_keeps_head_and_tail_and_counts_the_middle(self):
+        buf = CaptureBuffer(head_bytes=10, tail_bytes=10)
+        for i in range(1000):
+            buf.write(f"{i:04d}\n")
+
+        assert buf.written == 5000
+        assert buf.dropped == 4980
+        text = buf.getvalue()
+        assert text.startswith("0000\n0001\n")
+        assert text.endswith("0998\n0999\n")
+        assert "[seer: 4980 bytes of output dropped]" in text
+
+    def test_memory_stays_bounded(self):
+        buf = CaptureBuffer(head_bytes=1024, tail_bytes=4096)
+        line = "x" * 99 + "\n"
+        for _ in range(20000):
+            buf.write(line)
+        assert len(buf._head) == 1024
+        assert len(buf._tail) < 2 * 4096
+        assert buf.dropped == 20000 * 100 - 1024 - 4096
+
+    def test_cut_multibyte_characters_are_dropped_not_garbled(self):
+        buf = CaptureBuffer(head_bytes=3, tail_bytes=3)
+        buf.write("éééééé")
+        text = buf.getvalue()
+        assert "�" not in text
+        assert text.startswith("é") and text.endswith("é")
+
+
+class TestLogCapture:
+    def test_limits_come_from_the_environment(self, monkeypatch):
+        monkeypatch.setenv("SEER_LOG_HEAD_BYTES", "100")
+        monkeypatch.setenv("SEER_LOG_TAIL_BYTES", "200")
+        capture = _LogCapture()
+        assert (capture.stream.head_bytes, capture.stream.tail_bytes) == (100, 200)
+
+    def test_stdout_and_log_records_share_the_bound(self):
+        capture = _LogCapture(head_bytes=64, tail_bytes=64)
+        capture.start()
+        try:
+            for i in range(500):
+                print(f"line {i}")
+                logging.getLogger("seer.test").info("record %d", i)
+        finally:
+            text = capture.stop()
+        assert text.startswith("line 0\n")
+        assert text.endswith("record 499\n")
+        assert capture.dropped > 0
+        assert len(text.encode("utf-8")) < 64 + 64 + 64
+
+    @patch.object(Seer, "_post")
+    def test_monitor_sends_bounded_logs(self, mock_post, monkeypatch):
+        monkeypatch.setenv("SEER_LOG_HEAD_BYTES", "256")
+        monkeypatch.setenv("SEER_LOG_TAIL_BYTES", "256")
+        seer = Seer(api_key="test-key")
+        with seer.monitor("chatty", capture_logs=True):
+            for i in range(5000):
+                print(f"progress {i}")
+
+        final = mock_post.call_args_list[-1].args[1]
+        assert final["logs"].rstrip().endswith("progress 4999")
+        assert "bytes of output dropped]" in final["logs"]
+        assert len(final["logs"]) < 1024
+
+
+class TestCaptureLevel:
+    @pytest.fixture
+    def root_at_warning(self):
+        root = logging.getLogger()
+        before = root.level
+        root.setLevel(logging.WARNING)
+        yield root
+        root.setLevel(before)
+
+    def test_default_level_is_info_not_debug(self, root_at_warning, monkeypatch):
+        monkeypatch.delenv("SEER_CAPTURE_LEVEL", raising=False)
+        capture = _LogCapture()
+        capture.start()
+        try:
+            assert not root_at_warning.isEnabledFor(logging.DEBUG)
+            logging.getLogger("seer.test").debug("noise")
+            logging.getLogger("seer.test").info("progress")
+        finally:
+            text = capture.stop()
+        assert "progress" in text and "noise" not in text
+        assert root_at_warning.level == logging.WARNING
+
+    def test_level_is_configurable(self, root_at_warning, monkeypatch):
+        monkeypatch.setenv("SEER_CAPTURE_LEVEL", "error")
+        assert _LogCapture().level == logging.ERROR
+        capture = _LogCapture(level="DEBUG")
+        capture.start()
+        try:
+            logging.getLogger("seer.test").debug("detail")
+        finally:
+            text = capture.stop()
+        assert "detail" in text
+
+    def test_never_raises_a_stricter_root_level(self):
+        root = logging.getLogger()
+        before = root.level
+        root.setLevel(logging.DEBUG)
+        try:
+            capture = _LogCapture(level="ERROR")
+            capture.start()
+            assert root.level == logging.DEBUG
+            logging.getLogger("seer.test").warning("below capture level")
+            text = capture.stop()
+        finally:
+            root.setLevel(before)
+        assert "below capture level" not in text
+
+    def test_records_are_formatted_off_the_job_thread(self, monkeypatch):
+        # pytest's own log handlers format in the calling thread.
+        monkeypatch.setattr(logging.getLogger(), "handlers", [])
+        formatted_on = []
+
+        class Probe:
+            def __str__(self):
+                formatted_on.append(threading.current_thread().name)
+                return "probe"
+
+        capture = _LogCapture()
+        capture.start()
+        try:
+            logging.getLogger("seer.test").warning("value=%s", Probe())
+        finally:
+            text = capture.stop()
+        assert "value=probe" in text
+        assert formatted_on and threading.current_thread().name not in formatted_on
+
+
+class TestFdCapture:
+    def test_captures_native_writes_stderr_and_subprocesses(self):
+        capture = _LogCapture(mode="fd")
+        capture.start()
+        try:
+            os.write(1, b"raw fd1\n")
+            os.write(2, b"raw fd2\n")
+            child = "import sys; print('child out'); print('child err', file=sys.stderr)"
+            subprocess.run([sys.executable, "-c", child], check=True)
+            print("python print")
+            logging.getLogger("seer.test").warning("a record")
+        finally:
+            text = capture.stop()
+        for line in ("raw fd1", "raw fd2", "child out", "child err", "python print", "a record"):
+            assert line in text
+
+    def test_fds_are_restored(self):
+        before = [os.fstat(fd).st_ino for fd in (1, 2)]
+        capture = _LogCapture(mode="fd")
+        capture.start()
+        capture.stop()
+        assert [os.fstat(fd).st_ino for fd in (1, 2)] == before
+        assert not [t for t in threading.enumerate() if t.name.startswith("seer-fd")]
+
+    def test_split_multibyte_characters_survive_chunking(self):
+        capture = _LogCapture(mode="fd")
+        capture.start()
+        try:
+            data = "é".encode("utf-8")
+            os.write(1, data[:1])
+            time.sleep(0.02)
+            os.write(1, data[1:] + b"\n")
+        finally:
+            text = capture.stop()
+        assert "é\n" in text
+
+    def test_sdk_threads_print_past_the_pipe(self, monkeypatch):
+        with open(1, "w", buffering=1, closefd=False) as stdout:
+            monkeypatch.setattr(sys, "stdout", stdout)
+            capture = _LogCapture(mode="fd")
+            capture.start()
+            try:
+                print("job line")
+                sdk = threading.Thread(target=print, args=("seer diagnostic",), name="seer-test")
+                sdk.start()
+                sdk.join()
+            finally:
+                text = capture.stop()
+        assert "job line" in text and "seer diagnostic" not in text
+
+    def test_a_quieter_console_handler_does_not_hide_the_capture_level(self):
+        root = logging.getLogger()
+        with open(2, "w", buffering=1, closefd=False) as stderr:
+            console = logging.StreamHandler(stderr)
+            console.setLevel(logging.WARNING)
+            root.addHandler(console)
+            capture = _LogCapture(mode="fd", level="INFO")
+            capture.start()
+            try:
+                logging.getLogger("seer.test").info("progress")
+                logging.getLogger("seer.test").warning("careful")
+            finally:
+                text = capture.stop()
+                root.removeHandler(console)
+        assert text.count("progress") == 1 and text.count("careful") == 1
+
+    @patch.object(Seer, "_post")
+    def test_monitor_fd_mode(self, mock_post):
+        seer = Seer(api_key="test-key")
+        with seer.monitor("spark", capture_logs=True, capture_mode="fd"):
+            os.write(2, b"from the jvm\n")
+        assert "from the jvm" in mock_post.call_args_list[-1].args[1]["logs"]
+
+    def test_unknown_mode_is_rejected(self):
+        seer = Seer(api_key="test-key")
+        with pytest.raises(ValueError):
+            with seer.monitor("job", capture_logs=True, capture_mode="pty"):
+                pass
+
+
+class TestStreamTee:
+    def test_buffer_writes_bytes_to_both(self):
+        raw = io.BytesIO()
+        original = io.TextIOWrapper(raw, encoding="utf-8")
+        sink = CaptureBuffer()
+        tee = StreamTee(original, sink)
+        tee.buffer.write("naïve bytes\n".encode("utf-8"))
+        tee.flush()
+        assert raw.getvalue() == "naïve bytes\n".encode("utf-8")
+        assert sink.getvalue() == "naïve bytes\n"
+
+    def test_sdk_thread_writes_are_not_copied(self):
+        original = io.StringIO()
+        sink = CaptureBuffer()
+        tee = StreamTee(original, sink)
+        sdk = threading.Thread(target=tee.write, args=("queued at x\n",), name="seer-test")
+        sdk.start()
+        sdk.join()
+        tee.write("job output\n")
+        assert original.getvalue() == "queued at x\njob output\n"
+        assert sink.getvalue() == "job output\n"
+
+
+class TestLogStreamer:
+    def _wait_for(self, predicate, timeout=2.0):
+        deadline = time.monotonic() + timeout
+        while not predicate() and time.monotonic() < deadline:
+            time.sleep(0.005)
+        assert predicate()
+
+    def test_ships_chunks_with_offsets_and_keeps_the_rest(self):
+        shipped = []
+        streamer = LogStreamer(
+            lambda chunk, offset: shipped.append((chunk, offset)),
+            flush_bytes=20,
+            flush_interval=60,
+        )
+        streamer.start()
+        streamer.write("a" * 25)
+        self._wait_for(lambda: len(shipped) == 1)
+        streamer.write("b" * 5)
+        streamer.stop()
+
+        assert shipped == [("a" * 25, 0)]
+        assert streamer.streaming
+        assert (streamer.getvalue(), streamer.offset) == ("b" * 5, 25)
+
+    def test_time_trigger_ships_small_output(self):
+        shipped = []
+        streamer = LogStreamer(
+            lambda chunk, offset: shipped.append((chunk, offset)),
+            flush_bytes=1024,
+            flush_interval=0.01,
+        )
+        streamer.start()
+        streamer.write("tick\n")
+        self._wait_for(lambda: shipped)
+        streamer.stop()
+        assert shipped[0] == ("tick\n", 0)
+
+    def test_old_server_falls_back_to_bounded_capture(self):
+        ship = threading.Event()
+        streamer = LogStreamer(
+            lambda chunk, offset: ship.set(),
+            supported=lambda: False,
+            flush_bytes=1,
+            head_bytes=8,
+            tail_bytes=8,
+        )
+        streamer.write("0123456789")
+        streamer.start()
+        self._wait_for(lambda: streamer._fallback is not None)
+        streamer.write("abcdefghij")
+        streamer.stop()
+
+        assert not ship.is_set() and not streamer.streaming
+        text = streamer.getvalue()
+        assert text.startswith("01234567") and text.endswith("cdefghij")
+        assert "[seer: 4 bytes of output dropped]" in text
+
+    def test_stops_shipping_at_the_server_limit(self):
+        shipped = []
+        streamer = LogStreamer(
+            lambda chunk, offset: shipped.append((chunk, offset)),
+            max_offset=lambda: 100,
+            flush_bytes=20,
+            flush_interval=60,
+            tail_bytes=8,
+        )
+        streamer.start()
+        streamer.write("a" * 25)
+        self._wait_for(lambda: len(shipped) == 1)
+        streamer.write("b" * 90)
+        self._wait_for(lambda: streamer.capped)
+        streamer.write("c" * 10)
+        streamer.stop()
+
+        assert shipped == [("a" * 25, 0), ("b" * 75, 25)]
+        text = streamer.getvalue()
+        assert "[seer: 17 bytes of output dropped]" in text and text.endswith("c" * 8)
+        assembled = _assemble(shipped + [(text, streamer.final_offset(text))])
+        assert len(assembled) == 100 and assembled.endswith("c" * 8)
+
+    def test_a_failed_chunk_is_retried_with_the_next_one(self):
+        attempts = []
+
+        def ship(chunk, offset):
+            attempts.append((chunk, offset))
+            if len(attempts) == 1:
+                raise requests.exceptions.ConnectionError("down")
+
+        streamer = LogStreamer(ship, flush_bytes=20, flush_interval=60)
+        streamer.start()
+        streamer.write("a" * 25)
+        self._wait_for(lambda: len(attempts) == 1)
+        streamer.write("b" * 25)
+        self._wait_for(lambda: len(attempts) == 2)
+        streamer.stop()
+
+        assert attempts[1] == ("a" * 25 + "b" * 25, 0)
+        assert streamer.shipped == 1 and streamer.offset == 50
+
+    def test_unsent_output_is_left_for_the_final_payload(self):
+        def ship(chunk, offset):
+            raise requests.exceptions.ConnectionError("down")
+
+        streamer = LogStreamer(ship, flush_bytes=20, flush_interval=60)
+        streamer.start()
+        streamer.write("a" * 25)
+        self._wait_for(lambda: streamer._pending == b"a" * 25 and not streamer._sending)
+        streamer.stop()
+
+        assert not streamer.streaming
+        assert (streamer.getvalue(), streamer.offset) == ("a" * 25, 0)
+
+    def test_pending_output_is_bounded_while_shipping_stalls(self):
+        streamer = LogStreamer(
+            lambda chunk, offset: None, flush_bytes=100, head_bytes=100, tail_bytes=300
+        )
+        for _ in range(1000):
+            streamer.write("x" * 9 + "\n")
+        assert len(streamer._pending) == 400
+        assert streamer.dropped == streamer.offset == 9600
+        assert streamer.getvalue().endswith("[seer: 9600 bytes of output dropped]\n")
+
+
+class TestStreamLogs:
+    @patch("seerpy.seer.server_capabilities", return_value=frozenset({"logs_offset"}))
+    @patch.object(Seer, "_post")
+    def test_monitor_ships_chunks_and_final_tail(self, mock_post, _caps, monkeypatch):
+        monkeypatch.setenv("SEER_LOG_FLUSH_BYTES", "64")
+        seer = Seer(api_key="test-key")
+        expected = []
+        with seer.monitor("long", stream_logs=True):
+            for i in range(200):
+                line = f"step {i}"
+                expected.append(line + "\n")
+                print(line)
+                time.sleep(0.0005)
+
+        calls = [c.args[1] for c in mock_post.call_args_list if c.args[1].get("logs")]
+        chunks, final = calls[:-1], calls[-1]
+        assert chunks and all(c["status"] == "running" for c in chunks)
+        assert final["status"] == "success"
+        assert len(final["logs"]) < len("".join(expected)) // 2
+        assembled = _assemble([(c["logs"], c["logs_offset"]) for c in calls])
+        body = assembled[assembled.index("step 0") :]
+        assert body == "".join(expected)
+
+    @patch("seerpy.seer.server_capabilities", return_value=frozenset({"logs_offset"}))
+    @patch.object(Seer, "_post")
+    def test_failed_chunks_go_in_the_final_payload(
+        self, mock_post, _caps, queue_dir, monkeypatch
+    ):
+        monkeypatch.setenv("SEER_LOG_FLUSH_BYTES", "16")
+
+        def post(path, payload, **kwargs):
+            if payload.get("logs_offset") is not None and payload["status"] == "running":
+                raise requests.exceptions.ConnectionError("down")
+            return None
+
+        mock_post.side_effect = post
+        seer = Seer(api_key="test-key")
+        with seer.monitor("flaky", stream_logs=True):
+            print("x" * 40)
+            time.sleep(0.05)
+
+        assert queue_status().pending == 0
+        final = mock_post.call_args_list[-1].args[1]
+        assert "x" * 40 in final["logs"] and "logs_offset" not in final
+
+    @patch("seerpy.seer.server_capabilities", return_value=frozenset({"logs_offset"}))
+    @patch.object(Seer, "_post", side_effect=requests.exceptions.ConnectionError("down"))
+    def test_an_outage_queues_one_envelope_per_run(self, _post, _caps, queue_dir, monkeypatch):
+        monkeypatch.setenv("SEER_LOG_FLUSH_BYTES", "16")
+        seer = Seer(api_key="test-key")
+        with seer.monitor("offline", stream_logs=True):
+            for i in range(5):
+                print(f"line {i} " + "x" * 20)
+                time.sleep(0.01)
+
+        envelopes = [json.loads(p.read_text(encoding="utf-8")) for p in queue_dir.glob("*.json")]
+        assert len(envelopes) == 1
+        logs = envelopes[0]["payload"]["logs"]
+        assert all(f"line {i} " in logs for i in range(5))
+        assert "queued at" not in logs
+
+    @patch("seerpy.seer.server_log_limit", return_value=300)
+    @patch("seerpy.seer.server_capabilities", return_value=frozenset({"logs_offset"}))
+    @patch.object(Seer, "_post")
+    def test_output_past_the_server_limit_is_not_streamed(
+        self, mock_post, _caps, _limit, monkeypatch
+    ):
+        monkeypatch.setenv("SEER_LOG_FLUSH_BYTES", "16")
+        monkeypatch.setenv("SEER_LOG_TAIL_BYTES", "64")
+        seer = Seer(api_key="test-key")
+        with seer.monitor("chatty", stream_logs=True):
+            for i in range(100):
+                print(f"line {i}")
+                time.sleep(0.0005)
+
+        calls = [c.args[1] for c in mock_post.call_args_list if c.args[1].get("logs")]
+        ends = [c["logs_offset"] + len(c["logs"].encode("utf-8")) for c in calls]
+        assert max(ends) <= 300
+        assert calls[-1]["status"] == "success" and "line 99" in calls[-1]["logs"]
+
+    @patch("seerpy.seer.server_capabilities", return_value=frozenset())
+    @patch.object(Seer, "_post")
+    def test_old_server_gets_full_logs_in_final(self, mock_post, _caps):
+        seer = Seer(api_key="test-key")
+        with seer.monitor("legacy", stream_logs=True):
+            time.sleep(0.02)
+            print("all of it")
+
+        final = mock_post.call_args_list[-1].args[1]
+        assert "all of it" in final["logs"]
+        assert "logs_offset" not in final
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import threading
+import time
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -11,7 +13,8 @@ celery = pytest.importorskip("celery")
 from celery import Celery
 
 from seerpy import Seer
-from seerpy.integrations.celery import SeerTask, set_default_seer
+from seerpy.integrations import celery as seer_celery
+from seerpy.integrations.celery import RunIdMap, SeerTask, set_default_seer
 
 
 @pytest.fixture
@@ -39,3 +42,73 @@ def test_seer_task_wraps_monitor(eager_app, monkeypatch):
         mock_monitor.assert_called()
         args, kwargs = mock_monitor.call_args
         assert args[0] == "tests.add"
+
+
+@pytest.fixture
+def signal_seer(monkeypatch):
+    seer = Seer(api_key="test-key", auto_replay=False)
+    seer_celery.connect_seer_signals(seer)
+    monkeypatch.setattr(seer_celery, "_DISPATCHER", None)
+    yield seer
+    seer_celery._SIGNAL_SEER = None
+    if seer_celery._DISPATCHER is not None:
+        seer_celery._DISPATCHER.close(timeout=2)
+
+
+def test_signal_handlers_do_not_wait_on_the_network(eager_app, signal_seer):
+    release = threading.Event()
+    sent = []
+
+    def slow_post(path, payload, **kwargs):
+        release.wait(5)
+        sent.append((payload["status"], payload["run_id"], kwargs["idempotency_key"]))
+
+    @eager_app.task(name="tests.mul")
+    def mul(a, b):
+        return a * b
+
+    with patch.object(signal_seer, "_post", side_effect=slow_post):
+        started = time.monotonic()
+        assert mul.delay(2, 3).get() == 6
+        assert time.monotonic() - started < 1
+        release.set()
+        seer_celery._DISPATCHER.close(timeout=2)
+
+    assert [status for status, _run_id, _key in sent] == ["running", "success"]
+    assert sent[0][1] == sent[1][1] != ""
+    assert sent[0][2].endswith(":register") and sent[1][2].endswith(":complete")
+
+
+def test_failed_final_goes_to_the_offline_queue(eager_app, signal_seer):
+    eager_app.conf.task_eager_propagates = False  # propagating skips task_failure
+
+    @eager_app.task(name="tests.boom")
+    def boom():
+        raise ValueError("nope")
+
+    with patch.object(signal_seer, "_post", side_effect=ConnectionError("down")), patch.object(
+        signal_seer, "_queue"
+    ) as mock_queue:
+        with pytest.raises(ValueError):
+            boom.delay().get()
+        seer_celery._DISPATCHER.close(timeout=2)
+
+    payload, endpoint = mock_queue.call_args.args
+    assert (payload["status"], payload["error_details"]) == ("failed", "nope")
+    assert endpoint == "monitoring" and payload["run_id"]
+
+
+class TestRunIdMap:
+    def test_entries_expire(self):
+        ids = RunIdMap(ttl=0.01)
+        ids.put("t1", ("run", "key"))
+        time.sleep(0.02)
+        assert ids.pop("t1") is None
+
+    def test_oldest_entries_are_evicted_past_the_cap(self):
+        ids = RunIdMap(max_entries=2)
+        for n in range(3):
+            ids.put(f"t{n}", (f"run{n}", "key"))
+        assert len(ids) == 2
+        assert ids.pop("t0") is None
+        assert ids.pop("t2") == ("run2", "key")
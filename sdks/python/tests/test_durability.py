@@ -0,0 +1,124 @@
+"""Tests for queue durability modes and group commit."""
+
+from __future__ import annotations
+
+import os
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from seerpy.durability import Durability, GroupCommitter, get_durability
+from seerpy.payloads import get_queue_durability, queue_status, save_failed_payload
+from seerpy.storage import _atomic_write_json
+
+
+@pytest.fixture
+def queue_dir(queue_dir, monkeypatch):
+    monkeypatch.delenv("SEER_QUEUE_BACKEND", raising=False)
+    return queue_dir
+
+
+class TestModes:
+    def test_strict_syncs_file_then_directory(self, tmp_path):
+        target = tmp_path / "a.json"
+        with patch("seerpy.durability.os.fsync", wraps=os.fsync) as fsync, patch(
+            "seerpy.durability.fsync_dir"
+        ) as fsync_dir:
+            _atomic_write_json(str(target), {"n": 1}, Durability("strict"))
+        assert fsync.call_count == 1
+        fsync_dir.assert_called_once_with(str(tmp_path))
+        assert target.read_text(encoding="utf-8").startswith("{")
+
+    @pytest.mark.parametrize("backend", ["files", "log"])
+    def test_relaxed_never_fsyncs(self, queue_dir, monkeypatch, backend):
+        monkeypatch.setenv("SEER_QUEUE_DURABILITY", "relaxed")
+        monkeypatch.setenv("SEER_QUEUE_BACKEND", backend)
+        with patch("seerpy.durability.os.fsync") as fsync:
+            save_failed_payload({"job_name": "j"}, "monitoring")
+        fsync.assert_not_called()
+        assert queue_status().pending == 1
+
+    def test_unknown_mode_falls_back_to_strict(self, monkeypatch):
+        monkeypatch.setenv("SEER_QUEUE_DURABILITY", "yolo")
+        assert get_queue_durability() == "strict"
+        with pytest.raises(ValueError):
+            Durability("yolo")
+
+
+class TestGroupCommit:
+    def test_concurrent_writers_share_one_batch(self, tmp_path):
+        committer = GroupCommitter(window=0.05)
+        ready = threading.Barrier(8)
+        errors = []
+
+        def write(n):
+            committer.begin()
+            ready.wait()
+            fd = os.open(str(tmp_path / f"{n}.bin"), os.O_WRONLY | os.O_CREAT)
+            os.write(fd, b"x")
+            try:
+                committer.commit([(fd, str(tmp_path))])
+            except Exception as exc:
+                errors.append(exc)
+
+        threads = [threading.Thread(target=write, args=(n,)) for n in range(8)]
+        with patch("seerpy.durability.fsync_dir") as fsync_dir:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        assert errors == []
+        assert committer.batches == 1
+        fsync_dir.assert_called_once_with(str(tmp_path))
+
+    @pytest.mark.parametrize("backend", ["files", "log"])
+    def test_group_mode_enqueues_are_batched(self, queue_dir, monkeypatch, backend):
+        monkeypatch.setenv("SEER_QUEUE_DURABILITY", "group")
+        monkeypatch.setenv("SEER_QUEUE_BACKEND", backend)
+        committer = get_durability("group").committer
+        before = committer.batches
+
+        def enqueue(n):
+            for i in range(5):
+                save_failed_payload({"job_name": f"j{n}", "i": i}, "monitoring")
+
+        threads = [threading.Thread(target=enqueue, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert queue_status().pending == 40
+        assert 0 < committer.batches - before < 40
+
+    def test_failed_write_releases_its_slot(self, tmp_path):
+        durability = Durability("group", window=0.01)
+        with pytest.raises(RuntimeError):
+            with durability.deferred():
+                _atomic_write_json(str(tmp_path / "a.json"), {}, durability)
+                raise RuntimeError("boom")
+        assert durability.committer._writing == 0
+        before = durability.committer.batches
+        with durability.deferred():
+            _atomic_write_json(str(tmp_path / "b.json"), {}, durability)
+        # One batch for the file before its rename, one for the directory after.
+        assert durability.committer.batches - before == 2
+
+    def test_group_mode_syncs_a_file_before_publishing_it(self, queue_dir, monkeypatch):
+        monkeypatch.setenv("SEER_QUEUE_DURABILITY", "group")
+        events = []
+        real_fsync, real_replace = os.fsync, os.replace
+
+        def fsync(fd):
+            events.append("fsync")
+            real_fsync(fd)
+
+        def replace(src, dst):
+            events.append("replace")
+            real_replace(src, dst)
+
+        with patch("seerpy.durability.os.fsync", side_effect=fsync), patch(
+            "seerpy.storage.os.replace", side_effect=replace
+        ), patch("seerpy.durability.fsync_dir", side_effect=lambda d: events.append("dir")):
+            save_failed_payload({"job_name": "j"}, "monitoring")
+        assert events == ["fsync", "replace", "dir"]
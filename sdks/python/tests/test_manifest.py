@@ -0,0 +1,152 @@
+"""Tests for the queue manifest index, paginated iteration, and backlog summary."""
+
+from __future__ import annotations
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from seerpy.payloads import (
+    _queue_storage,
+    backlog_summary,
+    iter_dead,
+    iter_pending,
+    list_dead_letters,
+    queue_status,
+    save_failed_payload,
+)
+from seerpy import storage as storage_module
+from seerpy.storage import FileQueueStorage
+
+
+@pytest.fixture(params=["files", "log", "sqlite"])
+def queue_dir(request, queue_dir, monkeypatch):
+    monkeypatch.setenv("SEER_QUEUE_BACKEND", request.param)
+    return queue_dir
+
+
+@pytest.fixture
+def file_queue(tmp_path, monkeypatch):
+    path = tmp_path / "queue"
+    path.mkdir()
+    monkeypatch.setenv("SEER_QUEUE_DIR", str(path))
+    monkeypatch.delenv("SEER_QUEUE_BACKEND", raising=False)
+    return path
+
+
+def _envelope(job, created_at="2026-01-01T00:00:00+00:00", endpoint="monitoring"):
+    return {
+        "version": 3,
+        "endpoint": endpoint,
+        "base_url": "https://example.com",
+        "payload": {"job_name": job, "status": "failed"},
+        "created_at": created_at,
+        "attempts": 0,
+        "idempotency_key": f"k-{job}-{created_at}",
+    }
+
+
+def _bury_all(store):
+    for item in store.pending():
+        store.bury(item, store.claim(item))
+
+
+class TestIteration:
+    def test_iter_pending_pages_in_fifo_order(self, queue_dir):
+        for n in range(7):
+            save_failed_payload({"job_name": f"j{n % 2}", "n": n}, "monitoring")
+
+        items = list(iter_pending(page_size=3))
+        assert len(items) == 7
+        assert [i.order for i in items] == sorted(i.order for i in items)
+        assert [i.job_name for i in iter_pending(job_name="j1", page_size=2)] == ["j1"] * 3
+
+        resumed = list(iter_pending(after=items[3].order, page_size=2))
+        assert [i.key for i in resumed] == [i.key for i in items[4:]]
+
+    def test_age_and_endpoint_filters(self, queue_dir):
+        save_failed_payload({"job_name": "fresh"}, "heartbeat")
+        assert [i.job_name for i in iter_pending(newer_than=60)] == ["fresh"]
+        assert list(iter_pending(older_than=60)) == []
+        assert list(iter_pending(endpoint="monitoring")) == []
+
+    def test_iter_dead_and_backlog_summary(self, queue_dir):
+        store = _queue_storage(str(queue_dir))
+        for n in range(3):
+            store.append(_envelope("a", created_at=f"2026-01-0{n + 1}T00:00:00+00:00"))
+        store.append(_envelope("b", endpoint="heartbeat"))
+        _bury_all(store)
+        store.append(_envelope("a"))
+
+        dead = list(iter_dead(page_size=2))
+        assert [d["job_name"] for d in dead] == ["a", "a", "a", "b"]
+        assert [d["job_name"] for d in iter_dead(endpoint="heartbeat")] == ["b"]
+        assert len(list(iter_dead(job_name="a", after=dead[0]["file"], page_size=1))) == 2
+        assert list_dead_letters(job_name="b")[0]["status"] == "failed"
+
+        summary = {job.job_name: job for job in backlog_summary()}
+        assert (summary["a"].pending, summary["a"].dead) == (1, 3)
+        assert summary["a"].pending_bytes > 0 and summary["a"].dead_bytes > 0
+        assert (summary["b"].pending, summary["b"].dead) == (0, 1)
+        assert queue_status().dead == 4
+
+
+class TestFileManifest:
+    def test_status_and_dead_listing_do_not_touch_files(self, file_queue):
+        save_failed_payload({"job_name": "j"}, "monitoring")
+        store = FileQueueStorage(str(file_queue))
+        _bury_all(store)
+        save_failed_payload({"job_name": "j"}, "monitoring")
+        queue_status()
+
+        with patch("builtins.open", side_effect=AssertionError("opened a queue file")):
+            st = queue_status()
+            dead = list_dead_letters()
+        assert (st.pending, st.dead) == (1, 1)
+        assert dead[0]["job_name"] == "j"
+
+    def test_files_changed_behind_its_back_are_picked_up(self, file_queue):
+        save_failed_payload({"job_name": "j"}, "monitoring")
+        assert queue_status().pending == 1
+
+        legacy = file_queue / "20200101000000000000_heartbeat_legacy.json"
+        legacy.write_text(json.dumps({"job_name": "old"}), encoding="utf-8")
+        (file_queue / "dead" / "broken.json").write_text("{not json", encoding="utf-8")
+
+        st = queue_status()
+        assert (st.pending, st.dead) == (2, 1)
+        assert st.oldest_pending == legacy.name
+        assert list_dead_letters()[0]["error"]
+        assert list_dead_letters(job_name="j") == []
+
+        legacy.unlink()
+        assert queue_status().pending == 1
+
+    def test_unlocked_writer_during_our_write_is_not_lost(self, file_queue):
+        store = FileQueueStorage(str(file_queue))
+        foreign = file_queue / "20200101000000000000_heartbeat_cli.json"
+        real_publish = storage_module._publish
+
+        def publish_then_race(tmp_path, path, durability):
+            real_publish(tmp_path, path, durability)
+            # A writer that never takes .queue.lock (the CLI, older seerpy).
+            foreign.write_text(json.dumps(_envelope("cli")), encoding="utf-8")
+
+        with patch("seerpy.storage._publish", side_effect=publish_then_race):
+            store.append(_envelope("py"))
+
+        assert sorted(i.job_name for i in store.pending()) == ["cli", "py"]
+        assert store.stats()[0] == 2
+
+    def test_manifest_is_rebuilt_when_lost(self, file_queue):
+        for n in range(3):
+            save_failed_payload({"job_name": "j", "n": n}, "monitoring")
+        index = file_queue / "index"
+        for path in index.iterdir():
+            path.unlink()
+        index.rmdir()
+
+        fresh = FileQueueStorage(str(file_queue))
+        assert fresh.stats()[0] == 3
+        assert [i.job_name for i in fresh.pending()] == ["j"] * 3
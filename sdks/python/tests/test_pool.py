@@ -0,0 +1,97 @@
+"""Tests for the shared per-host connection pools."""
+
+from __future__ import annotations
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from seerpy import Seer, connection_stats, replay_failed_payloads, save_failed_payload
+from seerpy import pool as seer_pool
+from seerpy.pool import SessionPool
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        self.server.paths.append(self.path)
+        body = json.dumps({"ok": True}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.paths = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd, f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def fresh_pool(monkeypatch):
+    monkeypatch.setattr(seer_pool, "_POOL", None)
+    yield
+    seer_pool.get_session_pool().close()
+
+
+@pytest.fixture
+def queue_dir(queue_dir, monkeypatch):
+    monkeypatch.setenv("SEER_REPLAY_CONCURRENCY", "1")
+    return queue_dir
+
+
+class TestSessionPool:
+    def test_one_session_per_base_url(self):
+        pool = SessionPool(pool_size=2, keepalive=60)
+        assert pool.session("https://a.example/") is pool.session("https://a.example")
+        assert pool.session("https://a.example") is not pool.session("https://b.example")
+
+    def test_settings_come_from_the_environment(self, monkeypatch):
+        monkeypatch.setenv("SEER_HTTP_POOL_SIZE", "3")
+        monkeypatch.setenv("SEER_HTTP_KEEPALIVE", "0")
+        pool = SessionPool()
+        assert (pool.pool_size, pool.keepalive) == (3, 0)
+        assert pool.session("https://a.example").headers["Connection"] == "close"
+
+
+class TestConnectionReuse:
+    def test_replay_and_live_sends_share_connections(self, server, fresh_pool, queue_dir):
+        httpd, base = server
+        for n in range(5):
+            save_failed_payload({"job_name": "j", "run_id": f"r{n}"}, "monitoring", base_url=base)
+
+        result = replay_failed_payloads("key", base_url=base)
+        seer = Seer(api_key="key", base_url=base)
+        seer.heartbeat("worker")
+
+        assert result.sent == 5
+        stats = connection_stats()[base]
+        assert stats.requests == 6 == len(httpd.paths)
+        assert stats.connections == 1
+        assert stats.reused == 5
+
+    def test_idle_connections_are_dropped_but_counted(self, server, fresh_pool, monkeypatch):
+        httpd, base = server
+        monkeypatch.setenv("SEER_HTTP_KEEPALIVE", "0.01")
+        seer = Seer(api_key="key", base_url=base)
+        seer.heartbeat("worker")
+        threading.Event().wait(0.05)
+        seer.heartbeat("worker")
+
+        stats = connection_stats()[base]
+        assert (stats.requests, stats.connections, stats.reused) == (2, 2, 0)
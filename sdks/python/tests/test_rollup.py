@@ -0,0 +1,146 @@
+"""Tests for client-side run rollups."""
+
+from __future__ import annotations
+
+from contextlib import nullcontext
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from seerpy import AsyncSeer, Seer, replay_failed_payloads
+from seerpy.rollup import RunAggregator, percentile
+
+
+@pytest.fixture
+def queue_dir(queue_dir, monkeypatch):
+    monkeypatch.setenv("SEER_REPLAY_CONCURRENCY", "1")
+    return queue_dir
+
+
+@pytest.fixture(autouse=True)
+def rollup_capable():
+    with patch("seerpy.rollup.lacks_capability", return_value=False) as lacks:
+        yield lacks
+
+
+@pytest.fixture
+def seer():
+    client = Seer(api_key="test-key", rollup_interval=3600)
+    yield client
+    if client._rollups is not None:
+        client._rollups._stop.set()
+
+
+def test_async_client_accepts_rollup_interval():
+    client = AsyncSeer(api_key="test-key", rollup_interval=10)
+    assert client.rollup_interval == 10.0
+
+
+def test_percentile_is_nearest_rank():
+    values = [float(n) for n in range(1, 101)]
+    assert (percentile(values, 50), percentile(values, 95), percentile(values, 100)) == (
+        50.0, 95.0, 100.0,
+    )
+    assert percentile([], 50) == 0.0
+    assert percentile([7.0], 99) == 7.0
+
+
+def test_monitor_rollup_ships_one_event_per_job(seer):
+    with patch.object(seer, "_post") as mock_post:
+        for n in range(10):
+            with pytest.raises(RuntimeError) if n == 3 else nullcontext():
+                with seer.monitor("hot", rollup=True, tags=["fast"]):
+                    if n == 3:
+                        raise RuntimeError("boom")
+        with seer.monitor("other", rollup=True):
+            pass
+        mock_post.assert_not_called()
+        seer.flush_events()
+
+    by_job = {call.args[1]["job_name"]: call for call in mock_post.call_args_list}
+    assert set(by_job) == {"hot", "other"}
+    hot = by_job["hot"]
+    assert hot.args[0] == "/rollup"
+    payload = hot.args[1]
+    assert (payload["count"], payload["successes"], payload["failures"]) == (10, 9, 1)
+    assert payload["tags"] == ["fast"]
+    assert payload["window_start"] <= payload["window_end"]
+    durations = payload["duration_ms"]
+    assert 0 <= durations["p50"] <= durations["p95"] <= durations["p99"] <= durations["max"]
+
+
+def test_unsent_rollup_is_queued_and_replayed_with_its_key(seer, queue_dir):
+    with patch.object(seer, "_post", side_effect=ConnectionError("down")) as mock_post:
+        with seer.monitor("hot", rollup=True):
+            pass
+        seer.flush_events()
+    key = mock_post.call_args.kwargs["idempotency_key"]
+
+    with patch("seerpy.payloads.post_with_backoff") as replay_post:
+        replay_post.return_value = MagicMock(status_code=200)
+        result = replay_failed_payloads("test-key", base_url=seer.base_url)
+
+    assert result.sent == 1
+    url, payload, headers = replay_post.call_args.args[:3]
+    assert url.endswith("/rollup") and payload["count"] == 1
+    assert headers["Idempotency-Key"] == key
+
+
+def test_close_queues_what_its_timeout_leaves_no_time_for(seer, queue_dir):
+    with patch.object(seer, "_post") as mock_post:
+        with seer.monitor("hot", rollup=True):
+            pass
+        seer._rollups.close(timeout=0)
+    mock_post.assert_not_called()
+    assert len(list(queue_dir.glob("*.json"))) == 1
+
+
+def test_windows_are_dropped_once_the_server_lacks_rollups(seer, rollup_capable):
+    rollups = seer._rollup_aggregator()
+    rollups.record("hot", "success", 0.1)
+    rollup_capable.return_value = True
+    with patch.object(seer, "_post") as mock_post:
+        assert rollups.flush() == 0
+    mock_post.assert_not_called()
+    assert rollups.unsupported
+
+
+def test_runs_are_sent_one_by_one_without_rollups(seer, queue_dir):
+    seer._rollup_aggregator().unsupported = True
+    with patch.object(seer, "_post") as mock_post:
+        with seer.monitor("hot", rollup=True):
+            pass
+    assert [c.args[0] for c in mock_post.call_args_list] == ["/monitoring"]
+    assert mock_post.call_args.args[1]["status"] == "success"
+    assert not list(queue_dir.glob("*.json"))
+
+
+def test_samples_stay_bounded():
+    aggregator = RunAggregator(MagicMock(_batcher=None), interval=3600, max_samples=10)
+    try:
+        for n in range(1000):
+            aggregator.record("hot", "success", n / 1000)
+        window = aggregator._windows["hot"]
+        assert window.count == 1000 and len(window.samples) == 10
+        assert window.max_ms == pytest.approx(999.0)
+    finally:
+        aggregator._stop.set()
+
+
+def test_rollups_go_through_the_batcher_when_batching(queue_dir):
+    seer = Seer(api_key="test-key", batch_events=True, batch_interval=3600, rollup_interval=3600)
+    with patch.object(seer._batcher, "add") as mock_add:
+        with seer.monitor("hot", rollup=True):
+            pass
+        seer._rollups.flush()
+    seer._rollups._stop.set()
+    endpoint, payload = mock_add.call_args.args
+    assert endpoint == "rollup" and payload["count"] == 1
+    assert mock_add.call_args.kwargs["queue_key"] == mock_add.call_args.kwargs["idempotency_key"]
+
+
+def test_rollup_rejects_per_run_options(seer):
+    with pytest.raises(ValueError):
+        with seer.monitor("hot", rollup=True, capture_logs=True):
+            pass
+
@@ -0,0 +1,89 @@
+"""Tests for sampling of monitored runs."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from seerpy import AsyncSeer, SamplingPolicy, Seer
+
+
+def _decisions(policy, statuses, job="job"):
+    return [policy.keep(job, status) for status in statuses]
+
+
+class TestSamplingPolicy:
+    def test_keeps_one_in_n_successes(self):
+        policy = SamplingPolicy(keep_every=3)
+        assert _decisions(policy, ["success"] * 7) == [
+            True, False, False, True, False, False, True,
+        ]
+
+    def test_keeps_failures_and_the_first_success_after(self):
+        policy = SamplingPolicy(keep_every=100)
+        statuses = ["success", "success", "failed", "cancelled", "success", "success"]
+        assert _decisions(policy, statuses) == [True, False, True, True, True, False]
+
+    def test_counts_each_job_separately(self):
+        policy = SamplingPolicy(keep_every=2)
+        assert policy.keep("a", "success") and policy.keep("b", "success")
+        assert not policy.keep("a", "success")
+
+    def test_failures_and_recovery_can_be_sampled_too(self):
+        policy = SamplingPolicy(keep_every=2, keep_failures=False, keep_recovery=False)
+        assert _decisions(policy, ["success", "failed", "success"]) == [True, False, False]
+
+    def test_rejects_keep_every_below_one(self):
+        with pytest.raises(ValueError):
+            SamplingPolicy(keep_every=0)
+
+
+class TestMonitorSampling:
+    def test_unsampled_runs_touch_neither_network_nor_disk(self, queue_dir):
+        seer = Seer(api_key="test-key")
+        policy = SamplingPolicy(keep_every=3)
+        with patch.object(seer, "_post") as mock_post, patch.object(seer, "_queue") as mock_queue:
+            for _ in range(3):
+                with seer.monitor("hot", sampling=policy):
+                    pass
+
+        sent = [call.args[1]["status"] for call in mock_post.call_args_list]
+        assert sent == ["success"]
+        mock_queue.assert_not_called()
+        assert list(queue_dir.iterdir()) == []
+
+    def test_failed_run_is_reported_and_queued_when_offline(self, queue_dir):
+        seer = Seer(api_key="test-key")
+        policy = SamplingPolicy(keep_every=100)
+        with patch.object(seer, "_post", side_effect=ConnectionError("down")), patch.object(
+            seer, "_queue"
+        ) as mock_queue:
+            with pytest.raises(RuntimeError):
+                with seer.monitor("hot", sampling=policy):
+                    raise RuntimeError("boom")
+
+        payload = mock_queue.call_args.args[0]
+        assert payload["status"] == "failed" and payload["start_time"]
+
+    def test_stream_logs_is_rejected(self):
+        seer = Seer(api_key="test-key")
+        with pytest.raises(ValueError):
+            with seer.monitor("hot", stream_logs=True, sampling=SamplingPolicy()):
+                pass
+
+    def test_amonitor_samples_too(self, queue_dir):
+        async def run():
+            seer = AsyncSeer(api_key="test-key")
+            policy = SamplingPolicy(keep_every=2)
+            with patch.object(seer, "_apost", new_callable=AsyncMock) as mock_post:
+                for _ in range(3):
+                    async with seer.amonitor("hot", sampling=policy):
+                        pass
+            return mock_post
+
+        mock_post = asyncio.run(run())
+        assert [call.args[1]["status"] for call in mock_post.call_args_list] == [
+            "success", "success",
+        ]
@@ -2,20 +2,40 @@
 
 from __future__ import annotations
 
+import gzip
 import json
 import logging
+import os
+import threading
+import time
+import uuid
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
 import requests
+from filelock import FileLock
 
 from seerpy import Seer
-from seerpy.http import compute_backoff_delay, parse_json_response, post_with_backoff
+from seerpy import http as seer_http
+from seerpy.backoff import ReplaySchedule
+from seerpy.http import (
+    DeadlineExceeded,
+    compute_backoff_delay,
+    parse_json_response,
+    post_with_backoff,
+)
+from seerpy.storage import QueueItem, QueueStorage, _load_envelope
 from seerpy.payloads import (
     DEFAULT_BASE_URL,
+    ReplayResult,
+    _env_float,
+    _sharded_replay,
+    enforce_queue_limits,
+    new_run_id,
     queue_status,
     replay_failed_payloads,
+    replay_shard,
     retry_dead,
     save_failed_payload,
 )
@@ -111,10 +131,206 @@ class TestPostWithBackoff:
         assert mock_sleep.call_args_list[0].args[0] == 2.5
 
 
+class TestDeadlines:
+    @patch("seerpy.http.requests.post")
+    def test_connect_and_read_timeouts_are_separate(self, mock_post):
+        mock_post.return_value = _mock_response(payload={"ok": True})
+        post_with_backoff("https://example.com/x", {}, {}, timeout=30, connect_timeout=2)
+        assert mock_post.call_args.kwargs["timeout"] == (2, 30)
+
+    @patch("seerpy.http.requests.post")
+    def test_attempt_timeouts_shrink_to_the_deadline(self, mock_post):
+        mock_post.return_value = _mock_response(payload={"ok": True})
+        post_with_backoff("https://example.com/x", {}, {}, timeout=30, deadline=1.5)
+        connect, read = mock_post.call_args.kwargs["timeout"]
+        assert 0 < connect <= 1.5 and 0 < read <= 1.5
+
+    @patch("seerpy.http.time.sleep")
+    @patch("seerpy.http.requests.post")
+    def test_no_retry_whose_backoff_overruns_the_deadline(self, mock_post, mock_sleep, monkeypatch):
+        monkeypatch.setenv("SEER_BREAKER_THRESHOLD", "0")
+        mock_post.side_effect = requests.exceptions.ConnectionError("down")
+        with pytest.raises(DeadlineExceeded):
+            post_with_backoff(
+                "https://example.com/x", {}, {}, base_delay=10, max_delay=10, deadline=0.5,
+                rng=MagicMock(uniform=MagicMock(return_value=5.0)),
+            )
+        assert mock_post.call_count == 1
+        mock_sleep.assert_not_called()
+
+    def test_monitor_budgets_queue_what_does_not_fit(self, queue_dir):
+        seer = Seer(api_key="test-key")
+        calls = []
+
+        def slow_register(path, payload, **kwargs):
+            calls.append((payload["status"], kwargs.get("deadline")))
+            if payload["status"] == "running":
+                threading.Event().wait(1.0)
+
+        with patch.object(seer, "_post", side_effect=slow_register), patch.object(
+            seer, "_queue"
+        ) as mock_queue:
+            started = time.monotonic()
+            with seer.monitor("job", start_budget=2, finish_budget=0.1):
+                pass
+            assert time.monotonic() - started < 0.8
+
+        assert calls == [("running", 2)]  # the final was queued, not sent inline
+        assert mock_queue.call_args.args[0]["status"] == "success"
+
+    def test_final_gets_what_is_left_of_the_finish_budget(self):
+        seer = Seer(api_key="test-key")
+        with patch.object(seer, "_post") as mock_post:
+            with seer.monitor("job", finish_budget=5):
+                pass
+        deadline = mock_post.call_args_list[-1].kwargs["deadline"]
+        assert 0 < deadline <= 5
+
+
+@pytest.fixture
+def fresh_capabilities():
+    seer_http._CAPABILITIES.clear()
+    yield
+    seer_http._CAPABILITIES.clear()
+
+
+class TestGzipBodies:
+    big = {"job_name": "j", "logs": "line of output\n" * 1000}
+
+    @patch("seerpy.http.requests.get")
+    @patch("seerpy.http.requests.post")
+    def test_large_body_is_gzipped_when_server_supports_it(
+        self, mock_post, mock_get, fresh_capabilities
+    ):
+        mock_get.return_value = _mock_response(payload={"capabilities": ["batch", "gzip"]})
+        mock_post.return_value = _mock_response(payload={"ok": True})
+        post_with_backoff("https://example.com/monitoring", self.big, {})
+        post_with_backoff("https://example.com/heartbeat", self.big, {})
+
+        assert mock_get.call_count == 1
+        assert mock_get.call_args.args[0] == "https://example.com/health"
+        kwargs = mock_post.call_args.kwargs
+        assert kwargs["headers"]["Content-Encoding"] == "gzip"
+        assert json.loads(gzip.decompress(kwargs["data"])) == self.big
+
+    @patch("seerpy.http.requests.get")
+    @patch("seerpy.http.requests.post")
+    def test_small_bodies_and_old_servers_get_plain_json(
+        self, mock_post, mock_get, fresh_capabilities
+    ):
+        mock_get.return_value = _mock_response(payload={"status": "ok"})
+        mock_post.return_value = _mock_response(payload={"ok": True})
+        post_with_backoff("https://example.com/monitoring", {"job_name": "j"}, {})
+        mock_get.assert_not_called()
+        post_with_backoff("https://example.com/monitoring", self.big, {})
+
+        kwargs = mock_post.call_args.kwargs
+        assert "Content-Encoding" not in kwargs["headers"]
+        assert json.loads(kwargs["data"]) == self.big
+
+    @patch("seerpy.http.requests.get")
+    @patch("seerpy.http.requests.post")
+    def test_415_falls_back_to_plain_and_is_remembered(
+        self, mock_post, mock_get, fresh_capabilities
+    ):
+        mock_get.return_value = _mock_response(payload={"capabilities": ["gzip"]})
+        mock_post.side_effect = [
+            _mock_response(status_code=415, text="unsupported"),
+            _mock_response(payload={"ok": True}),
+            _mock_response(payload={"ok": True}),
+        ]
+        post_with_backoff("https://example.com/monitoring", self.big, {})
+        post_with_backoff("https://example.com/monitoring", self.big, {})
+
+        encodings = [c.kwargs["headers"].get("Content-Encoding") for c in mock_post.call_args_list]
+        assert encodings == ["gzip", None, None]
+        assert mock_get.call_count == 1
+
+    @patch("seerpy.http.requests.get")
+    @patch("seerpy.http.requests.post")
+    def test_capability_probe_is_bounded_by_the_deadline(
+        self, mock_post, mock_get, fresh_capabilities
+    ):
+        mock_get.return_value = _mock_response(payload={"capabilities": ["gzip"]})
+        mock_post.return_value = _mock_response(payload={"ok": True})
+        post_with_backoff("https://example.com/monitoring", self.big, {}, deadline=2)
+
+        assert mock_get.call_args.kwargs["timeout"] <= 1
+        assert mock_post.call_args.kwargs["headers"]["Content-Encoding"] == "gzip"
+
+    @patch("seerpy.http.requests.get")
+    @patch("seerpy.http.requests.post")
+    def test_nearly_spent_deadline_skips_the_probe(
+        self, mock_post, mock_get, fresh_capabilities
+    ):
+        mock_post.return_value = _mock_response(payload={"ok": True})
+        post_with_backoff("https://example.com/monitoring", self.big, {}, deadline=0.5)
+
+        mock_get.assert_not_called()
+        assert "Content-Encoding" not in mock_post.call_args.kwargs["headers"]
+
+    @patch("seerpy.http.requests.post")
+    def test_threshold_zero_disables_compression(
+        self, mock_post, fresh_capabilities, monkeypatch
+    ):
+        monkeypatch.setenv("SEER_GZIP_MIN_BYTES", "0")
+        mock_post.return_value = _mock_response(payload={"ok": True})
+        post_with_backoff("https://example.com/monitoring", self.big, {})
+        assert "Content-Encoding" not in mock_post.call_args.kwargs["headers"]
+
+
+    @patch("seerpy.http.requests.get")
+    def test_only_a_server_that_answered_lacks_a_capability(self, mock_get, fresh_capabilities):
+        mock_get.side_effect = requests.exceptions.ConnectionError("down")
+        assert not seer_http.lacks_capability("https://down.example.com", "rollup")
+
+        mock_get.side_effect = None
+        mock_get.return_value = _mock_response(payload={"capabilities": ["gzip"]})
+        assert seer_http.lacks_capability("https://old.example.com", "rollup")
+        assert not seer_http.lacks_capability("https://old.example.com", "gzip")
+
+class TestQueueStorage:
+    def test_backends_must_implement_the_queue_methods(self, tmp_path):
+        class Partial(QueueStorage):
+            def append(self, envelope, *, name=None):
+                return ""
+
+        with pytest.raises(TypeError):
+            Partial(str(tmp_path))
+
+
+class TestEnvFloat:
+    @pytest.mark.parametrize(
+        "raw, expected",
+        [(None, 2.5), ("", 2.5), (" 7.5 ", 7.5), ("soon", 2.5), ("-3", 0.0), ("0", 0.0)],
+    )
+    def test_parses_and_clamps(self, raw, expected, monkeypatch):
+        if raw is None:
+            monkeypatch.delenv("SEER_TEST_FLOAT", raising=False)
+        else:
+            monkeypatch.setenv("SEER_TEST_FLOAT", raw)
+        assert _env_float("SEER_TEST_FLOAT", 2.5, 0.0) == expected
+
+
+class TestRunIds:
+    def test_uuid7_layout(self):
+        value = uuid.UUID(new_run_id())
+        assert value.version == 7
+        assert value.variant == uuid.RFC_4122
+
+    def test_time_ordered(self):
+        import time
+
+        first = new_run_id()
+        time.sleep(0.002)
+        second = new_run_id()
+        assert first < second
+
+
 class TestMonitor:
     @patch.object(Seer, "_post")
     def test_success_path(self, mock_post):
-        start = _mock_response(payload={"run_id": "run-1"})
+        start = _mock_response(payload={"run_id": "ignored"})
         finish = _mock_response(payload={"ok": True})
         mock_post.side_effect = [start, finish]
 
@@ -126,9 +342,35 @@ class TestMonitor:
         start_payload = mock_post.call_args_list[0].args[1]
         finish_payload = mock_post.call_args_list[1].args[1]
         assert start_payload["status"] == "running"
+        assert start_payload["run_id"]
         assert finish_payload["status"] == "success"
-        assert finish_payload["run_id"] == "run-1"
+        assert finish_payload["run_id"] == start_payload["run_id"]
         assert finish_payload["tags"] == ["etl"]
+        start_key = mock_post.call_args_list[0].kwargs["idempotency_key"]
+        finish_key = mock_post.call_args_list[1].kwargs["idempotency_key"]
+        assert start_key.endswith(":register")
+        assert finish_key == start_key.replace(":register", ":complete")
+
+    @patch.object(Seer, "_post")
+    def test_job_starts_before_register_returns(self, mock_post):
+        import threading
+
+        release = threading.Event()
+        entered = []
+
+        def slow_start(path, payload, **kwargs):
+            if payload["status"] == "running":
+                release.wait(timeout=2)
+            return _mock_response(payload={"ok": True})
+
+        mock_post.side_effect = slow_start
+        seer = Seer(api_key="test-key")
+        with seer.monitor("job"):
+            entered.append(True)
+            release.set()
+
+        assert entered == [True]
+        assert mock_post.call_count == 2
 
     @patch.object(Seer, "_post")
     def test_user_exception_propagates_and_marks_failed(self, mock_post):
@@ -160,7 +402,20 @@ class TestMonitor:
         assert envelope["payload"]["status"] == "success"
         assert envelope["payload"]["job_name"] == "offline-job"
         assert "hello offline" in (envelope["payload"]["logs"] or "")
-        assert envelope["payload"]["run_id"] == ""
+        assert envelope["payload"]["run_id"]
+        # The final is still tried live after the start failed.
+        assert mock_post.call_count == 2
+
+    @patch.object(Seer, "_post")
+    def test_failed_start_still_sends_the_final_live(self, mock_post, queue_dir):
+        mock_post.side_effect = [requests.exceptions.ConnectionError("blip"), None]
+
+        seer = Seer(api_key="test-key")
+        with seer.monitor("flaky-start"):
+            pass
+
+        assert mock_post.call_args_list[-1].args[1]["status"] == "success"
+        assert list(queue_dir.glob("*.json")) == []
 
     @patch.object(Seer, "_post")
     def test_completion_failure_does_not_mask_user_error(self, mock_post, queue_dir):
@@ -177,7 +432,7 @@ class TestMonitor:
 
         files = list(queue_dir.glob("*.json"))
         assert len(files) == 1
-        envelope = json.loads(files[0].read_text(encoding="utf-8"))
+        envelope = _load_envelope(str(files[0]))
         assert envelope["payload"]["status"] == "failed"
 
     @patch.object(Seer, "_post")
@@ -218,10 +473,43 @@ class TestQueueReplay:
         assert mock_post.call_count == 1
 
     @patch("seerpy.payloads.post_with_backoff")
-    def test_replay_offline_final_registers_then_completes(self, mock_post, queue_dir):
-        register = _mock_response(payload={"run_id": "assigned-1"})
-        complete = _mock_response(payload={"ok": True})
-        mock_post.side_effect = [register, complete]
+    def test_v4_envelope_compresses_large_payloads(self, mock_post, queue_dir):
+        mock_post.return_value = _mock_response(payload={"ok": True})
+        logs = "".join(f"INFO step {i} rows=1000 ok\n" for i in range(2000))
+        payload = {"job_name": "etl", "status": "failed", "run_id": "r1", "logs": logs}
+        path = Path(save_failed_payload(payload, "monitoring"))
+
+        raw = path.read_text(encoding="utf-8")
+        on_disk = json.loads(raw)
+        assert on_disk["version"] == 4
+        assert "payload" not in on_disk
+        assert len(raw) * 4 < len(logs)
+        assert _load_envelope(str(path))["payload"] == payload
+
+        replay_failed_payloads("key")
+        assert mock_post.call_args.args[1]["logs"] == logs
+
+    @patch("seerpy.payloads.post_with_backoff")
+    def test_v3_pretty_printed_envelope_still_replays(self, mock_post, queue_dir):
+        mock_post.return_value = _mock_response(payload={"ok": True})
+        legacy = {
+            "version": 3,
+            "endpoint": "heartbeat",
+            "base_url": "https://example.com",
+            "payload": {"job_name": "old"},
+            "created_at": "2026-01-01T00:00:00+00:00",
+            "attempts": 0,
+            "idempotency_key": "v3-key",
+        }
+        (queue_dir / "20260101000000000000_heartbeat_v3.json").write_text(
+            json.dumps(legacy, indent=2), encoding="utf-8"
+        )
+        assert replay_failed_payloads("key").sent == 1
+        assert mock_post.call_args.args[1] == {"job_name": "old"}
+
+    @patch("seerpy.payloads.post_with_backoff")
+    def test_replay_offline_final_sends_single_request(self, mock_post, queue_dir):
+        mock_post.return_value = _mock_response(payload={"ok": True})
 
         save_failed_payload(
             {
@@ -238,18 +526,13 @@ class TestQueueReplay:
 
         result = replay_failed_payloads("key")
         assert result.sent == 1
-        assert mock_post.call_count == 2
+        assert mock_post.call_count == 1
 
-        register_payload = mock_post.call_args_list[0].args[1]
-        complete_payload = mock_post.call_args_list[1].args[1]
-        assert register_payload["status"] == "running"
-        assert register_payload["run_id"] == ""
+        complete_payload = mock_post.call_args.args[1]
         assert complete_payload["status"] == "success"
-        assert complete_payload["run_id"] == "assigned-1"
+        assert uuid.UUID(complete_payload["run_id"]).version == 7
         assert complete_payload["logs"] == "offline logs"
-
-        assert mock_post.call_args_list[0].args[2]["Idempotency-Key"] == "offline-key:register"
-        assert mock_post.call_args_list[1].args[2]["Idempotency-Key"] == "offline-key:complete"
+        assert mock_post.call_args.args[2]["Idempotency-Key"] == "offline-key:complete"
 
     @patch("seerpy.payloads.post_with_backoff")
     def test_replay_sends_idempotency_header(self, mock_post, queue_dir):
@@ -300,9 +583,7 @@ class TestQueueReplay:
 
     @patch("seerpy.payloads.post_with_backoff")
     def test_legacy_raw_payload_still_replays(self, mock_post, queue_dir):
-        register = _mock_response(payload={"run_id": "legacy-run"})
-        complete = _mock_response(payload={"ok": True})
-        mock_post.side_effect = [register, complete]
+        mock_post.return_value = _mock_response(payload={"ok": True})
         legacy = queue_dir / "monitoring_20200101000000.json"
         legacy.write_text(
             json.dumps({"job_name": "legacy", "status": "success", "run_id": ""}),
@@ -312,7 +593,137 @@ class TestQueueReplay:
         result = replay_failed_payloads("key")
         assert result.sent == 1
         assert not legacy.exists()
-        assert mock_post.call_count == 2
+        assert mock_post.call_count == 1
+
+    @patch("seerpy.payloads.post_with_backoff")
+    def test_replay_runs_jobs_concurrently(self, mock_post, queue_dir):
+        import threading
+        import time
+
+        lock = threading.Lock()
+        active = [0]
+        peak = [0]
+
+        def slow_post(url, payload, headers, **kwargs):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+            return _mock_response(payload={"ok": True})
+
+        mock_post.side_effect = slow_post
+        for n in range(4):
+            save_failed_payload({"job_name": f"job-{n}", "run_id": f"r{n}"}, "monitoring")
+
+        result = replay_failed_payloads("key", concurrency=4)
+        assert result.sent == 4
+        assert peak[0] > 1
+        assert result.wall_time > 0
+        assert result.throughput == pytest.approx(result.sent / result.wall_time)
+
+    @patch("seerpy.payloads.post_with_backoff")
+    def test_replay_keeps_fifo_per_job_and_stops_lane_on_failure(self, mock_post, queue_dir):
+        sent = []
+
+        def post(url, payload, headers, **kwargs):
+            if payload.get("run_id") == "a2":
+                raise requests.exceptions.ConnectionError("down")
+            sent.append(payload["run_id"])
+            return _mock_response(payload={"ok": True})
+
+        mock_post.side_effect = post
+        for run_id in ("a1", "a2", "a3"):
+            save_failed_payload({"job_name": "a", "run_id": run_id}, "monitoring")
+        save_failed_payload({"job_name": "b", "run_id": "b1"}, "monitoring")
+
+        result = replay_failed_payloads("key", concurrency=2)
+        assert sorted(sent) == ["a1", "b1"]
+        assert result.sent == 2
+        assert result.failed == 1
+        remaining = sorted(
+            json.loads(p.read_text(encoding="utf-8"))["payload"]["run_id"]
+            for p in queue_dir.glob("*.json")
+        )
+        assert remaining == ["a2", "a3"]
+
+    @patch("seerpy.payloads.post_with_backoff")
+    def test_sharded_replay_drains_the_partitions_it_can_lock(self, mock_post, queue_dir):
+        mock_post.return_value = _mock_response(payload={"ok": True})
+        for n in range(8):
+            save_failed_payload({"job_name": f"job-{n}", "run_id": f"r{n}"}, "monitoring")
+        jobs = {f"job-{n}": replay_shard(QueueItem(key="", order="", job_name=f"job-{n}"), 2)
+                for n in range(8)}
+
+        with FileLock(str(queue_dir / ".replay.0-of-2.lock")):
+            partial = replay_failed_payloads("key", shards=2)
+            with FileLock(str(queue_dir / ".replay.1-of-2.lock")):
+                assert replay_failed_payloads("key", shards=2).skipped
+
+        assert not partial.skipped
+        assert partial.sent == sum(1 for shard in jobs.values() if shard == 1)
+        remaining = {
+            json.loads(p.read_text(encoding="utf-8"))["payload"]["job_name"]
+            for p in queue_dir.glob("*.json")
+        }
+        assert remaining == {job for job, shard in jobs.items() if shard == 0}
+
+    @patch("seerpy.payloads.post_with_backoff")
+    def test_sharded_and_unsharded_replays_never_overlap(self, mock_post, queue_dir):
+        mock_post.return_value = _mock_response(payload={"ok": True})
+        save_failed_payload({"job_name": "job", "run_id": "r1"}, "monitoring")
+
+        # The CLI and shards=1 hold .replay.lock exclusively.
+        with FileLock(str(queue_dir / ".replay.lock")):
+            assert replay_failed_payloads("key", shards=4).skipped
+        with _sharded_replay(str(queue_dir), 4, 0) as admitted:
+            assert admitted
+            assert replay_failed_payloads("key", shards=1).skipped
+
+        assert mock_post.call_count == 0
+        assert replay_failed_payloads("key", shards=4).sent == 1
+
+    @patch("seerpy.payloads.post_with_backoff")
+    def test_replays_with_different_shard_counts_never_overlap(self, mock_post, queue_dir):
+        mock_post.return_value = _mock_response(payload={"ok": True})
+        save_failed_payload({"job_name": "job", "run_id": "r1"}, "monitoring")
+
+        with _sharded_replay(str(queue_dir), 2, 0) as admitted:
+            assert admitted
+            assert replay_failed_payloads("key", shards=4).skipped
+            assert replay_failed_payloads("key", shards=2).sent == 1
+
+    @patch("seerpy.payloads.post_with_backoff")
+    def test_concurrent_sharded_replays_send_each_envelope_once(self, mock_post, queue_dir):
+        sent = []
+
+        def slow_post(url, payload, headers, **kwargs):
+            time.sleep(0.01)
+            sent.append(payload["run_id"])
+            return _mock_response(payload={"ok": True})
+
+        mock_post.side_effect = slow_post
+        for n in range(16):
+            save_failed_payload({"job_name": f"job-{n % 6}", "run_id": f"r{n}"}, "monitoring")
+
+        results = []
+        workers = [
+            threading.Thread(
+                target=lambda: results.append(
+                    replay_failed_payloads("key", shards=4, lock_timeout=0, concurrency=1)
+                )
+            )
+            for _ in range(3)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        leftover = replay_failed_payloads("key", shards=4)
+        assert sorted(sent) == sorted(f"r{n}" for n in range(16))
+        assert sum(r.sent for r in results) + leftover.sent == 16
 
     def test_fifo_eviction_by_max_files(self, queue_dir, monkeypatch):
         monkeypatch.setenv("SEER_QUEUE_MAX_FILES", "2")
@@ -341,6 +752,27 @@ class TestQueueReplay:
         assert second.exists()
         assert sum(f.stat().st_size for f in files) <= 800
 
+    def test_eviction_reads_manifest_not_directory(self, queue_dir):
+        for n in range(6):
+            save_failed_payload({"n": n}, "heartbeat")
+
+        with patch("seerpy.storage.os.listdir", wraps=os.listdir) as listdir:
+            assert enforce_queue_limits(max_files=2) == 4
+        assert listdir.call_count == 0
+        remaining = sorted(
+            json.loads(p.read_text(encoding="utf-8"))["payload"]["n"]
+            for p in queue_dir.glob("*.json")
+        )
+        assert remaining == [4, 5]
+
+    def test_enqueue_well_under_caps_skips_rescan(self, queue_dir):
+        save_failed_payload({"n": 0}, "heartbeat")
+        with patch("seerpy.storage.os.listdir", wraps=os.listdir) as listdir:
+            for n in range(1, 4):
+                save_failed_payload({"n": n}, "heartbeat")
+        assert listdir.call_count == 0
+        assert queue_status().pending == 4
+
     @patch.object(Seer, "replay")
     def test_auto_replay_on_init(self, mock_replay, monkeypatch):
         monkeypatch.setenv("SEER_REPLAY_JITTER_MS", "0")
@@ -377,6 +809,33 @@ class TestBackgroundReplay:
             seer.stop_background_replay()
             assert seer._bg_thread is None
 
+    @patch.object(Seer, "replay")
+    def test_idle_flusher_wakes_on_enqueue(self, mock_replay, monkeypatch, queue_dir):
+        import time
+
+        monkeypatch.setenv("SEER_REPLAY_JITTER_MS", "0")
+        mock_replay.return_value = ReplayResult()  # drained: idle until max interval
+        seer = Seer(
+            api_key="test-key",
+            background_replay=True,
+            replay_interval=0.01,
+            replay_max_interval=60,
+        )
+        try:
+            deadline = time.time() + 1.0
+            while mock_replay.call_count < 1 and time.time() < deadline:
+                time.sleep(0.01)
+            time.sleep(0.1)
+            assert mock_replay.call_count == 1
+
+            save_failed_payload({"job_name": "j"}, "heartbeat")
+            deadline = time.time() + 1.0
+            while mock_replay.call_count < 2 and time.time() < deadline:
+                time.sleep(0.01)
+            assert mock_replay.call_count == 2
+        finally:
+            seer.stop_background_replay()
+
     @patch.object(Seer, "replay")
     def test_background_replay_off_by_default(self, mock_replay):
         seer = Seer(api_key="test-key")
@@ -386,6 +845,88 @@ class TestBackgroundReplay:
     def test_invalid_replay_interval(self):
         with pytest.raises(ValueError, match="replay_interval"):
             Seer(api_key="test-key", background_replay=True, replay_interval=0)
+        with pytest.raises(ValueError, match="replay_max_interval"):
+            Seer(api_key="test-key", replay_interval=60, replay_max_interval=30)
+
+
+class TestReplaySchedule:
+    def test_backs_off_while_failing_and_idles_when_drained(self):
+        schedule = ReplaySchedule(1, 8)
+        failing = ReplayResult(failed=2)
+        assert [schedule.next_delay(failing) for _ in range(4)] == [2, 4, 8, 8]
+        assert schedule.failing
+        assert schedule.next_delay(None) == 8  # a pass that raised counts as failing
+
+        assert schedule.next_delay(ReplayResult(sent=1, failed=1)) == 1  # progress, work left
+        assert not schedule.failing
+        assert schedule.next_delay(ReplayResult(skipped=True)) == 1
+        assert schedule.next_delay(ReplayResult(sent=3)) == 8  # drained
+        assert schedule.next_delay(ReplayResult()) == 8
+
+
+class TestHeartbeatCoalescer:
+    @patch.object(Seer, "_post")
+    def test_keeps_latest_per_job(self, mock_post, queue_dir):
+        mock_post.return_value = _mock_response(payload={"ok": True})
+        seer = Seer(api_key="test-key", coalesce_heartbeats=True, heartbeat_interval=60)
+        try:
+            for i in range(1000):
+                seer.heartbeat("worker-a", metadata={"i": i})
+                seer.heartbeat("worker-b", metadata={"i": i})
+            assert mock_post.call_count == 0
+            assert seer._coalescer.flush() == 2
+        finally:
+            seer._coalescer.close()
+
+        assert mock_post.call_count == 2
+        sent = {c.args[1]["job_name"]: c.args[1]["metadata"]["i"] for c in mock_post.call_args_list}
+        assert sent == {"worker-a": 999, "worker-b": 999}
+        assert not list(queue_dir.glob("*.json"))
+
+    @patch.object(Seer, "_post")
+    def test_failed_flush_retries_in_memory_then_queues_on_close(self, mock_post, queue_dir):
+        mock_post.side_effect = requests.exceptions.ConnectionError("down")
+        seer = Seer(api_key="test-key", coalesce_heartbeats=True, heartbeat_interval=60)
+        for i in range(50):
+            seer.heartbeat("worker", metadata={"i": i})
+        assert seer._coalescer.flush() == 0
+        seer.heartbeat("worker", metadata={"i": "newer"})
+        assert seer._coalescer.flush() == 0
+        assert not list(queue_dir.glob("*.json"))
+
+        seer._coalescer.close()
+        files = list(queue_dir.glob("*.json"))
+        assert len(files) == 1
+        envelope = json.loads(files[0].read_text(encoding="utf-8"))
+        assert envelope["payload"]["metadata"] == {"i": "newer"}
+
+    @patch.object(Seer, "_post")
+    def test_close_is_bounded_by_its_timeout(self, mock_post, queue_dir):
+        seer = Seer(api_key="test-key", coalesce_heartbeats=True, heartbeat_interval=60)
+        seer.heartbeat("worker-a")
+        seer._coalescer.close(timeout=1.0)
+        assert 0 < mock_post.call_args.kwargs["deadline"] <= 1.0
+
+        seer = Seer(api_key="test-key", coalesce_heartbeats=True, heartbeat_interval=60)
+        seer.heartbeat("worker-b")
+        seer._coalescer.close(timeout=0)
+        assert mock_post.call_count == 1
+        assert len(list(queue_dir.glob("*.json"))) == 1
+
+    @patch.object(Seer, "_post")
+    def test_background_flush(self, mock_post, queue_dir):
+        import time
+
+        mock_post.return_value = _mock_response(payload={"ok": True})
+        seer = Seer(api_key="test-key", coalesce_heartbeats=True, heartbeat_interval=0.02)
+        try:
+            seer.heartbeat("worker")
+            deadline = time.time() + 1.0
+            while mock_post.call_count < 1 and time.time() < deadline:
+                time.sleep(0.01)
+            assert mock_post.call_count == 1
+        finally:
+            seer._coalescer.close()
 
 
 class TestInit:
@@ -0,0 +1,170 @@
+"""Tests for the segmented append-only log queue backend."""
+
+from __future__ import annotations
+
+import json
+from unittest.mock import patch
+
+import pytest
+import requests
+
+from seerpy.payloads import (
+    enforce_queue_limits,
+    queue_status,
+    replay_failed_payloads,
+    retry_dead,
+    save_failed_payload,
+)
+from seerpy.segment_log import SegmentLogStorage
+
+
+@pytest.fixture
+def queue_dir(queue_dir, monkeypatch):
+    monkeypatch.setenv("SEER_QUEUE_BACKEND", "log")
+    return queue_dir
+
+
+def _envelope(n, job="job"):
+    return {
+        "version": 3,
+        "endpoint": "monitoring",
+        "base_url": "https://example.com",
+        "payload": {"job_name": job, "run_id": f"r{n}"},
+        "created_at": "2026-01-01T00:00:00Z",
+        "attempts": 0,
+        "idempotency_key": f"k{n}",
+    }
+
+
+class TestSegmentLogQueue:
+    @patch("seerpy.payloads.post_with_backoff")
+    def test_save_status_and_replay(self, mock_post, queue_dir, mock_response):
+        mock_post.return_value = mock_response(payload={"ok": True})
+        for n in range(3):
+            save_failed_payload({"job_name": "j", "run_id": f"r{n}"}, "monitoring")
+
+        st = queue_status()
+        assert st.backend == "log"
+        assert st.pending == 3
+        assert st.pending_bytes > 0
+        assert not list(queue_dir.glob("*.json"))
+
+        result = replay_failed_payloads("key", concurrency=1)
+        assert result.sent == 3
+        assert [c.args[1]["run_id"] for c in mock_post.call_args_list] == ["r0", "r1", "r2"]
+        assert queue_status().pending == 0
+
+    @patch("seerpy.payloads.post_with_backoff")
+    def test_failure_keeps_fifo_slot_then_dead_letters(self, mock_post, queue_dir, monkeypatch):
+        monkeypatch.setenv("SEER_REPLAY_BACKOFF_BASE", "0")  # replay the failing host again
+        mock_post.side_effect = requests.exceptions.ConnectionError("down")
+        save_failed_payload({"job_name": "j", "run_id": "r1"}, "monitoring", idempotency_key="a")
+        save_failed_payload({"job_name": "j", "run_id": "r2"}, "monitoring", idempotency_key="b")
+
+        assert replay_failed_payloads("key", max_attempts=2).failed == 1
+        store = SegmentLogStorage(str(queue_dir))
+        assert [(i.job_name, i.attempts) for i in store.pending()] == [("j", 1), ("j", 0)]
+
+        assert replay_failed_payloads("key", max_attempts=2).dead_lettered == 1
+        dead = list((queue_dir / "dead").glob("*.json"))
+        assert len(dead) == 1
+        assert json.loads(dead[0].read_text(encoding="utf-8"))["payload"]["run_id"] == "r1"
+
+        assert retry_dead(all_dead=True, flush=False)["restored"] == 1
+        st = queue_status()
+        assert (st.pending, st.dead) == (2, 0)
+
+    def test_eviction_drops_oldest(self, queue_dir):
+        for n in range(5):
+            save_failed_payload({"n": n}, "heartbeat")
+        assert enforce_queue_limits(max_files=2) == 3
+        store = SegmentLogStorage(str(queue_dir))
+        remaining = [store.claim(i)["payload"]["n"] for i in store.pending()]
+        assert remaining == [3, 4]
+
+
+class TestSegmentLogStorage:
+    def test_other_instances_see_appends_and_acks(self, tmp_path):
+        writer = SegmentLogStorage(str(tmp_path))
+        reader = SegmentLogStorage(str(tmp_path))
+        writer.append(_envelope(1))
+        writer.append(_envelope(2))
+
+        items = reader.pending()
+        assert [reader.claim(i)["idempotency_key"] for i in items] == ["k1", "k2"]
+        reader.ack(items[0])
+        reader.release(items[1])
+        assert [i.key for i in writer.pending()] == [items[1].key]
+
+    def test_claims_are_shared_between_instances(self, tmp_path):
+        sender = SegmentLogStorage(str(tmp_path))
+        other = SegmentLogStorage(str(tmp_path))
+        sender.append(_envelope(1))
+        sender.append(_envelope(2))
+        first = sender.pending()[0]
+        envelope = sender.claim(first)
+
+        assert other.claim(first) is None
+        assert other.stats()[:2] == (1, 1)
+        assert other.evict(max_files=1, max_bytes=10**9) == []
+
+        sender.requeue(first, {**envelope, "attempts": 1})
+        assert [i.attempts for i in other.pending()] == [1, 0]
+
+    def test_eviction_skips_claims_without_sorting_the_queue(self, tmp_path):
+        store = SegmentLogStorage(str(tmp_path))
+        for n in range(4):
+            store.append(_envelope(n))
+        first = store.pending()[0]
+        store.claim(first)
+
+        with patch.object(store, "_unclaimed", side_effect=AssertionError):
+            assert store.evict(max_files=5, max_bytes=10**9) == []
+            evicted = store.evict(max_files=1, max_bytes=10**9)
+        assert len(evicted) == 2
+        assert [store.claim(i)["idempotency_key"] for i in store.pending()] == ["k3"]
+        assert first.key not in evicted
+
+    def test_lapsed_claim_returns_to_pending(self, tmp_path):
+        crashed = SegmentLogStorage(str(tmp_path), claim_lease=0)
+        crashed.append(_envelope(1))
+        crashed.claim(crashed.pending()[0])
+
+        other = SegmentLogStorage(str(tmp_path))
+        item = other.pending()[0]
+        assert other.claim(item)["idempotency_key"] == "k1"
+        assert crashed.stats()[:2] == (0, 1)
+
+    def test_torn_tail_is_truncated(self, tmp_path):
+        store = SegmentLogStorage(str(tmp_path))
+        store.append(_envelope(1))
+        segment = next((tmp_path / "log").glob("*.seg"))
+        intact = segment.stat().st_size
+        with open(segment, "ab") as handle:
+            handle.write(b"\x00\x00\x01\x00partial")
+
+        reopened = SegmentLogStorage(str(tmp_path))
+        assert len(reopened.pending()) == 1
+        assert segment.stat().st_size == intact
+        reopened.append(_envelope(2))
+        assert [reopened.claim(i)["idempotency_key"] for i in reopened.pending()] == ["k1", "k2"]
+
+    def test_compaction_deletes_settled_segments(self, tmp_path):
+        store = SegmentLogStorage(str(tmp_path), segment_bytes=300)
+        for n in range(6):
+            store.append(_envelope(n))
+        before = len(list((tmp_path / "log").glob("*.seg")))
+        assert before > 2
+
+        items = store.pending()
+        for item in items[:-1]:
+            store.claim(item)
+            store.ack(item)
+        store.compact()
+
+        segments = sorted((tmp_path / "log").glob("*.seg"))
+        offset = json.loads((tmp_path / "log" / "offset.json").read_text())
+        assert len(segments) < before
+        assert int(segments[0].stem) == offset["segment"]
+        reopened = SegmentLogStorage(str(tmp_path), segment_bytes=300)
+        assert [reopened.claim(i)["idempotency_key"] for i in reopened.pending()] == ["k5"]
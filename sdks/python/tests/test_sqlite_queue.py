@@ -0,0 +1,123 @@
+"""Tests for the SQLite queue backend and per-client backend selection."""
+
+from __future__ import annotations
+
+import sqlite3
+from unittest.mock import patch
+
+import pytest
+import requests
+
+from seerpy import Seer
+from seerpy.payloads import (
+    enforce_queue_limits,
+    list_dead_letters,
+    queue_status,
+    replay_failed_payloads,
+    retry_dead,
+    save_failed_payload,
+)
+from seerpy.sqlite_queue import SQLiteQueueStorage
+
+
+@pytest.fixture
+def queue_dir(queue_dir, monkeypatch):
+    monkeypatch.setenv("SEER_QUEUE_BACKEND", "sqlite")
+    return queue_dir
+
+
+def _rows(queue_dir, sql):
+    conn = sqlite3.connect(str(queue_dir / "queue.sqlite3"))
+    try:
+        return conn.execute(sql).fetchall()
+    finally:
+        conn.close()
+
+
+class TestSQLiteQueue:
+    @patch("seerpy.payloads.post_with_backoff")
+    def test_save_status_and_replay(self, mock_post, queue_dir, mock_response):
+        mock_post.return_value = mock_response(payload={"ok": True})
+        for n in range(3):
+            save_failed_payload({"job_name": "j", "run_id": f"r{n}"}, "monitoring")
+
+        assert _rows(queue_dir, "PRAGMA journal_mode") == [("wal",)]
+        st = queue_status()
+        assert (st.backend, st.pending, st.sending) == ("sqlite", 3, 0)
+        assert st.oldest_pending == "1"
+
+        result = replay_failed_payloads("key", concurrency=1)
+        assert result.sent == 3
+        assert [c.args[1]["run_id"] for c in mock_post.call_args_list] == ["r0", "r1", "r2"]
+        assert _rows(queue_dir, "SELECT COUNT(*) FROM envelopes") == [(0,)]
+
+    @patch("seerpy.payloads.post_with_backoff")
+    def test_attempts_dead_letter_filter_and_retry(self, mock_post, queue_dir, monkeypatch):
+        monkeypatch.setenv("SEER_REPLAY_BACKOFF_BASE", "0")  # replay the failing host again
+        mock_post.side_effect = requests.exceptions.ConnectionError("down")
+        save_failed_payload({"job_name": "a", "status": "failed"}, "monitoring")
+        save_failed_payload({"job_name": "b"}, "heartbeat")
+
+        replay_failed_payloads("key", max_attempts=2)
+        assert _rows(queue_dir, "SELECT job_name, attempts, state FROM envelopes ORDER BY id") == [
+            ("a", 1, "pending"),
+            ("b", 1, "pending"),
+        ]
+        assert replay_failed_payloads("key", max_attempts=2).dead_lettered == 2
+
+        st = queue_status()
+        assert (st.pending, st.dead) == (0, 2)
+        dead = list_dead_letters(job_name="a")
+        assert [(d["job_name"], d["status"], d["attempts"]) for d in dead] == [("a", "failed", 2)]
+        assert list_dead_letters(endpoint="heartbeat")[0]["job_name"] == "b"
+
+        assert retry_dead(filename=dead[0]["file"], flush=False)["restored"] == 1
+        st = queue_status()
+        assert (st.pending, st.dead) == (1, 1)
+
+    def test_eviction_is_fifo(self, queue_dir):
+        for n in range(5):
+            save_failed_payload({"n": n}, "heartbeat")
+        assert enforce_queue_limits(max_files=2) == 3
+        assert _rows(queue_dir, "SELECT id FROM envelopes ORDER BY id") == [(4,), (5,)]
+
+    def test_eviction_checks_caps_from_totals(self, tmp_path):
+        store = SQLiteQueueStorage(str(tmp_path))
+        for n in range(3):
+            store.append({"endpoint": "heartbeat", "payload": {"n": n}})
+        statements = []
+        store._conn.set_trace_callback(statements.append)
+
+        assert store.evict(max_files=5, max_bytes=10**9) == []
+        assert not [sql for sql in statements if "FROM envelopes" in sql]
+        assert len(store.evict(max_files=1, max_bytes=10**9)) == 2
+        assert store.stats()[0] == 1
+
+    def test_claim_is_exclusive_across_connections(self, tmp_path):
+        first = SQLiteQueueStorage(str(tmp_path))
+        second = SQLiteQueueStorage(str(tmp_path))
+        first.append({"endpoint": "heartbeat", "payload": {"job_name": "j"}})
+
+        item = second.pending()[0]
+        assert first.claim(item) is not None
+        assert second.claim(item) is None
+        assert second.stats()[:2] == (0, 1)
+        first.release(item)
+        assert second.claim(item)["payload"] == {"job_name": "j"}
+
+
+class TestBackendSelection:
+    @patch.object(Seer, "_post", side_effect=requests.exceptions.ConnectionError("down"))
+    def test_seer_queue_backend_overrides_env(self, _mock_post, tmp_path, monkeypatch):
+        monkeypatch.setenv("SEER_QUEUE_DIR", str(tmp_path))
+        monkeypatch.delenv("SEER_QUEUE_BACKEND", raising=False)
+        seer = Seer(api_key="test-key", queue_backend="sqlite")
+        seer.heartbeat("worker")
+
+        assert not list(tmp_path.glob("*.json"))
+        assert queue_status(backend="sqlite").pending == 1
+        assert queue_status().pending == 0
+
+    def test_rejects_unknown_backend(self):
+        with pytest.raises(ValueError):
+            Seer(api_key="test-key", queue_backend="redis")
@@ -46,8 +46,10 @@ func main() {
 	// Apply API-key auth only to ingest routes — not Group("/"), which would
 	// also lock the embedded UI behind Authorization headers.
 	authMW := auth.Middleware(cfg.APIKeys)
-	app.Post("/monitoring", authMW, srv.Monitoring)
-	app.Post("/heartbeat", authMW, srv.Heartbeat)
+	app.Post("/monitoring", authMW, api.DecompressRequest, srv.Monitoring)
+	app.Post("/heartbeat", authMW, api.DecompressRequest, srv.Heartbeat)
+	app.Post("/rollup", authMW, api.DecompressRequest, srv.Rollup)
+	app.Post("/batch", authMW, api.DecompressRequest, srv.Batch)
 	app.Get("/check_heartbeat", authMW, srv.CheckHeartbeat)
 
 	ent := app.Group("/enterprise", authMW)
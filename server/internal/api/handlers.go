@@ -1,7 +1,10 @@
 package api
 
 import (
+	"bytes"
+	"compress/gzip"
 	"encoding/json"
+	"io"
 	"log"
 	"strings"
 	"time"
@@ -20,6 +23,9 @@ type EventNotifier interface {
 	Notify(job models.Job, status string, run *models.Run)
 }
 
+// maxRunIDLen matches the Run.RunID column size; clients may assign their own ids.
+const maxRunIDLen = 64
+
 type Server struct {
 	DB       *gorm.DB
 	Notifier EventNotifier
@@ -36,6 +42,7 @@ type monitoringRequest struct {
 	ErrorDetails *string         `json:"error_details"`
 	Tags         json.RawMessage `json:"tags"`
 	Logs         *string         `json:"logs"`
+	LogsOffset   *int64          `json:"logs_offset"`
 }
 
 type heartbeatRequest struct {
@@ -45,58 +52,155 @@ type heartbeatRequest struct {
 	Tags        json.RawMessage `json:"tags"`
 }
 
+type rollupDurations struct {
+	P50 float64 `json:"p50"`
+	P95 float64 `json:"p95"`
+	P99 float64 `json:"p99"`
+	Max float64 `json:"max"`
+}
+
+type rollupRequest struct {
+	JobName     string          `json:"job_name"`
+	WindowStart *string         `json:"window_start"`
+	WindowEnd   *string         `json:"window_end"`
+	Count       int64           `json:"count"`
+	Successes   int64           `json:"successes"`
+	Failures    int64           `json:"failures"`
+	Cancelled   int64           `json:"cancelled"`
+	DurationMs  rollupDurations `json:"duration_ms"`
+	Tags        json.RawMessage `json:"tags"`
+}
+
+// maxBatchEvents caps how many events one /batch request may carry.
+const maxBatchEvents = 500
+
+type batchEvent struct {
+	Endpoint       string          `json:"endpoint"`
+	IdempotencyKey string          `json:"idempotency_key"`
+	Payload        json.RawMessage `json:"payload"`
+}
+
+type batchRequest struct {
+	Events []batchEvent `json:"events"`
+}
+
+// capabilities lists optional protocol features, so clients can probe /health
+// before using them and keep talking plain JSON to older servers.
+var capabilities = []string{"batch", "gzip", "logs_offset", "rollup"}
+
+// maxRunLogBytes caps the end offset of a chunk written with logs_offset.
+// /health advertises it as max_log_bytes so streaming clients stop before it.
+const maxRunLogBytes = 64 << 20
+
+// maxInflatedBody caps a decompressed request body (guards against gzip bombs).
+const maxInflatedBody = 32 << 20
+
 func (s *Server) Health(c *fiber.Ctx) error {
 	return c.JSON(fiber.Map{
-		"status":  "ok",
-		"edition": "community",
-		"version": version.Version,
+		"status":        "ok",
+		"edition":       "community",
+		"version":       version.Version,
+		"capabilities":  capabilities,
+		"max_log_bytes": maxRunLogBytes,
 	})
 }
 
+// DecompressRequest inflates gzip-encoded ingest bodies before the handler
+// parses them. Other encodings are rejected with 415, which clients take as
+// a cue to resend plain JSON.
+func DecompressRequest(c *fiber.Ctx) error {
+	encoding := strings.ToLower(strings.TrimSpace(c.Get(fiber.HeaderContentEncoding)))
+	switch encoding {
+	case "", "identity":
+		return c.Next()
+	case "gzip":
+	default:
+		return c.Status(fiber.StatusUnsupportedMediaType).JSON(fiber.Map{
+			"error": "unsupported content encoding",
+		})
+	}
+	zr, err := gzip.NewReader(bytes.NewReader(c.Request().Body()))
+	if err != nil {
+		return c.Status(fiber.StatusBadRequest).JSON(fiber.Map{"error": "invalid gzip body"})
+	}
+	defer zr.Close()
+	body, err := io.ReadAll(io.LimitReader(zr, maxInflatedBody+1))
+	if err != nil {
+		return c.Status(fiber.StatusBadRequest).JSON(fiber.Map{"error": "invalid gzip body"})
+	}
+	if len(body) > maxInflatedBody {
+		return c.Status(fiber.StatusRequestEntityTooLarge).JSON(fiber.Map{"error": "body too large"})
+	}
+	c.Request().SetBody(body)
+	c.Request().Header.Del(fiber.HeaderContentEncoding)
+	return c.Next()
+}
+
 func (s *Server) Monitoring(c *fiber.Ctx) error {
 	var req monitoringRequest
 	if err := c.BodyParser(&req); err != nil {
 		return c.Status(fiber.StatusBadRequest).JSON(fiber.Map{"error": "invalid json"})
 	}
+	status, body := s.ingestMonitoring(req, c.Get("Idempotency-Key"))
+	return c.Status(status).JSON(body)
+}
+
+// ingestMonitoring applies one monitoring event; shared by /monitoring and /batch.
+func (s *Server) ingestMonitoring(req monitoringRequest, idem string) (int, fiber.Map) {
 	req.JobName = strings.TrimSpace(req.JobName)
 	req.Status = strings.ToLower(strings.TrimSpace(req.Status))
 	if req.JobName == "" {
-		return c.Status(fiber.StatusBadRequest).JSON(fiber.Map{"error": "job_name required"})
+		return fiber.StatusBadRequest, fiber.Map{"error": "job_name required"}
 	}
 	if req.Status == "" {
-		return c.Status(fiber.StatusBadRequest).JSON(fiber.Map{"error": "status required"})
+		return fiber.StatusBadRequest, fiber.Map{"error": "status required"}
+	}
+	if req.LogsOffset != nil {
+		end := *req.LogsOffset
+		if req.Logs != nil {
+			end += int64(len(*req.Logs))
+		}
+		if *req.LogsOffset < 0 || end > maxRunLogBytes {
+			return fiber.StatusRequestEntityTooLarge, fiber.Map{"error": "logs_offset out of range", "max_bytes": maxRunLogBytes}
+		}
 	}
 
-	idem := strings.TrimSpace(c.Get("Idempotency-Key"))
-	idemBase := idempotencyBase(idem)
+	idemBase := idempotencyBase(strings.TrimSpace(idem))
 
 	job, err := s.ensureJob(req.JobName)
 	if err != nil {
-		return c.Status(fiber.StatusInternalServerError).JSON(fiber.Map{"error": err.Error()})
+		return fiber.StatusInternalServerError, fiber.Map{"error": err.Error()}
 	}
 
 	switch req.Status {
 	case "running":
-		return s.handleRunning(c, job, req, idemBase)
+		return s.handleRunning(job, req, idemBase)
 	case "success", "failed", "cancelled":
-		return s.handleTerminal(c, job, req, idemBase)
+		return s.handleTerminal(job, req, idemBase)
 	default:
-		return c.Status(fiber.StatusBadRequest).JSON(fiber.Map{"error": "unsupported status"})
+		return fiber.StatusBadRequest, fiber.Map{"error": "unsupported status"}
 	}
 }
 
-func (s *Server) handleRunning(c *fiber.Ctx, job models.Job, req monitoringRequest, idemBase string) error {
+func (s *Server) handleRunning(job models.Job, req monitoringRequest, idemBase string) (int, fiber.Map) {
 	runID := strings.TrimSpace(req.RunID)
 
 	// Progress update: running + run_id → upsert metadata/logs/tags only, no alert.
+	// An unknown run_id is a client-assigned id: register the run under it.
 	if runID != "" {
+		if len(runID) > maxRunIDLen {
+			return fiber.StatusBadRequest, fiber.Map{"error": "run_id too long"}
+		}
 		var run models.Run
-		err := s.DB.Where("run_id = ? AND job_id = ?", runID, job.ID).First(&run).Error
+		err := s.DB.Where("run_id = ?", runID).First(&run).Error
 		if err == gorm.ErrRecordNotFound {
-			return c.Status(fiber.StatusNotFound).JSON(fiber.Map{"error": "run not found", "run_id": runID})
+			return s.createRunningRun(job, req, runID, idemBase)
 		}
 		if err != nil {
-			return c.Status(fiber.StatusInternalServerError).JSON(fiber.Map{"error": err.Error()})
+			return fiber.StatusInternalServerError, fiber.Map{"error": err.Error()}
+		}
+		if run.JobID != job.ID {
+			return fiber.StatusConflict, fiber.Map{"error": "run_id belongs to another job", "run_id": runID}
 		}
 		if len(req.Metadata) > 0 && string(req.Metadata) != "null" {
 			run.MetadataJSON = string(req.Metadata)
@@ -104,27 +208,28 @@ func (s *Server) handleRunning(c *fiber.Ctx, job models.Job, req monitoringReque
 		if len(req.Tags) > 0 && string(req.Tags) != "null" {
 			run.TagsJSON = string(req.Tags)
 		}
-		if req.Logs != nil {
-			run.Logs = *req.Logs
-		}
+		run.Logs = applyLogs(run.Logs, req)
 		if err := s.DB.Save(&run).Error; err != nil {
-			return c.Status(fiber.StatusInternalServerError).JSON(fiber.Map{"error": err.Error()})
+			return fiber.StatusInternalServerError, fiber.Map{"error": err.Error()}
 		}
-		return c.JSON(fiber.Map{"run_id": run.RunID, "update_status": "Success"})
+		return fiber.StatusOK, fiber.Map{"run_id": run.RunID, "update_status": "Success"}
 	}
 
 	if idemBase != "" {
 		var existing models.Run
 		err := s.DB.Where("job_id = ? AND idempotency_key = ? AND status = ?", job.ID, idemBase, "running").First(&existing).Error
 		if err == nil {
-			return c.JSON(fiber.Map{"run_id": existing.RunID, "status": existing.Status})
+			return fiber.StatusOK, fiber.Map{"run_id": existing.RunID, "status": existing.Status}
 		}
 		if err != nil && err != gorm.ErrRecordNotFound {
-			return c.Status(fiber.StatusInternalServerError).JSON(fiber.Map{"error": err.Error()})
+			return fiber.StatusInternalServerError, fiber.Map{"error": err.Error()}
 		}
 	}
 
-	runID = uuid.NewString()
+	return s.createRunningRun(job, req, uuid.NewString(), idemBase)
+}
+
+func (s *Server) createRunningRun(job models.Job, req monitoringRequest, runID, idemBase string) (int, fiber.Map) {
 	start := parseFlexibleTime(req.StartTime)
 	run := models.Run{
 		JobID:          job.ID,
@@ -134,22 +239,20 @@ func (s *Server) handleRunning(c *fiber.Ctx, job models.Job, req monitoringReque
 		MetadataJSON:   rawOrEmpty(req.Metadata),
 		TagsJSON:       rawOrEmpty(req.Tags),
 		IdempotencyKey: idemBase,
-	}
-	if req.Logs != nil {
-		run.Logs = *req.Logs
+		Logs:           applyLogs("", req),
 	}
 	if err := s.DB.Create(&run).Error; err != nil {
 		var existing models.Run
 		if s.DB.Where("run_id = ?", runID).First(&existing).Error == nil {
-			return c.JSON(fiber.Map{"run_id": existing.RunID, "status": existing.Status})
+			return fiber.StatusOK, fiber.Map{"run_id": existing.RunID, "status": existing.Status}
 		}
-		return c.Status(fiber.StatusInternalServerError).JSON(fiber.Map{"error": err.Error()})
+		return fiber.StatusInternalServerError, fiber.Map{"error": err.Error()}
 	}
 	s.notifyAsync(job, "start", &run)
-	return c.JSON(fiber.Map{"run_id": run.RunID, "status": run.Status})
+	return fiber.StatusOK, fiber.Map{"run_id": run.RunID, "status": run.Status}
 }
 
-func (s *Server) handleTerminal(c *fiber.Ctx, job models.Job, req monitoringRequest, idemBase string) error {
+func (s *Server) handleTerminal(job models.Job, req monitoringRequest, idemBase string) (int, fiber.Map) {
 	if idemBase != "" {
 		var existing models.Run
 		err := s.DB.Where(
@@ -157,18 +260,21 @@ func (s *Server) handleTerminal(c *fiber.Ctx, job models.Job, req monitoringRequ
 			job.ID, idemBase, []string{"success", "failed", "cancelled"},
 		).First(&existing).Error
 		if err == nil {
-			return c.JSON(fiber.Map{
+			return fiber.StatusOK, fiber.Map{
 				"run_id":        existing.RunID,
 				"status":        existing.Status,
 				"update_status": "Success",
-			})
+			}
 		}
 		if err != nil && err != gorm.ErrRecordNotFound {
-			return c.Status(fiber.StatusInternalServerError).JSON(fiber.Map{"error": err.Error()})
+			return fiber.StatusInternalServerError, fiber.Map{"error": err.Error()}
 		}
 	}
 
 	runID := strings.TrimSpace(req.RunID)
+	if len(runID) > maxRunIDLen {
+		return fiber.StatusBadRequest, fiber.Map{"error": "run_id too long"}
+	}
 	var run models.Run
 	now := time.Now().UTC()
 	end := parseFlexibleTime(req.EndTime)
@@ -180,11 +286,6 @@ func (s *Server) handleTerminal(c *fiber.Ctx, job models.Job, req monitoringRequ
 	if req.ErrorDetails != nil {
 		errDetails = *req.ErrorDetails
 	}
-	logs := ""
-	if req.Logs != nil {
-		logs = *req.Logs
-	}
-
 	if runID != "" {
 		err := s.DB.Where("run_id = ?", runID).First(&run).Error
 		if err == nil {
@@ -195,23 +296,28 @@ func (s *Server) handleTerminal(c *fiber.Ctx, job models.Job, req monitoringRequ
 			}
 			run.MetadataJSON = rawOrEmpty(req.Metadata)
 			run.TagsJSON = rawOrEmpty(req.Tags)
-			run.Logs = logs
+			if req.LogsOffset != nil {
+				run.Logs = applyLogs(run.Logs, req)
+			} else {
+				run.Logs = applyLogs("", req)
+			}
 			run.ErrorDetails = errDetails
 			if idemBase != "" {
 				run.IdempotencyKey = idemBase
 			}
 			if err := s.DB.Save(&run).Error; err != nil {
-				return c.Status(fiber.StatusInternalServerError).JSON(fiber.Map{"error": err.Error()})
+				return fiber.StatusInternalServerError, fiber.Map{"error": err.Error()}
 			}
 			s.notifyAsync(job, req.Status, &run)
-			return c.JSON(fiber.Map{"run_id": run.RunID, "status": run.Status, "update_status": "Success"})
+			return fiber.StatusOK, fiber.Map{"run_id": run.RunID, "status": run.Status, "update_status": "Success"}
 		}
 		if err != gorm.ErrRecordNotFound {
-			return c.Status(fiber.StatusInternalServerError).JSON(fiber.Map{"error": err.Error()})
+			return fiber.StatusInternalServerError, fiber.Map{"error": err.Error()}
 		}
 	}
 
 	// Offline-friendly: create standalone terminal run when start never registered.
+	// Clients mint run ids up front, so a queued final arrives with its own id.
 	if runID == "" {
 		runID = uuid.NewString()
 	}
@@ -223,15 +329,39 @@ func (s *Server) handleTerminal(c *fiber.Ctx, job models.Job, req monitoringRequ
 		EndTime:        end,
 		MetadataJSON:   rawOrEmpty(req.Metadata),
 		TagsJSON:       rawOrEmpty(req.Tags),
-		Logs:           logs,
+		Logs:           applyLogs("", req),
 		ErrorDetails:   errDetails,
 		IdempotencyKey: idemBase,
 	}
 	if err := s.DB.Create(&run).Error; err != nil {
-		return c.Status(fiber.StatusInternalServerError).JSON(fiber.Map{"error": err.Error()})
+		return fiber.StatusInternalServerError, fiber.Map{"error": err.Error()}
 	}
 	s.notifyAsync(job, req.Status, &run)
-	return c.JSON(fiber.Map{"run_id": run.RunID, "status": run.Status, "update_status": "Success"})
+	return fiber.StatusOK, fiber.Map{"run_id": run.RunID, "status": run.Status, "update_status": "Success"}
+}
+
+// applyLogs returns a run's logs after the request. Without logs_offset the
+// request's logs replace what is stored (nil leaves them alone). With it,
+// the chunk is written at that byte offset, padding any gap with spaces, so
+// clients can ship long-running output in chunks that may be retried or
+// arrive out of order.
+func applyLogs(current string, req monitoringRequest) string {
+	if req.Logs == nil {
+		return current
+	}
+	if req.LogsOffset == nil {
+		return *req.Logs
+	}
+	offset := int(*req.LogsOffset)
+	chunk := *req.Logs
+	if offset > len(current) {
+		current += strings.Repeat(" ", offset-len(current))
+	}
+	end := offset + len(chunk)
+	if end >= len(current) {
+		return current[:offset] + chunk
+	}
+	return current[:offset] + chunk + current[end:]
 }
 
 func (s *Server) Heartbeat(c *fiber.Ctx) error {
@@ -239,13 +369,19 @@ func (s *Server) Heartbeat(c *fiber.Ctx) error {
 	if err := c.BodyParser(&req); err != nil {
 		return c.Status(fiber.StatusBadRequest).JSON(fiber.Map{"error": "invalid json"})
 	}
+	status, body := s.ingestHeartbeat(req)
+	return c.Status(status).JSON(body)
+}
+
+// ingestHeartbeat records one heartbeat; shared by /heartbeat and /batch.
+func (s *Server) ingestHeartbeat(req heartbeatRequest) (int, fiber.Map) {
 	req.JobName = strings.TrimSpace(req.JobName)
 	if req.JobName == "" {
-		return c.Status(fiber.StatusBadRequest).JSON(fiber.Map{"error": "job_name required"})
+		return fiber.StatusBadRequest, fiber.Map{"error": "job_name required"}
 	}
 	job, err := s.ensureJob(req.JobName)
 	if err != nil {
-		return c.Status(fiber.StatusInternalServerError).JSON(fiber.Map{"error": err.Error()})
+		return fiber.StatusInternalServerError, fiber.Map{"error": err.Error()}
 	}
 
 	seen := parseFlexibleTime(req.CurrentTime)
@@ -264,16 +400,16 @@ func (s *Server) Heartbeat(c *fiber.Ctx) error {
 			TagsJSON:     rawOrEmpty(req.Tags),
 		}
 		if err := s.DB.Create(&hb).Error; err != nil {
-			return c.Status(fiber.StatusInternalServerError).JSON(fiber.Map{"error": err.Error()})
+			return fiber.StatusInternalServerError, fiber.Map{"error": err.Error()}
 		}
 	} else if err != nil {
-		return c.Status(fiber.StatusInternalServerError).JSON(fiber.Map{"error": err.Error()})
+		return fiber.StatusInternalServerError, fiber.Map{"error": err.Error()}
 	} else {
 		hb.SeenAt = *seen
 		hb.MetadataJSON = rawOrEmpty(req.Metadata)
 		hb.TagsJSON = rawOrEmpty(req.Tags)
 		if err := s.DB.Save(&hb).Error; err != nil {
-			return c.Status(fiber.StatusInternalServerError).JSON(fiber.Map{"error": err.Error()})
+			return fiber.StatusInternalServerError, fiber.Map{"error": err.Error()}
 		}
 	}
 
@@ -283,7 +419,143 @@ func (s *Server) Heartbeat(c *fiber.Ctx) error {
 		_ = s.DB.Model(&job).Update("last_miss_alert_at", nil).Error
 	}
 
-	return c.JSON(fiber.Map{"ok": true, "job_name": job.Name, "seen_at": hb.SeenAt})
+	return fiber.StatusOK, fiber.Map{"ok": true, "job_name": job.Name, "seen_at": hb.SeenAt}
+}
+
+func (s *Server) Rollup(c *fiber.Ctx) error {
+	var req rollupRequest
+	if err := c.BodyParser(&req); err != nil {
+		return c.Status(fiber.StatusBadRequest).JSON(fiber.Map{"error": "invalid json"})
+	}
+	status, body := s.ingestRollup(req, c.Get("Idempotency-Key"))
+	return c.Status(status).JSON(body)
+}
+
+// ingestRollup stores one window summary; shared by /rollup and /batch. A
+// repeated Idempotency-Key (a replayed rollup) returns the stored row.
+func (s *Server) ingestRollup(req rollupRequest, idem string) (int, fiber.Map) {
+	req.JobName = strings.TrimSpace(req.JobName)
+	if req.JobName == "" {
+		return fiber.StatusBadRequest, fiber.Map{"error": "job_name required"}
+	}
+	start := parseFlexibleTime(req.WindowStart)
+	end := parseFlexibleTime(req.WindowEnd)
+	if start == nil || end == nil || end.Before(*start) {
+		return fiber.StatusBadRequest, fiber.Map{"error": "window_start and window_end required"}
+	}
+	if req.Count < 0 || req.Successes < 0 || req.Failures < 0 || req.Cancelled < 0 ||
+		req.Successes+req.Failures+req.Cancelled > req.Count {
+		return fiber.StatusBadRequest, fiber.Map{"error": "invalid counts"}
+	}
+
+	job, err := s.ensureJob(req.JobName)
+	if err != nil {
+		return fiber.StatusInternalServerError, fiber.Map{"error": err.Error()}
+	}
+	idem = strings.TrimSpace(idem)
+	if idem != "" {
+		var existing models.Rollup
+		err := s.DB.Where("job_id = ? AND idempotency_key = ?", job.ID, idem).First(&existing).Error
+		if err == nil {
+			return fiber.StatusOK, fiber.Map{"rollup_id": existing.ID, "count": existing.Count}
+		}
+		if err != gorm.ErrRecordNotFound {
+			return fiber.StatusInternalServerError, fiber.Map{"error": err.Error()}
+		}
+	}
+
+	rollup := models.Rollup{
+		JobID:          job.ID,
+		WindowStart:    *start,
+		WindowEnd:      *end,
+		Count:          req.Count,
+		Successes:      req.Successes,
+		Failures:       req.Failures,
+		Cancelled:      req.Cancelled,
+		DurationP50Ms:  req.DurationMs.P50,
+		DurationP95Ms:  req.DurationMs.P95,
+		DurationP99Ms:  req.DurationMs.P99,
+		DurationMaxMs:  req.DurationMs.Max,
+		TagsJSON:       rawOrEmpty(req.Tags),
+		IdempotencyKey: idem,
+	}
+	if err := s.DB.Create(&rollup).Error; err != nil {
+		return fiber.StatusInternalServerError, fiber.Map{"error": err.Error()}
+	}
+	return fiber.StatusOK, fiber.Map{"rollup_id": rollup.ID, "count": rollup.Count}
+}
+
+// Batch applies many monitoring/heartbeat/rollup events in order and returns one result per
+// event. Once an event for a job fails, later events for that job in the same batch are
+// skipped with 424 so clients can keep per-job FIFO order and retry them together.
+func (s *Server) Batch(c *fiber.Ctx) error {
+	var req batchRequest
+	if err := c.BodyParser(&req); err != nil {
+		return c.Status(fiber.StatusBadRequest).JSON(fiber.Map{"error": "invalid json"})
+	}
+	if len(req.Events) == 0 {
+		return c.Status(fiber.StatusBadRequest).JSON(fiber.Map{"error": "events required"})
+	}
+	if len(req.Events) > maxBatchEvents {
+		return c.Status(fiber.StatusRequestEntityTooLarge).JSON(fiber.Map{
+			"error":      "too many events",
+			"max_events": maxBatchEvents,
+		})
+	}
+
+	failedJobs := make(map[string]bool)
+	results := make([]fiber.Map, len(req.Events))
+	for i, ev := range req.Events {
+		status, body := s.ingestBatchEvent(ev, failedJobs)
+		results[i] = fiber.Map{"status": status, "body": body}
+	}
+	return c.JSON(fiber.Map{"results": results})
+}
+
+func (s *Server) ingestBatchEvent(ev batchEvent, failedJobs map[string]bool) (int, fiber.Map) {
+	var (
+		status  int
+		body    fiber.Map
+		jobName string
+	)
+	switch ev.Endpoint {
+	case "monitoring":
+		var req monitoringRequest
+		if err := json.Unmarshal(ev.Payload, &req); err != nil {
+			return fiber.StatusBadRequest, fiber.Map{"error": "invalid json"}
+		}
+		jobName = strings.TrimSpace(req.JobName)
+		if failedJobs[jobName] {
+			return fiber.StatusFailedDependency, fiber.Map{"error": "skipped after earlier failure for job", "job_name": jobName}
+		}
+		status, body = s.ingestMonitoring(req, ev.IdempotencyKey)
+	case "heartbeat":
+		var req heartbeatRequest
+		if err := json.Unmarshal(ev.Payload, &req); err != nil {
+			return fiber.StatusBadRequest, fiber.Map{"error": "invalid json"}
+		}
+		jobName = strings.TrimSpace(req.JobName)
+		if failedJobs[jobName] {
+			return fiber.StatusFailedDependency, fiber.Map{"error": "skipped after earlier failure for job", "job_name": jobName}
+		}
+		status, body = s.ingestHeartbeat(req)
+	case "rollup":
+		var req rollupRequest
+		if err := json.Unmarshal(ev.Payload, &req); err != nil {
+			return fiber.StatusBadRequest, fiber.Map{"error": "invalid json"}
+		}
+		jobName = strings.TrimSpace(req.JobName)
+		if failedJobs[jobName] {
+			return fiber.StatusFailedDependency, fiber.Map{"error": "skipped after earlier failure for job", "job_name": jobName}
+		}
+		status, body = s.ingestRollup(req, ev.IdempotencyKey)
+	default:
+		return fiber.StatusBadRequest, fiber.Map{"error": "unknown endpoint", "endpoint": ev.Endpoint}
+	}
+	if status >= fiber.StatusMultipleChoices {
+		failedJobs[jobName] = true
+	}
+	return status, body
 }
 
 // CheckHeartbeat scans for stale heartbeats and sends miss alerts (debounce: once until heartbeat resumes).
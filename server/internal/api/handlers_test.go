@@ -1,7 +1,10 @@
 package api_test
 
 import (
+	"bytes"
+	"compress/gzip"
 	"encoding/json"
+	"fmt"
 	"io"
 	"net/http/httptest"
 	"path/filepath"
@@ -107,8 +110,10 @@ func setupEnv(t *testing.T, cfg config.Config) *testEnv {
 	app := fiber.New()
 	app.Get("/health", srv.Health)
 	authMW := auth.Middleware([]string{"test-key"})
-	app.Post("/monitoring", authMW, srv.Monitoring)
-	app.Post("/heartbeat", authMW, srv.Heartbeat)
+	app.Post("/monitoring", authMW, api.DecompressRequest, srv.Monitoring)
+	app.Post("/heartbeat", authMW, api.DecompressRequest, srv.Heartbeat)
+	app.Post("/rollup", authMW, api.DecompressRequest, srv.Rollup)
+	app.Post("/batch", authMW, api.DecompressRequest, srv.Batch)
 	app.Get("/check_heartbeat", authMW, srv.CheckHeartbeat)
 	ent := app.Group("/enterprise", authMW)
 	ent.All("/:feature", srv.EnterpriseStub)
@@ -169,6 +174,64 @@ func TestHealth(t *testing.T) {
 	if ver == "" {
 		t.Fatalf("missing version: %v", body)
 	}
+	caps, _ := body["capabilities"].([]any)
+	if !containsAny(caps, "gzip") || !containsAny(caps, "batch") || !containsAny(caps, "logs_offset") {
+		t.Fatalf("capabilities=%v", body["capabilities"])
+	}
+	if body["max_log_bytes"] != float64(maxRunLogBytes) {
+		t.Fatalf("max_log_bytes=%v", body["max_log_bytes"])
+	}
+}
+
+func containsAny(items []any, want string) bool {
+	for _, item := range items {
+		if item == want {
+			return true
+		}
+	}
+	return false
+}
+
+func gzipBody(t *testing.T, body string) string {
+	t.Helper()
+	var buf bytes.Buffer
+	zw := gzip.NewWriter(&buf)
+	if _, err := zw.Write([]byte(body)); err != nil {
+		t.Fatal(err)
+	}
+	if err := zw.Close(); err != nil {
+		t.Fatal(err)
+	}
+	return buf.String()
+}
+
+func TestGzipRequestBodies(t *testing.T) {
+	env := setupEnv(t, config.Config{HeartbeatStaleAfterSec: 300})
+	gz := map[string]string{"Content-Encoding": "gzip"}
+
+	status, out := postJSON(t, env.app, "/monitoring",
+		gzipBody(t, `{"job_name":"zipped","status":"running","run_id":""}`), gz)
+	if status != 200 {
+		t.Fatalf("monitoring status=%d body=%v", status, out)
+	}
+	if runID, _ := out["run_id"].(string); runID == "" {
+		t.Fatalf("expected run_id: %v", out)
+	}
+
+	status, out = postJSON(t, env.app, "/heartbeat", gzipBody(t, `{"job_name":"zipped"}`), gz)
+	if status != 200 {
+		t.Fatalf("heartbeat status=%d body=%v", status, out)
+	}
+
+	status, _ = postJSON(t, env.app, "/monitoring", "not gzip", gz)
+	if status != 400 {
+		t.Fatalf("corrupt gzip status=%d", status)
+	}
+	status, _ = postJSON(t, env.app, "/monitoring", `{"job_name":"x"}`,
+		map[string]string{"Content-Encoding": "br"})
+	if status != 415 {
+		t.Fatalf("unsupported encoding status=%d", status)
+	}
 }
 
 func TestMonitoringRegisterAndComplete(t *testing.T) {
@@ -193,6 +256,59 @@ func TestMonitoringRegisterAndComplete(t *testing.T) {
 	}
 }
 
+func TestClientAssignedRunID(t *testing.T) {
+	env := setupEnv(t, config.Config{NotifyOnStart: true, HeartbeatStaleAfterSec: 300})
+	runID := "0190a1b2-c3d4-7e5f-8a9b-0c1d2e3f4a5b"
+
+	status, start := postJSON(t, env.app, "/monitoring",
+		`{"job_name":"job1","status":"running","run_id":"`+runID+`","start_time":"2026-01-01T00:00:00Z"}`,
+		map[string]string{"Idempotency-Key": "c1:register"})
+	if status != 200 {
+		t.Fatalf("status=%d body=%v", status, start)
+	}
+	if start["run_id"] != runID {
+		t.Fatalf("run_id=%v", start["run_id"])
+	}
+	if !env.notifier.waitFor(1, time.Second) {
+		t.Fatal("expected start notify")
+	}
+
+	status, _ = postJSON(t, env.app, "/monitoring",
+		`{"job_name":"job1","status":"success","run_id":"`+runID+`"}`,
+		map[string]string{"Idempotency-Key": "c1:complete"})
+	if status != 200 {
+		t.Fatalf("complete status=%d", status)
+	}
+	var runs []models.Run
+	if err := env.db.Where("run_id = ?", runID).Find(&runs).Error; err != nil {
+		t.Fatal(err)
+	}
+	if len(runs) != 1 || runs[0].Status != "success" {
+		t.Fatalf("runs=%v", runs)
+	}
+
+	status, body := postJSON(t, env.app, "/monitoring",
+		`{"job_name":"other","status":"running","run_id":"`+runID+`"}`, nil)
+	if status != 409 {
+		t.Fatalf("cross-job run_id status=%d body=%v", status, body)
+	}
+}
+
+func TestClientAssignedRunIDTerminalOnly(t *testing.T) {
+	env := setupEnv(t, config.Config{NotifyOnFailure: true, HeartbeatStaleAfterSec: 300})
+	runID := "0190a1b2-c3d4-7e5f-8a9b-0c1d2e3f4a5c"
+
+	status, body := postJSON(t, env.app, "/monitoring",
+		`{"job_name":"job1","status":"failed","run_id":"`+runID+`","error_details":"boom"}`,
+		map[string]string{"Idempotency-Key": "t1:complete"})
+	if status != 200 {
+		t.Fatalf("status=%d body=%v", status, body)
+	}
+	if body["run_id"] != runID {
+		t.Fatalf("run_id=%v", body["run_id"])
+	}
+}
+
 func TestProgressUpsertNoAlert(t *testing.T) {
 	env := setupEnv(t, config.Config{
 		NotifyOnStart:          true,
@@ -238,6 +354,45 @@ func TestProgressUpsertNoAlert(t *testing.T) {
 	}
 }
 
+func TestLogsOffsetChunksAssembleInAnyOrder(t *testing.T) {
+	env := setupEnv(t, config.Config{HeartbeatStaleAfterSec: 300})
+	runID := "0190a1b2-c3d4-7e5f-8a9b-0c1d2e3f4a60"
+	chunk := func(status, logs string, offset int) {
+		t.Helper()
+		body := fmt.Sprintf(`{"job_name":"long","status":%q,"run_id":%q,"logs":%q,"logs_offset":%d}`,
+			status, runID, logs, offset)
+		if code, out := postJSON(t, env.app, "/monitoring", body, nil); code != 200 {
+			t.Fatalf("status=%d body=%v", code, out)
+		}
+	}
+	logsOf := func() string {
+		t.Helper()
+		var run models.Run
+		if err := env.db.Where("run_id = ?", runID).First(&run).Error; err != nil {
+			t.Fatal(err)
+		}
+		return run.Logs
+	}
+
+	chunk("running", "first\n", 0)
+	chunk("running", "third\n", 12)
+	if got := logsOf(); got != "first\n      third\n" {
+		t.Fatalf("gap not padded: %q", got)
+	}
+	chunk("running", "second", 6)
+	chunk("running", "second", 6) // retried
+	chunk("success", "tail\n", 18)
+	if got := logsOf(); got != "first\nsecondthird\ntail\n" {
+		t.Fatalf("logs=%q", got)
+	}
+
+	code, _ := postJSON(t, env.app, "/monitoring",
+		`{"job_name":"long","status":"running","run_id":"`+runID+`","logs":"x","logs_offset":-1}`, nil)
+	if code != 413 {
+		t.Fatalf("negative offset status=%d", code)
+	}
+}
+
 func TestCancelledStatusAndNotify(t *testing.T) {
 	env := setupEnv(t, config.Config{
 		NotifyOnFailure:        true,
@@ -407,3 +562,103 @@ func TestHeartbeatMissCheckAndDebounce(t *testing.T) {
 		t.Fatal("expected LastMissAlertAt cleared")
 	}
 }
+
+func TestBatchPerItemResults(t *testing.T) {
+	env := setupEnv(t, config.Config{NotifyOnFailure: true, HeartbeatStaleAfterSec: 300})
+
+	body := `{"events":[
+		{"endpoint":"heartbeat","idempotency_key":"h1","payload":{"job_name":"worker"}},
+		{"endpoint":"monitoring","idempotency_key":"m1:complete","payload":{"job_name":"etl","status":"success","run_id":"r-batch-1"}},
+		{"endpoint":"monitoring","idempotency_key":"m2:complete","payload":{"job_name":"etl","status":"bogus"}},
+		{"endpoint":"monitoring","idempotency_key":"m3:complete","payload":{"job_name":"etl","status":"success","run_id":"r-batch-3"}},
+		{"endpoint":"nope","payload":{"job_name":"x"}}
+	]}`
+	status, out := postJSON(t, env.app, "/batch", body, nil)
+	if status != 200 {
+		t.Fatalf("status=%d body=%v", status, out)
+	}
+	results, _ := out["results"].([]any)
+	if len(results) != 5 {
+		t.Fatalf("results=%v", out["results"])
+	}
+	want := []float64{200, 200, 400, 424, 400}
+	for i, w := range want {
+		item := results[i].(map[string]any)
+		if item["status"] != w {
+			t.Fatalf("item %d status=%v want %v (%v)", i, item["status"], w, item)
+		}
+	}
+
+	var count int64
+	env.db.Model(&models.Run{}).Where("run_id = ?", "r-batch-3").Count(&count)
+	if count != 0 {
+		t.Fatal("event after a failed event for the same job must be skipped")
+	}
+
+	// Replaying the same batch item is idempotent.
+	status, _ = postJSON(t, env.app, "/batch",
+		`{"events":[{"endpoint":"monitoring","idempotency_key":"m1:complete","payload":{"job_name":"etl","status":"success","run_id":"r-batch-1"}}]}`, nil)
+	if status != 200 {
+		t.Fatalf("retry status=%d", status)
+	}
+	env.db.Model(&models.Run{}).Where("run_id = ?", "r-batch-1").Count(&count)
+	if count != 1 {
+		t.Fatalf("runs=%d", count)
+	}
+}
+
+func TestBatchLimits(t *testing.T) {
+	app := setupApp(t)
+	status, _ := postJSON(t, app, "/batch", `{"events":[]}`, nil)
+	if status != 400 {
+		t.Fatalf("empty status=%d", status)
+	}
+	events := make([]string, 501)
+	for i := range events {
+		events[i] = `{"endpoint":"heartbeat","payload":{"job_name":"w"}}`
+	}
+	status, _ = postJSON(t, app, "/batch", `{"events":[`+strings.Join(events, ",")+`]}`, nil)
+	if status != 413 {
+		t.Fatalf("oversized status=%d", status)
+	}
+}
+
+func TestRollupIngest(t *testing.T) {
+	env := setupEnv(t, config.Config{NotifyOnFailure: true, HeartbeatStaleAfterSec: 300})
+	body := `{"job_name":"hot","window_start":"2026-01-01T00:00:00Z","window_end":"2026-01-01T00:01:00Z",
+		"count":1000,"successes":990,"failures":10,"cancelled":0,
+		"duration_ms":{"p50":4.5,"p95":12,"p99":30,"max":81.2}}`
+
+	for i := 0; i < 2; i++ {
+		status, out := postJSON(t, env.app, "/rollup", body, map[string]string{"Idempotency-Key": "w1"})
+		if status != 200 || out["count"] != float64(1000) {
+			t.Fatalf("attempt %d status=%d body=%v", i, status, out)
+		}
+	}
+	var rollups []models.Rollup
+	env.db.Find(&rollups)
+	if len(rollups) != 1 {
+		t.Fatalf("replayed rollup must be stored once, got %d", len(rollups))
+	}
+	if r := rollups[0]; r.Failures != 10 || r.DurationP95Ms != 12 || r.DurationMaxMs != 81.2 {
+		t.Fatalf("rollup=%+v", r)
+	}
+	var runs int64
+	env.db.Model(&models.Run{}).Count(&runs)
+	if runs != 0 || len(env.notifier.statuses()) != 0 {
+		t.Fatal("a rollup must not create runs or alerts")
+	}
+
+	status, _ := postJSON(t, env.app, "/rollup",
+		`{"job_name":"hot","window_start":"2026-01-01T00:00:00Z","window_end":"2026-01-01T00:01:00Z","count":1,"successes":2}`, nil)
+	if status != 400 {
+		t.Fatalf("inconsistent counts status=%d", status)
+	}
+
+	status, out := postJSON(t, env.app, "/batch",
+		`{"events":[{"endpoint":"rollup","idempotency_key":"w2","payload":{"job_name":"hot","window_start":"2026-01-01T00:01:00Z","window_end":"2026-01-01T00:02:00Z","count":5,"successes":5}}]}`, nil)
+	results, _ := out["results"].([]any)
+	if status != 200 || len(results) != 1 || results[0].(map[string]any)["status"] != float64(200) {
+		t.Fatalf("batch status=%d body=%v", status, out)
+	}
+}
@@ -36,6 +36,7 @@ func Open(path string) (*gorm.DB, error) {
 		&models.Job{},
 		&models.Run{},
 		&models.Heartbeat{},
+		&models.Rollup{},
 		&models.AlertChannel{},
 	); err != nil {
 		_ = sqlDB.Close()
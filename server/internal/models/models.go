@@ -43,6 +43,27 @@ type Heartbeat struct {
 	Job          Job       `gorm:"constraint:OnUpdate:CASCADE,OnDelete:CASCADE;" json:"-"`
 }
 
+// Rollup summarises many runs of a job over one client-side window, for jobs
+// that run too often to record each execution.
+type Rollup struct {
+	ID             uint      `gorm:"primaryKey" json:"id"`
+	JobID          uint      `gorm:"index;not null" json:"job_id"`
+	WindowStart    time.Time `gorm:"index;not null" json:"window_start"`
+	WindowEnd      time.Time `gorm:"not null" json:"window_end"`
+	Count          int64     `gorm:"not null" json:"count"`
+	Successes      int64     `gorm:"not null" json:"successes"`
+	Failures       int64     `gorm:"not null" json:"failures"`
+	Cancelled      int64     `gorm:"not null" json:"cancelled"`
+	DurationP50Ms  float64   `json:"duration_p50_ms"`
+	DurationP95Ms  float64   `json:"duration_p95_ms"`
+	DurationP99Ms  float64   `json:"duration_p99_ms"`
+	DurationMaxMs  float64   `json:"duration_max_ms"`
+	TagsJSON       string    `gorm:"type:text" json:"tags,omitempty"`
+	IdempotencyKey string    `gorm:"size:128;index" json:"idempotency_key,omitempty"`
+	CreatedAt      time.Time `json:"created_at"`
+	Job            Job       `gorm:"constraint:OnUpdate:CASCADE,OnDelete:CASCADE;" json:"-"`
+}
+
 type AlertChannel struct {
 	ID         uint      `gorm:"primaryKey" json:"id"`
 	Type       string    `gorm:"size:32;not null;index" json:"type"` // webhook | email